@@ -2,22 +2,61 @@
 Audio processing API endpoints
 """
 
+import asyncio
+import json
+import os
 from pathlib import Path
+from typing import Optional
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
-
-from app.config import TEMP_DIR
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.config import (
+    AUDIO_METADATA_BATCH_MAX_FILES,
+    AUDIO_STREAM_FORMATS,
+    AUDIO_WAVEFORM_DEFAULT_WIDTH,
+    AUDIO_WAVEFORM_MAX_LEVELS,
+    AUDIO_WAVEFORM_MAX_WIDTH,
+    TEMP_DIR,
+)
 from app.models.audio import AudioMetadataResponse, AudioProcessingResponse
 from app.services.audio_service import (
     compress_audio,
     convert_audio,
+    encode_waveform_binary,
+    extract_audio_archive,
     extract_audio_metadata,
+    extract_waveform,
+    get_audio_compress_options,
+    get_audio_convert_options,
+    get_waveform_cache_name,
     merge_audio,
 )
+from app.services.audio_service_async import (
+    iter_audio_metadata,
+    merge_audio_with_progress,
+    transcode_audio_with_progress,
+)
+from app.tasks import task_store
 from app.utils.file_handler import delete_file, generate_unique_filename, save_upload_file
+from app.utils.media_stream import get_stream_media_type, start_ffmpeg_stream
 
 router = APIRouter(prefix="/audio", tags=["Audio"])
 
+SUPPORTED_AUDIO_EXTENSIONS = {
+    ".mp3",
+    ".wav",
+    ".flac",
+    ".ogg",
+    ".aac",
+    ".m4a",
+    ".wma",
+    ".opus",
+    ".mp4",  # Can contain audio
+    ".m4v",  # Can contain audio
+}
+
 
 def validate_audio_format(filename: str) -> bool:
     """
@@ -32,21 +71,8 @@ def validate_audio_format(filename: str) -> bool:
     if not filename:
         return False
 
-    supported_formats = {
-        ".mp3",
-        ".wav",
-        ".flac",
-        ".ogg",
-        ".aac",
-        ".m4a",
-        ".wma",
-        ".opus",
-        ".mp4",  # Can contain audio
-        ".m4v",  # Can contain audio
-    }
-
     file_ext = Path(filename).suffix.lower()
-    return file_ext in supported_formats
+    return file_ext in SUPPORTED_AUDIO_EXTENSIONS
 
 
 @router.post("/convert", response_model=AudioProcessingResponse)
@@ -98,7 +124,9 @@ async def convert_audio_endpoint(
         output_filename = generate_unique_filename(f"{base_name}.{output_format}")
         output_path = TEMP_DIR / output_filename
 
-        result = convert_audio(
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            convert_audio,
             input_path=input_path,
             output_path=output_path,
             output_format=output_format,
@@ -116,6 +144,161 @@ async def convert_audio_endpoint(
             delete_file(input_path)
 
 
+async def run_transcode_task(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    output_options: dict,
+    chunked: bool,
+    message: str,
+):
+    """Background task for audio conversion/compression with progress"""
+    try:
+        await transcode_audio_with_progress(
+            task_id, input_path, output_path, output_options, chunked, message
+        )
+    finally:
+        delete_file(input_path)
+
+
+@router.post("/convert/async")
+async def convert_audio_async(
+    file: UploadFile = File(..., description="Audio file to convert"),
+    output_format: str = Form(
+        ..., description="Output audio format (mp3, wav, flac, ogg, aac, m4a)"
+    ),
+    quality: str = Form("medium", description="Conversion quality (low, medium, high)"),
+    bitrate: str = Form("192k", description="Audio bitrate (e.g., 128k, 192k, 256k, 320k)"),
+    chunked: bool = Form(
+        False, description="Split long MP3/AAC encodes into segments encoded on all cores"
+    ),
+):
+    """
+    Start async audio conversion with progress tracking
+
+    With chunked=true, long recordings converted to MP3, AAC or M4A are split
+    into segments that are encoded concurrently and joined on the encoder's
+    frame boundaries. The result carries no encoder-delay (gapless playback)
+    metadata, so it starts a few milliseconds later than a single-pass encode.
+
+    Returns a task_id for progress tracking via SSE
+    """
+    if not validate_audio_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported audio format")
+
+    output_format = output_format.lower()
+    output_options = get_audio_convert_options(output_format, quality.lower(), bitrate)
+    if output_options is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported output format. Allowed formats: mp3, wav, flac, ogg, aac, m4a",
+        )
+
+    if quality.lower() not in {"low", "medium", "high"}:
+        raise HTTPException(
+            status_code=400, detail="Invalid quality. Allowed values: low, medium, high"
+        )
+
+    input_path = await save_upload_file(file)
+
+    base_name = Path(file.filename).stem
+    output_filename = generate_unique_filename(f"{base_name}.{output_format}")
+    output_path = TEMP_DIR / output_filename
+
+    task = task_store.create_task(
+        task_type="audio_convert",
+        metadata={
+            "filename": file.filename,
+            "output_format": output_format,
+            "quality": quality.lower(),
+            "bitrate": bitrate,
+            "chunked": chunked,
+        },
+    )
+
+    asyncio.create_task(
+        run_transcode_task(
+            task.id,
+            input_path,
+            output_path,
+            output_options,
+            chunked,
+            f"Audio converted to {output_format.upper()} successfully",
+        )
+    )
+
+    return {"task_id": task.id}
+
+
+@router.post("/convert/stream")
+async def convert_audio_stream_endpoint(
+    file: UploadFile = File(..., description="Audio file to convert"),
+    output_format: str = Form(
+        ..., description="Output audio format (mp3, aac, ogg, flac, wav, m4a)"
+    ),
+    quality: str = Form("medium", description="Conversion quality (low, medium, high)"),
+    bitrate: str = Form("192k", description="Audio bitrate (e.g., 128k, 192k, 256k, 320k)"),
+):
+    """
+    Convert an audio file and stream the result while it is being encoded
+
+    The response body is FFmpeg's output, sent chunk by chunk as soon as it is
+    produced, so playback or saving can start long before a long file is fully
+    converted. M4A is sent as fragmented MP4. The same bytes are kept in
+    temporary storage; once the stream completes they are available at the
+    URL in the X-Download-Url header.
+
+    Supported output formats: MP3, AAC, OGG, FLAC, WAV, M4A
+    """
+    if not validate_audio_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported audio format")
+
+    output_format = output_format.lower()
+    if output_format not in AUDIO_STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported output format. Allowed formats: {', '.join(AUDIO_STREAM_FORMATS)}",
+        )
+
+    if quality.lower() not in {"low", "medium", "high"}:
+        raise HTTPException(
+            status_code=400, detail="Invalid quality. Allowed values: low, medium, high"
+        )
+
+    input_path = await save_upload_file(file)
+
+    base_name = Path(file.filename).stem
+    output_filename = generate_unique_filename(f"{base_name}.{output_format}")
+    muxer, muxer_options = AUDIO_STREAM_FORMATS[output_format]
+    output_options = {
+        **get_audio_convert_options(output_format, quality.lower(), bitrate),
+        **muxer_options,
+    }
+    # A piped MP3 never gets its VBR header rewritten, so players could only
+    # guess the duration; constant bitrate keeps their estimate exact
+    output_options.pop("q:a", None)
+
+    try:
+        chunks = await start_ffmpeg_stream(
+            input_path,
+            TEMP_DIR / output_filename,
+            muxer,
+            output_options,
+            cleanup_paths=(input_path,),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"FFmpeg error: {str(e)}")
+
+    return StreamingResponse(
+        chunks,
+        media_type=get_stream_media_type(output_format),
+        headers={
+            "Content-Disposition": f'inline; filename="{output_filename}"',
+            "X-Download-Url": f"/api/v1/download/{output_filename}",
+        },
+    )
+
+
 @router.post("/compress", response_model=AudioProcessingResponse)
 async def compress_audio_endpoint(
     file: UploadFile = File(..., description="Audio file to compress"),
@@ -175,7 +358,9 @@ async def compress_audio_endpoint(
         output_filename = generate_unique_filename(f"{base_name}_compressed.{output_ext}")
         output_path = TEMP_DIR / output_filename
 
-        result = compress_audio(
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            compress_audio,
             input_path=input_path,
             output_path=output_path,
             quality=quality,
@@ -192,24 +377,75 @@ async def compress_audio_endpoint(
             delete_file(input_path)
 
 
-@router.post("/merge", response_model=AudioProcessingResponse)
-async def merge_audio_endpoint(
-    files: list[UploadFile] = File(..., description="Audio files to merge (in order)"),
-    output_format: str = Form("mp3", description="Output format (mp3, wav, flac, ogg, aac, m4a)"),
-    quality: str = Form("medium", description="Output quality (low, medium, high)"),
-    bitrate: str = Form("192k", description="Audio bitrate (e.g., 128k, 192k, 256k, 320k)"),
+@router.post("/compress/async")
+async def compress_audio_async(
+    file: UploadFile = File(..., description="Audio file to compress"),
+    quality: str = Form("medium", description="Compression quality (low, medium, high)"),
+    target_bitrate: str = Form(
+        "128k", description="Target bitrate (e.g., 64k, 96k, 128k, 160k, 192k)"
+    ),
+    chunked: bool = Form(
+        False, description="Split long MP3/AAC encodes into segments encoded on all cores"
+    ),
 ):
     """
-    Merge multiple audio files into one
+    Start async audio compression with progress tracking
 
-    - **files**: Audio files to merge (in order)
-    - **output_format**: Target format (mp3, wav, flac, ogg, aac, m4a)
-    - **quality**: Output quality preset (low, medium, high)
-    - **bitrate**: Audio bitrate for lossy formats (128k, 192k, 256k, 320k)
+    With chunked=true, long MP3/AAC/M4A (and WAV/FLAC, compressed to MP3)
+    recordings are split into segments encoded concurrently.
 
-    Supported input formats: MP3, WAV, FLAC, OGG, AAC, M4A, WMA, OPUS, MP4, M4V
-    Supported output formats: MP3, WAV, FLAC, OGG, AAC, M4A
+    Returns a task_id for progress tracking via SSE
     """
+    if not validate_audio_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported audio format")
+
+    if quality.lower() not in {"low", "medium", "high"}:
+        raise HTTPException(
+            status_code=400, detail="Invalid quality. Allowed values: low, medium, high"
+        )
+
+    if not target_bitrate.endswith("k"):
+        raise HTTPException(
+            status_code=400,
+            detail="Bitrate must be in format like '128k', '192k', etc.",
+        )
+
+    input_path = await save_upload_file(file)
+
+    base_name = Path(file.filename).stem
+    input_ext = Path(file.filename).suffix.lower()
+    output_ext = "mp3" if input_ext in [".wav", ".flac"] else input_ext.lstrip(".")
+    output_filename = generate_unique_filename(f"{base_name}_compressed.{output_ext}")
+    output_path = TEMP_DIR / output_filename
+
+    output_options = get_audio_compress_options(input_path, quality.lower(), target_bitrate)
+
+    task = task_store.create_task(
+        task_type="audio_compress",
+        metadata={
+            "filename": file.filename,
+            "quality": quality.lower(),
+            "target_bitrate": target_bitrate,
+            "chunked": chunked,
+        },
+    )
+
+    asyncio.create_task(
+        run_transcode_task(
+            task.id,
+            input_path,
+            output_path,
+            output_options,
+            chunked,
+            f"Audio compressed successfully (bitrate: {output_options['b:a']})",
+        )
+    )
+
+    return {"task_id": task.id}
+
+
+def validate_merge_request(files: list[UploadFile], output_format: str, quality: str, mode: str):
+    """Validate the parameters of a merge request, raising HTTPException on errors"""
     if len(files) < 2:
         raise HTTPException(
             status_code=400, detail="At least 2 audio files are required for merging"
@@ -236,6 +472,34 @@ async def merge_audio_endpoint(
             detail=f"Invalid quality. Allowed values: {', '.join(allowed_qualities)}",
         )
 
+    if mode.lower() not in {"auto", "reencode"}:
+        raise HTTPException(status_code=400, detail="Invalid mode. Allowed values: auto, reencode")
+
+
+@router.post("/merge", response_model=AudioProcessingResponse)
+async def merge_audio_endpoint(
+    files: list[UploadFile] = File(..., description="Audio files to merge (in order)"),
+    output_format: str = Form("mp3", description="Output format (mp3, wav, flac, ogg, aac, m4a)"),
+    quality: str = Form("medium", description="Output quality (low, medium, high)"),
+    bitrate: str = Form("192k", description="Audio bitrate (e.g., 128k, 192k, 256k, 320k)"),
+    mode: str = Form("auto", description="Merge mode (auto: stream copy when possible, reencode)"),
+):
+    """
+    Merge multiple audio files into one
+
+    - **files**: Audio files to merge (in order)
+    - **output_format**: Target format (mp3, wav, flac, ogg, aac, m4a)
+    - **quality**: Output quality preset (low, medium, high)
+    - **bitrate**: Audio bitrate for lossy formats (128k, 192k, 256k, 320k)
+    - **mode**: `auto` joins files sharing the same codec, sample rate and
+      channels without re-encoding (e.g. audiobook chapters; quality and
+      bitrate are then kept from the inputs); `reencode` always re-encodes
+
+    Supported input formats: MP3, WAV, FLAC, OGG, AAC, M4A, WMA, OPUS, MP4, M4V
+    Supported output formats: MP3, WAV, FLAC, OGG, AAC, M4A
+    """
+    validate_merge_request(files, output_format, quality, mode)
+
     input_paths = []
     output_path = None
 
@@ -250,12 +514,15 @@ async def merge_audio_endpoint(
         output_filename = generate_unique_filename(f"{base_name}_merged.{output_format}")
         output_path = TEMP_DIR / output_filename
 
-        result = merge_audio(
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            merge_audio,
             input_paths=input_paths,
             output_path=output_path,
             output_format=output_format,
             quality=quality,
             bitrate=bitrate,
+            mode=mode.lower(),
         )
 
         if not result.success:
@@ -270,6 +537,130 @@ async def merge_audio_endpoint(
                 delete_file(input_path)
 
 
+async def run_merge_task(task_id: str, input_paths: list[Path], output_path: Path, options: dict):
+    """Background task for audio merging with progress"""
+    try:
+        await merge_audio_with_progress(task_id, input_paths, output_path, **options)
+    finally:
+        for input_path in input_paths:
+            delete_file(input_path)
+
+
+@router.post("/merge/async")
+async def merge_audio_async(
+    files: list[UploadFile] = File(..., description="Audio files to merge (in order)"),
+    output_format: str = Form("mp3", description="Output format (mp3, wav, flac, ogg, aac, m4a)"),
+    quality: str = Form("medium", description="Output quality (low, medium, high)"),
+    bitrate: str = Form("192k", description="Audio bitrate (e.g., 128k, 192k, 256k, 320k)"),
+    mode: str = Form("auto", description="Merge mode (auto: stream copy when possible, reencode)"),
+):
+    """
+    Start async audio merging with progress tracking
+
+    Returns a task_id for progress tracking via SSE
+    """
+    validate_merge_request(files, output_format, quality, mode)
+
+    # Save all uploaded files
+    input_paths = [await save_upload_file(file) for file in files]
+
+    # Build output filename
+    base_name = Path(files[0].filename).stem
+    output_filename = generate_unique_filename(f"{base_name}_merged.{output_format}")
+    output_path = TEMP_DIR / output_filename
+
+    options = {
+        "output_format": output_format.lower(),
+        "quality": quality.lower(),
+        "bitrate": bitrate,
+        "mode": mode.lower(),
+    }
+
+    # Create task
+    task = task_store.create_task(
+        task_type="audio_merge",
+        metadata={"filenames": [file.filename for file in files], **options},
+    )
+
+    # Start background processing
+    asyncio.create_task(run_merge_task(task.id, input_paths, output_path, options))
+
+    return {"task_id": task.id}
+
+
+@router.post("/waveform")
+async def audio_waveform_endpoint(
+    file: UploadFile = File(..., description="Audio file to compute the waveform of"),
+    width: int = Form(
+        default=AUDIO_WAVEFORM_DEFAULT_WIDTH,
+        description="Number of peak buckets of the most detailed zoom level",
+    ),
+    levels: int = Form(
+        default=4, description="Number of zoom levels, each with half the buckets of the previous"
+    ),
+    output: str = Form(default="json", description="Response encoding: json or binary"),
+):
+    """
+    Compute waveform peaks (min, max and RMS per bucket) at several zoom levels.
+
+    Peaks are quantized to 8 bits and cached by content, so a waveform
+    editor can fetch the overview of a long recording in a few kilobytes
+    instead of downloading and decoding the whole file. The binary encoding
+    is described in encode_waveform_binary.
+    """
+    if not validate_audio_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported audio format")
+
+    if width < 16 or width > AUDIO_WAVEFORM_MAX_WIDTH:
+        raise HTTPException(
+            status_code=400, detail=f"width must be between 16 and {AUDIO_WAVEFORM_MAX_WIDTH}"
+        )
+
+    if levels < 1 or levels > AUDIO_WAVEFORM_MAX_LEVELS:
+        raise HTTPException(
+            status_code=400, detail=f"levels must be between 1 and {AUDIO_WAVEFORM_MAX_LEVELS}"
+        )
+
+    output = output.lower()
+    if output not in ("json", "binary"):
+        raise HTTPException(status_code=400, detail="output must be one of: json, binary")
+
+    input_path = None
+
+    try:
+        input_path = await save_upload_file(file)
+
+        # Hashing, probing and decoding all block: keep them off the event loop
+        output_path = TEMP_DIR / await run_in_threadpool(
+            get_waveform_cache_name, input_path, width=width, levels=levels
+        )
+        cache_status = "HIT" if output_path.exists() else "MISS"
+
+        if cache_status == "HIT":
+            # Keep recently used peaks from being cleaned up
+            os.utime(output_path)
+        else:
+            result = await run_in_threadpool(
+                extract_waveform, input_path, output_path, width, levels
+            )
+            if not result.success:
+                raise HTTPException(status_code=500, detail=result.message)
+
+        headers = {"X-Cache": cache_status}
+        if output == "binary":
+            waveform = await run_in_threadpool(lambda: json.loads(output_path.read_text()))
+            return Response(
+                content=encode_waveform_binary(waveform),
+                media_type="application/octet-stream",
+                headers=headers,
+            )
+        return FileResponse(path=output_path, media_type="application/json", headers=headers)
+
+    finally:
+        if input_path:
+            delete_file(input_path)
+
+
 @router.post("/metadata", response_model=AudioMetadataResponse)
 async def get_audio_metadata_endpoint(
     file: UploadFile = File(..., description="Audio file to extract metadata from"),
@@ -299,3 +690,77 @@ async def get_audio_metadata_endpoint(
     finally:
         if input_path:
             delete_file(input_path)
+
+
+@router.post("/metadata/batch")
+async def get_audio_metadata_batch_endpoint(
+    files: Optional[list[UploadFile]] = File(
+        default=None, description="Audio files to extract metadata from"
+    ),
+    archive: Optional[UploadFile] = File(
+        default=None, description="ZIP archive of audio files (other members are skipped)"
+    ),
+):
+    """
+    Extract metadata from many audio files in one request.
+
+    Files are probed concurrently on a bounded pool and the results are
+    streamed as NDJSON (one JSON object per line) as soon as each file is
+    done, so they arrive out of order: each line carries the `index` and
+    `filename` of its file alongside the fields of /audio/metadata.
+    """
+    files = files or []
+    if not files and archive is None:
+        raise HTTPException(status_code=400, detail="Upload files or a ZIP archive")
+
+    if len(files) > AUDIO_METADATA_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {AUDIO_METADATA_BATCH_MAX_FILES} files per request",
+        )
+
+    for file in files:
+        if not validate_audio_format(file.filename):
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported audio format: {file.filename}"
+            )
+
+    if archive is not None and Path(archive.filename or "").suffix.lower() != ".zip":
+        raise HTTPException(status_code=400, detail="archive must be a ZIP file")
+
+    inputs: list[tuple[str, Path]] = []
+    archive_path = None
+
+    try:
+        for file in files:
+            inputs.append((file.filename, await save_upload_file(file)))
+
+        if archive is not None:
+            archive_path = await save_upload_file(archive)
+            loop = asyncio.get_running_loop()
+            inputs.extend(
+                await loop.run_in_executor(
+                    None, extract_audio_archive, archive_path, SUPPORTED_AUDIO_EXTENSIONS
+                )
+            )
+    except ValueError as e:
+        for _, path in inputs:
+            delete_file(path)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        for _, path in inputs:
+            delete_file(path)
+        raise
+    finally:
+        if archive_path:
+            delete_file(archive_path)
+
+    async def generate_results():
+        try:
+            async for result in iter_audio_metadata(inputs):
+                yield json.dumps(result) + "\n"
+        finally:
+            for _, path in inputs:
+                delete_file(path)
+
+    return StreamingResponse(generate_results(), media_type="application/x-ndjson")
@@ -2,24 +2,68 @@
 Image processing API endpoints
 """
 
+import asyncio
 from pathlib import Path
-
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
-
-from app.config import TEMP_DIR
-from app.models.image import ColorExtractionResponse, ImageProcessingResponse
+from typing import Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from app.config import (
+    IMAGE_COLLAGE_CELL_SIZE,
+    IMAGE_COLLAGE_FORMATS,
+    IMAGE_COLLAGE_MAX_CELL_SIZE,
+    IMAGE_COLLAGE_MAX_GUTTER,
+    IMAGE_COLLAGE_MAX_PIXELS,
+    IMAGE_COLOR_BATCH_MAX_FILES,
+    IMAGE_COMPRESSION_QUALITY,
+    IMAGE_ENCODER_PROFILE_NAMES,
+    IMAGE_ICON_MAX_SIZE,
+    IMAGE_ICON_MIN_SIZE,
+    IMAGE_PREVIEW_FORMATS,
+    IMAGE_PREVIEW_QUALITY,
+    IMAGE_RESPONSIVE_FORMATS,
+    IMAGE_RESPONSIVE_MAX_WIDTH,
+    IMAGE_RESPONSIVE_MAX_WIDTHS,
+    IMAGE_RESPONSIVE_WIDTHS,
+    IMAGE_TILE_FORMATS,
+    IMAGE_TILE_LAYOUTS,
+    IMAGE_TILE_MAX_SIZE,
+    IMAGE_TILE_MIN_SIZE,
+    IMAGE_TILE_SIZE,
+    TEMP_DIR,
+)
+from app.models.image import (
+    ColorExtractionBatchResponse,
+    ColorExtractionResponse,
+    ImageOperations,
+    ImageProcessingResponse,
+    PreviewSessionResponse,
+)
+from app.services.image_preview_service import (
+    PreviewSession,
+    commit_preview,
+    create_preview_session,
+    preview_sessions,
+    render_preview,
+)
 from app.services.image_service import (
     adjust_image,
     apply_filter,
     compress_image,
     convert_image,
     create_collage,
+    create_favicon_bundle,
     create_icon,
+    create_responsive_images,
     extract_colors,
     flip_image,
     resize_image,
     rotate_image,
 )
+from app.services.image_service_async import create_tiles_with_progress
+from app.tasks import task_store
 from app.utils.file_handler import (
     delete_file,
     generate_unique_filename,
@@ -29,21 +73,63 @@ from app.utils.validators import validate_image_format
 
 router = APIRouter(prefix="/image", tags=["Image"])
 
+SUPPORTED_FILTERS = {"grayscale", "sepia", "blur", "sharpen", "invert"}
+
+
+def validate_encoder_profile(profile: Optional[str]):
+    """Raise a 400 error for an unknown encoder profile"""
+    if profile is not None and profile not in IMAGE_ENCODER_PROFILE_NAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported encoder profile. Supported: {', '.join(IMAGE_ENCODER_PROFILE_NAMES)}",
+        )
+
 
 @router.post("/compress", response_model=ImageProcessingResponse)
 async def compress_image_endpoint(
     file: UploadFile = File(..., description="Image file to compress"),
     quality: str = Form("medium", description="Compression quality (low, medium, high)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+    max_bytes: Optional[int] = Form(
+        None, description="Largest output size in bytes (searches the quality)"
+    ),
+    min_ssim: Optional[float] = Form(
+        None, description="Lowest SSIM against the input, 0-1 (searches the quality)"
+    ),
+    allow_downscale: bool = Form(
+        False, description="Reduce the dimensions when max_bytes cannot be met otherwise"
+    ),
+    output_format: Optional[str] = Form(
+        None, description="auto to keep the smallest of JPEG/WebP/AVIF/PNG (input format otherwise)"
+    ),
 ):
     """
     Compress an image file
 
+    With max_bytes and/or min_ssim the quality preset is ignored: the encoder
+    quality is searched in memory and the number of trial encodes is reported.
+    With output_format=auto every candidate format is tried in parallel, the
+    smallest is kept and all candidate sizes are reported.
+
     Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
     """
     # Validate file format
     if not validate_image_format(file.filename):
         raise HTTPException(status_code=400, detail="Unsupported image format")
 
+    validate_encoder_profile(profile)
+
+    if max_bytes is not None and max_bytes < 1:
+        raise HTTPException(status_code=400, detail="max_bytes must be positive")
+
+    if min_ssim is not None and not 0 < min_ssim < 1:
+        raise HTTPException(status_code=400, detail="min_ssim must be between 0 and 1")
+
+    if output_format is not None and output_format.lower() != "auto":
+        raise HTTPException(status_code=400, detail="output_format must be auto when set")
+
     input_path = None
     output_path = None
 
@@ -55,8 +141,18 @@ async def compress_image_endpoint(
         output_filename = generate_unique_filename(f"compressed_{file.filename}")
         output_path = TEMP_DIR / output_filename
 
-        # Compress image
-        result = compress_image(input_path, output_path, quality)
+        # Compress image (a quality search runs several encodes: keep it off the event loop)
+        result = await run_in_threadpool(
+            compress_image,
+            input_path,
+            output_path,
+            quality,
+            profile,
+            max_bytes=max_bytes,
+            min_ssim=min_ssim,
+            allow_downscale=allow_downscale,
+            output_format=output_format,
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -72,8 +168,14 @@ async def compress_image_endpoint(
 @router.post("/convert", response_model=ImageProcessingResponse)
 async def convert_image_endpoint(
     file: UploadFile = File(..., description="Image file to convert"),
-    output_format: str = Form(..., description="Target format (jpg, png, webp, etc.)"),
+    output_format: str = Form(
+        ..., description="Target format (jpg, png, webp, etc.), or auto for the smallest"
+    ),
     quality: str = Form("medium", description="Conversion quality (low, medium, high)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+    lossless: bool = Form(False, description="Encode WebP losslessly"),
 ):
     """
     Convert an image to a different format
@@ -85,9 +187,11 @@ async def convert_image_endpoint(
         raise HTTPException(status_code=400, detail="Unsupported input image format")
 
     # Validate output format
-    if output_format.lower() not in ["jpg", "jpeg", "png", "gif", "bmp", "webp"]:
+    if output_format.lower() not in ["jpg", "jpeg", "png", "gif", "bmp", "webp", "avif", "auto"]:
         raise HTTPException(status_code=400, detail="Unsupported output format")
 
+    validate_encoder_profile(profile)
+
     input_path = None
     output_path = None
 
@@ -101,7 +205,10 @@ async def convert_image_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Convert image
-        result = convert_image(input_path, output_path, output_format, quality)
+        # Encoding (to several formats with auto) is CPU-bound: keep it off the event loop
+        result = await run_in_threadpool(
+            convert_image, input_path, output_path, output_format, quality, profile, lossless
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -138,7 +245,8 @@ async def extract_colors_endpoint(
         input_path = await save_upload_file(file)
 
         # Extract colors
-        result = extract_colors(input_path, max_colors=max_colors)
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        result = await run_in_threadpool(extract_colors, input_path, max_colors=max_colors)
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -151,16 +259,81 @@ async def extract_colors_endpoint(
             delete_file(input_path)
 
 
+@router.post("/extract-colors/batch", response_model=ColorExtractionBatchResponse)
+async def extract_colors_batch_endpoint(
+    files: list[UploadFile] = File(..., description="Image files to analyze"),
+    max_colors: int = Form(6, description="Number of dominant colors to return per image"),
+):
+    """
+    Extract dominant colors from several images in one request.
+
+    Results are returned in upload order; an image that cannot be analyzed
+    gets an unsuccessful result without failing the others.
+    """
+    if len(files) > IMAGE_COLOR_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {IMAGE_COLOR_BATCH_MAX_FILES} images per request"
+        )
+
+    for file in files:
+        if not validate_image_format(file.filename):
+            raise HTTPException(
+                status_code=400, detail=f"Unsupported image format: {file.filename}"
+            )
+
+    if max_colors <= 0 or max_colors > 12:
+        raise HTTPException(status_code=400, detail="max_colors must be between 1 and 12")
+
+    input_paths = []
+
+    try:
+        for file in files:
+            input_paths.append(await save_upload_file(file))
+
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        results = await asyncio.gather(
+            *(
+                run_in_threadpool(extract_colors, input_path, max_colors=max_colors)
+                for input_path in input_paths
+            )
+        )
+        for file, result in zip(files, results):
+            result.filename = file.filename
+
+        succeeded = sum(result.success for result in results)
+        return ColorExtractionBatchResponse(
+            success=succeeded > 0,
+            message=f"Colors extracted from {succeeded}/{len(results)} image(s)",
+            results=results,
+        )
+
+    finally:
+        # Clean up input files
+        for input_path in input_paths:
+            delete_file(input_path)
+
+
 @router.post("/rotate", response_model=ImageProcessingResponse)
 async def rotate_image_endpoint(
     file: UploadFile = File(..., description="Image file to rotate"),
     angle: int = Form(..., description="Rotation angle in degrees (90, 180, or 270)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+    metadata_only: bool = Form(
+        False,
+        description="JPEG only: rewrite the EXIF orientation instead of moving pixels",
+    ),
 ):
     """
-    Rotate an image by a specified angle
+    Rotate an image clockwise by a specified angle
 
     Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
     Supported angles: 90, 180, 270 degrees
+
+    JPEGs whose size is a whole number of MCUs (8 or 16 pixels) are rotated
+    losslessly without re-encoding. With metadata_only, only the EXIF
+    orientation is rewritten (any size, near-instant).
     """
     # Validate file format
     if not validate_image_format(file.filename):
@@ -170,6 +343,11 @@ async def rotate_image_endpoint(
     if angle not in [90, 180, 270]:
         raise HTTPException(status_code=400, detail="Invalid angle. Supported angles: 90, 180, 270")
 
+    if metadata_only and Path(file.filename).suffix.lower() not in (".jpg", ".jpeg"):
+        raise HTTPException(status_code=400, detail="metadata_only requires a JPEG image")
+
+    validate_encoder_profile(profile)
+
     input_path = None
     output_path = None
 
@@ -182,7 +360,10 @@ async def rotate_image_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Rotate image
-        result = rotate_image(input_path, output_path, angle)
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        result = await run_in_threadpool(
+            rotate_image, input_path, output_path, angle, profile, metadata_only
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -204,6 +385,9 @@ async def resize_image_endpoint(
     resample: str = Form(
         "lanczos", description="Resampling algorithm (nearest, bilinear, bicubic, lanczos)"
     ),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
 ):
     """
     Resize an image to specified dimensions
@@ -221,6 +405,8 @@ async def resize_image_endpoint(
             status_code=400, detail="At least one dimension (width or height) must be specified"
         )
 
+    validate_encoder_profile(profile)
+
     # Validate dimensions are positive
     if width is not None and width <= 0:
         raise HTTPException(status_code=400, detail="Width must be a positive integer")
@@ -247,13 +433,16 @@ async def resize_image_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Resize image
-        result = resize_image(
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        result = await run_in_threadpool(
+            resize_image,
             input_path,
             output_path,
             width=width,
             height=height,
             maintain_aspect_ratio=maintain_aspect_ratio,
             resample=resample.lower(),
+            profile=profile,
         )
 
         if not result.success:
@@ -267,15 +456,151 @@ async def resize_image_endpoint(
             delete_file(input_path)
 
 
+def validate_operations(operations: ImageOperations):
+    """Raise a 400 error for out-of-range adjustments or an unknown filter"""
+    for value, name in [
+        (operations.brightness, "brightness"),
+        (operations.contrast, "contrast"),
+        (operations.saturation, "saturation"),
+    ]:
+        if value <= 0 or value > 3:
+            raise HTTPException(
+                status_code=400, detail=f"{name} must be greater than 0 and at most 3.0"
+            )
+
+    if operations.gamma < 0.1 or operations.gamma > 10:
+        raise HTTPException(status_code=400, detail="gamma must be between 0.1 and 10.0")
+
+    if not 0 <= operations.black_point < operations.white_point <= 255:
+        raise HTTPException(
+            status_code=400,
+            detail="Levels must satisfy 0 <= black_point < white_point <= 255",
+        )
+
+    if operations.filter_name and operations.filter_name.lower() not in SUPPORTED_FILTERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported filter. Supported: {', '.join(sorted(SUPPORTED_FILTERS))}",
+        )
+
+
+@router.post("/responsive")
+async def create_responsive_images_endpoint(
+    file: UploadFile = File(..., description="Image file to create the responsive set from"),
+    widths: str = Form(
+        ",".join(map(str, IMAGE_RESPONSIVE_WIDTHS)),
+        description="Comma-separated output widths in pixels",
+    ),
+    formats: str = Form(
+        "webp,jpg", description="Comma-separated output formats (webp, jpg, avif, png)"
+    ),
+    quality: str = Form("medium", description="Quality (low, medium, high)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+):
+    """
+    Create a responsive image set (srcset) from one upload
+
+    The image is decoded once and resized to every width, each width is
+    encoded to every format. Returns a ZIP with the images and
+    manifest.json holding a srcset per format. Widths larger than the
+    image are skipped.
+
+    Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
+    """
+    # Validate file format
+    if not validate_image_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    try:
+        width_list = sorted({int(width.strip()) for width in widths.split(",")})
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid widths format. Use comma-separated integers (e.g., '320,640,960')",
+        )
+    if len(width_list) > IMAGE_RESPONSIVE_MAX_WIDTHS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {IMAGE_RESPONSIVE_MAX_WIDTHS} widths are supported"
+        )
+    if width_list[0] < 1 or width_list[-1] > IMAGE_RESPONSIVE_MAX_WIDTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Widths must be between 1 and {IMAGE_RESPONSIVE_MAX_WIDTH} pixels",
+        )
+
+    format_list = list(
+        dict.fromkeys(
+            image_format.strip().lower().replace("jpeg", "jpg")
+            for image_format in formats.split(",")
+        )
+    )
+    for image_format in format_list:
+        if image_format not in IMAGE_RESPONSIVE_FORMATS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported output format. Supported: {', '.join(IMAGE_RESPONSIVE_FORMATS)}",
+            )
+
+    if quality not in IMAGE_COMPRESSION_QUALITY:
+        raise HTTPException(status_code=400, detail="Quality must be low, medium or high")
+
+    validate_encoder_profile(profile)
+
+    input_path = None
+
+    try:
+        # Save uploaded file
+        input_path = await save_upload_file(file)
+
+        base_name = Path(file.filename).stem
+        output_path = TEMP_DIR / generate_unique_filename(f"{base_name}_responsive.zip")
+
+        result = await run_in_threadpool(
+            create_responsive_images,
+            input_path,
+            output_path,
+            width_list,
+            format_list,
+            quality,
+            profile,
+            base_name,
+        )
+
+        if not result.success:
+            raise HTTPException(status_code=500, detail=result.message)
+
+        return FileResponse(
+            path=output_path,
+            filename=f"{base_name}_responsive.zip",
+            media_type="application/zip",
+            headers={"X-Download-Url": result.download_url},
+        )
+
+    finally:
+        # Clean up input file
+        if input_path:
+            delete_file(input_path)
+
+
 @router.post("/adjust", response_model=ImageProcessingResponse)
 async def adjust_image_endpoint(
     file: UploadFile = File(..., description="Image file to adjust"),
     brightness: float = Form(1.0, description="Brightness factor (0.1 - 3.0, 1.0 = original)"),
     contrast: float = Form(1.0, description="Contrast factor (0.1 - 3.0, 1.0 = original)"),
     saturation: float = Form(1.0, description="Saturation factor (0.1 - 3.0, 1.0 = original)"),
+    gamma: float = Form(1.0, description="Midtone gamma (0.1 - 10.0, 1.0 = original)"),
+    black_point: int = Form(0, description="Input level mapped to black (0 - 254)"),
+    white_point: int = Form(255, description="Input level mapped to white (1 - 255)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
 ):
     """
-    Adjust brightness, contrast, and saturation of an image.
+    Adjust brightness, contrast, saturation, gamma and levels of an image.
+
+    All adjustments are applied together in at most two passes over the pixels.
 
     Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
     """
@@ -283,16 +608,17 @@ async def adjust_image_endpoint(
     if not validate_image_format(file.filename):
         raise HTTPException(status_code=400, detail="Unsupported image format")
 
-    # Validate factors
-    for value, name in [
-        (brightness, "brightness"),
-        (contrast, "contrast"),
-        (saturation, "saturation"),
-    ]:
-        if value <= 0 or value > 3:
-            raise HTTPException(
-                status_code=400, detail=f"{name} must be greater than 0 and at most 3.0"
-            )
+    validate_operations(
+        ImageOperations(
+            brightness=brightness,
+            contrast=contrast,
+            saturation=saturation,
+            gamma=gamma,
+            black_point=black_point,
+            white_point=white_point,
+        )
+    )
+    validate_encoder_profile(profile)
 
     input_path = None
     output_path = None
@@ -306,12 +632,17 @@ async def adjust_image_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Adjust image
-        result = adjust_image(
+        result = await run_in_threadpool(
+            adjust_image,
             input_path,
             output_path,
             brightness=brightness,
             contrast=contrast,
             saturation=saturation,
+            gamma=gamma,
+            black_point=black_point,
+            white_point=white_point,
+            profile=profile,
         )
 
         if not result.success:
@@ -331,6 +662,9 @@ async def filter_image_endpoint(
     filter_name: str = Form(
         ..., description="Filter to apply (grayscale, sepia, blur, sharpen, invert)"
     ),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
 ):
     """
     Apply a visual filter to an image.
@@ -338,13 +672,14 @@ async def filter_image_endpoint(
     if not validate_image_format(file.filename):
         raise HTTPException(status_code=400, detail="Unsupported image format")
 
-    supported_filters = {"grayscale", "sepia", "blur", "sharpen", "invert"}
-    if filter_name.lower() not in supported_filters:
+    if filter_name.lower() not in SUPPORTED_FILTERS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported filter. Supported: {', '.join(sorted(supported_filters))}",
+            detail=f"Unsupported filter. Supported: {', '.join(sorted(SUPPORTED_FILTERS))}",
         )
 
+    validate_encoder_profile(profile)
+
     input_path = None
     output_path = None
 
@@ -353,7 +688,9 @@ async def filter_image_endpoint(
         output_filename = generate_unique_filename(f"filtered_{file.filename}")
         output_path = TEMP_DIR / output_filename
 
-        result = apply_filter(input_path, output_path, filter_name)
+        result = await run_in_threadpool(
+            apply_filter, input_path, output_path, filter_name, profile
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -364,15 +701,172 @@ async def filter_image_endpoint(
             delete_file(input_path)
 
 
+@router.post("/preview", response_model=PreviewSessionResponse)
+async def create_preview_session_endpoint(
+    file: UploadFile = File(..., description="Image file to preview edits on"),
+):
+    """
+    Start an interactive preview session
+
+    The image is decoded once into a downscaled proxy kept in memory. Use the
+    returned session_id with /image/preview/{session_id}/render for live
+    previews and /image/preview/{session_id}/commit for the final result.
+
+    Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
+    """
+    if not validate_image_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    input_path = await save_upload_file(file)
+
+    result = await run_in_threadpool(create_preview_session, input_path)
+
+    if not result.success:
+        delete_file(input_path)
+        raise HTTPException(status_code=500, detail=result.message)
+
+    return result
+
+
+def get_preview_session_or_404(session_id: str) -> PreviewSession:
+    """Get a preview session or raise a 404 error"""
+    session = preview_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Preview session not found")
+    return session
+
+
+@router.post("/preview/{session_id}/render")
+async def render_preview_endpoint(
+    session_id: str,
+    brightness: float = Form(1.0, description="Brightness factor (0.1 - 3.0, 1.0 = original)"),
+    contrast: float = Form(1.0, description="Contrast factor (0.1 - 3.0, 1.0 = original)"),
+    saturation: float = Form(1.0, description="Saturation factor (0.1 - 3.0, 1.0 = original)"),
+    gamma: float = Form(1.0, description="Midtone gamma (0.1 - 10.0, 1.0 = original)"),
+    black_point: int = Form(0, description="Input level mapped to black (0 - 254)"),
+    white_point: int = Form(255, description="Input level mapped to white (1 - 255)"),
+    filter_name: Optional[str] = Form(
+        None, description="Filter to apply (grayscale, sepia, blur, sharpen, invert)"
+    ),
+    output_format: str = Form("jpeg", description="Preview format (jpeg or webp)"),
+    quality: int = Form(IMAGE_PREVIEW_QUALITY, description="Preview quality (1 - 100)"),
+):
+    """
+    Render adjustments and a filter on the preview proxy of a session
+
+    Returns the encoded preview image inline.
+    """
+    output_format = output_format.lower()
+    if output_format not in IMAGE_PREVIEW_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported preview format. Supported: {', '.join(IMAGE_PREVIEW_FORMATS)}",
+        )
+
+    if quality < 1 or quality > 100:
+        raise HTTPException(status_code=400, detail="quality must be between 1 and 100")
+
+    operations = ImageOperations(
+        brightness=brightness,
+        contrast=contrast,
+        saturation=saturation,
+        gamma=gamma,
+        black_point=black_point,
+        white_point=white_point,
+        filter_name=filter_name,
+    )
+    validate_operations(operations)
+
+    session = get_preview_session_or_404(session_id)
+    content = await run_in_threadpool(render_preview, session, operations, output_format, quality)
+
+    return Response(
+        content=content,
+        media_type=IMAGE_PREVIEW_FORMATS[output_format],
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.post("/preview/{session_id}/commit", response_model=ImageProcessingResponse)
+async def commit_preview_endpoint(
+    session_id: str,
+    brightness: float = Form(1.0, description="Brightness factor (0.1 - 3.0, 1.0 = original)"),
+    contrast: float = Form(1.0, description="Contrast factor (0.1 - 3.0, 1.0 = original)"),
+    saturation: float = Form(1.0, description="Saturation factor (0.1 - 3.0, 1.0 = original)"),
+    gamma: float = Form(1.0, description="Midtone gamma (0.1 - 10.0, 1.0 = original)"),
+    black_point: int = Form(0, description="Input level mapped to black (0 - 254)"),
+    white_point: int = Form(255, description="Input level mapped to white (1 - 255)"),
+    filter_name: Optional[str] = Form(
+        None, description="Filter to apply (grayscale, sepia, blur, sharpen, invert)"
+    ),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+):
+    """
+    Render adjustments and a filter on the full-resolution original
+
+    The session stays open, so further previews and commits can follow.
+    """
+    operations = ImageOperations(
+        brightness=brightness,
+        contrast=contrast,
+        saturation=saturation,
+        gamma=gamma,
+        black_point=black_point,
+        white_point=white_point,
+        filter_name=filter_name,
+    )
+    validate_operations(operations)
+    validate_encoder_profile(profile)
+
+    session = get_preview_session_or_404(session_id)
+    output_filename = generate_unique_filename(f"edited_{session.source_path.name}")
+    output_path = TEMP_DIR / output_filename
+
+    result = await run_in_threadpool(commit_preview, session, output_path, operations, profile)
+
+    if not result.success:
+        if not session.source_path.exists():
+            # The temp-file cleanup removed the original: drop the session and its proxy
+            preview_sessions.pop(session_id)
+            raise HTTPException(status_code=404, detail=result.message)
+        raise HTTPException(status_code=500, detail=result.message)
+
+    return result
+
+
+@router.delete("/preview/{session_id}")
+async def close_preview_session_endpoint(session_id: str):
+    """
+    Close a preview session and free its memory
+    """
+    if preview_sessions.pop(session_id) is None:
+        raise HTTPException(status_code=404, detail="Preview session not found")
+
+    return {"success": True, "message": "Preview session closed"}
+
+
 @router.post("/flip", response_model=ImageProcessingResponse)
 async def flip_image_endpoint(
     file: UploadFile = File(..., description="Image file to flip"),
     direction: str = Form("horizontal", description="Flip direction (horizontal or vertical)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+    metadata_only: bool = Form(
+        False,
+        description="JPEG only: rewrite the EXIF orientation instead of moving pixels",
+    ),
 ):
     """
     Flip an image horizontally or vertically
 
     Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
+
+    JPEGs whose size is a whole number of MCUs (8 or 16 pixels) are flipped
+    losslessly without re-encoding. With metadata_only, only the EXIF
+    orientation is rewritten (any size, near-instant).
     """
     # Validate file format
     if not validate_image_format(file.filename):
@@ -384,6 +878,11 @@ async def flip_image_endpoint(
             status_code=400, detail="Invalid direction. Use 'horizontal' or 'vertical'"
         )
 
+    if metadata_only and Path(file.filename).suffix.lower() not in (".jpg", ".jpeg"):
+        raise HTTPException(status_code=400, detail="metadata_only requires a JPEG image")
+
+    validate_encoder_profile(profile)
+
     input_path = None
     output_path = None
 
@@ -396,7 +895,10 @@ async def flip_image_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Flip image
-        result = flip_image(input_path, output_path, direction)
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        result = await run_in_threadpool(
+            flip_image, input_path, output_path, direction, profile, metadata_only
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -418,11 +920,25 @@ async def create_collage_endpoint(
         ...,
         description="Comma-separated list of image indices in order (e.g., '0,1,2,3' for 2x2 grid)",
     ),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+    cell_width: int = Form(
+        IMAGE_COLLAGE_CELL_SIZE,
+        description=f"Cell width in pixels (default: {IMAGE_COLLAGE_CELL_SIZE})",
+    ),
+    cell_height: int = Form(
+        IMAGE_COLLAGE_CELL_SIZE,
+        description=f"Cell height in pixels (default: {IMAGE_COLLAGE_CELL_SIZE})",
+    ),
+    gutter: int = Form(0, description="White space between cells in pixels"),
+    output_format: str = Form("png", description="Output format (png, jpg, webp)"),
 ):
     """
     Create a collage from multiple images arranged in a grid
 
     Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
+    Output: PNG, or JPG/WEBP for smaller photo collages
     """
     # Validate grid dimensions
     if rows < 1 or rows > 10:
@@ -430,6 +946,35 @@ async def create_collage_endpoint(
     if cols < 1 or cols > 10:
         raise HTTPException(status_code=400, detail="Columns must be between 1 and 10")
 
+    # Validate cell size, gutter and canvas size
+    for value in (cell_width, cell_height):
+        if value < 1 or value > IMAGE_COLLAGE_MAX_CELL_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cell size must be between 1 and {IMAGE_COLLAGE_MAX_CELL_SIZE}",
+            )
+    if gutter < 0 or gutter > IMAGE_COLLAGE_MAX_GUTTER:
+        raise HTTPException(
+            status_code=400, detail=f"Gutter must be between 0 and {IMAGE_COLLAGE_MAX_GUTTER}"
+        )
+    collage_pixels = (cols * cell_width + (cols - 1) * gutter) * (
+        rows * cell_height + (rows - 1) * gutter
+    )
+    if collage_pixels > IMAGE_COLLAGE_MAX_PIXELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Collage too large (at most {IMAGE_COLLAGE_MAX_PIXELS} pixels)",
+        )
+
+    output_format = output_format.lower()
+    if output_format not in IMAGE_COLLAGE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported output format. Supported: {', '.join(IMAGE_COLLAGE_FORMATS)}",
+        )
+
+    validate_encoder_profile(profile)
+
     total_cells = rows * cols
     if len(files) == 0:
         raise HTTPException(status_code=400, detail="At least one image is required")
@@ -474,11 +1019,23 @@ async def create_collage_endpoint(
             input_paths.append(input_path)
 
         # Create output path
-        output_filename = generate_unique_filename("collage.png")
+        output_filename = generate_unique_filename(f"collage.{output_format}")
         output_path = TEMP_DIR / output_filename
 
         # Create collage
-        result = create_collage(input_paths, output_path, rows, cols, order_list)
+        result = await run_in_threadpool(
+            create_collage,
+            input_paths,
+            output_path,
+            rows,
+            cols,
+            order_list,
+            profile,
+            cell_width=cell_width,
+            cell_height=cell_height,
+            gutter=gutter,
+            output_format=output_format,
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -496,20 +1053,47 @@ async def create_collage_endpoint(
 async def create_icon_endpoint(
     file: UploadFile = File(..., description="Image file to convert to icon"),
     size: int = Form(256, description="Icon size in pixels (16-512, default: 256)"),
+    sizes: Optional[str] = Form(
+        None,
+        description="Comma-separated sizes of a multi-image ICO (e.g. '16,32,48,64,128,256'), overrides size",
+    ),
+    include_png: bool = Form(False, description="Return a ZIP with PNG favicon variants"),
+    include_manifest: bool = Form(
+        False, description="Return a ZIP with site.webmanifest and its PNG icons"
+    ),
 ):
     """
     Convert an image to an ICO file
 
+    Every size is rendered from a single decode. With include_png or
+    include_manifest, the ICO is returned in a favicon ZIP archive together
+    with the PNG variants and/or the web app manifest.
+
     Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
-    Output: ICO file with specified size
+    Output: ICO file with the specified sizes, or a ZIP favicon set
     """
     # Validate file format
     if not validate_image_format(file.filename):
         raise HTTPException(status_code=400, detail="Unsupported image format")
 
-    # Validate size
-    if size < 16 or size > 512:
-        raise HTTPException(status_code=400, detail="Icon size must be between 16 and 512 pixels")
+    # Parse sizes
+    if sizes is not None:
+        try:
+            size_list = sorted({int(value.strip()) for value in sizes.split(",")})
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid sizes format. Use comma-separated integers (e.g., '16,32,48')",
+            )
+    else:
+        size_list = [size]
+
+    # Validate sizes
+    if size_list[0] < IMAGE_ICON_MIN_SIZE or size_list[-1] > IMAGE_ICON_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Icon size must be between {IMAGE_ICON_MIN_SIZE} and {IMAGE_ICON_MAX_SIZE} pixels",
+        )
 
     input_path = None
     output_path = None
@@ -517,14 +1101,37 @@ async def create_icon_endpoint(
     try:
         # Save uploaded file
         input_path = await save_upload_file(file)
+        base_name = Path(file.filename).stem
+
+        if include_png or include_manifest:
+            output_path = TEMP_DIR / generate_unique_filename(f"{base_name}_favicons.zip")
+            result = await run_in_threadpool(
+                create_favicon_bundle,
+                input_path,
+                output_path,
+                # The favicon set has its own default sizes
+                size_list if sizes is not None else None,
+                include_png,
+                include_manifest,
+            )
+
+            if not result.success:
+                raise HTTPException(status_code=500, detail=result.message)
+
+            return FileResponse(
+                path=output_path,
+                filename=f"{base_name}_favicons.zip",
+                media_type="application/zip",
+                headers={"X-Download-Url": result.download_url},
+            )
 
         # Create output path
-        base_name = Path(file.filename).stem
         output_filename = generate_unique_filename(f"{base_name}.ico")
         output_path = TEMP_DIR / output_filename
 
         # Create icon
-        result = create_icon(input_path, output_path, size)
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        result = await run_in_threadpool(create_icon, input_path, output_path, size, size_list)
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -535,3 +1142,99 @@ async def create_icon_endpoint(
         # Clean up input file
         if input_path:
             delete_file(input_path)
+
+
+# ============================================
+# ASYNC ENDPOINT WITH SSE PROGRESS TRACKING
+# ============================================
+
+
+async def run_tiles_task(task_id: str, input_path: Path, output_path: Path, options: dict):
+    """Background task for tile pyramids with progress"""
+    try:
+        await create_tiles_with_progress(task_id, input_path, output_path, **options)
+    finally:
+        delete_file(input_path)
+
+
+@router.post("/tiles")
+async def create_tiles_endpoint(
+    file: UploadFile = File(..., description="Large image (scan, map) to tile"),
+    layout: str = Form("dzi", description="Pyramid layout (dzi, xyz)"),
+    tile_size: int = Form(
+        IMAGE_TILE_SIZE,
+        description=f"Tile size in pixels ({IMAGE_TILE_MIN_SIZE}-{IMAGE_TILE_MAX_SIZE})",
+    ),
+    output_format: str = Form("jpg", description="Tile format (jpg, png, webp)"),
+    quality: str = Form("medium", description="Quality (low, medium, high)"),
+    profile: Optional[str] = Form(
+        None, description="Encoder profile (fast, balanced, smallest); defaults per format"
+    ),
+):
+    """
+    Start building a deep-zoom tile pyramid with progress tracking
+
+    Returns a task_id that can be used to:
+    - Poll status: GET /api/v1/tasks/{task_id}/status
+    - Stream progress: GET /api/v1/tasks/{task_id}/stream (SSE)
+
+    The result is a ZIP with a DZI descriptor and tile folder (dzi), or
+    {z}/{x}/{y} tiles and metadata.json (xyz).
+
+    Supported formats: JPG, JPEG, PNG, GIF, BMP, WEBP
+    """
+    # Validate file format
+    if not validate_image_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    layout = layout.lower()
+    if layout not in IMAGE_TILE_LAYOUTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported layout. Supported: {', '.join(IMAGE_TILE_LAYOUTS)}",
+        )
+
+    if tile_size < IMAGE_TILE_MIN_SIZE or tile_size > IMAGE_TILE_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tile size must be between {IMAGE_TILE_MIN_SIZE} and {IMAGE_TILE_MAX_SIZE} pixels",
+        )
+
+    output_format = output_format.lower().replace("jpeg", "jpg")
+    if output_format not in IMAGE_TILE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported output format. Supported: {', '.join(IMAGE_TILE_FORMATS)}",
+        )
+
+    if quality not in IMAGE_COMPRESSION_QUALITY:
+        raise HTTPException(status_code=400, detail="Quality must be low, medium or high")
+
+    validate_encoder_profile(profile)
+
+    # Save uploaded file
+    input_path = await save_upload_file(file)
+
+    # Create output path
+    base_name = Path(file.filename).stem
+    output_path = TEMP_DIR / generate_unique_filename(f"{base_name}_{layout}.zip")
+
+    options = {
+        "layout": layout,
+        "tile_size": tile_size,
+        "output_format": output_format,
+        "quality": quality,
+        "profile": profile,
+        "name": base_name,
+    }
+
+    # Create task
+    task = task_store.create_task(
+        task_type="image_tiles",
+        metadata={"filename": file.filename, **options},
+    )
+
+    # Start background processing
+    asyncio.create_task(run_tiles_task(task.id, input_path, output_path, options))
+
+    return {"task_id": task.id}
@@ -2,13 +2,16 @@
 Palette generator API endpoints
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
 from app.models.palette_generator import (
     PaletteGeneratorRequest,
     PaletteGeneratorResponse,
 )
-from app.services.palette_generator_service import generate_palette
+from app.services.palette_generator_service import generate_palette, generate_palette_from_image
+from app.utils.file_handler import delete_file, save_upload_file
+from app.utils.validators import validate_image_format
 
 router = APIRouter(prefix="/palette-generator", tags=["Palette Generator"])
 
@@ -28,3 +31,39 @@ async def generate_palette_endpoint(request: PaletteGeneratorRequest):
         raise HTTPException(status_code=400, detail=result.message)
 
     return result
+
+
+@router.post("/from-image", response_model=PaletteGeneratorResponse)
+async def generate_palette_from_image_endpoint(
+    file: UploadFile = File(..., description="Image to take the palette from"),
+    count: int = Form(5, description="Number of colors in palette (2-10)"),
+):
+    """
+    Generate a color palette from the dominant colors of an image
+
+    - **file**: Image file (JPG, JPEG, PNG, GIF, BMP, WEBP)
+    - **count**: Number of colors in palette (2-10); fewer are returned when
+      the image has fewer distinct colors
+    """
+    if not validate_image_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    if count < 2 or count > 10:
+        raise HTTPException(status_code=400, detail="count must be between 2 and 10")
+
+    input_path = None
+
+    try:
+        input_path = await save_upload_file(file)
+
+        # Decoding may wait for the image memory budget: keep it off the event loop
+        result = await run_in_threadpool(generate_palette_from_image, input_path, count)
+
+        if not result.success:
+            raise HTTPException(status_code=500, detail=result.message)
+
+        return result
+
+    finally:
+        if input_path:
+            delete_file(input_path)
@@ -3,25 +3,46 @@ Video processing API endpoints
 """
 
 import asyncio
+import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile
-
-from app.config import TEMP_DIR
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+
+from app.config import (
+    TEMP_DIR,
+    VIDEO_HLS_LADDER,
+    VIDEO_HLS_SEGMENT_SECONDS,
+    VIDEO_STREAM_FORMATS,
+    VIDEO_THUMBNAIL_MAX_COUNT,
+)
 from app.models.video import VideoProcessingResponse
 from app.services.video_service import (
     compress_video,
     convert_video,
     extract_audio,
+    extract_thumbnails,
+    get_available_h264_encoder,
+    get_target_size_error,
+    get_thumbnail_archive_name,
+    get_video_convert_options,
     merge_videos,
     rotate_video,
+    trim_video,
+    validate_animation_options,
     video_to_gif,
 )
 from app.services.video_service_async import (
     compress_video_with_progress,
     convert_video_with_progress,
+    extract_audio_with_progress,
+    get_video_duration,
     merge_videos_with_progress,
+    package_hls_with_progress,
+    trim_video_with_progress,
+    video_to_gif_with_progress,
 )
 from app.tasks import task_store
 from app.utils.file_handler import (
@@ -29,6 +50,7 @@ from app.utils.file_handler import (
     generate_unique_filename,
     save_upload_file,
 )
+from app.utils.media_stream import get_stream_media_type, start_ffmpeg_stream
 from app.utils.validators import validate_video_format
 
 router = APIRouter(prefix="/video", tags=["Video"])
@@ -38,18 +60,28 @@ router = APIRouter(prefix="/video", tags=["Video"])
 async def compress_video_endpoint(
     file: UploadFile = File(..., description="Video file to compress"),
     quality: str = Form("medium", description="Compression quality (low, medium, high)"),
+    target_size_mb: Optional[float] = Form(
+        None, description="Target output size in MB (two-pass bitrate encode)"
+    ),
 ):
     """
     Compress a video file
 
     Supported formats: MP4, AVI, MOV, MKV, FLV, WMV
 
+    When target_size_mb is set, the bitrate is computed from the video duration
+    and a two-pass encode makes the output fit that size (e.g. 25 for a 25 MB
+    attachment limit) instead of using the quality preset's CRF.
+
     Note: This operation may take some time depending on video size
     """
     # Validate file format
     if not validate_video_format(file.filename):
         raise HTTPException(status_code=400, detail="Unsupported video format")
 
+    if target_size_mb is not None and target_size_mb <= 0:
+        raise HTTPException(status_code=400, detail="target_size_mb must be greater than 0")
+
     input_path = None
     output_path = None
 
@@ -61,8 +93,18 @@ async def compress_video_endpoint(
         output_filename = generate_unique_filename(f"compressed_{file.filename}")
         output_path = TEMP_DIR / output_filename
 
+        # An unreachable target is a client error, not a failed encode
+        if target_size_mb is not None:
+            duration = await run_in_threadpool(get_video_duration, input_path)
+            target_error = get_target_size_error(target_size_mb, duration)
+            if target_error:
+                raise HTTPException(status_code=400, detail=target_error)
+
         # Compress video
-        result = compress_video(input_path, output_path, quality)
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            compress_video, input_path, output_path, quality, target_size_mb
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -109,7 +151,10 @@ async def convert_video_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Convert video
-        result = convert_video(input_path, output_path, output_format, quality)
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            convert_video, input_path, output_path, output_format, quality
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -122,6 +167,68 @@ async def convert_video_endpoint(
             delete_file(input_path)
 
 
+@router.post("/convert/stream")
+async def convert_video_stream_endpoint(
+    file: UploadFile = File(..., description="Video file to convert"),
+    output_format: str = Form("mp4", description="Target format (mp4, mov, mkv, flv)"),
+    quality: str = Form("medium", description="Conversion quality (low, medium, high)"),
+):
+    """
+    Convert a video and stream the result while it is being encoded
+
+    The response body is FFmpeg's output, sent chunk by chunk as soon as it is
+    produced. MP4 and MOV are sent as fragmented MP4 so players can start
+    before the encode finishes. The same bytes are kept in temporary storage;
+    once the stream completes they are available at the URL in the
+    X-Download-Url header.
+
+    Supported output formats: MP4, MOV, MKV, FLV
+    """
+    if not validate_video_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported input video format")
+
+    output_format = output_format.lower()
+    if output_format not in VIDEO_STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported output format. Allowed formats: {', '.join(VIDEO_STREAM_FORMATS)}",
+        )
+
+    encoder = get_available_h264_encoder()
+    if encoder is None:
+        raise HTTPException(
+            status_code=500,
+            detail="No H.264 encoder available. Please install FFmpeg with H.264 support.",
+        )
+
+    input_path = await save_upload_file(file)
+
+    base_name = Path(file.filename).stem
+    output_filename = generate_unique_filename(f"{base_name}_converted.{output_format}")
+    muxer, muxer_options = VIDEO_STREAM_FORMATS[output_format]
+    output_options = {**get_video_convert_options(encoder, quality), **muxer_options}
+
+    try:
+        chunks = await start_ffmpeg_stream(
+            input_path,
+            TEMP_DIR / output_filename,
+            muxer,
+            output_options,
+            cleanup_paths=(input_path,),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"FFmpeg error: {str(e)}")
+
+    return StreamingResponse(
+        chunks,
+        media_type=get_stream_media_type(output_format),
+        headers={
+            "Content-Disposition": f'inline; filename="{output_filename}"',
+            "X-Download-Url": f"/api/v1/download/{output_filename}",
+        },
+    )
+
+
 @router.post("/rotate", response_model=VideoProcessingResponse)
 async def rotate_video_endpoint(
     file: UploadFile = File(..., description="Video file to rotate"),
@@ -155,7 +262,8 @@ async def rotate_video_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Rotate video
-        result = rotate_video(input_path, output_path, angle)
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(rotate_video, input_path, output_path, angle)
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -176,26 +284,26 @@ async def video_to_gif_endpoint(
     width: int | None = Form(None, description="Target width in pixels"),
     fps: int = Form(12, description="Frames per second for GIF"),
     loop: bool = Form(True, description="Loop GIF indefinitely"),
+    output_format: str = Form("gif", description="Animated image format (gif, webp, avif)"),
+    preset: str = Form(
+        "balanced", description="WebP/AVIF speed/size preset (fast, balanced, small)"
+    ),
+    dither: str = Form(
+        "sierra2_4a", description="GIF dithering (sierra2_4a, floyd_steinberg, bayer, none)"
+    ),
 ):
     """
-    Convert a segment of a video to an animated GIF.
+    Convert a segment of a video to an animated GIF, WebP or AVIF.
+
+    Animated WebP and AVIF are typically 3-10x smaller than the equivalent
+    GIF. GIF palettes are cached per segment, so re-rendering the same clip
+    with other loop or dither settings is faster.
 
     Supports common video formats: MP4, AVI, MOV, MKV, FLV, WMV
     """
-    if not validate_video_format(file.filename):
-        raise HTTPException(status_code=400, detail="Unsupported video format")
-
-    if start_time < 0:
-        raise HTTPException(status_code=400, detail="start_time must be non-negative")
-
-    if duration is not None and duration <= 0:
-        raise HTTPException(status_code=400, detail="duration must be greater than 0")
-
-    if fps < 1 or fps > 60:
-        raise HTTPException(status_code=400, detail="fps must be between 1 and 60")
-
-    if width is not None and width < 32:
-        raise HTTPException(status_code=400, detail="width must be at least 32 pixels")
+    output_format = validate_animation_request(
+        file.filename, start_time, duration, width, fps, output_format, preset, dither
+    )
 
     input_path = None
     output_path = None
@@ -205,11 +313,15 @@ async def video_to_gif_endpoint(
         input_path = await save_upload_file(file)
 
         # Create output path
-        output_filename = generate_unique_filename(f"gif_{Path(file.filename).stem}.gif")
+        output_filename = generate_unique_filename(
+            f"{output_format}_{Path(file.filename).stem}.{output_format}"
+        )
         output_path = TEMP_DIR / output_filename
 
-        # Convert video to GIF
-        result = video_to_gif(
+        # Convert video to an animated image
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            video_to_gif,
             input_path=input_path,
             output_path=output_path,
             start_time=start_time,
@@ -217,6 +329,9 @@ async def video_to_gif_endpoint(
             width=width,
             fps=fps,
             loop=loop,
+            output_format=output_format,
+            preset=preset,
+            dither=dither,
         )
 
         if not result.success:
@@ -229,21 +344,51 @@ async def video_to_gif_endpoint(
             delete_file(input_path)
 
 
+def validate_animation_request(
+    filename: str,
+    start_time: float,
+    duration: Optional[float],
+    width: Optional[int],
+    fps: int,
+    output_format: str,
+    preset: str,
+    dither: str,
+) -> str:
+    """Validate /to-gif parameters, returning the normalized output format"""
+    if not validate_video_format(filename):
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    output_format = output_format.lower()
+    error = validate_animation_options(
+        start_time, duration, width, fps, output_format, preset, dither
+    )
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    return output_format
+
+
 @router.post("/extract-audio", response_model=VideoProcessingResponse)
 async def extract_audio_endpoint(
     file: UploadFile = File(..., description="Video file to extract audio from"),
-    output_format: str = Form("mp3", description="Output audio format (mp3, wav, flac, ogg)"),
+    output_format: str = Form(
+        "mp3", description="Output audio format (mp3, m4a, wav, flac, ogg, auto)"
+    ),
     bitrate: str = Form("192k", description="Audio bitrate, e.g., 128k, 192k"),
+    all_tracks: bool = Form(False, description="Extract every audio track (returned as ZIP)"),
+    passthrough: bool = Form(
+        True, description="Stream-copy tracks whose codec fits the output format"
+    ),
 ):
     """
     Extract the audio track from a video and export it to an audio file.
-    """
-    if not validate_video_format(file.filename):
-        raise HTTPException(status_code=400, detail="Unsupported video format")
 
-    allowed_formats = {"mp3", "wav", "flac", "ogg"}
-    if output_format.lower() not in allowed_formats:
-        raise HTTPException(status_code=400, detail="Unsupported output audio format")
+    When the source codec fits the requested container (e.g. AAC to m4a) the
+    track is copied without re-encoding; output_format "auto" always picks
+    the source's native container. The bitrate only applies to re-encoded
+    tracks.
+    """
+    output_format = validate_audio_extraction_request(file.filename, output_format)
 
     input_path = None
     output_path = None
@@ -257,11 +402,15 @@ async def extract_audio_endpoint(
         output_filename = generate_unique_filename(f"{base_name}_audio.{output_format}")
         output_path = TEMP_DIR / output_filename
 
-        result = extract_audio(
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            extract_audio,
             input_path=input_path,
             output_path=output_path,
             output_format=output_format,
             bitrate=bitrate,
+            all_tracks=all_tracks,
+            passthrough=passthrough,
         )
 
         if not result.success:
@@ -274,6 +423,18 @@ async def extract_audio_endpoint(
             delete_file(input_path)
 
 
+def validate_audio_extraction_request(filename: str, output_format: str) -> str:
+    """Validate /extract-audio parameters, returning the normalized output format"""
+    if not validate_video_format(filename):
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    allowed_formats = {"mp3", "m4a", "wav", "flac", "ogg", "auto"}
+    if output_format.lower() not in allowed_formats:
+        raise HTTPException(status_code=400, detail="Unsupported output audio format")
+
+    return output_format.lower()
+
+
 @router.post("/merge", response_model=VideoProcessingResponse)
 async def merge_videos_endpoint(
     files: List[UploadFile] = File(..., description="Video files to merge (in order)"),
@@ -327,7 +488,10 @@ async def merge_videos_endpoint(
         output_path = TEMP_DIR / output_filename
 
         # Merge videos
-        result = merge_videos(input_paths, output_path, output_format, quality, merge_mode)
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            merge_videos, input_paths, output_path, output_format, quality, merge_mode
+        )
 
         if not result.success:
             raise HTTPException(status_code=500, detail=result.message)
@@ -341,26 +505,173 @@ async def merge_videos_endpoint(
                 delete_file(input_path)
 
 
+@router.post("/trim", response_model=VideoProcessingResponse)
+async def trim_video_endpoint(
+    file: UploadFile = File(..., description="Video file to trim"),
+    start_time: float = Form(0.0, description="Start of the segment in seconds"),
+    end_time: Optional[float] = Form(None, description="End of the segment in seconds"),
+    smart: bool = Form(
+        False, description="Re-encode the partial GOPs at the edges for a frame-accurate cut"
+    ),
+):
+    """
+    Cut a segment out of a video
+
+    Supported formats: MP4, AVI, MOV, MKV, FLV, WMV
+
+    Streams are copied without re-encoding, so trimming a short clip out of a
+    long recording takes about as long as copying the clip. Without smart mode
+    the cut starts at the keyframe at or before start_time; with smart=true
+    only the frames between the cut points and the nearest keyframes are
+    re-encoded, making the cut frame-accurate.
+    """
+    if not validate_video_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    if start_time < 0:
+        raise HTTPException(status_code=400, detail="start_time must be non-negative")
+
+    if end_time is not None and end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be greater than start_time")
+
+    input_path = None
+
+    try:
+        # Save uploaded file
+        input_path = await save_upload_file(file)
+
+        # Stream copy keeps the source container
+        output_filename = generate_unique_filename(f"trimmed_{file.filename}")
+        output_path = TEMP_DIR / output_filename
+
+        # Encoding may wait for the core budget: keep it off the event loop
+        result = await run_in_threadpool(
+            trim_video, input_path, output_path, start_time, end_time, smart
+        )
+
+        if not result.success:
+            raise HTTPException(status_code=500, detail=result.message)
+
+        return result
+
+    finally:
+        if input_path:
+            delete_file(input_path)
+
+
+@router.post("/thumbnails")
+async def video_thumbnails_endpoint(
+    file: UploadFile = File(..., description="Video file to extract thumbnails from"),
+    mode: str = Form("grid", description="grid (evenly spaced), sprite (sheet + WebVTT) or scenes"),
+    count: int = Form(10, description="Number of thumbnails (maximum for scenes)"),
+    width: int = Form(320, description="Thumbnail width in pixels"),
+    image_format: str = Form("jpg", description="Image format (jpg, png, webp)"),
+    columns: int = Form(5, description="Sprite sheet columns"),
+    scene_threshold: float = Form(0.4, description="Scene change score (0-1) for scenes mode"),
+):
+    """
+    Extract poster frames, a scrubbing sprite sheet or scene keyframes
+
+    Returns a ZIP archive with the images and a manifest.json of their
+    timestamps (sprite mode adds a WebVTT index of the tiles). All frames are
+    produced by a single FFmpeg run, and archives are cached by content so
+    repeated requests for the same video and options are served immediately.
+    """
+    if not validate_video_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    if mode not in ("grid", "sprite", "scenes"):
+        raise HTTPException(status_code=400, detail="mode must be one of: grid, sprite, scenes")
+
+    if count < 1 or count > VIDEO_THUMBNAIL_MAX_COUNT:
+        raise HTTPException(
+            status_code=400, detail=f"count must be between 1 and {VIDEO_THUMBNAIL_MAX_COUNT}"
+        )
+
+    if width < 16 or width > 3840:
+        raise HTTPException(status_code=400, detail="width must be between 16 and 3840 pixels")
+
+    image_format = image_format.lower().replace("jpeg", "jpg")
+    if image_format not in ("jpg", "png", "webp"):
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    if columns < 1:
+        raise HTTPException(status_code=400, detail="columns must be at least 1")
+
+    if not 0 < scene_threshold < 1:
+        raise HTTPException(status_code=400, detail="scene_threshold must be between 0 and 1")
+
+    input_path = None
+
+    try:
+        input_path = await save_upload_file(file)
+
+        options = {"mode": mode, "count": count, "width": width, "image_format": image_format}
+        if mode == "sprite":
+            options["columns"] = columns
+        if mode == "scenes":
+            options["scene_threshold"] = scene_threshold
+
+        output_path = TEMP_DIR / get_thumbnail_archive_name(input_path, **options)
+        cache_status = "HIT" if output_path.exists() else "MISS"
+
+        if cache_status == "HIT":
+            # Keep recently used archives from being cleaned up
+            os.utime(output_path)
+        else:
+            # Encoding may wait for the core budget: keep it off the event loop
+            result = await run_in_threadpool(extract_thumbnails, input_path, output_path, **options)
+            if not result.success:
+                raise HTTPException(status_code=500, detail=result.message)
+
+        return FileResponse(
+            path=output_path,
+            filename=f"{Path(file.filename).stem}_{mode}.zip",
+            media_type="application/zip",
+            headers={"X-Cache": cache_status},
+        )
+
+    finally:
+        if input_path:
+            delete_file(input_path)
+
+
 # ============================================
 # ASYNC ENDPOINTS WITH SSE PROGRESS TRACKING
 # ============================================
 
 
-async def run_compress_task(task_id: str, input_path: Path, output_path: Path, quality: str):
+async def run_compress_task(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    quality: str,
+    chunked: bool = False,
+    target_size_mb: Optional[float] = None,
+):
     """Background task for video compression with progress"""
     try:
-        await compress_video_with_progress(task_id, input_path, output_path, quality)
+        await compress_video_with_progress(
+            task_id, input_path, output_path, quality, chunked, target_size_mb
+        )
     finally:
         # Clean up input file after processing
         delete_file(input_path)
 
 
 async def run_convert_task(
-    task_id: str, input_path: Path, output_path: Path, output_format: str, quality: str
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    output_format: str,
+    quality: str,
+    chunked: bool = False,
 ):
     """Background task for video conversion with progress"""
     try:
-        await convert_video_with_progress(task_id, input_path, output_path, output_format, quality)
+        await convert_video_with_progress(
+            task_id, input_path, output_path, output_format, quality, chunked
+        )
     finally:
         delete_file(input_path)
 
@@ -385,11 +696,64 @@ async def run_merge_task(
                 delete_file(input_path)
 
 
+async def run_trim_task(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    start_time: float,
+    end_time: Optional[float],
+    smart: bool,
+):
+    """Background task for video trimming with progress"""
+    try:
+        await trim_video_with_progress(
+            task_id, input_path, output_path, start_time, end_time, smart
+        )
+    finally:
+        delete_file(input_path)
+
+
+async def run_gif_task(task_id: str, input_path: Path, output_path: Path, options: dict):
+    """Background task for animated image rendering with progress"""
+    try:
+        await video_to_gif_with_progress(task_id, input_path, output_path, **options)
+    finally:
+        delete_file(input_path)
+
+
+async def run_extract_audio_task(task_id: str, input_path: Path, output_path: Path, options: dict):
+    """Background task for audio extraction with progress"""
+    try:
+        await extract_audio_with_progress(task_id, input_path, output_path, **options)
+    finally:
+        delete_file(input_path)
+
+
+async def run_hls_task(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    heights: Optional[List[int]],
+    segment_seconds: int,
+):
+    """Background task for HLS packaging with progress"""
+    try:
+        await package_hls_with_progress(task_id, input_path, output_path, heights, segment_seconds)
+    finally:
+        delete_file(input_path)
+
+
 @router.post("/compress/async")
 async def compress_video_async(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Video file to compress"),
     quality: str = Form("medium", description="Compression quality (low, medium, high)"),
+    chunked: bool = Form(
+        False, description="Split at keyframes and encode segments in parallel on all cores"
+    ),
+    target_size_mb: Optional[float] = Form(
+        None, description="Target output size in MB (two-pass bitrate encode)"
+    ),
 ):
     """
     Start async video compression with progress tracking
@@ -399,11 +763,20 @@ async def compress_video_async(
     - Stream progress: GET /api/v1/tasks/{task_id}/stream (SSE)
 
     Progress events include: analyzing, encoding, finalizing stages
+
+    With chunked=true, long videos are split at keyframes into segments that are
+    encoded concurrently and stitched back together without re-encoding.
+
+    With target_size_mb, a two-pass encode makes the output fit that size;
+    progress covers both passes.
     """
     # Validate file format
     if not validate_video_format(file.filename):
         raise HTTPException(status_code=400, detail="Unsupported video format")
 
+    if target_size_mb is not None and target_size_mb <= 0:
+        raise HTTPException(status_code=400, detail="target_size_mb must be greater than 0")
+
     # Save uploaded file
     input_path = await save_upload_file(file)
 
@@ -417,11 +790,15 @@ async def compress_video_async(
         metadata={
             "filename": file.filename,
             "quality": quality,
+            "chunked": chunked,
+            "target_size_mb": target_size_mb,
         },
     )
 
     # Start background processing
-    asyncio.create_task(run_compress_task(task.id, input_path, output_path, quality))
+    asyncio.create_task(
+        run_compress_task(task.id, input_path, output_path, quality, chunked, target_size_mb)
+    )
 
     return {"task_id": task.id}
 
@@ -432,6 +809,9 @@ async def convert_video_async(
     file: UploadFile = File(..., description="Video file to convert"),
     output_format: str = Form(..., description="Target format (mp4, avi, mov, etc.)"),
     quality: str = Form("medium", description="Conversion quality (low, medium, high)"),
+    chunked: bool = Form(
+        False, description="Split at keyframes and encode segments in parallel on all cores"
+    ),
 ):
     """
     Start async video conversion with progress tracking
@@ -461,11 +841,14 @@ async def convert_video_async(
             "filename": file.filename,
             "output_format": output_format,
             "quality": quality,
+            "chunked": chunked,
         },
     )
 
     # Start background processing
-    asyncio.create_task(run_convert_task(task.id, input_path, output_path, output_format, quality))
+    asyncio.create_task(
+        run_convert_task(task.id, input_path, output_path, output_format, quality, chunked)
+    )
 
     return {"task_id": task.id}
 
@@ -541,3 +924,218 @@ async def merge_videos_async(
     )
 
     return {"task_id": task.id}
+
+
+@router.post("/trim/async")
+async def trim_video_async(
+    file: UploadFile = File(..., description="Video file to trim"),
+    start_time: float = Form(0.0, description="Start of the segment in seconds"),
+    end_time: Optional[float] = Form(None, description="End of the segment in seconds"),
+    smart: bool = Form(
+        False, description="Re-encode the partial GOPs at the edges for a frame-accurate cut"
+    ),
+):
+    """
+    Start async video trimming with progress tracking
+
+    Returns a task_id for progress tracking via SSE
+    """
+    if not validate_video_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    if start_time < 0:
+        raise HTTPException(status_code=400, detail="start_time must be non-negative")
+
+    if end_time is not None and end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be greater than start_time")
+
+    # Save uploaded file
+    input_path = await save_upload_file(file)
+
+    # Create output path
+    output_filename = generate_unique_filename(f"trimmed_{file.filename}")
+    output_path = TEMP_DIR / output_filename
+
+    # Create task
+    task = task_store.create_task(
+        task_type="video_trim",
+        metadata={
+            "filename": file.filename,
+            "start_time": start_time,
+            "end_time": end_time,
+            "smart": smart,
+        },
+    )
+
+    # Start background processing
+    asyncio.create_task(
+        run_trim_task(task.id, input_path, output_path, start_time, end_time, smart)
+    )
+
+    return {"task_id": task.id}
+
+
+@router.post("/to-gif/async")
+async def video_to_gif_async(
+    file: UploadFile = File(..., description="Video file to convert"),
+    start_time: float = Form(0.0, description="Start time in seconds"),
+    duration: float | None = Form(None, description="Duration in seconds"),
+    width: int | None = Form(None, description="Target width in pixels"),
+    fps: int = Form(12, description="Frames per second"),
+    loop: bool = Form(True, description="Loop indefinitely"),
+    output_format: str = Form("gif", description="Animated image format (gif, webp, avif)"),
+    preset: str = Form(
+        "balanced", description="WebP/AVIF speed/size preset (fast, balanced, small)"
+    ),
+    dither: str = Form(
+        "sierra2_4a", description="GIF dithering (sierra2_4a, floyd_steinberg, bayer, none)"
+    ),
+):
+    """
+    Start async animated GIF/WebP/AVIF rendering with progress tracking
+
+    Returns a task_id for progress tracking via SSE
+    """
+    output_format = validate_animation_request(
+        file.filename, start_time, duration, width, fps, output_format, preset, dither
+    )
+
+    # Save uploaded file
+    input_path = await save_upload_file(file)
+
+    # Create output path
+    output_filename = generate_unique_filename(
+        f"{output_format}_{Path(file.filename).stem}.{output_format}"
+    )
+    output_path = TEMP_DIR / output_filename
+
+    options = {
+        "start_time": start_time,
+        "duration": duration,
+        "width": width,
+        "fps": fps,
+        "loop": loop,
+        "output_format": output_format,
+        "preset": preset,
+        "dither": dither,
+    }
+
+    # Create task
+    task = task_store.create_task(
+        task_type="video_to_gif", metadata={"filename": file.filename, **options}
+    )
+
+    # Start background processing
+    asyncio.create_task(run_gif_task(task.id, input_path, output_path, options))
+
+    return {"task_id": task.id}
+
+
+@router.post("/extract-audio/async")
+async def extract_audio_async(
+    file: UploadFile = File(..., description="Video file to extract audio from"),
+    output_format: str = Form(
+        "mp3", description="Output audio format (mp3, m4a, wav, flac, ogg, auto)"
+    ),
+    bitrate: str = Form("192k", description="Audio bitrate, e.g., 128k, 192k"),
+    all_tracks: bool = Form(False, description="Extract every audio track (returned as ZIP)"),
+    passthrough: bool = Form(
+        True, description="Stream-copy tracks whose codec fits the output format"
+    ),
+):
+    """
+    Start async audio extraction with progress tracking
+
+    Returns a task_id for progress tracking via SSE
+    """
+    output_format = validate_audio_extraction_request(file.filename, output_format)
+
+    # Save uploaded file
+    input_path = await save_upload_file(file)
+
+    # Create output path
+    base_name = Path(file.filename).stem
+    output_filename = generate_unique_filename(f"{base_name}_audio.{output_format}")
+    output_path = TEMP_DIR / output_filename
+
+    options = {
+        "output_format": output_format,
+        "bitrate": bitrate,
+        "all_tracks": all_tracks,
+        "passthrough": passthrough,
+    }
+
+    # Create task
+    task = task_store.create_task(
+        task_type="video_extract_audio", metadata={"filename": file.filename, **options}
+    )
+
+    # Start background processing
+    asyncio.create_task(run_extract_audio_task(task.id, input_path, output_path, options))
+
+    return {"task_id": task.id}
+
+
+@router.post("/hls")
+async def package_hls_async(
+    file: UploadFile = File(..., description="Video file to package"),
+    renditions: Optional[str] = Form(
+        None, description="Comma-separated rendition heights (e.g. 1080,720,480); default: all"
+    ),
+    segment_seconds: int = Form(
+        VIDEO_HLS_SEGMENT_SECONDS, description="Target segment duration in seconds (2-30)"
+    ),
+):
+    """
+    Start async HLS packaging with progress tracking
+
+    The video is decoded once and encoded into an adaptive-bitrate ladder
+    (1080p/720p/480p/360p, never above the source resolution) in a single
+    FFmpeg process. The result is a ZIP holding master.m3u8 and one folder of
+    playlist and segments per rendition, ready to be served as static files.
+
+    Returns a task_id for progress tracking via SSE
+    """
+    if not validate_video_format(file.filename):
+        raise HTTPException(status_code=400, detail="Unsupported video format")
+
+    if not 2 <= segment_seconds <= 30:
+        raise HTTPException(status_code=400, detail="segment_seconds must be between 2 and 30")
+
+    heights = None
+    if renditions:
+        try:
+            heights = [int(h.strip().rstrip("pP")) for h in renditions.split(",") if h.strip()]
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="renditions must be comma-separated heights"
+            )
+        available = {rung["height"] for rung in VIDEO_HLS_LADDER}
+        if not heights or not set(heights) <= available:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported renditions. Available heights: "
+                f"{', '.join(str(h) for h in sorted(available, reverse=True))}",
+            )
+
+    # Save uploaded file
+    input_path = await save_upload_file(file)
+
+    # Create output path
+    output_filename = generate_unique_filename(f"{Path(file.filename).stem}_hls.zip")
+    output_path = TEMP_DIR / output_filename
+
+    # Create task
+    task = task_store.create_task(
+        task_type="video_hls",
+        metadata={
+            "filename": file.filename,
+            "renditions": heights,
+            "segment_seconds": segment_seconds,
+        },
+    )
+
+    # Start background processing
+    asyncio.create_task(run_hls_task(task.id, input_path, output_path, heights, segment_seconds))
+
+    return {"task_id": task.id}
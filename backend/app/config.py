@@ -51,9 +51,259 @@ VIDEO_COMPRESSION_PRESETS = {
     "high": {"crf": 18, "preset": "slow"},
 }
 
+# Target-size (two-pass) video compression
+VIDEO_TARGET_SIZE_OVERHEAD = 0.01  # Share of the target size kept as a safety margin
+VIDEO_TARGET_MUX_BYTES_PER_SECOND = 1024  # Container index/headers per second of media
+VIDEO_TARGET_MIN_VIDEO_BITRATE = 64_000  # Below this (bits/s) the target is considered unreachable
+
+# FFmpeg CPU budget shared by all concurrent encodes (defaults to every core)
+FFMPEG_CORE_BUDGET = int(os.getenv("FFMPEG_CORE_BUDGET", os.cpu_count() or 1))
+
+# Segment-parallel (chunked) video encoding
+VIDEO_CHUNK_MIN_SECONDS = float(os.getenv("VIDEO_CHUNK_MIN_SECONDS", 10))
+VIDEO_CHUNK_MAX_SEGMENTS = int(os.getenv("VIDEO_CHUNK_MAX_SEGMENTS", FFMPEG_CORE_BUDGET))
+
+# Live streaming of conversions: output format -> (FFmpeg muxer, extra muxer options)
+# Only formats that can be written to a non-seekable pipe are listed; MP4-family
+# outputs are fragmented so playback can start before the encode finishes.
+# Video fragments start at keyframes, audio-only ones are cut every second
+# (every audio frame is a keyframe).
+FRAGMENTED_MP4_FLAGS = {"movflags": "frag_keyframe+empty_moov+default_base_moof"}
+FRAGMENTED_M4A_FLAGS = {"movflags": "empty_moov+default_base_moof", "frag_duration": 1_000_000}
+AUDIO_STREAM_FORMATS = {
+    "mp3": ("mp3", {}),
+    "aac": ("adts", {}),
+    "ogg": ("ogg", {}),
+    "flac": ("flac", {}),
+    "wav": ("wav", {}),
+    "m4a": ("ipod", FRAGMENTED_M4A_FLAGS),
+}
+VIDEO_STREAM_FORMATS = {
+    "mp4": ("mp4", FRAGMENTED_MP4_FLAGS),
+    "mov": ("mov", FRAGMENTED_MP4_FLAGS),
+    "mkv": ("matroska", {}),
+    "flv": ("flv", {}),
+}
+MEDIA_STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read from FFmpeg per response chunk
+
+# HLS packaging: adaptive-bitrate ladder encoded from a single decode.
+# Rungs taller than the source are skipped (no upscaling).
+VIDEO_HLS_LADDER = [
+    {"name": "1080p", "height": 1080, "video_bitrate": "5000k", "audio_bitrate": "192k"},
+    {"name": "720p", "height": 720, "video_bitrate": "2800k", "audio_bitrate": "128k"},
+    {"name": "480p", "height": 480, "video_bitrate": "1400k", "audio_bitrate": "128k"},
+    {"name": "360p", "height": 360, "video_bitrate": "800k", "audio_bitrate": "96k"},
+]
+VIDEO_HLS_SEGMENT_SECONDS = 6
+VIDEO_HLS_PRESET = "fast"  # libx264 preset shared by every rendition
+
+# Segment-parallel (chunked) audio transcoding. Encoders listed here can be
+# cut at frame boundaries: encoder -> (raw intermediate container, options).
+# MP3 segments are encoded without bit reservoir so no frame depends on bytes
+# of the previous one, which makes them joinable by plain frame concatenation.
+AUDIO_CHUNK_MIN_SECONDS = float(os.getenv("AUDIO_CHUNK_MIN_SECONDS", 120))
+AUDIO_CHUNK_MAX_SEGMENTS = int(os.getenv("AUDIO_CHUNK_MAX_SEGMENTS", FFMPEG_CORE_BUDGET))
+AUDIO_CHUNK_PREROLL_FRAMES = 4  # Frames encoded and dropped on each side of a cut
+AUDIO_CHUNK_ENCODERS = {
+    "libmp3lame": ("mp3", {"reservoir": 0, "write_xing": 0, "id3v2_version": 0}),
+    "aac": ("adts", {}),
+}
+AUDIO_CHUNK_SAMPLE_RATES = {  # Rates the encoders take natively (others are not chunked)
+    "libmp3lame": {8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000},
+    "aac": {8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000, 64000, 88200, 96000},
+}
+
+# Waveform peaks (/audio/waveform). Audio is decoded to low-rate mono PCM and
+# reduced to min/max/RMS per bucket; each further zoom level halves the width.
+AUDIO_WAVEFORM_SAMPLE_RATE = 8000
+AUDIO_WAVEFORM_DEFAULT_WIDTH = 2048  # Buckets of the most detailed level
+AUDIO_WAVEFORM_MAX_WIDTH = 16384
+AUDIO_WAVEFORM_MAX_LEVELS = 8
+
+# Batch metadata extraction (/audio/metadata/batch)
+AUDIO_METADATA_BATCH_WORKERS = int(os.getenv("AUDIO_METADATA_BATCH_WORKERS", 8))
+AUDIO_METADATA_BATCH_MAX_FILES = int(os.getenv("AUDIO_METADATA_BATCH_MAX_FILES", 1000))
+AUDIO_METADATA_BATCH_MAX_BYTES = (
+    int(os.getenv("AUDIO_METADATA_BATCH_MAX_MB", 4096)) * 1024 * 1024
+)  # Uncompressed size of an uploaded archive
+
+# Media probe cache (ffprobe results keyed by content fingerprint)
+MEDIA_PROBE_CACHE_SIZE = int(os.getenv("MEDIA_PROBE_CACHE_SIZE", 256))
+
+# Video trimming
+VIDEO_TRIM_KEYFRAME_WINDOW = 30.0  # Seconds scanned around each cut point for keyframes
+VIDEO_TRIM_EDGE_ENCODERS = {"h264": "libx264", "hevc": "libx265"}  # Smart-trim edge encoders
+
+# Video thumbnails and sprite sheets
+VIDEO_THUMBNAIL_MAX_COUNT = 100
+VIDEO_THUMBNAIL_CANDIDATE_FRAMES = 12  # Frames compared to pick each representative thumbnail
+VIDEO_THUMBNAIL_SCAN_SECONDS = 1.0  # Input read after each seek point
+
+# Audio extraction: output formats, their encoders and the source codecs that can be
+# stream-copied into them without re-encoding
+AUDIO_EXTRACT_ENCODERS = {
+    "mp3": "libmp3lame",
+    "m4a": "aac",
+    "ogg": "libvorbis",
+    "flac": "flac",
+    "wav": "pcm_s16le",
+}
+AUDIO_EXTRACT_PASSTHROUGH = {
+    "mp3": {"mp3"},
+    "m4a": {"aac", "alac"},
+    "ogg": {"vorbis", "opus", "flac"},
+    "flac": {"flac"},
+    "wav": {"pcm_s16le", "pcm_s24le", "pcm_s32le", "pcm_f32le", "pcm_u8"},
+}
+
+# Audio merge stream copy: output format -> input codecs the concat demuxer can
+# join without re-encoding (when sample rate, channels and profile also match).
+# Vorbis/Opus are left out: each file carries its own codec setup headers.
+AUDIO_MERGE_PASSTHROUGH = {
+    "mp3": {"mp3"},
+    "aac": {"aac"},
+    "m4a": {"aac", "alac"},
+    "flac": {"flac"},
+    "wav": AUDIO_EXTRACT_PASSTHROUGH["wav"],
+}
+
+# Animated images (/video/to-gif): speed/size presets per output format
+ANIMATED_IMAGE_FORMATS = ["gif", "webp", "avif"]
+ANIMATED_IMAGE_PRESETS = {
+    "webp": {
+        "fast": {"quality": 70, "compression_level": 1},
+        "balanced": {"quality": 75, "compression_level": 4},
+        "small": {"quality": 60, "compression_level": 6},
+    },
+    "avif": {
+        "fast": {"crf": 35, "cpu-used": 8},
+        "balanced": {"crf": 32, "cpu-used": 6},
+        "small": {"crf": 40, "cpu-used": 4},
+    },
+}
+GIF_DITHER_MODES = ["sierra2_4a", "floyd_steinberg", "bayer", "none"]
+
 # Image compression quality
 IMAGE_COMPRESSION_QUALITY = {
     "low": 50,
     "medium": 75,
     "high": 90,
 }
+
+# Image encoder profiles: how hard each encoder works for smaller files.
+# Profiles never change the requested quality, only CPU spent per byte saved.
+IMAGE_ENCODER_PROFILES = {
+    "JPEG": {
+        "fast": {"optimize": False, "progressive": False, "subsampling": "4:2:0"},
+        "balanced": {"optimize": True, "progressive": False, "subsampling": "4:2:0"},
+        "smallest": {"optimize": True, "progressive": True, "subsampling": "4:2:0"},
+    },
+    "PNG": {
+        "fast": {"compress_level": 1},
+        "balanced": {"compress_level": 6},
+        "smallest": {"compress_level": 9, "optimize": True},
+    },
+    "WEBP": {
+        "fast": {"method": 0},
+        "balanced": {"method": 4},
+        "smallest": {"method": 6},
+    },
+    "AVIF": {
+        "fast": {"speed": 10},
+        "balanced": {"speed": 6},
+        "smallest": {"speed": 2},
+    },
+    "GIF": {
+        "fast": {"optimize": False},
+        "balanced": {"optimize": True},
+        "smallest": {"optimize": True},
+    },
+}
+IMAGE_ENCODER_PROFILE_NAMES = ["fast", "balanced", "smallest"]
+IMAGE_ENCODER_DEFAULT_PROFILE = os.getenv("IMAGE_ENCODER_PROFILE", "balanced")
+IMAGE_ENCODER_FORMAT_PROFILES: dict[str, str] = {}  # Per-format defaults, e.g. {"PNG": "fast"}
+IMAGE_ENCODER_QUALITY = 95  # Lossy quality of edited images when the request sets none
+# Lossless WebP effort (its "quality") for each profile
+IMAGE_WEBP_LOSSLESS_EFFORT = {"fast": 0, "balanced": 75, "smallest": 100}
+
+# Automatic output format ("auto"): candidates encoded in parallel, smallest kept.
+# JPEG is skipped for images with transparency, formats Pillow lacks are skipped.
+IMAGE_AUTO_FORMATS = ["JPEG", "WEBP", "AVIF", "PNG"]
+IMAGE_ENCODE_WORKERS = int(os.getenv("IMAGE_ENCODE_WORKERS", os.cpu_count() or 1))
+# Parallel decodes (collage cells); kept apart from encoding because decodes
+# wait on the image memory budget
+IMAGE_DECODE_WORKERS = int(os.getenv("IMAGE_DECODE_WORKERS", os.cpu_count() or 1))
+
+# Target-size / target-SSIM compression: encoder quality is binary searched
+# over in-memory encodes and the search stops once within tolerance of the target
+IMAGE_TARGET_MIN_QUALITY = 10
+IMAGE_TARGET_MAX_QUALITY = 95
+IMAGE_TARGET_SIZE_TOLERANCE = 0.05  # Share of max_bytes a result may fall short by
+IMAGE_TARGET_SSIM_TOLERANCE = 0.005  # SSIM a result may exceed min_ssim by
+IMAGE_TARGET_MAX_DOWNSCALES = 4  # Downscale rounds when the lowest quality is too large
+IMAGE_SSIM_MAX_PIXELS = 1_000_000  # Larger images are compared at a reduced size
+
+# Image decoding: bytes of decoded rasters held at once by concurrent jobs
+# (larger jobs wait for memory to free up), and how much larger than its final
+# size an image is kept when decoded or reduced ahead of a resize
+IMAGE_MEMORY_BUDGET = int(os.getenv("IMAGE_MEMORY_BUDGET_MB", 1024)) * 1024 * 1024
+IMAGE_REDUCING_GAP = 2.0
+
+# Dominant color extraction: median-cut clusters computed before merging,
+# k-means refinement passes (each costs about twice the median cut itself),
+# and CIELAB distance under which clusters merge
+IMAGE_COLOR_CLUSTERS = 32
+IMAGE_COLOR_KMEANS_ITERATIONS = 0
+IMAGE_COLOR_MERGE_DELTA_E = 10.0
+IMAGE_COLOR_BATCH_MAX_FILES = 50
+
+# Collages (/image/collage): cells are decoded at reduced size and resized in
+# parallel on the encode pool. Large PNG canvases use the fast PNG profile
+# unless the request sets one (zlib effort grows with the canvas).
+IMAGE_COLLAGE_CELL_SIZE = 800
+IMAGE_COLLAGE_MAX_CELL_SIZE = 2000
+IMAGE_COLLAGE_MAX_GUTTER = 200
+IMAGE_COLLAGE_MAX_PIXELS = 64_000_000  # Largest canvas (width * height)
+IMAGE_COLLAGE_FORMATS = ["png", "jpg", "webp"]
+IMAGE_COLLAGE_PNG_FAST_PIXELS = 4_000_000
+
+# Responsive image sets (/image/responsive): widths of the srcset ladder (wider
+# than the source are skipped) and the formats each width can be encoded to
+IMAGE_RESPONSIVE_WIDTHS = [320, 640, 960, 1280, 1920]
+IMAGE_RESPONSIVE_MAX_WIDTHS = 12
+IMAGE_RESPONSIVE_MAX_WIDTH = 7680
+IMAGE_RESPONSIVE_FORMATS = ["webp", "jpg", "avif", "png"]
+
+# Icons (/image/to-icon): ICO frames are at most 256 pixels (larger sizes are
+# stored as 256); favicon bundles add PNG variants and a web app manifest
+IMAGE_ICON_MIN_SIZE = 16
+IMAGE_ICON_MAX_SIZE = 512
+IMAGE_ICON_ICO_MAX_SIZE = 256
+IMAGE_ICON_SIZES = [16, 32, 48, 64, 128, 256]
+IMAGE_FAVICON_PNG_VARIANTS = {"apple-touch-icon.png": 180}  # Flattened on white
+IMAGE_FAVICON_MANIFEST_ICONS = {
+    "android-chrome-192x192.png": 192,
+    "android-chrome-512x512.png": 512,
+}
+
+# Deep-zoom tile pyramids (/image/tiles): tiles are cut band by band and encoded
+# on the encode pool, with at most IMAGE_TILE_MAX_PENDING tiles in flight
+IMAGE_TILE_SIZE = 256
+IMAGE_TILE_MIN_SIZE = 64
+IMAGE_TILE_MAX_SIZE = 1024
+IMAGE_TILE_LAYOUTS = ["dzi", "xyz"]
+IMAGE_TILE_FORMATS = ["jpg", "png", "webp"]
+IMAGE_TILE_MAX_PENDING = 64
+
+# Lossless JPEG rotations and flips (/image/rotate, /image/flip): jpegtran
+# (libjpeg-turbo-progs) transforms MCU-aligned JPEGs in the DCT domain; without
+# it, or for other sizes, images are decoded and re-encoded
+IMAGE_JPEGTRAN_PATH = os.getenv("JPEGTRAN_PATH", "jpegtran")
+IMAGE_JPEGTRAN_TIMEOUT = 60  # Seconds
+
+# Interactive previews (/image/preview): each session keeps a downscaled RGB
+# proxy of its upload in memory, evicted least recently used beyond the budget
+IMAGE_PREVIEW_CACHE_BYTES = int(os.getenv("IMAGE_PREVIEW_CACHE_MB", 256)) * 1024 * 1024
+IMAGE_PREVIEW_MAX_SIZE = 1280  # Longest side of the cached proxy
+IMAGE_PREVIEW_QUALITY = 80  # Default quality of rendered previews
+IMAGE_PREVIEW_FORMATS = {"jpeg": "image/jpeg", "webp": "image/webp"}
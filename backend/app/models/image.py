@@ -24,6 +24,17 @@ class ImageConversionRequest(BaseModel):
     )
 
 
+class FormatCandidate(BaseModel):
+    """Result of encoding an image to one candidate format"""
+
+    format: str
+    size: Optional[int] = Field(None, description="Encoded size in bytes (None when it failed)")
+    quality: Optional[int] = None
+    ssim: Optional[float] = None
+    message: Optional[str] = None
+    selected: bool = False
+
+
 class ImageProcessingResponse(BaseModel):
     """Response model for image processing"""
 
@@ -35,6 +46,10 @@ class ImageProcessingResponse(BaseModel):
     processed_size: Optional[int] = None
     compression_ratio: Optional[float] = None
     dimensions: Optional[dict] = None
+    quality: Optional[int] = None
+    ssim: Optional[float] = None
+    trial_encodes: Optional[int] = None
+    candidates: Optional[list[FormatCandidate]] = None
 
 
 class ColorInfo(BaseModel):
@@ -53,6 +68,14 @@ class ColorExtractionResponse(BaseModel):
     colors: list[ColorInfo]
 
 
+class ColorExtractionBatchResponse(BaseModel):
+    """Response model for color extraction over several images"""
+
+    success: bool
+    message: str
+    results: list[ColorExtractionResponse]
+
+
 class CollageRequest(BaseModel):
     """Request model for creating a collage"""
 
@@ -61,3 +84,25 @@ class CollageRequest(BaseModel):
     image_order: list[int] = Field(
         ..., description="Order of images in the grid (indices from 0 to rows*cols-1)"
     )
+
+
+class ImageOperations(BaseModel):
+    """Adjustments and filter applied together to an image"""
+
+    brightness: float = 1.0
+    contrast: float = 1.0
+    saturation: float = 1.0
+    gamma: float = 1.0
+    black_point: int = 0
+    white_point: int = 255
+    filter_name: Optional[str] = None
+
+
+class PreviewSessionResponse(BaseModel):
+    """Response model for a new interactive preview session"""
+
+    success: bool
+    message: str
+    session_id: Optional[str] = None
+    dimensions: Optional[dict] = None
+    preview_dimensions: Optional[dict] = None
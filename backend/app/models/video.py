@@ -13,6 +13,9 @@ class VideoCompressionRequest(BaseModel):
     quality: Literal["low", "medium", "high"] = Field(
         default="medium", description="Compression quality preset"
     )
+    target_size_mb: Optional[float] = Field(
+        default=None, gt=0, description="Target output size in MB (two-pass bitrate encode)"
+    )
 
 
 class VideoConversionRequest(BaseModel):
@@ -46,15 +49,43 @@ class VideoToGifRequest(BaseModel):
     width: Optional[int] = Field(default=None, ge=32, le=3840, description="Target width in pixels")
     fps: int = Field(default=12, ge=1, le=60, description="Frames per second for GIF")
     loop: bool = Field(default=True, description="Whether the GIF should loop")
+    output_format: Literal["gif", "webp", "avif"] = Field(
+        default="gif", description="Animated image format"
+    )
+    preset: Literal["fast", "balanced", "small"] = Field(
+        default="balanced", description="WebP/AVIF speed/size preset"
+    )
+    dither: Literal["sierra2_4a", "floyd_steinberg", "bayer", "none"] = Field(
+        default="sierra2_4a", description="GIF dithering mode"
+    )
 
 
 class AudioExtractionRequest(BaseModel):
     """Request model for extracting audio from a video"""
 
-    output_format: Literal["mp3", "wav", "flac", "ogg"] = Field(
-        default="mp3", description="Target audio format"
+    output_format: Literal["mp3", "m4a", "wav", "flac", "ogg", "auto"] = Field(
+        default="mp3", description="Target audio format ('auto' keeps the source codec)"
+    )
+    bitrate: str = Field(
+        default="192k", description="Audio bitrate for re-encoded tracks (e.g., 128k, 192k)"
+    )
+    all_tracks: bool = Field(default=False, description="Extract every audio track as a ZIP")
+    passthrough: bool = Field(
+        default=True, description="Stream-copy tracks whose codec fits the output format"
+    )
+
+
+class VideoTrimRequest(BaseModel):
+    """Request model for trimming a video"""
+
+    start_time: float = Field(default=0.0, ge=0, description="Start of the segment in seconds")
+    end_time: Optional[float] = Field(
+        default=None, gt=0, description="End of the segment in seconds (end of file if omitted)"
+    )
+    smart: bool = Field(
+        default=False,
+        description="Re-encode the partial GOPs at the edges for a frame-accurate cut",
     )
-    bitrate: str = Field(default="192k", description="Audio bitrate (e.g., 128k, 192k, 256k)")
 
 
 class VideoMergeRequest(BaseModel):
@@ -2,15 +2,89 @@
 Audio processing service using FFmpeg
 """
 
+from array import array
+import hashlib
+import json
+import math
+import os
 from pathlib import Path
-from typing import Any
+import shutil
+import struct
+import subprocess
+from typing import Any, Optional
+import uuid
+import zipfile
 
 import ffmpeg
 from mutagen import File as MutagenFile
 from mutagen.id3 import ID3NoHeaderError
 
+from app.config import (
+    AUDIO_MERGE_PASSTHROUGH,
+    AUDIO_METADATA_BATCH_MAX_BYTES,
+    AUDIO_METADATA_BATCH_MAX_FILES,
+    AUDIO_WAVEFORM_SAMPLE_RATE,
+    TEMP_DIR,
+)
 from app.models.audio import AudioMetadataResponse, AudioProcessingResponse
-from app.utils.file_handler import calculate_compression_ratio, get_file_size
+from app.utils.file_handler import (
+    calculate_compression_ratio,
+    generate_unique_filename,
+    get_file_size,
+)
+from app.utils.media_probe import get_file_fingerprint, probe_media
+from app.utils.resource_governor import core_budget, thread_options
+
+
+def get_audio_convert_options(
+    output_format: str, quality: str = "medium", bitrate: str = "192k"
+) -> Optional[dict]:
+    """
+    Get the FFmpeg output options converting audio to a format
+
+    Returns:
+        Output options, or None if the format is not supported
+    """
+    # Map codecs per format
+    codec_map = {
+        "mp3": "libmp3lame",
+        "wav": "pcm_s16le",
+        "flac": "flac",
+        "ogg": "libvorbis",
+        "aac": "aac",
+        "m4a": "aac",
+    }
+
+    codec = codec_map.get(output_format.lower())
+    if codec is None:
+        return None
+
+    # Build output options
+    output_kwargs = {"acodec": codec}
+
+    # Set bitrate for lossy formats
+    if output_format.lower() in ["mp3", "ogg", "aac", "m4a"]:
+        output_kwargs["b:a"] = bitrate
+
+    # For WAV and FLAC, we can set sample rate based on quality
+    if output_format.lower() in ["wav", "flac"]:
+        quality_sample_rates = {
+            "low": "22050",
+            "medium": "44100",
+            "high": "48000",
+        }
+        output_kwargs["ar"] = quality_sample_rates.get(quality, "44100")
+
+    # For MP3, adjust quality based on preset
+    if output_format.lower() == "mp3":
+        quality_presets = {
+            "low": "7",  # Lower quality, smaller file
+            "medium": "4",  # Medium quality
+            "high": "0",  # High quality, larger file
+        }
+        output_kwargs["q:a"] = quality_presets.get(quality, "4")
+
+    return output_kwargs
 
 
 def convert_audio(
@@ -36,18 +110,8 @@ def convert_audio(
     try:
         original_size = get_file_size(input_path)
 
-        # Map codecs per format
-        codec_map = {
-            "mp3": "libmp3lame",
-            "wav": "pcm_s16le",
-            "flac": "flac",
-            "ogg": "libvorbis",
-            "aac": "aac",
-            "m4a": "aac",
-        }
-
-        codec = codec_map.get(output_format.lower())
-        if codec is None:
+        output_kwargs = get_audio_convert_options(output_format, quality, bitrate)
+        if output_kwargs is None:
             return AudioProcessingResponse(
                 success=False,
                 message=f"Unsupported output audio format: {output_format}",
@@ -57,35 +121,11 @@ def convert_audio(
         # Build FFmpeg input
         stream = ffmpeg.input(str(input_path))
 
-        # Build output options
-        output_kwargs = {"acodec": codec}
-
-        # Set bitrate for lossy formats
-        if output_format.lower() in ["mp3", "ogg", "aac", "m4a"]:
-            output_kwargs["b:a"] = bitrate
-
-        # For WAV and FLAC, we can set sample rate based on quality
-        if output_format.lower() in ["wav", "flac"]:
-            quality_sample_rates = {
-                "low": "22050",
-                "medium": "44100",
-                "high": "48000",
-            }
-            sample_rate = quality_sample_rates.get(quality, "44100")
-            output_kwargs["ar"] = sample_rate
-
-        # For MP3, adjust quality based on preset
-        if output_format.lower() == "mp3":
-            quality_presets = {
-                "low": "7",  # Lower quality, smaller file
-                "medium": "4",  # Medium quality
-                "high": "0",  # High quality, larger file
-            }
-            output_kwargs["q:a"] = quality_presets.get(quality, "4")
-
         # Run FFmpeg conversion
-        stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        with core_budget.job() as threads:
+            output_kwargs.update(thread_options(threads))
+            stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
         # Get converted file size
         processed_size = get_file_size(output_path)
@@ -117,6 +157,55 @@ def convert_audio(
         )
 
 
+def get_audio_compress_options(
+    input_path: Path, quality: str = "medium", target_bitrate: str = "128k"
+) -> dict:
+    """Get the FFmpeg output options compressing an audio file"""
+    # Detect input format
+    input_ext = input_path.suffix.lower()
+
+    # Determine output format based on input
+    # For lossless formats (WAV, FLAC), convert to MP3 for compression
+    # For lossy formats, keep the same format but reduce bitrate
+    if input_ext in [".wav", ".flac"]:
+        codec = "libmp3lame"
+    elif input_ext in [".mp3"]:
+        codec = "libmp3lame"
+    elif input_ext in [".ogg"]:
+        codec = "libvorbis"
+    elif input_ext in [".aac", ".m4a"]:
+        codec = "aac"
+    else:
+        # Default to MP3 for unknown formats
+        codec = "libmp3lame"
+
+    # Build output options for compression
+    output_kwargs = {"acodec": codec}
+
+    # Set bitrate based on quality preset if target_bitrate not explicitly set
+    quality_bitrates = {
+        "low": "96k",
+        "medium": "128k",
+        "high": "192k",
+    }
+
+    # Use target_bitrate if provided, otherwise use quality preset
+    output_kwargs["b:a"] = (
+        target_bitrate if target_bitrate else quality_bitrates.get(quality, "128k")
+    )
+
+    # For MP3, adjust quality preset for better compression
+    if codec == "libmp3lame":
+        quality_presets = {
+            "low": "7",  # Lower quality, smaller file
+            "medium": "5",  # Medium quality
+            "high": "3",  # Higher quality
+        }
+        output_kwargs["q:a"] = quality_presets.get(quality, "5")
+
+    return output_kwargs
+
+
 def compress_audio(
     input_path: Path,
     output_path: Path,
@@ -138,58 +227,17 @@ def compress_audio(
     try:
         original_size = get_file_size(input_path)
 
-        # Detect input format
-        input_ext = input_path.suffix.lower()
-
-        # Determine output format based on input
-        # For lossless formats (WAV, FLAC), convert to MP3 for compression
-        # For lossy formats, keep the same format but reduce bitrate
-        if input_ext in [".wav", ".flac"]:
-            output_format = "mp3"
-            codec = "libmp3lame"
-        elif input_ext in [".mp3"]:
-            output_format = "mp3"
-            codec = "libmp3lame"
-        elif input_ext in [".ogg"]:
-            output_format = "ogg"
-            codec = "libvorbis"
-        elif input_ext in [".aac", ".m4a"]:
-            output_format = "aac"
-            codec = "aac"
-        else:
-            # Default to MP3 for unknown formats
-            output_format = "mp3"
-            codec = "libmp3lame"
+        output_kwargs = get_audio_compress_options(input_path, quality, target_bitrate)
+        final_bitrate = output_kwargs["b:a"]
 
         # Build FFmpeg input
         stream = ffmpeg.input(str(input_path))
 
-        # Build output options for compression
-        output_kwargs = {"acodec": codec}
-
-        # Set bitrate based on quality preset if target_bitrate not explicitly set
-        quality_bitrates = {
-            "low": "96k",
-            "medium": "128k",
-            "high": "192k",
-        }
-
-        # Use target_bitrate if provided, otherwise use quality preset
-        final_bitrate = target_bitrate if target_bitrate else quality_bitrates.get(quality, "128k")
-        output_kwargs["b:a"] = final_bitrate
-
-        # For MP3, adjust quality preset for better compression
-        if output_format == "mp3":
-            quality_presets = {
-                "low": "7",  # Lower quality, smaller file
-                "medium": "5",  # Medium quality
-                "high": "3",  # Higher quality
-            }
-            output_kwargs["q:a"] = quality_presets.get(quality, "5")
-
         # Run FFmpeg compression
-        stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        with core_budget.job() as threads:
+            output_kwargs.update(thread_options(threads))
+            stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
         # Get compressed file size
         processed_size = get_file_size(output_path)
@@ -221,15 +269,116 @@ def compress_audio(
         )
 
 
+def get_merge_copy_codec(input_paths: list[Path], output_format: str) -> Optional[str]:
+    """
+    Check whether audio files can be merged by stream copy
+
+    Copying is possible when every input's first audio stream has the same
+    codec, sample rate, channel layout and profile, and that codec fits the
+    output container. Inputs that cannot be probed force a re-encode.
+
+    Returns:
+        The shared codec name, or None if the inputs need re-encoding
+    """
+    compatible = AUDIO_MERGE_PASSTHROUGH.get(output_format.lower(), set())
+    layouts = set()
+
+    for path in input_paths:
+        try:
+            streams = probe_media(path).get("streams", [])
+        except Exception:
+            return None
+
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        if audio is None or audio.get("codec_name") not in compatible:
+            return None
+
+        layouts.add(
+            (
+                audio.get("codec_name"),
+                audio.get("sample_rate"),
+                audio.get("channels"),
+                audio.get("profile"),
+            )
+        )
+        if len(layouts) > 1:
+            return None
+
+    return layouts.pop()[0] if layouts else None
+
+
+def get_total_duration(input_paths: list[Path]) -> float:
+    """Get the summed duration in seconds of audio files (0 for unreadable ones)"""
+    total = 0.0
+    for path in input_paths:
+        try:
+            total += float(probe_media(path)["format"]["duration"])
+        except Exception:
+            continue
+    return total
+
+
+def write_concat_list(input_paths: list[Path], list_path: Path) -> Path:
+    """Write a concat demuxer file list"""
+    lines = []
+    for path in input_paths:
+        escaped = str(path.resolve()).replace("'", "'\\''")
+        lines.append(f"file '{escaped}'\n")
+    list_path.write_text("".join(lines))
+    return list_path
+
+
+def build_merge_output(
+    input_paths: list[Path],
+    output_path: Path,
+    output_format: str = "mp3",
+    quality: str = "medium",
+    bitrate: str = "192k",
+    list_path: Optional[Path] = None,
+    threads: int = 1,
+):
+    """
+    Build the FFmpeg graph merging audio files
+
+    With a concat list (list_path), the inputs are joined by the concat
+    demuxer and their packets copied as-is; otherwise every input is decoded,
+    joined by the concat filter and encoded for output_format.
+    """
+    if list_path is not None:
+        merged_stream = ffmpeg.input(str(list_path), format="concat", safe=0)["a:0"]
+        return ffmpeg.output(merged_stream, str(output_path), acodec="copy")
+
+    # Use concat filter instead of concat demuxer for better compatibility
+    # This method works even when files have different codecs/sample rates
+    # The filter normalizes all inputs before concatenating
+    # Create input streams for all audio files
+    input_streams = [ffmpeg.input(str(path)) for path in input_paths]
+
+    # Extract audio streams (in case some files have video tracks)
+    # Use ['a'] to get the first audio stream from each input
+    audio_streams = [stream["a"] for stream in input_streams]
+
+    # Use concat filter to merge audio streams
+    # The concat filter requires all streams to be passed as a list
+    # n=number of inputs, v=0 (no video), a=1 (audio only)
+    # This syntax is similar to how paletteuse filter works in video_service.py
+    merged_stream = ffmpeg.filter(audio_streams, "concat", n=len(input_paths), v=0, a=1)
+
+    output_kwargs = get_audio_convert_options(output_format, quality, bitrate)
+    output_kwargs.update(thread_options(threads))
+    return ffmpeg.output(merged_stream, str(output_path), **output_kwargs)
+
+
 def merge_audio(
     input_paths: list[Path],
     output_path: Path,
     output_format: str = "mp3",
     quality: str = "medium",
     bitrate: str = "192k",
+    mode: str = "auto",
 ) -> AudioProcessingResponse:
     """
-    Merge multiple audio files into one using FFmpeg concat demuxer
+    Merge multiple audio files into one using FFmpeg
 
     Args:
         input_paths: List of paths to input audio files (in order)
@@ -237,10 +386,14 @@ def merge_audio(
         output_format: Output audio format (mp3, wav, flac, ogg, aac, m4a)
         quality: Output quality preset (low, medium, high)
         bitrate: Audio bitrate (e.g., 128k, 192k, 256k, 320k)
+        mode: "auto" joins inputs sharing one stream layout by stream copy
+            (quality and bitrate are then kept from the inputs) and re-encodes
+            otherwise; "reencode" always decodes and re-encodes
 
     Returns:
         AudioProcessingResponse with merge results
     """
+    list_path = None
     try:
         if len(input_paths) < 2:
             return AudioProcessingResponse(
@@ -249,79 +402,41 @@ def merge_audio(
                 filename=output_path.name if output_path else None,
             )
 
-        # Calculate total original size
-        total_original_size = sum(get_file_size(path) for path in input_paths)
-
-        # Map codecs per format
-        codec_map = {
-            "mp3": "libmp3lame",
-            "wav": "pcm_s16le",
-            "flac": "flac",
-            "ogg": "libvorbis",
-            "aac": "aac",
-            "m4a": "aac",
-        }
-
-        codec = codec_map.get(output_format.lower())
-        if codec is None:
+        if get_audio_convert_options(output_format) is None:
             return AudioProcessingResponse(
                 success=False,
                 message=f"Unsupported output audio format: {output_format}",
                 filename=output_path.name if output_path else None,
             )
 
-        # Use concat filter instead of concat demuxer for better compatibility
-        # This method works even when files have different codecs/sample rates
-        # The filter normalizes all inputs before concatenating
-        # Create input streams for all audio files
-        input_streams = [ffmpeg.input(str(path)) for path in input_paths]
-
-        # Extract audio streams (in case some files have video tracks)
-        # Use ['a'] to get the first audio stream from each input
-        audio_streams = [stream["a"] for stream in input_streams]
-
-        # Use concat filter to merge audio streams
-        # The concat filter requires all streams to be passed as a list
-        # n=number of inputs, v=0 (no video), a=1 (audio only)
-        # This syntax is similar to how paletteuse filter works in video_service.py
-        merged_stream = ffmpeg.filter(audio_streams, "concat", n=len(input_paths), v=0, a=1)
-
-        # Build output options
-        output_kwargs = {"acodec": codec}
-
-        # Set bitrate for lossy formats
-        if output_format.lower() in ["mp3", "ogg", "aac", "m4a"]:
-            output_kwargs["b:a"] = bitrate
-
-        # For WAV and FLAC, set sample rate based on quality
-        if output_format.lower() in ["wav", "flac"]:
-            quality_sample_rates = {
-                "low": "22050",
-                "medium": "44100",
-                "high": "48000",
-            }
-            sample_rate = quality_sample_rates.get(quality, "44100")
-            output_kwargs["ar"] = sample_rate
-
-        # For MP3, adjust quality based on preset
-        if output_format.lower() == "mp3":
-            quality_presets = {
-                "low": "7",
-                "medium": "4",
-                "high": "0",
-            }
-            output_kwargs["q:a"] = quality_presets.get(quality, "4")
-
-        stream = ffmpeg.output(merged_stream, str(output_path), **output_kwargs)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        # Calculate total original size
+        total_original_size = sum(get_file_size(path) for path in input_paths)
+
+        copy_codec = None
+        if mode == "auto":
+            copy_codec = get_merge_copy_codec(input_paths, output_format)
+        if copy_codec:
+            list_path = write_concat_list(
+                input_paths, output_path.with_name(f"{output_path.stem}.concat.txt")
+            )
+
+        with core_budget.job() as threads:
+            stream = build_merge_output(
+                input_paths, output_path, output_format, quality, bitrate, list_path, threads
+            )
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
         # Get merged file size
         merged_size = get_file_size(output_path)
         compression_ratio = calculate_compression_ratio(total_original_size, merged_size)
 
+        message = f"Successfully merged {len(input_paths)} audio files"
+        if copy_codec:
+            message += f" (stream copy, {copy_codec})"
+
         return AudioProcessingResponse(
             success=True,
-            message=f"Successfully merged {len(input_paths)} audio files",
+            message=message,
             filename=output_path.name,
             download_url=f"/api/v1/download/{output_path.name}",
             original_size=total_original_size,
@@ -344,6 +459,222 @@ def merge_audio(
             filename=output_path.name if output_path else None,
         )
 
+    finally:
+        if list_path is not None:
+            list_path.unlink(missing_ok=True)
+
+
+def get_waveform_cache_name(input_path: Path, **options) -> str:
+    """
+    Name of the waveform peaks cached in TEMP_DIR for this content and options
+
+    The name does not depend on the response encoding: JSON and binary
+    requests are both served from the same cached peaks.
+    """
+    key = get_file_fingerprint(input_path) + repr(sorted(options.items()))
+    return f"waveform_{hashlib.sha256(key.encode()).hexdigest()[:24]}.json"
+
+
+def read_waveform_buckets(
+    input_path: Path, samples_per_bucket: int
+) -> list[tuple[float, float, float]]:
+    """
+    Decode audio through an FFmpeg pipe into (min, max, rms) per bucket
+
+    The audio is downmixed to low-rate mono PCM and FFmpeg's astats filter
+    reduces every `samples_per_bucket` samples to one line of metadata, so
+    only the bucket values ever cross the pipe and memory stays constant
+    whatever the input duration. Values are normalized to -1.0..1.0.
+
+    Raises:
+        ffmpeg.Error: If FFmpeg cannot decode the input
+    """
+    cmd = (
+        ffmpeg.input(str(input_path))
+        .audio.filter(
+            "aformat",
+            sample_fmts="s16",
+            sample_rates=AUDIO_WAVEFORM_SAMPLE_RATE,
+            channel_layouts="mono",
+        )
+        .filter("asetnsamples", n=samples_per_bucket, p=0)
+        .filter(
+            "astats",
+            metadata=1,
+            reset=1,
+            measure_overall="none",
+            measure_perchannel="Min_level+Max_level+RMS_level",
+        )
+        .filter("ametadata", mode="print", file="pipe:1")
+        .output("-", format="null")
+        .global_args("-v", "error", "-nostats")
+        .compile()
+    )
+
+    buckets = []
+    stats: dict[str, float] = {}
+
+    def add_bucket():
+        if len(stats) == 3:
+            buckets.append(
+                (
+                    stats["Min_level"] / 32768,
+                    stats["Max_level"] / 32768,
+                    10 ** (stats["RMS_level"] / 20),  # dBFS, -inf for digital silence
+                )
+            )
+        stats.clear()
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for line in process.stdout:
+            if line.startswith(b"frame:"):
+                add_bucket()
+                continue
+            key, _, value = line.decode().strip().partition("=")
+            name = key.rsplit(".", 1)[-1]
+            if name in ("Min_level", "Max_level", "RMS_level"):
+                stats[name] = float(value)
+        add_bucket()
+        stderr = process.stderr.read()
+        process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+    if process.returncode != 0:
+        raise ffmpeg.Error("ffmpeg", b"", stderr)
+    return buckets
+
+
+def build_waveform_levels(
+    buckets: list[tuple[float, float, float]], levels: int
+) -> list[list[tuple[float, float, float]]]:
+    """
+    Derive coarser zoom levels by merging adjacent buckets pairwise
+
+    Each level has half the buckets of the previous one: the min of the
+    mins, the max of the maxes and the quadratic mean of the RMS values.
+    """
+    result = [buckets]
+    while len(result) < levels and len(result[-1]) > 1:
+        previous = result[-1]
+        merged = [
+            (min(a[0], b[0]), max(a[1], b[1]), math.sqrt((a[2] ** 2 + b[2] ** 2) / 2))
+            for a, b in zip(previous[::2], previous[1::2])
+        ]
+        if len(previous) % 2:
+            merged.append(previous[-1])
+        result.append(merged)
+    return result
+
+
+def extract_waveform(
+    input_path: Path, output_path: Path, width: int = 2048, levels: int = 4
+) -> AudioProcessingResponse:
+    """
+    Compute waveform peaks at several zoom levels and save them as JSON
+
+    Values are quantized to 8 bits (-127..127). The first level has up to
+    `width` buckets, each following level half as many.
+
+    Args:
+        input_path: Path to input audio file
+        output_path: Path of the JSON peaks file
+        width: Number of buckets of the most detailed level
+        levels: Number of zoom levels
+
+    Returns:
+        AudioProcessingResponse with the peaks file
+    """
+    try:
+        duration = float(probe_media(input_path)["format"]["duration"])
+        samples_per_bucket = max(1, math.ceil(duration * AUDIO_WAVEFORM_SAMPLE_RATE / width))
+
+        buckets = read_waveform_buckets(input_path, samples_per_bucket)
+        if not buckets:
+            return AudioProcessingResponse(success=False, message="No audio stream found in file")
+
+        def quantize(values):
+            return [max(-127, min(127, round(value * 127))) for value in values]
+
+        waveform = {
+            "version": 1,
+            "bits": 8,
+            "sample_rate": AUDIO_WAVEFORM_SAMPLE_RATE,
+            "duration": duration,
+            "levels": [],
+        }
+        for level, level_buckets in enumerate(build_waveform_levels(buckets, levels)):
+            mins, maxes, rms = zip(*level_buckets)
+            waveform["levels"].append(
+                {
+                    "width": len(level_buckets),
+                    "seconds_per_bucket": samples_per_bucket
+                    * 2**level
+                    / AUDIO_WAVEFORM_SAMPLE_RATE,
+                    "min": quantize(mins),
+                    "max": quantize(maxes),
+                    "rms": quantize(rms),
+                }
+            )
+
+        # Write under a temporary name of its own so a concurrent identical
+        # request neither serves nor overwrites half-written cached peaks
+        partial_path = output_path.with_name(f"{output_path.name}.partial-{uuid.uuid4().hex[:12]}")
+        try:
+            partial_path.write_text(json.dumps(waveform, separators=(",", ":")))
+            os.replace(partial_path, output_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+        return AudioProcessingResponse(
+            success=True,
+            message=f"Computed {len(waveform['levels'])} waveform level(s)",
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=get_file_size(input_path),
+            processed_size=get_file_size(output_path),
+        )
+
+    except ffmpeg.Error as e:
+        error_message = e.stderr.decode() if e.stderr else str(e)
+        return AudioProcessingResponse(success=False, message=f"FFmpeg error: {error_message}")
+    except Exception as e:
+        return AudioProcessingResponse(success=False, message=f"Error computing waveform: {str(e)}")
+
+
+def encode_waveform_binary(waveform: dict) -> bytes:
+    """
+    Pack waveform peaks into a compact binary layout (little-endian)
+
+    Header: magic b"WAVP", version (u8), level count (u8), reserved (u16),
+    sample rate (u32), duration (f32). Then for each level: bucket count
+    (u32), seconds per bucket (f32) and one interleaved min, max, rms
+    triplet of int8 per bucket.
+    """
+    data = bytearray(
+        struct.pack(
+            "<4sBBHIf",
+            b"WAVP",
+            waveform["version"],
+            len(waveform["levels"]),
+            0,
+            waveform["sample_rate"],
+            waveform["duration"],
+        )
+    )
+    for level in waveform["levels"]:
+        data += struct.pack("<If", level["width"], level["seconds_per_bucket"])
+        interleaved = [
+            v for triplet in zip(level["min"], level["max"], level["rms"]) for v in triplet
+        ]
+        data += array("b", interleaved).tobytes()
+    return bytes(data)
+
 
 def extract_audio_metadata(input_path: Path) -> AudioMetadataResponse:
     """
@@ -363,9 +694,9 @@ def extract_audio_metadata(input_path: Path) -> AudioMetadataResponse:
         metadata["file_size"] = file_size
         metadata["file_size_mb"] = round(file_size / (1024 * 1024), 2)
 
-        # Use ffprobe to get technical information
+        # Use ffprobe to get technical information (cached by content)
         try:
-            probe = ffmpeg.probe(str(input_path))
+            probe = probe_media(input_path)
             audio_stream = next(
                 (
                     stream
@@ -517,6 +848,64 @@ def extract_audio_metadata(input_path: Path) -> AudioMetadataResponse:
         )
 
 
+def extract_audio_archive(
+    archive_path: Path, supported_extensions: set[str]
+) -> list[tuple[str, Path]]:
+    """
+    Unpack the audio files of a ZIP archive into TEMP_DIR
+
+    Members are written under generated names (never their archive paths).
+    The archive is rejected when it holds too many files or too many
+    uncompressed bytes: the declared sizes are checked up front, then the
+    bytes actually read are counted against the same limit while streaming,
+    since the sizes in the central directory are untrusted.
+
+    Returns:
+        (name inside the archive, extracted path) of each audio member
+
+    Raises:
+        ValueError: If the archive is invalid or exceeds the batch limits
+    """
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except zipfile.BadZipFile:
+        raise ValueError("Invalid ZIP archive")
+
+    with archive:
+        members = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir()
+            and Path(info.filename).suffix.lower() in supported_extensions
+            and not Path(info.filename).name.startswith(".")
+        ]
+        if len(members) > AUDIO_METADATA_BATCH_MAX_FILES:
+            raise ValueError(f"Archive holds more than {AUDIO_METADATA_BATCH_MAX_FILES} files")
+        if sum(info.file_size for info in members) > AUDIO_METADATA_BATCH_MAX_BYTES:
+            raise ValueError("Archive is too large once uncompressed")
+
+        extracted = []
+        total_bytes = 0
+        try:
+            for info in members:
+                path = TEMP_DIR / generate_unique_filename(Path(info.filename).name)
+                extracted.append((info.filename, path))
+                with archive.open(info) as source, open(path, "wb") as target:
+                    while chunk := source.read(1024 * 1024):
+                        total_bytes += len(chunk)
+                        if total_bytes > AUDIO_METADATA_BATCH_MAX_BYTES:
+                            raise ValueError("Archive is too large once uncompressed")
+                        target.write(chunk)
+        except Exception as e:
+            for _, path in extracted:
+                path.unlink(missing_ok=True)
+            if isinstance(e, zipfile.BadZipFile):
+                raise ValueError("Invalid ZIP archive") from e
+            raise
+
+    return extracted
+
+
 def format_duration(seconds: float) -> str:
     """
     Format duration in seconds to human-readable string (MM:SS or HH:MM:SS)
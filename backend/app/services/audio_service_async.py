@@ -0,0 +1,403 @@
+"""
+Async audio processing service with progress tracking
+Uses FFmpeg with progress parsing for real-time updates
+"""
+
+import asyncio
+from math import ceil
+from pathlib import Path
+import shutil
+import time
+from typing import AsyncIterator, Optional
+
+import ffmpeg
+
+from app.config import (
+    AUDIO_CHUNK_ENCODERS,
+    AUDIO_CHUNK_MAX_SEGMENTS,
+    AUDIO_CHUNK_MIN_SECONDS,
+    AUDIO_CHUNK_PREROLL_FRAMES,
+    AUDIO_CHUNK_SAMPLE_RATES,
+    AUDIO_METADATA_BATCH_WORKERS,
+    TEMP_DIR,
+)
+from app.services.audio_service import (
+    build_merge_output,
+    extract_audio_metadata,
+    get_audio_convert_options,
+    get_merge_copy_codec,
+    get_total_duration,
+    write_concat_list,
+)
+from app.services.video_service_async import run_ffmpeg
+from app.tasks.models import TaskResult
+from app.tasks.store import task_store
+from app.utils.audio_frames import get_frame_samples, iter_audio_frames
+from app.utils.file_handler import calculate_compression_ratio, get_file_size
+from app.utils.media_probe import probe_media
+from app.utils.resource_governor import core_budget, thread_options
+
+
+def get_audio_segment_count(duration: Optional[float]) -> int:
+    """Number of segments a chunked audio encode of `duration` seconds is split into"""
+    if not duration or duration <= 0:
+        return 1
+    return max(1, min(AUDIO_CHUNK_MAX_SEGMENTS, int(duration // AUDIO_CHUNK_MIN_SECONDS)))
+
+
+def plan_audio_segments(
+    total_samples: int, frame_samples: int, segment_count: int
+) -> list[tuple[int, Optional[int]]]:
+    """
+    Split a timeline into segments whose cuts fall on encoder frame boundaries
+
+    Returns:
+        List of (start, end) sample positions, the last end being None (EOF)
+    """
+    total_frames = ceil(total_samples / frame_samples)
+    if segment_count < 2 or total_frames < 2 * segment_count:
+        return [(0, None)]
+
+    frames_per_segment = ceil(total_frames / segment_count)
+    starts = range(0, total_frames, frames_per_segment)
+    boundaries = [start * frame_samples for start in starts]
+    return list(zip(boundaries, [*boundaries[1:], None]))
+
+
+def get_audio_chunk_plan(
+    input_path: Path, output_options: dict
+) -> tuple[Optional[int], Optional[float]]:
+    """
+    Check whether an encode can be chunked
+
+    Returns:
+        Tuple of (sample rate, duration) of the input's first audio stream, or
+        (None, duration) when the encoder or sample rate cannot be chunked
+    """
+    info = probe_media(input_path)
+    audio = next((s for s in info.get("streams", []) if s.get("codec_type") == "audio"), {})
+    duration = float(audio.get("duration") or info.get("format", {}).get("duration") or 0)
+    sample_rate = int(audio.get("sample_rate") or 0)
+
+    encoder = output_options.get("acodec")
+    if encoder not in AUDIO_CHUNK_ENCODERS or "ar" in output_options:
+        return None, duration
+    if sample_rate not in AUDIO_CHUNK_SAMPLE_RATES[encoder]:
+        return None, duration
+    return sample_rate, duration
+
+
+async def encode_audio_chunked(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    output_options: dict,
+    duration: float,
+    sample_rate: int,
+    message: str = "Encoding",
+) -> tuple[int, Optional[float]]:
+    """
+    Encode an audio file as segments in parallel and join them back to back
+
+    Segment cuts are placed on the encoder's frame grid. Each segment is
+    encoded with a few extra frames of pre-roll and post-roll, so the encoder
+    is warmed up with the real neighbouring audio, and those frames are then
+    dropped by frame parsing. The kept frames are concatenated without
+    re-encoding, so segments neither overlap nor leave gaps, but the result
+    is not identical to a single-pass encode: no encoder delay (priming) is
+    recorded, so playback starts one delay late (576 samples for MP3, 1024
+    for AAC), and AAC frames at the joins differ slightly. Segments are
+    scheduled under the global core budget, one core each (the MP3, AAC and
+    Vorbis encoders are single-threaded).
+
+    Returns:
+        Tuple of (number of segments, total FFmpeg CPU seconds)
+    """
+    container, container_options = AUDIO_CHUNK_ENCODERS[output_options["acodec"]]
+    frame_samples = get_frame_samples(container, sample_rate)
+    preroll = AUDIO_CHUNK_PREROLL_FRAMES * frame_samples
+    segments = plan_audio_segments(
+        ceil(duration * sample_rate), frame_samples, get_audio_segment_count(duration)
+    )
+    encoded_seconds = [0.0] * len(segments)
+
+    work_dir = TEMP_DIR / f"audio_chunks_{output_path.stem}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    def report(index: int, seconds: float):
+        encoded_seconds[index] = seconds
+        percent = 5 + min(sum(encoded_seconds) / duration, 1) * 85
+        task_store.update_progress(
+            task_id,
+            percent,
+            f"{message}... {percent:.0f}% ({len(segments)} segments)",
+            "encoding",
+        )
+
+    async def encode_segment(
+        index: int, start: int, end: Optional[int]
+    ) -> tuple[list[bytes], Optional[float]]:
+        segment_path = work_dir / f"segment_{index:04d}.{container}"
+        first = max(0, start - preroll)
+
+        cmd = ["ffmpeg", "-y", "-benchmark", "-ss", f"{first / sample_rate:.6f}"]
+        cmd.extend(["-i", str(input_path)])
+        if end is not None:
+            cmd.extend(["-t", f"{(end + preroll - first) / sample_rate:.6f}"])
+        cmd.extend(["-map", "0:a:0", "-vn", "-ar", str(sample_rate)])
+        for option, value in {**output_options, **container_options}.items():
+            cmd.extend([f"-{option}", str(value)])
+        cmd.extend(["-f", container, "-progress", "pipe:1", "-nostats", str(segment_path)])
+
+        async with core_budget.reserve(1):
+            cpu_time = await run_ffmpeg(cmd, lambda seconds: report(index, seconds))
+
+        frames = list(iter_audio_frames(segment_path.read_bytes(), container))
+        segment_path.unlink()
+
+        skip = (start - first) // frame_samples
+        if end is None:
+            return frames[skip:], cpu_time
+
+        count = (end - start) // frame_samples
+        if len(frames) < skip + count:
+            raise RuntimeError(f"Segment {index} ended early ({len(frames)} frames)")
+        return frames[skip : skip + count], cpu_time
+
+    try:
+        jobs = [
+            asyncio.create_task(encode_segment(index, start, end))
+            for index, (start, end) in enumerate(segments)
+        ]
+        try:
+            outputs = await asyncio.gather(*jobs)
+        except BaseException:
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            raise
+
+        task_store.update_progress(task_id, 90, "Joining segments...", "finalizing")
+
+        joined_path = work_dir / f"joined.{container}"
+        with open(joined_path, "wb") as joined:
+            for frames, _ in outputs:
+                joined.writelines(frames)
+
+        # Remux into the output container (writes the MP3 seek header, MP4 index);
+        # FFmpeg's ADTS demuxer is named "aac"
+        demuxer = "aac" if container == "adts" else container
+        cmd = ["ffmpeg", "-y", "-benchmark", "-nostats", "-f", demuxer, "-i", str(joined_path)]
+        cmd.extend(["-c", "copy", str(output_path)])
+        cpu_times = [cpu_time for _, cpu_time in outputs]
+        cpu_times.append(await run_ffmpeg(cmd))
+
+        known_cpu_times = [cpu_time for cpu_time in cpu_times if cpu_time is not None]
+        cpu_time = round(sum(known_cpu_times), 3) if known_cpu_times else None
+        return len(segments), cpu_time
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def transcode_audio_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    output_options: dict,
+    chunked: bool = False,
+    message: str = "Audio converted successfully",
+) -> TaskResult:
+    """
+    Encode an audio file with FFmpeg output options and real-time progress
+
+    With `chunked`, long MP3/AAC encodes are split into segments encoded in
+    parallel across cores (see encode_audio_chunked); other encoders, sample
+    rates FFmpeg would have to convert, and short files use a single encode.
+    """
+    try:
+        task_store.update_progress(task_id, 0, "Analyzing audio...", "analyzing")
+
+        original_size = get_file_size(input_path)
+        sample_rate, duration = get_audio_chunk_plan(input_path, output_options)
+        segment_count = 1
+        started = time.monotonic()
+
+        if chunked and sample_rate and get_audio_segment_count(duration) > 1:
+            task_store.update_progress(task_id, 5, "Starting chunked encode...", "encoding")
+            segment_count, cpu_time = await encode_audio_chunked(
+                task_id, input_path, output_path, output_options, duration, sample_rate
+            )
+        else:
+            async with core_budget.async_job() as threads:
+                cmd = (
+                    ffmpeg.input(str(input_path))
+                    .output(str(output_path), **output_options, **thread_options(threads))
+                    .global_args("-benchmark", "-progress", "pipe:1", "-nostats")
+                    .overwrite_output()
+                    .compile()
+                )
+                task_store.update_progress(task_id, 5, "Encoding...", "encoding")
+
+                def report(current_time: float):
+                    percent = 5 + min(current_time / (duration or 100), 1) * 94
+                    task_store.update_progress(
+                        task_id, percent, f"Encoding... {percent:.0f}%", "encoding"
+                    )
+
+                cpu_time = await run_ffmpeg(cmd, report)
+
+        wall_time = round(time.monotonic() - started, 3)
+        processed_size = get_file_size(output_path)
+
+        if segment_count > 1:
+            message += f" ({segment_count} segments in parallel)"
+
+        result = TaskResult(
+            success=True,
+            download_url=f"/api/v1/download/{output_path.name}",
+            filename=output_path.name,
+            original_size=original_size,
+            processed_size=processed_size,
+            compression_ratio=calculate_compression_ratio(original_size, processed_size),
+            message=message,
+            cpu_time=cpu_time,
+            wall_time=wall_time,
+        )
+
+        task_store.complete_task(task_id, result)
+        return result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
+
+
+async def merge_audio_with_progress(
+    task_id: str,
+    input_paths: list[Path],
+    output_path: Path,
+    output_format: str = "mp3",
+    quality: str = "medium",
+    bitrate: str = "192k",
+    mode: str = "auto",
+) -> TaskResult:
+    """
+    Merge multiple audio files into one with real-time progress updates
+
+    Inputs sharing one stream layout are joined by stream copy in auto mode,
+    everything else goes through the concat filter and is re-encoded.
+    """
+    list_path = None
+    try:
+        task_store.update_progress(task_id, 0, "Analyzing audio files...", "analyzing")
+
+        if len(input_paths) < 2:
+            raise ValueError("At least 2 audio files are required for merging")
+        if get_audio_convert_options(output_format) is None:
+            raise ValueError(f"Unsupported output audio format: {output_format}")
+
+        total_original_size = sum(get_file_size(path) for path in input_paths)
+        total_duration = get_total_duration(input_paths) or 100
+
+        copy_codec = get_merge_copy_codec(input_paths, output_format) if mode == "auto" else None
+        if copy_codec:
+            list_path = write_concat_list(
+                input_paths, output_path.with_name(f"{output_path.stem}.concat.txt")
+            )
+
+        started = time.monotonic()
+        verb = "Joining (stream copy)" if copy_codec else "Merging"
+
+        async with core_budget.async_job() as threads:
+            cmd = (
+                build_merge_output(
+                    input_paths, output_path, output_format, quality, bitrate, list_path, threads
+                )
+                .global_args("-benchmark", "-progress", "pipe:1", "-nostats")
+                .overwrite_output()
+                .compile()
+            )
+
+            task_store.update_progress(task_id, 5, f"{verb}...", "encoding")
+
+            def report(current_time: float):
+                percent = 5 + min(current_time / total_duration, 1) * 94
+                task_store.update_progress(
+                    task_id, percent, f"{verb}... {percent:.0f}%", "encoding"
+                )
+
+            cpu_time = await run_ffmpeg(cmd, report)
+
+        wall_time = round(time.monotonic() - started, 3)
+        merged_size = get_file_size(output_path)
+
+        message = f"Successfully merged {len(input_paths)} audio files"
+        if copy_codec:
+            message += f" (stream copy, {copy_codec})"
+
+        result = TaskResult(
+            success=True,
+            download_url=f"/api/v1/download/{output_path.name}",
+            filename=output_path.name,
+            original_size=total_original_size,
+            processed_size=merged_size,
+            compression_ratio=calculate_compression_ratio(total_original_size, merged_size),
+            message=message,
+            cpu_time=cpu_time,
+            wall_time=wall_time,
+        )
+
+        task_store.complete_task(task_id, result)
+        return result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
+    finally:
+        if list_path is not None:
+            list_path.unlink(missing_ok=True)
+
+
+async def iter_audio_metadata(
+    inputs: list[tuple[str, Path]], workers: int = AUDIO_METADATA_BATCH_WORKERS
+) -> AsyncIterator[dict]:
+    """
+    Extract the metadata of many audio files concurrently
+
+    At most `workers` files are probed at a time (each extraction is one
+    ffprobe call and one mutagen open, run in a worker thread). Results are
+    yielded as they complete, so they are not in input order: each one
+    carries the `index` and `filename` of its input.
+
+    Args:
+        inputs: (original filename, path) of each file
+        workers: Maximum number of files probed concurrently
+    """
+    semaphore = asyncio.Semaphore(max(1, workers))
+    loop = asyncio.get_running_loop()
+
+    async def extract(index: int, filename: str, path: Path) -> dict:
+        async with semaphore:
+            result = await loop.run_in_executor(None, extract_audio_metadata, path)
+        return {"index": index, **result.model_dump(), "filename": filename}
+
+    pending = [
+        asyncio.ensure_future(extract(index, filename, path))
+        for index, (filename, path) in enumerate(inputs)
+    ]
+    try:
+        for next_result in asyncio.as_completed(pending):
+            yield await next_result
+    finally:
+        # Client went away: drop the files not started yet
+        for future in pending:
+            future.cancel()
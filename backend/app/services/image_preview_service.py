@@ -0,0 +1,262 @@
+"""
+Interactive image previews
+
+An upload is decoded once into a downscaled RGB proxy, kept in a memory-bounded
+LRU of preview sessions. Each preview render applies the operations to that
+proxy and encodes a small image with the "fast" encoder profile, so a slider tick
+costs milliseconds instead of a full decode, process and optimized encode of
+the original. Committing a session renders the same operations once on the
+full-resolution original, which stays in TEMP_DIR for the session lifetime.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import io
+import os
+from pathlib import Path
+import threading
+from typing import Optional
+import uuid
+
+from PIL import Image, ImageFilter
+
+from app.config import (
+    IMAGE_PREVIEW_CACHE_BYTES,
+    IMAGE_PREVIEW_MAX_SIZE,
+    IMAGE_PREVIEW_QUALITY,
+)
+from app.models.image import ImageOperations, ImageProcessingResponse, PreviewSessionResponse
+from app.utils.color_adjust import adjust_colors
+from app.utils.file_handler import delete_file, get_file_size
+from app.utils.image_encoder import save_image
+from app.utils.image_loader import estimate_decoded_bytes, load_image
+
+# Filters folded into the color adjustment pass
+COLOR_EFFECT_FILTERS = ("grayscale", "sepia", "invert")
+
+# Filters applied as convolutions after the color adjustments
+CONVOLUTION_FILTERS = {"blur": ImageFilter.BLUR, "sharpen": ImageFilter.SHARPEN}
+
+
+@dataclass
+class PreviewSession:
+    """An uploaded image and its decoded preview proxy"""
+
+    session_id: str
+    source_path: Path
+    source_format: str
+    size: tuple[int, int]
+    proxy: Image.Image
+
+    @property
+    def nbytes(self) -> int:
+        return estimate_decoded_bytes(self.proxy.size, self.proxy.mode)
+
+
+class PreviewSessionStore:
+    """
+    Thread-safe LRU of preview sessions bounded by the bytes of their proxies
+
+    Evicted sessions have their source file deleted. The most recent session
+    is always kept, even when its proxy alone exceeds the budget.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(1, max_bytes)
+        self._sessions: OrderedDict[str, PreviewSession] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the cached proxies"""
+        return self._nbytes
+
+    def get(self, session_id: str) -> Optional[PreviewSession]:
+        """Get a session, marking it as recently used"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def put(self, session: PreviewSession):
+        """Store a session, evicting the least recently used ones"""
+        evicted = []
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._nbytes += session.nbytes
+            while self._nbytes > self.max_bytes and len(self._sessions) > 1:
+                _, oldest = self._sessions.popitem(last=False)
+                self._nbytes -= oldest.nbytes
+                evicted.append(oldest)
+
+        for oldest in evicted:
+            delete_file(oldest.source_path)
+
+    def pop(self, session_id: str) -> Optional[PreviewSession]:
+        """Remove a session and delete its source file"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._nbytes -= session.nbytes
+
+        if session is not None:
+            delete_file(session.source_path)
+        return session
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+def apply_operations(img: Image.Image, operations: ImageOperations) -> Image.Image:
+    """
+    Apply adjustments and a filter to an RGB image
+
+    Color filters are fused with the adjustments into a single
+    adjust_colors() call; blur and sharpen run afterwards.
+    """
+    filter_key = operations.filter_name.lower() if operations.filter_name else None
+
+    img = adjust_colors(
+        img,
+        brightness=operations.brightness,
+        contrast=operations.contrast,
+        saturation=operations.saturation,
+        gamma=operations.gamma,
+        black_point=operations.black_point,
+        white_point=operations.white_point,
+        effect=filter_key if filter_key in COLOR_EFFECT_FILTERS else None,
+    )
+
+    if filter_key in CONVOLUTION_FILTERS:
+        img = img.filter(CONVOLUTION_FILTERS[filter_key])
+    return img
+
+
+def create_preview_session(input_path: Path) -> PreviewSessionResponse:
+    """
+    Decode an uploaded image into a new preview session
+
+    The session takes ownership of `input_path`, which is deleted when the
+    session is closed or evicted.
+
+    Args:
+        input_path: Path to the uploaded image (kept for the commit render)
+
+    Returns:
+        PreviewSessionResponse with the session id and both sizes
+    """
+    try:
+        with Image.open(input_path) as img:
+            size = img.size
+
+        max_size = (IMAGE_PREVIEW_MAX_SIZE, IMAGE_PREVIEW_MAX_SIZE)
+        with load_image(input_path, max_size=max_size, copies=1) as img:
+            source_format = img.format or "PNG"
+            proxy = img.convert("RGB") if img.mode != "RGB" else img.copy()
+        proxy.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        session = PreviewSession(
+            session_id=uuid.uuid4().hex,
+            source_path=input_path,
+            source_format=source_format,
+            size=size,
+            proxy=proxy,
+        )
+        preview_sessions.put(session)
+
+        return PreviewSessionResponse(
+            success=True,
+            message="Preview session created",
+            session_id=session.session_id,
+            dimensions={"width": size[0], "height": size[1]},
+            preview_dimensions={"width": proxy.width, "height": proxy.height},
+        )
+    except Exception as e:
+        return PreviewSessionResponse(
+            success=False, message=f"Error creating preview session: {str(e)}"
+        )
+
+
+def render_preview(
+    session: PreviewSession,
+    operations: ImageOperations,
+    output_format: str = "jpeg",
+    quality: int = IMAGE_PREVIEW_QUALITY,
+) -> bytes:
+    """
+    Render operations on the session proxy
+
+    Args:
+        session: Preview session
+        operations: Adjustments and filter to apply
+        output_format: "jpeg" or "webp"
+        quality: Encoder quality (1-100)
+
+    Returns:
+        The encoded preview image
+    """
+    # Keep the source file clear of the periodic temp file cleanup
+    if session.source_path.exists():
+        os.utime(session.source_path)
+
+    rendered = apply_operations(session.proxy, operations)
+
+    buffer = io.BytesIO()
+    save_image(rendered, buffer, output_format, "fast", quality)
+    return buffer.getvalue()
+
+
+def commit_preview(
+    session: PreviewSession,
+    output_path: Path,
+    operations: ImageOperations,
+    profile: Optional[str] = None,
+) -> ImageProcessingResponse:
+    """
+    Render operations on the full-resolution original of a preview session
+
+    Args:
+        session: Preview session
+        output_path: Path to save the result (in the source format)
+        operations: Adjustments and filter to apply
+        profile: Encoder profile (fast, balanced, smallest)
+    """
+    try:
+        if not session.source_path.exists():
+            return ImageProcessingResponse(
+                success=False,
+                message="Preview session expired",
+                filename=output_path.name,
+            )
+
+        original_size = get_file_size(session.source_path)
+
+        with load_image(session.source_path) as img:
+            work = img if img.mode == "RGB" else img.convert("RGB")
+            work = apply_operations(work, operations)
+
+            save_image(work, output_path, session.source_format, profile)
+
+        processed_size = get_file_size(output_path)
+
+        return ImageProcessingResponse(
+            success=True,
+            message="Preview committed successfully",
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=original_size,
+            processed_size=processed_size,
+            dimensions={"width": work.width, "height": work.height},
+        )
+    except Exception as e:
+        return ImageProcessingResponse(
+            success=False,
+            message=f"Error committing preview: {str(e)}",
+            filename=output_path.name if output_path else None,
+        )
+
+
+# Global preview session store
+preview_sessions = PreviewSessionStore(IMAGE_PREVIEW_CACHE_BYTES)
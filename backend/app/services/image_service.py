@@ -2,25 +2,319 @@
 Image processing service using Pillow
 """
 
+from concurrent.futures import as_completed
+import io
+import json
+import math
 from pathlib import Path
+from typing import Optional
+import zipfile
+
+from PIL import Image, ImageFilter, ImageOps
+
+from app.config import (
+    IMAGE_AUTO_FORMATS,
+    IMAGE_COLLAGE_CELL_SIZE,
+    IMAGE_COLLAGE_MAX_PIXELS,
+    IMAGE_COLLAGE_PNG_FAST_PIXELS,
+    IMAGE_COMPRESSION_QUALITY,
+    IMAGE_FAVICON_MANIFEST_ICONS,
+    IMAGE_FAVICON_PNG_VARIANTS,
+    IMAGE_ICON_ICO_MAX_SIZE,
+    IMAGE_ICON_MAX_SIZE,
+    IMAGE_ICON_MIN_SIZE,
+    IMAGE_ICON_SIZES,
+    IMAGE_REDUCING_GAP,
+    IMAGE_RESPONSIVE_WIDTHS,
+    IMAGE_TARGET_MAX_DOWNSCALES,
+    IMAGE_TARGET_MAX_QUALITY,
+    IMAGE_TARGET_MIN_QUALITY,
+    IMAGE_TARGET_SIZE_TOLERANCE,
+    IMAGE_TARGET_SSIM_TOLERANCE,
+)
+from app.models.image import (
+    ColorExtractionResponse,
+    ColorInfo,
+    FormatCandidate,
+    ImageProcessingResponse,
+)
+from app.utils.color_adjust import adjust_colors
+from app.utils.color_quantize import get_dominant_colors
+from app.utils.file_handler import calculate_compression_ratio, get_file_size
+from app.utils.image_encoder import (
+    FORMAT_EXTENSIONS,
+    LOSSY_FORMATS,
+    encode_pool,
+    flatten_for_jpeg,
+    get_auto_formats,
+    has_transparency,
+    normalize_format,
+    save_image,
+)
+from app.utils.image_loader import decode_pool, load_image
+from app.utils.image_metrics import SSIMReference
+from app.utils.jpeg_transform import (
+    ORIENTATION_TRANSPOSE,
+    compose_transpose,
+    get_exif_orientation,
+    transform_jpeg,
+    transpose,
+)
+
+ROTATE_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+FLIP_TRANSPOSE = {
+    "horizontal": Image.Transpose.FLIP_LEFT_RIGHT,
+    "vertical": Image.Transpose.FLIP_TOP_BOTTOM,
+}
+
+
+class _QualitySearch:
+    """Trial encodes of one image at several qualities, kept in memory"""
+
+    def __init__(
+        self,
+        img: Image.Image,
+        image_format: str,
+        profile: Optional[str],
+        min_ssim: Optional[float],
+    ):
+        self.img = img
+        self.image_format = image_format
+        self.profile = profile
+        self.reference = SSIMReference(img) if min_ssim is not None else None
+        self.trials: dict[int, tuple[bytes, Optional[float]]] = {}
+
+    def encode(self, quality: int) -> tuple[bytes, Optional[float]]:
+        """Encoded bytes and SSIM (when a target is set) at a quality"""
+        if quality not in self.trials:
+            buffer = io.BytesIO()
+            save_image(self.img, buffer, self.image_format, self.profile, quality)
+            data = buffer.getvalue()
+
+            ssim = None
+            if self.reference is not None:
+                with Image.open(io.BytesIO(data)) as decoded:
+                    ssim = self.reference.compare(decoded)
+
+            self.trials[quality] = (data, ssim)
+        return self.trials[quality]
+
+
+def _search_quality(
+    search: _QualitySearch, max_bytes: Optional[int], min_ssim: Optional[float]
+) -> Optional[int]:
+    """
+    Binary search the encoder quality
 
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+    With min_ssim, finds the lowest quality reaching it (the smallest file
+    with that fidelity); otherwise the highest quality fitting in max_bytes.
+    The search stops early once a result is within tolerance of the target.
+    Formats without a quality setting get a single encode.
 
-from app.config import IMAGE_COMPRESSION_QUALITY
-from app.models.image import ColorExtractionResponse, ColorInfo, ImageProcessingResponse
-from app.utils.file_handler import calculate_compression_ratio, get_file_size
+    Returns:
+        The quality found, or None when no quality meets the target
+    """
+    if search.image_format in LOSSY_FORMATS:
+        low, high = IMAGE_TARGET_MIN_QUALITY, IMAGE_TARGET_MAX_QUALITY
+    else:
+        low = high = IMAGE_TARGET_MAX_QUALITY
+
+    best = None
+    while low <= high:
+        quality = (low + high) // 2
+        data, ssim = search.encode(quality)
+
+        if min_ssim is not None:
+            if ssim >= min_ssim:
+                best, high = quality, quality - 1
+                if ssim - min_ssim <= IMAGE_TARGET_SSIM_TOLERANCE:
+                    break
+            else:
+                low = quality + 1
+        elif len(data) <= max_bytes:
+            best, low = quality, quality + 1
+            if len(data) >= max_bytes * (1 - IMAGE_TARGET_SIZE_TOLERANCE):
+                break
+        else:
+            high = quality - 1
+
+    return best
+
+
+def _compress_to_target(
+    img: Image.Image,
+    image_format: str,
+    profile: Optional[str],
+    max_bytes: Optional[int],
+    min_ssim: Optional[float],
+    allow_downscale: bool,
+) -> tuple[bytes, Image.Image, int, Optional[float], int]:
+    """
+    Encode an image to a size and/or fidelity target
+
+    When even the lowest quality is too large and allow_downscale is set,
+    the decoded image is resized (file size follows pixel count) and the
+    search repeats on the smaller image.
+
+    Returns:
+        (encoded bytes, encoded image, quality (None for formats without one),
+        SSIM (None without min_ssim), number of trial encodes)
+
+    Raises:
+        ValueError: If the target cannot be reached
+    """
+    image_format = normalize_format(image_format)
+    if image_format == "JPEG":
+        # Flatten once rather than on every trial encode
+        img = flatten_for_jpeg(img)
+
+    work = img
+    trial_encodes = 0
+    for _ in range(IMAGE_TARGET_MAX_DOWNSCALES + 1):
+        search = _QualitySearch(work, image_format, profile, min_ssim)
+        quality = _search_quality(search, max_bytes, min_ssim)
+        trial_encodes += len(search.trials)
+
+        if quality is None and min_ssim is not None:
+            raise ValueError(f"SSIM {min_ssim} cannot be reached")
+
+        # Without a fitting quality, the lowest one tried is the smallest encode
+        data, ssim = search.encode(quality if quality is not None else min(search.trials))
+        if max_bytes is None or len(data) <= max_bytes:
+            if image_format not in LOSSY_FORMATS:
+                quality = None
+            return data, work, quality, ssim, trial_encodes
+
+        if not allow_downscale:
+            raise ValueError(f"Image cannot be compressed to {max_bytes} bytes without downscaling")
+
+        scale = min(0.9, math.sqrt(max_bytes / len(data)) * 0.95)
+        work = img.resize(
+            (max(1, round(work.width * scale)), max(1, round(work.height * scale))),
+            Image.LANCZOS,
+        )
+
+    raise ValueError(f"Image cannot be compressed to {max_bytes} bytes")
+
+
+def _encode_candidate(
+    img: Image.Image,
+    image_format: str,
+    profile: Optional[str],
+    quality: int,
+    max_bytes: Optional[int],
+    min_ssim: Optional[float],
+    allow_downscale: bool,
+) -> tuple[bytes, Image.Image, Optional[int], Optional[float], int]:
+    """Encode an image to one format, to a target when one is set (see _compress_to_target)"""
+    if max_bytes is not None or min_ssim is not None:
+        return _compress_to_target(img, image_format, profile, max_bytes, min_ssim, allow_downscale)
+
+    buffer = io.BytesIO()
+    save_image(img, buffer, image_format, profile, quality)
+    return buffer.getvalue(), img, quality if image_format in LOSSY_FORMATS else None, None, 1
+
+
+def _race_formats(
+    img: Image.Image,
+    profile: Optional[str],
+    quality: int,
+    max_bytes: Optional[int] = None,
+    min_ssim: Optional[float] = None,
+    allow_downscale: bool = False,
+) -> tuple[str, tuple[bytes, Image.Image, Optional[int], Optional[float], int], list]:
+    """
+    Encode an image to every automatic-format candidate in parallel
+
+    Every candidate gets the same quality, or its own search when a target
+    is set (with min_ssim, candidates are then compared at equal fidelity).
+
+    Returns:
+        (smallest format, its _encode_candidate result counting the trial
+        encodes of every candidate, FormatCandidate of every format tried)
+
+    Raises:
+        ValueError: If no format could be encoded to the target
+    """
+    if img.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+        img = img.convert("RGB")
+
+    futures = {
+        image_format: encode_pool.submit(
+            _encode_candidate,
+            img,
+            image_format,
+            profile,
+            quality,
+            max_bytes,
+            min_ssim,
+            allow_downscale,
+        )
+        for image_format in get_auto_formats(img)
+    }
+
+    results = {}
+    candidates = []
+    for image_format, future in futures.items():
+        try:
+            results[image_format] = data, _, quality_used, ssim, _ = future.result()
+            candidates.append(
+                FormatCandidate(
+                    format=image_format,
+                    size=len(data),
+                    quality=quality_used,
+                    ssim=round(ssim, 4) if ssim is not None else None,
+                )
+            )
+        except ValueError as e:
+            candidates.append(FormatCandidate(format=image_format, message=str(e)))
+
+    if not results:
+        raise ValueError("No output format meets the target")
+
+    smallest = min(results, key=lambda image_format: len(results[image_format][0]))
+    for candidate in candidates:
+        candidate.selected = candidate.format == smallest
+    trial_encodes = sum(result[4] for result in results.values())
+    return smallest, results[smallest][:4] + (trial_encodes,), candidates
 
 
 def compress_image(
-    input_path: Path, output_path: Path, quality: str = "medium"
+    input_path: Path,
+    output_path: Path,
+    quality: str = "medium",
+    profile: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    min_ssim: Optional[float] = None,
+    allow_downscale: bool = False,
+    output_format: Optional[str] = None,
 ) -> ImageProcessingResponse:
     """
     Compress an image file
 
+    With max_bytes and/or min_ssim, the quality preset is ignored and the
+    encoder quality is searched instead: the highest quality fitting in
+    max_bytes, or the lowest quality reaching min_ssim (and still fitting
+    in max_bytes when both are set). Trial encodes stay in memory and only
+    the result is written.
+
+    With output_format "auto", the image is encoded to every candidate
+    format in parallel (each with its own search when a target is set) and
+    the smallest result is kept; the output extension follows the winner.
+
     Args:
         input_path: Path to input image
         output_path: Path to save compressed image
         quality: Compression quality preset (low, medium, high)
+        profile: Encoder profile (fast, balanced, smallest)
+        max_bytes: Largest acceptable output size
+        min_ssim: Lowest acceptable SSIM against the input (0-1)
+        allow_downscale: Reduce the dimensions when max_bytes cannot be met otherwise
+        output_format: "auto" to pick the smallest format (input format otherwise)
 
     Returns:
         ImageProcessingResponse with compression results
@@ -29,24 +323,66 @@ def compress_image(
         # Get original file size
         original_size = get_file_size(input_path)
 
+        # Get quality value
+        quality_value = IMAGE_COMPRESSION_QUALITY.get(quality, IMAGE_COMPRESSION_QUALITY["medium"])
+
+        auto_format = output_format is not None and output_format.lower() == "auto"
+        if auto_format or max_bytes is not None or min_ssim is not None:
+            # Decoded image plus a working copy and a trial decode per concurrent encode
+            encodes = len(IMAGE_AUTO_FORMATS) if auto_format else 1
+            candidates = None
+            with load_image(input_path, copies=1 + 2 * encodes) as img:
+                if auto_format:
+                    image_format, encoded_result, candidates = _race_formats(
+                        img, profile, quality_value, max_bytes, min_ssim, allow_downscale
+                    )
+                    output_path = output_path.with_suffix(FORMAT_EXTENSIONS[image_format])
+                else:
+                    image_format = Image.registered_extensions().get(
+                        output_path.suffix.lower(), img.format
+                    )
+                    encoded_result = _encode_candidate(
+                        img,
+                        image_format,
+                        profile,
+                        quality_value,
+                        max_bytes,
+                        min_ssim,
+                        allow_downscale,
+                    )
+            data, encoded, quality_used, ssim, trial_encodes = encoded_result
+            output_path.write_bytes(data)
+
+            compressed_size = get_file_size(output_path)
+            return ImageProcessingResponse(
+                success=True,
+                message=(
+                    f"Image compressed successfully as {normalize_format(image_format)} "
+                    f"({trial_encodes} trial encodes)"
+                ),
+                filename=output_path.name,
+                download_url=f"/api/v1/download/{output_path.name}",
+                original_size=original_size,
+                processed_size=compressed_size,
+                compression_ratio=calculate_compression_ratio(original_size, compressed_size),
+                dimensions={"width": encoded.width, "height": encoded.height},
+                quality=quality_used,
+                ssim=round(ssim, 4) if ssim is not None else None,
+                trial_encodes=trial_encodes,
+                candidates=candidates,
+            )
+
         # Open and compress image
         with Image.open(input_path) as img:
-            # Convert RGBA to RGB if saving as JPEG
-            if output_path.suffix.lower() in [".jpg", ".jpeg"] and img.mode == "RGBA":
-                rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3] if len(img.split()) == 4 else None)
-                img = rgb_img
+            output_format = Image.registered_extensions().get(
+                output_path.suffix.lower(), img.format
+            )
 
             # Get dimensions
             dimensions = {"width": img.width, "height": img.height}
 
-            # Get quality value
-            quality_value = IMAGE_COMPRESSION_QUALITY.get(
-                quality, IMAGE_COMPRESSION_QUALITY["medium"]
-            )
-
             # Save with compression
-            img.save(output_path, quality=quality_value, optimize=True)
+            save_image(img, output_path, output_format, profile, quality_value)
 
         # Get compressed file size
         compressed_size = get_file_size(output_path)
@@ -72,16 +408,27 @@ def compress_image(
 
 
 def convert_image(
-    input_path: Path, output_path: Path, output_format: str, quality: str = "medium"
+    input_path: Path,
+    output_path: Path,
+    output_format: str,
+    quality: str = "medium",
+    profile: Optional[str] = None,
+    lossless: bool = False,
 ) -> ImageProcessingResponse:
     """
     Convert an image to a different format
 
+    With output_format "auto", the image is encoded to every candidate
+    format in parallel at the same quality preset and the smallest file is
+    kept; the output extension follows the winner.
+
     Args:
         input_path: Path to input image
         output_path: Path to save converted image
-        output_format: Target format (jpg, png, webp, etc.)
+        output_format: Target format (jpg, png, webp, etc.) or "auto"
         quality: Conversion quality preset
+        profile: Encoder profile (fast, balanced, smallest)
+        lossless: Encode WebP losslessly
 
     Returns:
         ImageProcessingResponse with conversion results
@@ -90,37 +437,36 @@ def convert_image(
         # Get original file size
         original_size = get_file_size(input_path)
 
-        # Normalize format for Pillow (jpg -> JPEG)
-        pillow_format = output_format.upper()
-        if pillow_format == "JPG":
-            pillow_format = "JPEG"
+        # Get quality value
+        quality_value = IMAGE_COMPRESSION_QUALITY.get(quality, IMAGE_COMPRESSION_QUALITY["medium"])
+
+        if output_format.lower() == "auto":
+            # Decoded image plus a working copy per concurrent encode
+            with load_image(input_path, copies=1 + len(IMAGE_AUTO_FORMATS)) as img:
+                image_format, (data, encoded, *_), candidates = _race_formats(
+                    img, profile, quality_value
+                )
+            output_path = output_path.with_suffix(FORMAT_EXTENSIONS[image_format])
+            output_path.write_bytes(data)
+
+            return ImageProcessingResponse(
+                success=True,
+                message=f"Image converted to {image_format} successfully (smallest candidate)",
+                filename=output_path.name,
+                download_url=f"/api/v1/download/{output_path.name}",
+                original_size=original_size,
+                processed_size=get_file_size(output_path),
+                dimensions={"width": encoded.width, "height": encoded.height},
+                candidates=candidates,
+            )
 
         # Open and convert image
         with Image.open(input_path) as img:
-            # Convert RGBA to RGB if saving as JPEG
-            if output_format.lower() in ["jpg", "jpeg"] and img.mode == "RGBA":
-                rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3] if len(img.split()) == 4 else None)
-                img = rgb_img
-
             # Get dimensions
             dimensions = {"width": img.width, "height": img.height}
 
-            # Get quality value
-            quality_value = IMAGE_COMPRESSION_QUALITY.get(
-                quality, IMAGE_COMPRESSION_QUALITY["medium"]
-            )
-
             # Save in new format
-            if output_format.lower() in ["jpg", "jpeg", "webp"]:
-                img.save(
-                    output_path,
-                    format=pillow_format,
-                    quality=quality_value,
-                    optimize=True,
-                )
-            else:
-                img.save(output_path, format=pillow_format, optimize=True)
+            save_image(img, output_path, output_format, profile, quality_value, lossless)
 
         # Get converted file size
         converted_size = get_file_size(output_path)
@@ -143,57 +489,78 @@ def convert_image(
         )
 
 
-def rotate_image(input_path: Path, output_path: Path, angle: int) -> ImageProcessingResponse:
+def _transpose_image(
+    input_path: Path,
+    output_path: Path,
+    method: Image.Transpose,
+    profile: Optional[str] = None,
+    metadata_only: bool = False,
+) -> tuple[dict, bool]:
     """
-    Rotate an image by a specified angle
+    Rotate or flip an image as displayed (EXIF orientation applied)
+
+    JPEGs are transformed losslessly when possible (see transform_jpeg);
+    other images are decoded, transformed and saved in their format.
+
+    Returns:
+        New dimensions and whether the transform was lossless
+    """
+    size = transform_jpeg(input_path, output_path, method, profile, metadata_only)
+    if size is not None:
+        return {"width": size[0], "height": size[1]}, True
+
+    # Source and transformed copy held at once
+    with load_image(input_path) as img:
+        method = compose_transpose(ORIENTATION_TRANSPOSE[get_exif_orientation(img)], method)
+        transformed = transpose(img, method)
+        save_image(transformed, output_path, img.format or "PNG", profile)
+        return {"width": transformed.width, "height": transformed.height}, False
+
+
+def rotate_image(
+    input_path: Path,
+    output_path: Path,
+    angle: int,
+    profile: Optional[str] = None,
+    metadata_only: bool = False,
+) -> ImageProcessingResponse:
+    """
+    Rotate an image clockwise by a specified angle
+
+    JPEGs are rotated without re-encoding when their size allows it, or with
+    `metadata_only`, by rewriting their EXIF orientation.
 
     Args:
         input_path: Path to input image
         output_path: Path to save rotated image
         angle: Rotation angle in degrees (90, 180, or 270)
+        profile: Encoder profile (fast, balanced, smallest)
+        metadata_only: Only rewrite the EXIF orientation (JPEG only)
 
     Returns:
         ImageProcessingResponse with rotation results
     """
     try:
+        if angle not in ROTATE_TRANSPOSE:
+            return ImageProcessingResponse(
+                success=False,
+                message=f"Invalid angle: {angle}. Use 90, 180 or 270",
+                filename=output_path.name if output_path else None,
+            )
+
         # Get original file size
         original_size = get_file_size(input_path)
 
-        # Open and rotate image
-        with Image.open(input_path) as img:
-            # Get original dimensions
-            original_dimensions = {"width": img.width, "height": img.height}
-
-            # Rotate image (expand=True to avoid cropping)
-            rotated_img = img.rotate(-angle, expand=True)
-
-            # Get new dimensions after rotation
-            new_dimensions = {"width": rotated_img.width, "height": rotated_img.height}
-
-            # Preserve original format
-            output_format = img.format or "PNG"
-            if output_format == "JPEG":
-                # Convert RGBA to RGB if saving as JPEG
-                if rotated_img.mode == "RGBA":
-                    rgb_img = Image.new("RGB", rotated_img.size, (255, 255, 255))
-                    rgb_img.paste(
-                        rotated_img,
-                        mask=rotated_img.split()[3] if len(rotated_img.split()) == 4 else None,
-                    )
-                    rotated_img = rgb_img
-
-            # Save rotated image
-            if output_format in ["JPEG", "JPG"]:
-                rotated_img.save(output_path, format=output_format, quality=95, optimize=True)
-            else:
-                rotated_img.save(output_path, format=output_format, optimize=True)
+        new_dimensions, lossless = _transpose_image(
+            input_path, output_path, ROTATE_TRANSPOSE[angle], profile, metadata_only
+        )
 
         # Get rotated file size
         rotated_size = get_file_size(output_path)
 
         return ImageProcessingResponse(
             success=True,
-            message=f"Image rotated {angle} degrees successfully",
+            message=f"Image rotated {angle} degrees {'losslessly' if lossless else 'successfully'}",
             filename=output_path.name,
             download_url=f"/api/v1/download/{output_path.name}",
             original_size=original_size,
@@ -223,24 +590,15 @@ def extract_colors(
         sample_size: Image is resized to max(sample_size, sample_size) to speed up extraction.
     """
     try:
-        with Image.open(input_path) as img:
-            img = img.convert("RGB")
+        with load_image(input_path, max_size=(sample_size, sample_size), copies=1) as img:
             # Downscale for performance
             img.thumbnail((sample_size, sample_size), Image.LANCZOS)
-            pixels = list(img.getdata())
-
-        total = len(pixels)
-        # Count colors
-        from collections import Counter
+            dominant_colors = get_dominant_colors(img, max_colors)
 
-        counts = Counter(pixels)
-        most_common = counts.most_common(max_colors)
-
-        colors = []
-        for (r, g, b), count in most_common:
-            ratio = count / total if total else 0
-            hex_value = f"#{r:02x}{g:02x}{b:02x}"
-            colors.append(ColorInfo(hex=hex_value, ratio=ratio))
+        colors = [
+            ColorInfo(hex=f"#{r:02x}{g:02x}{b:02x}", ratio=ratio)
+            for (r, g, b), ratio in dominant_colors
+        ]
 
         return ColorExtractionResponse(
             success=True,
@@ -263,9 +621,13 @@ def adjust_image(
     brightness: float = 1.0,
     contrast: float = 1.0,
     saturation: float = 1.0,
+    gamma: float = 1.0,
+    black_point: int = 0,
+    white_point: int = 255,
+    profile: Optional[str] = None,
 ) -> ImageProcessingResponse:
     """
-    Adjust brightness, contrast, and saturation of an image.
+    Adjust brightness, contrast, saturation, gamma and levels of an image.
 
     Args:
         input_path: Path to input image.
@@ -273,32 +635,30 @@ def adjust_image(
         brightness: Brightness factor (1.0 = original).
         contrast: Contrast factor (1.0 = original).
         saturation: Color factor (1.0 = original).
+        gamma: Midtone gamma (1.0 = original, > 1 brightens).
+        black_point: Input level mapped to black (0 = original).
+        white_point: Input level mapped to white (255 = original).
+        profile: Encoder profile (fast, balanced, smallest).
     """
     try:
         original_size = get_file_size(input_path)
 
-        with Image.open(input_path) as img:
+        with load_image(input_path) as img:
             # Preserve dimensions
             dimensions = {"width": img.width, "height": img.height}
 
-            work = img.convert("RGB")
-            if brightness != 1.0:
-                work = ImageEnhance.Brightness(work).enhance(brightness)
-            if contrast != 1.0:
-                work = ImageEnhance.Contrast(work).enhance(contrast)
-            if saturation != 1.0:
-                work = ImageEnhance.Color(work).enhance(saturation)
-
-            output_format = img.format or "PNG"
-            if output_format in ["JPEG", "JPG"] and work.mode == "RGBA":
-                rgb_img = Image.new("RGB", work.size, (255, 255, 255))
-                rgb_img.paste(work, mask=work.split()[3] if len(work.split()) == 4 else None)
-                work = rgb_img
-
-            if output_format in ["JPEG", "JPG"]:
-                work.save(output_path, format=output_format, quality=95, optimize=True)
-            else:
-                work.save(output_path, format=output_format, optimize=True)
+            work = img if img.mode == "RGB" else img.convert("RGB")
+            work = adjust_colors(
+                work,
+                brightness=brightness,
+                contrast=contrast,
+                saturation=saturation,
+                gamma=gamma,
+                black_point=black_point,
+                white_point=white_point,
+            )
+
+            save_image(work, output_path, img.format or "PNG", profile)
 
         processed_size = get_file_size(output_path)
 
@@ -319,7 +679,9 @@ def adjust_image(
         )
 
 
-def apply_filter(input_path: Path, output_path: Path, filter_name: str) -> ImageProcessingResponse:
+def apply_filter(
+    input_path: Path, output_path: Path, filter_name: str, profile: Optional[str] = None
+) -> ImageProcessingResponse:
     """
     Apply a visual filter to an image.
 
@@ -328,21 +690,16 @@ def apply_filter(input_path: Path, output_path: Path, filter_name: str) -> Image
     try:
         original_size = get_file_size(input_path)
 
-        with Image.open(input_path) as img:
-            work = img.convert("RGB")
+        with load_image(input_path) as img:
+            work = img if img.mode == "RGB" else img.convert("RGB")
             filter_key = filter_name.lower()
 
-            if filter_key == "grayscale":
-                work = ImageOps.grayscale(work).convert("RGB")
-            elif filter_key == "sepia":
-                sepia_img = ImageOps.colorize(ImageOps.grayscale(work), "#704214", "#C0A080")
-                work = sepia_img
+            if filter_key in ("grayscale", "sepia", "invert"):
+                work = adjust_colors(work, effect=filter_key)
             elif filter_key == "blur":
                 work = work.filter(ImageFilter.BLUR)
             elif filter_key == "sharpen":
                 work = work.filter(ImageFilter.SHARPEN)
-            elif filter_key == "invert":
-                work = ImageOps.invert(work)
             else:
                 return ImageProcessingResponse(
                     success=False,
@@ -350,8 +707,7 @@ def apply_filter(input_path: Path, output_path: Path, filter_name: str) -> Image
                     filename=output_path.name if output_path else None,
                 )
 
-            output_format = img.format or "PNG"
-            work.save(output_path, format=output_format, optimize=True)
+            save_image(work, output_path, img.format or "PNG", profile)
 
         processed_size = get_file_size(output_path)
 
@@ -379,6 +735,7 @@ def resize_image(
     height: int | None = None,
     maintain_aspect_ratio: bool = True,
     resample: str = "lanczos",
+    profile: Optional[str] = None,
 ) -> ImageProcessingResponse:
     """
     Resize an image to specified dimensions
@@ -390,6 +747,7 @@ def resize_image(
         height: Target height in pixels (optional)
         maintain_aspect_ratio: Whether to maintain aspect ratio
         resample: Resampling algorithm (nearest, bilinear, bicubic, lanczos)
+        profile: Encoder profile (fast, balanced, smallest)
 
     Returns:
         ImageProcessingResponse with resize results
@@ -415,63 +773,52 @@ def resize_image(
         }
         resample_filter = resample_map.get(resample.lower(), Image.LANCZOS)
 
-        # Open and resize image
-        with Image.open(input_path) as img:
-            # Get original dimensions
-            original_dimensions = {"width": img.width, "height": img.height}
-            original_width, original_height = img.size
-
-            # Calculate target dimensions
-            if maintain_aspect_ratio:
-                if width is not None and height is not None:
-                    # Both dimensions specified - maintain aspect ratio
-                    aspect_ratio = original_width / original_height
-                    if width / height > aspect_ratio:
-                        # Height is the limiting factor
-                        target_width = int(height * aspect_ratio)
-                        target_height = height
-                    else:
-                        # Width is the limiting factor
-                        target_width = width
-                        target_height = int(width / aspect_ratio)
-                elif width is not None:
-                    # Only width specified
-                    aspect_ratio = original_width / original_height
-                    target_width = width
-                    target_height = int(width / aspect_ratio)
-                else:
-                    # Only height specified
-                    aspect_ratio = original_width / original_height
+        # Read the dimensions from the header only
+        with Image.open(input_path) as header:
+            original_width, original_height = header.size
+
+        # Calculate target dimensions
+        if maintain_aspect_ratio:
+            if width is not None and height is not None:
+                # Both dimensions specified - maintain aspect ratio
+                aspect_ratio = original_width / original_height
+                if width / height > aspect_ratio:
+                    # Height is the limiting factor
                     target_width = int(height * aspect_ratio)
                     target_height = height
+                else:
+                    # Width is the limiting factor
+                    target_width = width
+                    target_height = int(width / aspect_ratio)
+            elif width is not None:
+                # Only width specified
+                aspect_ratio = original_width / original_height
+                target_width = width
+                target_height = int(width / aspect_ratio)
             else:
-                # Don't maintain aspect ratio - use exact dimensions
-                target_width = width if width is not None else original_width
-                target_height = height if height is not None else original_height
-
+                # Only height specified
+                aspect_ratio = original_width / original_height
+                target_width = int(height * aspect_ratio)
+                target_height = height
+        else:
+            # Don't maintain aspect ratio - use exact dimensions
+            target_width = width if width is not None else original_width
+            target_height = height if height is not None else original_height
+
+        # Open the image, decoded at reduced resolution when downscaling.
+        # The resized copy is at most as large as the decoded source unless upscaling.
+        upscale = (target_width * target_height) / (original_width * original_height)
+        with load_image(
+            input_path, max_size=(target_width, target_height), copies=1 + max(1.0, upscale)
+        ) as img:
             # Resize image
             resized_img = img.resize((target_width, target_height), resample=resample_filter)
 
             # Get new dimensions
             new_dimensions = {"width": target_width, "height": target_height}
 
-            # Preserve original format
-            output_format = img.format or "PNG"
-            if output_format == "JPEG":
-                # Convert RGBA to RGB if saving as JPEG
-                if resized_img.mode == "RGBA":
-                    rgb_img = Image.new("RGB", resized_img.size, (255, 255, 255))
-                    rgb_img.paste(
-                        resized_img,
-                        mask=resized_img.split()[3] if len(resized_img.split()) == 4 else None,
-                    )
-                    resized_img = rgb_img
-
-            # Save resized image
-            if output_format in ["JPEG", "JPG"]:
-                resized_img.save(output_path, format=output_format, quality=95, optimize=True)
-            else:
-                resized_img.save(output_path, format=output_format, optimize=True)
+            # Save resized image in the original format
+            save_image(resized_img, output_path, img.format or "PNG", profile)
 
         # Get resized file size
         resized_size = get_file_size(output_path)
@@ -494,65 +841,199 @@ def resize_image(
         )
 
 
+def _resize_ladder(img: Image.Image, sizes: list[tuple[int, int]]) -> list[Image.Image]:
+    """
+    Resize an image to several sizes, largest first
+
+    Instead of resampling the full image for every size, the image is
+    halved with box reduction while it stays IMAGE_REDUCING_GAP times larger
+    than the next size, and each size is resampled from the current level.
+    Levels are shared between sizes, so the full-resolution image is only
+    touched once.
+
+    Returns:
+        The resized images, in the order of `sizes`
+    """
+    if img.mode not in ("L", "LA", "RGB", "RGBA"):
+        img = img.convert("RGBA" if has_transparency(img) else "RGB")
+
+    resized = {}
+    level = img
+    for size in sorted(set(sizes), reverse=True):
+        while (
+            level.width // 2 >= size[0] * IMAGE_REDUCING_GAP
+            and level.height // 2 >= size[1] * IMAGE_REDUCING_GAP
+        ):
+            level = level.reduce(2)
+        resized[size] = level if level.size == size else level.resize(size, Image.LANCZOS)
+    return [resized[size] for size in sizes]
+
+
+def _encode_to_bytes(
+    img: Image.Image, image_format: str, profile: Optional[str], quality: int
+) -> bytes:
+    """Encode an image in memory with save_image()"""
+    buffer = io.BytesIO()
+    save_image(img, buffer, image_format, profile, quality)
+    return buffer.getvalue()
+
+
+def create_responsive_images(
+    input_path: Path,
+    output_path: Path,
+    widths: Optional[list[int]] = None,
+    formats: Optional[list[str]] = None,
+    quality: str = "medium",
+    profile: Optional[str] = None,
+    name: str = "image",
+) -> ImageProcessingResponse:
+    """
+    Create a responsive image set (one image per width and format) as a ZIP
+
+    The input is decoded once, at reduced size when the widest output is
+    much smaller. The width ladder comes from _resize_ladder() and every
+    width/format pair is encoded in parallel on the encode pool. The ZIP
+    holds the images ("{name}-{width}w.{ext}") and manifest.json with a
+    ready-to-use srcset per format. Widths larger than the source are
+    skipped (the source width is used when all are).
+
+    Args:
+        input_path: Path to input image
+        output_path: Path to save the ZIP archive
+        widths: Output widths in pixels (defaults to IMAGE_RESPONSIVE_WIDTHS)
+        formats: Output formats (defaults to webp and jpg)
+        quality: Quality preset (low, medium, high)
+        profile: Encoder profile (fast, balanced, smallest)
+        name: Base name of the files in the archive
+
+    Returns:
+        ImageProcessingResponse with the archive and source dimensions
+    """
+    try:
+        original_size = get_file_size(input_path)
+        quality_value = IMAGE_COMPRESSION_QUALITY.get(quality, IMAGE_COMPRESSION_QUALITY["medium"])
+        formats = [image_format.lower() for image_format in formats or ["webp", "jpg"]]
+
+        # Read the dimensions from the header only
+        with Image.open(input_path) as header:
+            source_width, source_height = header.size
+
+        widths = sorted(
+            {width for width in widths or IMAGE_RESPONSIVE_WIDTHS if width <= source_width}
+        )
+        if not widths:
+            widths = [source_width]
+        sizes = [(width, max(1, round(source_height * width / source_width))) for width in widths]
+
+        # Only the width bounds the decode (a height of 1 never limits it)
+        with load_image(input_path, max_size=(widths[-1], 1)) as img:
+            levels = _resize_ladder(img, sizes)
+
+            # Levels may share the decoded raster: encode before it is released
+            futures = {
+                (size, image_format): encode_pool.submit(
+                    _encode_to_bytes, level, image_format, profile, quality_value
+                )
+                for size, level in zip(sizes, levels)
+                for image_format in formats
+            }
+
+            manifest = {
+                "source": {"width": source_width, "height": source_height},
+                "widths": widths,
+                "formats": {},
+            }
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as archive:
+                for image_format in formats:
+                    files = []
+                    for size in sizes:
+                        filename = f"{name}-{size[0]}w.{image_format}"
+                        data = futures.pop((size, image_format)).result()
+                        archive.writestr(filename, data)
+                        files.append(
+                            {
+                                "file": filename,
+                                "width": size[0],
+                                "height": size[1],
+                                "size": len(data),
+                            }
+                        )
+                    manifest["formats"][image_format] = {
+                        "srcset": ", ".join(f"{file['file']} {file['width']}w" for file in files),
+                        "files": files,
+                    }
+                archive.writestr(
+                    "manifest.json",
+                    json.dumps(manifest, indent=2),
+                    compress_type=zipfile.ZIP_DEFLATED,
+                )
+
+        return ImageProcessingResponse(
+            success=True,
+            message=(
+                f"Created {len(sizes) * len(formats)} images "
+                f"({len(sizes)} widths, {', '.join(formats)})"
+            ),
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+            dimensions={"width": source_width, "height": source_height},
+        )
+
+    except Exception as e:
+        return ImageProcessingResponse(
+            success=False,
+            message=f"Error creating responsive images: {str(e)}",
+            filename=output_path.name if output_path else None,
+        )
+
+
 def flip_image(
-    input_path: Path, output_path: Path, direction: str = "horizontal"
+    input_path: Path,
+    output_path: Path,
+    direction: str = "horizontal",
+    profile: Optional[str] = None,
+    metadata_only: bool = False,
 ) -> ImageProcessingResponse:
     """
     Flip an image horizontally or vertically
 
+    JPEGs are flipped without re-encoding when their size allows it, or with
+    `metadata_only`, by rewriting their EXIF orientation.
+
     Args:
         input_path: Path to input image
         output_path: Path to save flipped image
         direction: Flip direction ("horizontal" or "vertical")
+        profile: Encoder profile (fast, balanced, smallest)
+        metadata_only: Only rewrite the EXIF orientation (JPEG only)
 
     Returns:
         ImageProcessingResponse with flip results
     """
     try:
+        method = FLIP_TRANSPOSE.get(direction.lower())
+        if method is None:
+            return ImageProcessingResponse(
+                success=False,
+                message=f"Invalid flip direction: {direction}. Use 'horizontal' or 'vertical'",
+                filename=output_path.name if output_path else None,
+            )
+
         # Get original file size
         original_size = get_file_size(input_path)
 
-        # Open and flip image
-        with Image.open(input_path) as img:
-            # Get dimensions
-            dimensions = {"width": img.width, "height": img.height}
-
-            # Flip image based on direction
-            if direction.lower() == "horizontal":
-                flipped_img = ImageOps.mirror(img)
-            elif direction.lower() == "vertical":
-                flipped_img = ImageOps.flip(img)
-            else:
-                return ImageProcessingResponse(
-                    success=False,
-                    message=f"Invalid flip direction: {direction}. Use 'horizontal' or 'vertical'",
-                    filename=output_path.name if output_path else None,
-                )
-
-            # Preserve original format
-            output_format = img.format or "PNG"
-            if output_format == "JPEG":
-                # Convert RGBA to RGB if saving as JPEG
-                if flipped_img.mode == "RGBA":
-                    rgb_img = Image.new("RGB", flipped_img.size, (255, 255, 255))
-                    rgb_img.paste(
-                        flipped_img,
-                        mask=flipped_img.split()[3] if len(flipped_img.split()) == 4 else None,
-                    )
-                    flipped_img = rgb_img
-
-            # Save flipped image
-            if output_format in ["JPEG", "JPG"]:
-                flipped_img.save(output_path, format=output_format, quality=95, optimize=True)
-            else:
-                flipped_img.save(output_path, format=output_format, optimize=True)
+        dimensions, lossless = _transpose_image(
+            input_path, output_path, method, profile, metadata_only
+        )
 
         # Get flipped file size
         flipped_size = get_file_size(output_path)
 
         return ImageProcessingResponse(
             success=True,
-            message=f"Image flipped {direction} successfully",
+            message=f"Image flipped {direction} {'losslessly' if lossless else 'successfully'}",
             filename=output_path.name,
             download_url=f"/api/v1/download/{output_path.name}",
             original_size=original_size,
@@ -568,22 +1049,53 @@ def flip_image(
         )
 
 
+def _render_collage_cell(image_path: Path, cell_size: tuple[int, int]) -> Image.Image:
+    """
+    Decode an image straight to a collage cell
+
+    The image is decoded at reduced size (JPEG draft or box reduce), flattened
+    to RGB on white, then resized to cover the cell and center cropped (like
+    CSS object-fit: cover).
+    """
+    try:
+        with load_image(image_path, max_size=cell_size) as img:
+            return ImageOps.fit(flatten_for_jpeg(img), cell_size, Image.LANCZOS)
+    except Exception as e:
+        raise ValueError(f"Error opening image {image_path.name}: {str(e)}") from e
+
+
 def create_collage(
     image_paths: list[Path],
     output_path: Path,
     rows: int,
     cols: int,
     image_order: list[int],
+    profile: Optional[str] = None,
+    cell_width: int = IMAGE_COLLAGE_CELL_SIZE,
+    cell_height: int = IMAGE_COLLAGE_CELL_SIZE,
+    gutter: int = 0,
+    output_format: str = "png",
 ) -> ImageProcessingResponse:
     """
     Create a collage from multiple images arranged in a grid
 
+    Each distinct image is rendered to its cell size in parallel on the
+    decode pool, pasted into every cell showing it as soon as it is ready
+    and then released, so only the canvas and a few cells are in memory at
+    once. PNG canvases above IMAGE_COLLAGE_PNG_FAST_PIXELS are saved with
+    the fast profile unless one is given.
+
     Args:
         image_paths: List of paths to input images
         output_path: Path to save the collage
         rows: Number of rows in the grid
         cols: Number of columns in the grid
         image_order: Order of images in the grid (indices from 0 to len(image_paths)-1)
+        profile: Encoder profile (fast, balanced, smallest)
+        cell_width: Width of each cell in pixels
+        cell_height: Height of each cell in pixels
+        gutter: White space between cells in pixels
+        output_format: Output format (png, jpg, webp)
 
     Returns:
         ImageProcessingResponse with collage creation results
@@ -617,82 +1129,62 @@ def create_collage(
                     filename=output_path.name if output_path else None,
                 )
 
-        # Open all images and get their dimensions
-        images = []
-        for img_path in image_paths:
-            try:
-                with Image.open(img_path) as img:
-                    # Convert to RGB if necessary
-                    if img.mode != "RGB":
-                        rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                        if img.mode == "RGBA":
-                            rgb_img.paste(
-                                img, mask=img.split()[3] if len(img.split()) == 4 else None
-                            )
-                        else:
-                            rgb_img.paste(img)
-                        images.append(rgb_img.copy())
-                    else:
-                        images.append(img.copy())
-            except Exception as e:
-                return ImageProcessingResponse(
-                    success=False,
-                    message=f"Error opening image {img_path.name}: {str(e)}",
-                    filename=output_path.name if output_path else None,
-                )
-
-        # Calculate cell size based on the first image's aspect ratio
-        # We'll use a standard size and let images fill their cells
-        # Use a reasonable default size (e.g., 800x800 per cell)
-        cell_width = 800
-        cell_height = 800
+        collage_width = cols * cell_width + (cols - 1) * gutter
+        collage_height = rows * cell_height + (rows - 1) * gutter
+        if collage_width * collage_height > IMAGE_COLLAGE_MAX_PIXELS:
+            return ImageProcessingResponse(
+                success=False,
+                message=(
+                    f"Collage of {collage_width}x{collage_height} exceeds "
+                    f"{IMAGE_COLLAGE_MAX_PIXELS} pixels"
+                ),
+                filename=output_path.name if output_path else None,
+            )
 
-        # Create the collage canvas
-        collage_width = cell_width * cols
-        collage_height = cell_height * rows
-        collage = Image.new("RGB", (collage_width, collage_height), (255, 255, 255))
+        image_format = normalize_format(output_format)
+        if (
+            profile is None
+            and image_format == "PNG"
+            and collage_width * collage_height > IMAGE_COLLAGE_PNG_FAST_PIXELS
+        ):
+            profile = "fast"
 
-        # Place images in the grid according to image_order
+        # Grid positions of every image (an image may fill several cells)
+        positions: dict[int, list[tuple[int, int]]] = {}
         for grid_idx, image_idx in enumerate(image_order):
-            row = grid_idx // cols
-            col = grid_idx % cols
-
-            # Get the image to place
-            img = images[image_idx]
-
-            # Resize image to cover the cell while preserving aspect ratio
-            # Then crop to exact cell size (cover behavior - like CSS object-fit: cover)
-            img_aspect = img.width / img.height
-            cell_aspect = cell_width / cell_height
-
-            if img_aspect > cell_aspect:
-                # Image is wider than cell - fit to height, then crop width
-                new_height = cell_height
-                new_width = int(cell_height * img_aspect)
-            else:
-                # Image is taller than cell - fit to width, then crop height
-                new_width = cell_width
-                new_height = int(cell_width / img_aspect)
-
-            # Resize image to cover size
-            resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-
-            # Crop to exact cell dimensions (center crop)
-            left = (new_width - cell_width) // 2
-            top = (new_height - cell_height) // 2
-            right = left + cell_width
-            bottom = top + cell_height
-            cropped_img = resized_img.crop((left, top, right, bottom))
+            row, col = divmod(grid_idx, cols)
+            positions.setdefault(image_idx, []).append(
+                (col * (cell_width + gutter), row * (cell_height + gutter))
+            )
 
-            # Calculate position
-            x_offset = col * cell_width
-            y_offset = row * cell_height
+        cell_size = (cell_width, cell_height)
+        futures = {
+            decode_pool.submit(_render_collage_cell, image_paths[image_idx], cell_size): image_idx
+            for image_idx in positions
+        }
 
-            # Paste image onto collage (fills cell exactly, no white spaces)
-            collage.paste(cropped_img, (x_offset, y_offset))
+        collage = Image.new("RGB", (collage_width, collage_height), (255, 255, 255))
+        try:
+            for future in as_completed(list(futures)):
+                image_idx = futures.pop(future)
+                try:
+                    cell = future.result()
+                except ValueError as e:
+                    return ImageProcessingResponse(
+                        success=False,
+                        message=str(e),
+                        filename=output_path.name if output_path else None,
+                    )
+                for offset in positions[image_idx]:
+                    collage.paste(cell, offset)
+                del cell
+        finally:
+            for future in futures:
+                future.cancel()
 
         # Save the collage
-        collage.save(output_path, format="PNG", quality=95, optimize=True)
+        save_image(collage, output_path, image_format, profile)
+        collage.close()
 
         # Get file size
         collage_size = get_file_size(output_path)
@@ -714,70 +1206,96 @@ def create_collage(
         )
 
 
+def _render_icons(img: Image.Image, sizes: list[int]) -> dict[int, Image.Image]:
+    """Square icons of every size from one decoded image (see _resize_ladder)"""
+    # ICO and PNG icons keep transparency; other modes become RGB or RGBA
+    if img.mode not in ("RGBA", "RGB"):
+        img = img.convert("RGBA")
+    return dict(zip(sizes, _resize_ladder(img, [(size, size) for size in sizes])))
+
+
+def _get_ico_sizes(sizes: list[int]) -> list[int]:
+    """Frame sizes of an ICO file for the requested icon sizes"""
+    return sorted({min(size, IMAGE_ICON_ICO_MAX_SIZE) for size in sizes})
+
+
+def _encode_ico(icons: list[Image.Image]) -> bytes:
+    """Encode square icons, smallest first, as one multi-image ICO file"""
+    buffer = io.BytesIO()
+    icons[-1].save(
+        buffer,
+        format="ICO",
+        sizes=[icon.size for icon in icons],
+        append_images=icons[:-1],
+    )
+    return buffer.getvalue()
+
+
+def _validate_icon_sizes(sizes: list[int]) -> Optional[str]:
+    """Error message for the first icon size out of range, None when all are valid"""
+    for size in sizes:
+        if size < IMAGE_ICON_MIN_SIZE or size > IMAGE_ICON_MAX_SIZE:
+            return (
+                f"Invalid icon size: {size}. Size must be between "
+                f"{IMAGE_ICON_MIN_SIZE} and {IMAGE_ICON_MAX_SIZE} pixels"
+            )
+    return None
+
+
 def create_icon(
     input_path: Path,
     output_path: Path,
     size: int = 256,
+    sizes: Optional[list[int]] = None,
 ) -> ImageProcessingResponse:
     """
     Convert an image to an ICO file
 
+    With several sizes, every size is rendered from a single decode by
+    progressive downscaling and stored as one frame of the ICO file. Sizes
+    above 256 pixels (the ICO limit) are stored as 256.
+
     Args:
         input_path: Path to input image
         output_path: Path to save ICO file
         size: Icon size in pixels (default: 256, must be between 16 and 512)
+        sizes: Icon sizes of a multi-image ICO (overrides `size`)
 
     Returns:
         ImageProcessingResponse with icon creation results
     """
     try:
-        # Validate size
-        if size < 16 or size > 512:
+        sizes = sorted(set(sizes or [size]))
+
+        # Validate sizes
+        error = _validate_icon_sizes(sizes)
+        if error:
             return ImageProcessingResponse(
                 success=False,
-                message=f"Invalid icon size: {size}. Size must be between 16 and 512 pixels",
+                message=error,
                 filename=output_path.name if output_path else None,
             )
 
         # Get original file size
         original_size = get_file_size(input_path)
 
-        # Open input image
-        with Image.open(input_path) as img:
-            # Convert to RGBA if necessary (ICO format supports transparency)
-            if img.mode not in ("RGBA", "RGB"):
-                if img.mode == "P" and "transparency" in img.info:
-                    img = img.convert("RGBA")
-                elif img.mode == "LA":
-                    # Grayscale with alpha
-                    img = img.convert("RGBA")
-                else:
-                    img = img.convert("RGB")
-                    # Add alpha channel for RGB images (fully opaque)
-                    rgba_img = Image.new("RGBA", img.size, (255, 255, 255, 255))
-                    rgba_img.paste(img)
-                    img = rgba_img
-
-            # Get original dimensions
-            original_dimensions = {"width": img.width, "height": img.height}
-
-            # Resize image to square (ICO files typically use square icons)
-            icon_img = img.resize((size, size), Image.LANCZOS)
-
-            # Save as ICO file
-            icon_img.save(output_path, format="ICO")
+        # Open input image, decoded at reduced resolution when much larger than the icon
+        ico_sizes = _get_ico_sizes(sizes)
+        with load_image(input_path, max_size=(ico_sizes[-1], ico_sizes[-1])) as img:
+            icons = _render_icons(img, ico_sizes)
+            output_path.write_bytes(_encode_ico(list(icons.values())))
 
         # Get icon file size
         icon_size = get_file_size(output_path)
 
         return ImageProcessingResponse(
             success=True,
-            message=f"Icon created successfully ({size}x{size}px)",
+            message=f"Icon created successfully ({', '.join(f'{s}x{s}' for s in sizes)}px)",
             filename=output_path.name,
             download_url=f"/api/v1/download/{output_path.name}",
             original_size=original_size,
             processed_size=icon_size,
-            dimensions={"width": size, "height": size},
+            dimensions={"width": sizes[-1], "height": sizes[-1]},
         )
 
     except Exception as e:
@@ -786,3 +1304,101 @@ def create_icon(
             message=f"Error creating icon: {str(e)}",
             filename=output_path.name if output_path else None,
         )
+
+
+def create_favicon_bundle(
+    input_path: Path,
+    output_path: Path,
+    sizes: Optional[list[int]] = None,
+    include_png: bool = True,
+    include_manifest: bool = False,
+) -> ImageProcessingResponse:
+    """
+    Create a favicon set as a ZIP archive
+
+    The archive holds favicon.ico with a frame per size and, optionally,
+    PNG variants (favicon-{size}x{size}.png per size plus the
+    IMAGE_FAVICON_PNG_VARIANTS such as apple-touch-icon.png) and a
+    site.webmanifest listing the IMAGE_FAVICON_MANIFEST_ICONS. Every size
+    comes from a single decode, and the files are encoded in parallel on
+    the encode pool.
+
+    Args:
+        input_path: Path to input image
+        output_path: Path to save the ZIP archive
+        sizes: ICO sizes (defaults to IMAGE_ICON_SIZES)
+        include_png: Add the PNG variants
+        include_manifest: Add site.webmanifest and the icons it references
+
+    Returns:
+        ImageProcessingResponse with the archive
+    """
+    try:
+        sizes = sorted(set(sizes or IMAGE_ICON_SIZES))
+
+        error = _validate_icon_sizes(sizes)
+        if error:
+            return ImageProcessingResponse(
+                success=False,
+                message=error,
+                filename=output_path.name if output_path else None,
+            )
+
+        original_size = get_file_size(input_path)
+
+        ico_sizes = _get_ico_sizes(sizes)
+        png_files = {}
+        if include_png:
+            png_files.update({f"favicon-{size}x{size}.png": size for size in sizes})
+            png_files.update(IMAGE_FAVICON_PNG_VARIANTS)
+        if include_manifest:
+            png_files.update(IMAGE_FAVICON_MANIFEST_ICONS)
+        all_sizes = sorted(set(ico_sizes) | set(png_files.values()))
+
+        with load_image(input_path, max_size=(all_sizes[-1], all_sizes[-1])) as img:
+            icons = _render_icons(img, all_sizes)
+
+            # Icons may share the decoded raster: encode before it is released
+            futures = {
+                "favicon.ico": encode_pool.submit(_encode_ico, [icons[size] for size in ico_sizes])
+            }
+            for filename, size in png_files.items():
+                icon = icons[size]
+                if filename in IMAGE_FAVICON_PNG_VARIANTS:
+                    icon = flatten_for_jpeg(icon)
+                futures[filename] = encode_pool.submit(_encode_to_bytes, icon, "PNG", None, None)
+
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as archive:
+                for filename, future in futures.items():
+                    archive.writestr(filename, future.result())
+
+                if include_manifest:
+                    manifest = {
+                        "icons": [
+                            {"src": f"/{filename}", "sizes": f"{size}x{size}", "type": "image/png"}
+                            for filename, size in IMAGE_FAVICON_MANIFEST_ICONS.items()
+                        ],
+                        "display": "standalone",
+                    }
+                    archive.writestr(
+                        "site.webmanifest",
+                        json.dumps(manifest, indent=2),
+                        compress_type=zipfile.ZIP_DEFLATED,
+                    )
+
+        return ImageProcessingResponse(
+            success=True,
+            message=f"Favicon set created successfully ({len(futures)} images)",
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+            dimensions={"width": all_sizes[-1], "height": all_sizes[-1]},
+        )
+
+    except Exception as e:
+        return ImageProcessingResponse(
+            success=False,
+            message=f"Error creating favicon set: {str(e)}",
+            filename=output_path.name if output_path else None,
+        )
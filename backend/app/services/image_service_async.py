@@ -0,0 +1,104 @@
+"""
+Async image processing service with progress tracking
+Long image jobs run in a worker thread and report progress to the task store
+"""
+
+import asyncio
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+from app.config import IMAGE_TILE_SIZE
+from app.services.image_tiles_service import create_tile_pyramid
+from app.tasks.models import TaskResult, TaskStatus
+from app.tasks.store import task_store
+
+
+class TaskCancelledError(Exception):
+    """Raised from a progress callback to stop a job whose task was cancelled"""
+
+
+async def create_tiles_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    layout: str = "dzi",
+    tile_size: int = IMAGE_TILE_SIZE,
+    output_format: str = "jpg",
+    quality: str = "medium",
+    profile: Optional[str] = None,
+    name: str = "image",
+) -> TaskResult:
+    """
+    Build a deep-zoom tile pyramid with real-time progress updates
+
+    Progress follows the number of tiles written to the archive. Cancelling
+    the task stops the job at the next tile.
+    """
+    loop = asyncio.get_running_loop()
+    last_percent = -1
+
+    def publish(percent: int, message: str):
+        # Runs on the event loop: a progress update would reset a cancelled task
+        task = task_store.get_task(task_id)
+        if task and task.status != TaskStatus.CANCELLED:
+            task_store.update_progress(task_id, percent, message, "tiling")
+
+    def report(written: int, total: int):
+        nonlocal last_percent
+        task = task_store.get_task(task_id)
+        if task and task.status == TaskStatus.CANCELLED:
+            raise TaskCancelledError()
+
+        # One update per percent: pyramids have thousands of tiles
+        percent = 2 + int(written / total * 96)
+        if percent != last_percent:
+            last_percent = percent
+            loop.call_soon_threadsafe(publish, percent, f"Writing tiles... {written}/{total}")
+
+    try:
+        task_store.update_progress(task_id, 0, "Decoding image...", "decoding")
+
+        result = await loop.run_in_executor(
+            None,
+            partial(
+                create_tile_pyramid,
+                input_path,
+                output_path,
+                layout,
+                tile_size,
+                output_format,
+                quality,
+                profile,
+                name,
+                on_progress=report,
+            ),
+        )
+
+        task = task_store.get_task(task_id)
+        if task and task.status == TaskStatus.CANCELLED:
+            return TaskResult(success=False, error="Task cancelled")
+
+        if not result.success:
+            task_store.fail_task(task_id, result.message[:500])
+            return TaskResult(success=False, error=result.message[:500])
+
+        task_result = TaskResult(
+            success=True,
+            download_url=result.download_url,
+            filename=result.filename,
+            original_size=result.original_size,
+            processed_size=result.processed_size,
+            message=result.message,
+        )
+
+        task_store.complete_task(task_id, task_result)
+        return task_result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
@@ -0,0 +1,297 @@
+"""
+Deep-zoom tile pyramids (DZI and XYZ)
+
+A pyramid is built band by band. The image is cut into bands one tile row
+tall, each band is cut into tiles, and every two bands of a level are
+reduced 2x into one band of the level below, so each level comes from the
+level above it instead of from the original. Only one pending band per
+level is held at a time, whatever the image height. Tiles are encoded on
+the encode pool and written into the ZIP in order as soon as they are
+ready, with a bounded number in flight. Pillow decodes compressed formats
+in one piece, so the decoded image is held (within the image memory
+budget) while its bands are read.
+"""
+
+from collections import deque
+from functools import partial
+import io
+import json
+from pathlib import Path
+from typing import Callable, Optional
+import zipfile
+
+from PIL import Image
+
+from app.config import (
+    IMAGE_COMPRESSION_QUALITY,
+    IMAGE_TILE_MAX_PENDING,
+    IMAGE_TILE_SIZE,
+)
+from app.models.image import ImageProcessingResponse
+from app.utils.file_handler import get_file_size
+from app.utils.image_encoder import encode_pool, flatten_for_jpeg, has_transparency, save_image
+from app.utils.image_loader import load_image
+
+DZI_NAMESPACE = "http://schemas.microsoft.com/deepzoom/2008"
+
+
+def get_level_count(size: tuple[int, int], tile_size: int, layout: str) -> int:
+    """
+    Number of pyramid levels of an image
+
+    DZI levels go down to 1x1 pixel, XYZ zoom levels down to the level that
+    fits in a single tile (zoom 0).
+    """
+    longest = max(size)
+    if layout == "dzi":
+        return (longest - 1).bit_length() + 1
+    return (-(-longest // tile_size) - 1).bit_length() + 1
+
+
+def get_level_size(size: tuple[int, int], steps: int) -> tuple[int, int]:
+    """Size of the level `steps` halvings below the full image (rounded up)"""
+    return (-(-size[0] // 2**steps), -(-size[1] // 2**steps))
+
+
+def _get_tile_name(layout: str, name: str, extension: str, level: int, col: int, row: int) -> str:
+    """Path of a tile in the archive"""
+    if layout == "dzi":
+        return f"{name}_files/{level}/{col}_{row}.{extension}"
+    return f"{level}/{col}/{row}.{extension}"
+
+
+def _encode_tile(
+    tile: Image.Image, image_format: str, profile: Optional[str], quality: int
+) -> bytes:
+    """Encode one tile in memory"""
+    buffer = io.BytesIO()
+    save_image(tile, buffer, image_format, profile, quality)
+    return buffer.getvalue()
+
+
+class _TileArchive:
+    """ZIP of tiles encoded in parallel and written in submission order"""
+
+    def __init__(
+        self,
+        archive: zipfile.ZipFile,
+        image_format: str,
+        profile: Optional[str],
+        quality: int,
+        total: int,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.archive = archive
+        self.image_format = image_format
+        self.profile = profile
+        self.quality = quality
+        self.total = total
+        self.on_progress = on_progress
+        self.written = 0
+        self._pending = deque()
+
+    def add(self, name: str, tile: Image.Image):
+        """Queue a tile for encoding, writing finished ones while too many are pending"""
+        future = encode_pool.submit(
+            _encode_tile, tile, self.image_format, self.profile, self.quality
+        )
+        self._pending.append((name, future))
+        while len(self._pending) > IMAGE_TILE_MAX_PENDING:
+            self._write_next()
+
+    def _write_next(self):
+        name, future = self._pending.popleft()
+        self.archive.writestr(name, future.result())
+        self.written += 1
+        if self.on_progress is not None:
+            self.on_progress(self.written, self.total)
+
+    def finish(self):
+        """Write every pending tile"""
+        while self._pending:
+            self._write_next()
+
+    def cancel(self):
+        """Drop the pending tiles"""
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+
+class _PyramidLevel:
+    """One pyramid level, fed one band (a row of tiles) at a time"""
+
+    def __init__(
+        self,
+        number: int,
+        tile_size: int,
+        tiles: _TileArchive,
+        tile_name: Callable[[int, int, int], str],
+        pad: bool,
+        next_level: Optional["_PyramidLevel"],
+    ):
+        self.number = number
+        self.tile_size = tile_size
+        self.tiles = tiles
+        self.tile_name = tile_name
+        self.pad = pad
+        self.next_level = next_level
+        self.row = 0
+        self._pending_band = None
+
+    def add_band(self, band: Image.Image):
+        """Cut a band into tiles and pass every two bands on to the next level"""
+        for col, left in enumerate(range(0, band.width, self.tile_size)):
+            tile = band.crop((left, 0, min(left + self.tile_size, band.width), band.height))
+            if self.pad and tile.size != (self.tile_size, self.tile_size):
+                padded = Image.new(
+                    tile.mode,
+                    (self.tile_size, self.tile_size),
+                    (255, 255, 255) if tile.mode == "RGB" else (0, 0, 0, 0),
+                )
+                padded.paste(tile)
+                tile = padded
+            self.tiles.add(self.tile_name(self.number, col, self.row), tile)
+        self.row += 1
+
+        if self.next_level is None:
+            return
+        if self._pending_band is None:
+            self._pending_band = band
+            return
+
+        stacked = Image.new(band.mode, (band.width, self._pending_band.height + band.height))
+        stacked.paste(self._pending_band)
+        stacked.paste(band, (0, self._pending_band.height))
+        self._pending_band = None
+        self.next_level.add_band(stacked.reduce(2))
+
+    def finish(self):
+        """Pass the last odd band on and finish the levels below"""
+        if self.next_level is None:
+            return
+        if self._pending_band is not None:
+            self.next_level.add_band(self._pending_band.reduce(2))
+            self._pending_band = None
+        self.next_level.finish()
+
+
+def create_tile_pyramid(
+    input_path: Path,
+    output_path: Path,
+    layout: str = "dzi",
+    tile_size: int = IMAGE_TILE_SIZE,
+    output_format: str = "jpg",
+    quality: str = "medium",
+    profile: Optional[str] = None,
+    name: str = "image",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> ImageProcessingResponse:
+    """
+    Create a deep-zoom tile pyramid as a ZIP archive
+
+    Layouts:
+        dzi: "{name}.dzi" descriptor and "{name}_files/{level}/{col}_{row}.{ext}"
+            tiles (no overlap, edge tiles cropped), levels down to 1x1
+        xyz: "{zoom}/{x}/{y}.{ext}" tiles padded to full size (white for JPEG,
+            transparent otherwise) and metadata.json, zoom 0 fits one tile
+
+    Args:
+        input_path: Path to input image
+        output_path: Path to save the ZIP archive
+        layout: Pyramid layout (dzi, xyz)
+        tile_size: Tile width and height in pixels
+        output_format: Tile format (jpg, png, webp)
+        quality: Quality preset (low, medium, high)
+        profile: Encoder profile (fast, balanced, smallest)
+        name: Base name of the DZI descriptor and tile folder
+        on_progress: Called with (tiles written, total tiles) after each tile
+
+    Returns:
+        ImageProcessingResponse with the archive
+    """
+    tiles = None
+    try:
+        original_size = get_file_size(input_path)
+        quality_value = IMAGE_COMPRESSION_QUALITY.get(quality, IMAGE_COMPRESSION_QUALITY["medium"])
+
+        tile_name = partial(_get_tile_name, layout, name, output_format)
+
+        # Decoded image plus the bands held by the levels
+        with load_image(input_path, copies=1.5) as img:
+            size = img.size
+            # XYZ padding is transparent in formats that have alpha
+            mode = (
+                "RGBA"
+                if output_format != "jpg" and (layout == "xyz" or has_transparency(img))
+                else "RGB"
+            )
+
+            level_count = get_level_count(size, tile_size, layout)
+            total = 0
+            for steps in range(level_count):
+                width, height = get_level_size(size, steps)
+                total += -(-width // tile_size) * -(-height // tile_size)
+
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as archive:
+                tiles = _TileArchive(
+                    archive, output_format, profile, quality_value, total, on_progress
+                )
+
+                # Levels are numbered from the smallest (0) to the full image
+                top = None
+                for number in range(level_count):
+                    top = _PyramidLevel(number, tile_size, tiles, tile_name, layout == "xyz", top)
+
+                for top_row in range(0, size[1], tile_size):
+                    band = img.crop((0, top_row, size[0], min(top_row + tile_size, size[1])))
+                    if mode == "RGB":
+                        band = flatten_for_jpeg(band)
+                    if band.mode != mode:
+                        band = band.convert(mode)
+                    top.add_band(band)
+                top.finish()
+                tiles.finish()
+
+                if layout == "dzi":
+                    descriptor = (
+                        '<?xml version="1.0" encoding="UTF-8"?>\n'
+                        f'<Image xmlns="{DZI_NAMESPACE}" Format="{output_format}" '
+                        f'Overlap="0" TileSize="{tile_size}">'
+                        f'<Size Width="{size[0]}" Height="{size[1]}"/></Image>\n'
+                    )
+                    archive.writestr(f"{name}.dzi", descriptor, compress_type=zipfile.ZIP_DEFLATED)
+                else:
+                    metadata = {
+                        "width": size[0],
+                        "height": size[1],
+                        "tile_size": tile_size,
+                        "format": output_format,
+                        "min_zoom": 0,
+                        "max_zoom": level_count - 1,
+                    }
+                    archive.writestr(
+                        "metadata.json",
+                        json.dumps(metadata, indent=2),
+                        compress_type=zipfile.ZIP_DEFLATED,
+                    )
+
+        return ImageProcessingResponse(
+            success=True,
+            message=f"Created {layout.upper()} pyramid with {level_count} levels ({total} tiles)",
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+            dimensions={"width": size[0], "height": size[1]},
+        )
+
+    except Exception as e:
+        if tiles is not None:
+            tiles.cancel()
+        output_path.unlink(missing_ok=True)
+        return ImageProcessingResponse(
+            success=False,
+            message=f"Error creating tile pyramid: {str(e)}",
+            filename=output_path.name if output_path else None,
+        )
@@ -4,8 +4,11 @@ Palette generator service
 
 import colorsys
 import math
+from pathlib import Path
 from typing import List, Tuple
 
+from PIL import Image
+
 from app.models.palette_generator import (
     ColorInfo,
     PaletteGeneratorRequest,
@@ -13,6 +16,8 @@ from app.models.palette_generator import (
     PaletteScheme,
 )
 from app.services.color_service import detect_and_parse, rgb_to_hsl
+from app.utils.color_quantize import get_dominant_colors
+from app.utils.image_loader import load_image
 
 
 def generate_palette(request: PaletteGeneratorRequest) -> PaletteGeneratorResponse:
@@ -81,6 +86,51 @@ def generate_palette(request: PaletteGeneratorRequest) -> PaletteGeneratorRespon
         )
 
 
+def generate_palette_from_image(
+    input_path: Path, count: int = 5, sample_size: int = 200
+) -> PaletteGeneratorResponse:
+    """
+    Generate a color palette from the dominant colors of an image
+
+    Args:
+        input_path: Path to the image
+        count: Maximum number of colors in the palette
+        sample_size: Image is downscaled to fit sample_size x sample_size first
+
+    Returns:
+        PaletteGeneratorResponse with the palette, most common color first
+    """
+    try:
+        with load_image(input_path, max_size=(sample_size, sample_size), copies=1) as img:
+            img.thumbnail((sample_size, sample_size), Image.LANCZOS)
+            dominant_colors = get_dominant_colors(img, count)
+
+        colors = []
+        for (r, g, b), _ in dominant_colors:
+            h, s, l = rgb_to_hsl(r, g, b)
+            colors.append(
+                ColorInfo(
+                    hex=f"#{r:02x}{g:02x}{b:02x}",
+                    rgb=f"rgb({r}, {g}, {b})",
+                    hsl=f"hsl({round(h):d}, {round(s)}%, {round(l)}%)",
+                )
+            )
+
+        return PaletteGeneratorResponse(
+            success=True,
+            message=f"Extracted {len(colors)} colors from the image",
+            colors=colors,
+            scheme="image",
+            base_color=colors[0].hex if colors else None,
+        )
+
+    except Exception as e:
+        return PaletteGeneratorResponse(
+            success=False,
+            message=f"Error generating palette: {str(e)}",
+        )
+
+
 def _hsl_to_rgb_hex(h: float, s: float, l: float) -> Tuple[str, str, str]:
     """Convert HSL to RGB and return hex, rgb, hsl strings"""
     r_f, g_f, b_f = colorsys.hls_to_rgb(h / 360, l / 100, s / 100)
@@ -2,15 +2,46 @@
 Video processing service using FFmpeg
 """
 
+import hashlib
+import json
+import os
 from pathlib import Path
+import re
+import shutil
 import subprocess
 from typing import Optional
+import uuid
+import zipfile
 
 import ffmpeg
 
-from app.config import VIDEO_COMPRESSION_PRESETS
+from app.config import (
+    ANIMATED_IMAGE_FORMATS,
+    ANIMATED_IMAGE_PRESETS,
+    AUDIO_EXTRACT_ENCODERS,
+    AUDIO_EXTRACT_PASSTHROUGH,
+    GIF_DITHER_MODES,
+    TEMP_DIR,
+    VIDEO_COMPRESSION_PRESETS,
+    VIDEO_HLS_LADDER,
+    VIDEO_HLS_PRESET,
+    VIDEO_HLS_SEGMENT_SECONDS,
+    VIDEO_TARGET_MIN_VIDEO_BITRATE,
+    VIDEO_TARGET_MUX_BYTES_PER_SECOND,
+    VIDEO_TARGET_SIZE_OVERHEAD,
+    VIDEO_THUMBNAIL_CANDIDATE_FRAMES,
+    VIDEO_THUMBNAIL_MAX_COUNT,
+    VIDEO_THUMBNAIL_SCAN_SECONDS,
+    VIDEO_TRIM_EDGE_ENCODERS,
+    VIDEO_TRIM_KEYFRAME_WINDOW,
+)
 from app.models.video import VideoProcessingResponse
 from app.utils.file_handler import calculate_compression_ratio, get_file_size
+from app.utils.media_probe import get_file_fingerprint, get_keyframe_index, probe_media
+from app.utils.resource_governor import core_budget, thread_options
+
+# Offset (seconds) used to land stream-copy seeks exactly on a keyframe
+TRIM_SEEK_EPSILON = 0.001
 
 
 def get_available_h264_encoder():
@@ -41,8 +72,161 @@ def get_available_h264_encoder():
         return None
 
 
+def calculate_target_bitrates(target_size_bytes: int, duration: float) -> tuple[int, int]:
+    """
+    Split a target file size into video and audio bitrates
+
+    The audio budget shrinks for very small targets so most of the bits still
+    go to the picture; the container overhead and a safety margin are
+    subtracted first so the muxed file stays under the target.
+
+    Args:
+        target_size_bytes: Desired output size in bytes
+        duration: Video duration in seconds
+
+    Returns:
+        Tuple of (video_bitrate, audio_bitrate) in bits per second
+
+    Raises:
+        ValueError: If the target is too small for the video duration
+    """
+    if duration <= 0:
+        raise ValueError("Could not determine video duration")
+
+    media_bytes = target_size_bytes * (1 - VIDEO_TARGET_SIZE_OVERHEAD)
+    media_bytes -= VIDEO_TARGET_MUX_BYTES_PER_SECOND * duration
+    total_bitrate = media_bytes * 8 / duration
+
+    if total_bitrate >= 1_000_000:
+        audio_bitrate = 128_000
+    elif total_bitrate >= 300_000:
+        audio_bitrate = 64_000
+    else:
+        audio_bitrate = 32_000
+
+    video_bitrate = int(total_bitrate - audio_bitrate)
+    if video_bitrate < VIDEO_TARGET_MIN_VIDEO_BITRATE:
+        min_media_bytes = (VIDEO_TARGET_MIN_VIDEO_BITRATE + audio_bitrate) * duration / 8
+        min_size_mb = (
+            (min_media_bytes + VIDEO_TARGET_MUX_BYTES_PER_SECOND * duration)
+            / (1 - VIDEO_TARGET_SIZE_OVERHEAD)
+            / (1024 * 1024)
+        )
+        raise ValueError(
+            f"Target size is too small for a {duration:.0f}s video "
+            f"(at least {min_size_mb:.1f} MB required)"
+        )
+
+    return video_bitrate, audio_bitrate
+
+
+def get_target_size_error(target_size_mb: float, duration: Optional[float]) -> Optional[str]:
+    """
+    Why a video of `duration` seconds cannot be compressed to `target_size_mb`
+
+    Lets endpoints reject unreachable targets as client errors before
+    encoding. Returns None when the target can be reached.
+    """
+    try:
+        calculate_target_bitrates(int(target_size_mb * 1024 * 1024), duration or 0)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def get_passlog_prefix(output_path: Path) -> Path:
+    """Path prefix of the first-pass statistics files kept in TEMP_DIR"""
+    return TEMP_DIR / f"passlog_{output_path.stem}"
+
+
+def delete_passlog_files(passlog_prefix: Path):
+    """Delete the first-pass statistics files (log and mbtree)"""
+    for stats_file in passlog_prefix.parent.glob(f"{passlog_prefix.name}*"):
+        try:
+            stats_file.unlink()
+        except Exception:
+            pass
+
+
+def compress_video_to_size(
+    input_path: Path,
+    output_path: Path,
+    encoder: str,
+    target_size_mb: float,
+    preset: str = "medium",
+):
+    """
+    Encode a video to fit a target size
+
+    libx264 runs a two-pass encode at the computed bitrate so the size is hit
+    in a single job; other encoders fall back to a constrained single-pass
+    bitrate encode.
+
+    Raises:
+        ValueError: If the target is too small for the video duration
+        ffmpeg.Error: If FFmpeg fails
+    """
+    duration = float(ffmpeg.probe(str(input_path))["format"]["duration"])
+    video_bitrate, audio_bitrate = calculate_target_bitrates(
+        int(target_size_mb * 1024 * 1024), duration
+    )
+
+    rate_options = {
+        "c:v": encoder,
+        "b:v": video_bitrate,
+        "maxrate": video_bitrate,  # Cap peaks so the size limit is never overshot
+        "bufsize": video_bitrate * 2,
+    }
+    if encoder == "libx264":
+        rate_options["preset"] = preset
+
+    with core_budget.job() as threads:
+        rate_options.update(thread_options(threads, encoder))
+
+        if encoder != "libx264":
+            stream = ffmpeg.output(
+                ffmpeg.input(str(input_path)),
+                str(output_path),
+                **rate_options,
+                **{"c:a": "aac", "b:a": audio_bitrate},
+            )
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+            return
+
+        passlog_prefix = get_passlog_prefix(output_path)
+        try:
+            # First pass: analysis only, statistics are written to TEMP_DIR
+            first_pass = ffmpeg.output(
+                ffmpeg.input(str(input_path)),
+                os.devnull,
+                an=None,
+                f="null",
+                **rate_options,
+                **{"pass": 1, "passlogfile": str(passlog_prefix)},
+            )
+            ffmpeg.run(first_pass, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+
+            second_pass = ffmpeg.output(
+                ffmpeg.input(str(input_path)),
+                str(output_path),
+                **rate_options,
+                **{
+                    "pass": 2,
+                    "passlogfile": str(passlog_prefix),
+                    "c:a": "aac",
+                    "b:a": audio_bitrate,
+                },
+            )
+            ffmpeg.run(second_pass, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        finally:
+            delete_passlog_files(passlog_prefix)
+
+
 def compress_video(
-    input_path: Path, output_path: Path, quality: str = "medium"
+    input_path: Path,
+    output_path: Path,
+    quality: str = "medium",
+    target_size_mb: Optional[float] = None,
 ) -> VideoProcessingResponse:
     """
     Compress a video file using FFmpeg
@@ -51,6 +235,8 @@ def compress_video(
         input_path: Path to input video
         output_path: Path to save compressed video
         quality: Compression quality preset (low, medium, high)
+        target_size_mb: Target output size in MB; uses a two-pass bitrate
+            encode instead of the CRF preset when set
 
     Returns:
         VideoProcessingResponse with compression results
@@ -72,6 +258,22 @@ def compress_video(
                 filename=output_path.name if output_path else None,
             )
 
+        if target_size_mb:
+            compress_video_to_size(
+                input_path, output_path, encoder, target_size_mb, preset["preset"]
+            )
+
+            compressed_size = get_file_size(output_path)
+            return VideoProcessingResponse(
+                success=True,
+                message=f"Video compressed successfully to fit {target_size_mb:g} MB",
+                filename=output_path.name,
+                download_url=f"/api/v1/download/{output_path.name}",
+                original_size=original_size,
+                processed_size=compressed_size,
+                compression_ratio=calculate_compression_ratio(original_size, compressed_size),
+            )
+
         # Compress video using FFmpeg
         stream = ffmpeg.input(str(input_path))
 
@@ -88,8 +290,11 @@ def compress_video(
             quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
             output_options["b:v"] = quality_map.get(quality, "2.5M")
 
-        stream = ffmpeg.output(stream, str(output_path), **output_options)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        # Limit FFmpeg to this job's share of the cores
+        with core_budget.job() as threads:
+            output_options.update(thread_options(threads, encoder))
+            stream = ffmpeg.output(stream, str(output_path), **output_options)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
         # Get compressed file size
         compressed_size = get_file_size(output_path)
@@ -121,6 +326,27 @@ def compress_video(
         )
 
 
+def get_video_convert_options(encoder: str, quality: str = "medium") -> dict:
+    """Get the FFmpeg output options converting a video with an H.264 encoder"""
+    # Get compression preset
+    preset = VIDEO_COMPRESSION_PRESETS.get(quality, VIDEO_COMPRESSION_PRESETS["medium"])
+
+    # Build output options based on encoder
+    output_options = {"c:v": encoder, "c:a": "aac", "b:a": "128k"}
+
+    # Add quality parameters based on encoder type
+    if encoder == "libx264":
+        # libx264: Use CRF (Constant Rate Factor) - best quality
+        output_options["crf"] = preset["crf"]
+        output_options["preset"] = preset["preset"]
+    elif encoder in ["libopenh264", "h264_vaapi"]:
+        # Bitrate-based encoders
+        quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
+        output_options["b:v"] = quality_map.get(quality, "2.5M")
+
+    return output_options
+
+
 def convert_video(
     input_path: Path, output_path: Path, output_format: str, quality: str = "medium"
 ) -> VideoProcessingResponse:
@@ -140,9 +366,6 @@ def convert_video(
         # Get original file size
         original_size = get_file_size(input_path)
 
-        # Get compression preset
-        preset = VIDEO_COMPRESSION_PRESETS.get(quality, VIDEO_COMPRESSION_PRESETS["medium"])
-
         # Detect available H.264 encoder
         encoder = get_available_h264_encoder()
 
@@ -155,22 +378,13 @@ def convert_video(
 
         # Convert video using FFmpeg
         stream = ffmpeg.input(str(input_path))
+        output_options = get_video_convert_options(encoder, quality)
 
-        # Build output options based on encoder
-        output_options = {"c:v": encoder, "c:a": "aac", "b:a": "128k"}
-
-        # Add quality parameters based on encoder type
-        if encoder == "libx264":
-            # libx264: Use CRF (Constant Rate Factor) - best quality
-            output_options["crf"] = preset["crf"]
-            output_options["preset"] = preset["preset"]
-        elif encoder in ["libopenh264", "h264_vaapi"]:
-            # Bitrate-based encoders
-            quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
-            output_options["b:v"] = quality_map.get(quality, "2.5M")
-
-        stream = ffmpeg.output(stream, str(output_path), **output_options)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        # Limit FFmpeg to this job's share of the cores
+        with core_budget.job() as threads:
+            output_options.update(thread_options(threads, encoder))
+            stream = ffmpeg.output(stream, str(output_path), **output_options)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
         # Get converted file size
         converted_size = get_file_size(output_path)
@@ -257,8 +471,11 @@ def rotate_video(input_path: Path, output_path: Path, angle: int) -> VideoProces
         elif encoder in ["libopenh264", "h264_vaapi"]:
             output_options["b:v"] = "2.5M"
 
-        stream = ffmpeg.output(stream, str(output_path), **output_options)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        # Limit FFmpeg to this job's share of the cores
+        with core_budget.job() as threads:
+            output_options.update(thread_options(threads, encoder))
+            stream = ffmpeg.output(stream, str(output_path), **output_options)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
         # Get rotated file size
         rotated_size = get_file_size(output_path)
@@ -288,47 +505,164 @@ def rotate_video(input_path: Path, output_path: Path, angle: int) -> VideoProces
         )
 
 
+def get_audio_streams(input_path: Path) -> Optional[list[dict]]:
+    """Probe the audio streams of a file, or None when it cannot be probed"""
+    try:
+        info = probe_media(input_path)
+    except Exception:
+        return None
+    return [s for s in info.get("streams", []) if s.get("codec_type") == "audio"]
+
+
+def get_native_audio_format(codec_name: Optional[str]) -> Optional[str]:
+    """Output format a codec can be stream-copied into, or None"""
+    for output_format, codecs in AUDIO_EXTRACT_PASSTHROUGH.items():
+        if codec_name in codecs:
+            return output_format
+    return None
+
+
+def plan_audio_extraction(
+    input_path: Path,
+    output_path: Path,
+    output_format: str = "mp3",
+    bitrate: str = "192k",
+    all_tracks: bool = False,
+    passthrough: bool = True,
+) -> list[dict]:
+    """
+    Decide, per audio track, the output file and whether it can be stream-copied
+
+    A track is copied when its codec fits the target container (e.g. AAC into
+    m4a, MP3 into mp3), which makes extraction I/O-bound. With output_format
+    "auto" every track goes into the container native to its codec. When the
+    input cannot be probed, the first track is re-encoded.
+
+    Returns:
+        List of dicts with the audio stream index, output path, FFmpeg output
+        options and whether the track is copied
+
+    Raises:
+        ValueError: If the format is unsupported or there is no audio
+    """
+    output_format = output_format.lower()
+    if output_format != "auto" and output_format not in AUDIO_EXTRACT_ENCODERS:
+        raise ValueError("Unsupported output audio format")
+
+    streams = get_audio_streams(input_path)
+    if streams is None:
+        streams = [{}]
+    if not streams:
+        raise ValueError("No audio stream found")
+    if not all_tracks:
+        streams = streams[:1]
+
+    plan = []
+    for index, stream in enumerate(streams):
+        codec_name = stream.get("codec_name")
+        track_format = output_format
+        if track_format == "auto":
+            track_format = get_native_audio_format(codec_name) or "m4a"
+
+        copy = passthrough and codec_name in AUDIO_EXTRACT_PASSTHROUGH[track_format]
+        options = {"vn": None, "acodec": "copy" if copy else AUDIO_EXTRACT_ENCODERS[track_format]}
+        # Bitrate only if relevant
+        if not copy and track_format in ("mp3", "ogg", "m4a"):
+            options["b:a"] = bitrate
+        if track_format == "m4a":
+            options["f"] = "ipod"
+
+        if len(streams) > 1:
+            language = stream.get("tags", {}).get("language")
+            suffix = f"_{language}" if language and language != "und" else ""
+            track_path = output_path.with_name(
+                f"{output_path.stem}_track{index + 1}{suffix}.{track_format}"
+            )
+        else:
+            track_path = output_path.with_suffix(f".{track_format}")
+
+        plan.append({"stream": index, "path": track_path, "options": options, "copy": copy})
+
+    return plan
+
+
+def build_audio_extraction_output(input_path: Path, plan: list[dict], threads: int = 1):
+    """Build one FFmpeg run writing every planned audio track"""
+    source = ffmpeg.input(str(input_path))
+    outputs = []
+    for track in plan:
+        options = dict(track["options"])
+        if not track["copy"]:
+            options.update(thread_options(threads))
+        stream = source[f"a:{track['stream']}"] if len(plan) > 1 else source
+        outputs.append(ffmpeg.output(stream, str(track["path"]), **options))
+    return outputs[0] if len(outputs) == 1 else ffmpeg.merge_outputs(*outputs)
+
+
+def finalize_audio_extraction(plan: list[dict], output_path: Path) -> tuple[Path, str]:
+    """
+    Bundle multi-track extractions into a ZIP and describe the result
+
+    Returns:
+        Tuple of (path of the file to download, result message)
+    """
+    copied = sum(track["copy"] for track in plan)
+    if len(plan) == 1:
+        mode = "stream copy" if copied else "re-encoded"
+        return plan[0]["path"], f"Audio extracted successfully ({mode})"
+
+    archive_path = output_path.with_suffix(".zip")
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for track in plan:
+            archive.write(track["path"], track["path"].name)
+            track["path"].unlink(missing_ok=True)
+
+    return archive_path, f"Extracted {len(plan)} audio tracks ({copied} stream-copied)"
+
+
 def extract_audio(
-    input_path: Path, output_path: Path, output_format: str = "mp3", bitrate: str = "192k"
+    input_path: Path,
+    output_path: Path,
+    output_format: str = "mp3",
+    bitrate: str = "192k",
+    all_tracks: bool = False,
+    passthrough: bool = True,
 ) -> VideoProcessingResponse:
     """
     Extract audio from a video file and export to the desired audio format.
+
+    Tracks whose codec already fits the target container are stream-copied
+    instead of re-encoded; the others are encoded at `bitrate`. With
+    all_tracks, every audio stream is extracted in the same FFmpeg run and
+    the files are returned as a ZIP.
     """
+    plan = []
     try:
         original_size = get_file_size(input_path)
 
-        # Map codecs per format
-        codec_map = {
-            "mp3": "libmp3lame",
-            "wav": "pcm_s16le",
-            "flac": "flac",
-            "ogg": "libvorbis",
-        }
-
-        codec = codec_map.get(output_format.lower())
-        if codec is None:
+        try:
+            plan = plan_audio_extraction(
+                input_path, output_path, output_format, bitrate, all_tracks, passthrough
+            )
+        except ValueError as e:
             return VideoProcessingResponse(
                 success=False,
-                message="Unsupported output audio format",
+                message=str(e),
                 filename=output_path.name if output_path else None,
             )
 
-        stream = ffmpeg.input(str(input_path))
-        output_kwargs = {"vn": None, "acodec": codec}
-        # Bitrate only if relevant
-        if output_format.lower() in ["mp3", "ogg"]:
-            output_kwargs["b:a"] = bitrate
-
-        stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
-        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        with core_budget.job() as threads:
+            stream = build_audio_extraction_output(input_path, plan, threads)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
-        processed_size = get_file_size(output_path)
+        result_path, message = finalize_audio_extraction(plan, output_path)
+        processed_size = get_file_size(result_path)
 
         return VideoProcessingResponse(
             success=True,
-            message="Audio extracted successfully",
-            filename=output_path.name,
-            download_url=f"/api/v1/download/{output_path.name}",
+            message=message,
+            filename=result_path.name,
+            download_url=f"/api/v1/download/{result_path.name}",
             original_size=original_size,
             processed_size=processed_size,
         )
@@ -349,6 +683,175 @@ def extract_audio(
         )
 
 
+def get_palette_cache_path(
+    input_path: Path,
+    start_time: float,
+    duration: Optional[float],
+    fps: int,
+    width: Optional[int],
+) -> Optional[Path]:
+    """
+    Path of the cached GIF palette for this content and segment
+
+    The palette only depends on the frames that go into it, so re-rendering
+    the same segment with another loop or dither setting reuses it. Returns
+    None when the input cannot be fingerprinted (caching is then skipped).
+    """
+    try:
+        fingerprint = get_file_fingerprint(input_path)
+    except OSError:
+        return None
+
+    key = f"{fingerprint}:{start_time}:{duration}:{fps}:{width}"
+    return TEMP_DIR / f"palette_{hashlib.sha256(key.encode()).hexdigest()[:24]}.png"
+
+
+def get_avif_encoder() -> Optional[str]:
+    """Return the AV1 encoder used for animated AVIF, or None when FFmpeg lacks it"""
+    try:
+        result = subprocess.run(["ffmpeg", "-encoders"], capture_output=True, text=True)
+        return "libaom-av1" if "libaom-av1" in result.stdout else None
+    except Exception:
+        return None
+
+
+def validate_animation_options(
+    start_time: float,
+    duration: Optional[float],
+    width: Optional[int],
+    fps: int,
+    output_format: str = "gif",
+    preset: str = "balanced",
+    dither: str = "sierra2_4a",
+) -> Optional[str]:
+    """Return an error message for invalid animated image options, or None"""
+    if start_time < 0:
+        return "start_time must be non-negative"
+    if duration is not None and duration <= 0:
+        return "duration must be greater than 0 when provided"
+    if fps < 1 or fps > 60:
+        return "fps must be between 1 and 60"
+    if width is not None and width < 32:
+        return "width must be at least 32 pixels"
+    if output_format not in ANIMATED_IMAGE_FORMATS:
+        return f"output_format must be one of: {', '.join(ANIMATED_IMAGE_FORMATS)}"
+    if output_format != "gif" and preset not in ANIMATED_IMAGE_PRESETS[output_format]:
+        return f"preset must be one of: {', '.join(ANIMATED_IMAGE_PRESETS[output_format])}"
+    if output_format == "gif" and dither not in GIF_DITHER_MODES:
+        return f"dither must be one of: {', '.join(GIF_DITHER_MODES)}"
+    return None
+
+
+def build_animation_output(
+    input_path: Path,
+    output_path: Path,
+    start_time: float = 0.0,
+    duration: Optional[float] = None,
+    width: Optional[int] = None,
+    fps: int = 12,
+    loop: bool = True,
+    output_format: str = "gif",
+    preset: str = "balanced",
+    dither: str = "sierra2_4a",
+    threads: int = 1,
+) -> tuple:
+    """
+    Build the FFmpeg graph rendering a video segment as an animated image
+
+    GIFs use palettegen/paletteuse. When a palette for the segment is cached
+    it is fed straight to paletteuse, skipping the analysis; otherwise the
+    generated palette is also written out (to a temporary name) in the same
+    run. WebP and AVIF encode the frames directly with the preset options.
+
+    Returns:
+        Tuple of (ffmpeg output node, palette file written by this run or None)
+
+    Raises:
+        ValueError: If AVIF is requested but FFmpeg has no AV1 encoder
+    """
+    input_kwargs = {}
+    if start_time:
+        input_kwargs["ss"] = start_time
+    if duration:
+        input_kwargs["t"] = duration
+
+    stream = ffmpeg.input(str(input_path), **input_kwargs)
+    stream = ffmpeg.filter(stream, "fps", fps)
+
+    if width:
+        stream = ffmpeg.filter(
+            stream, "scale", width, -2 if output_format != "gif" else -1, flags="lanczos"
+        )
+
+    if output_format == "webp":
+        options = ANIMATED_IMAGE_PRESETS["webp"][preset]
+        output = ffmpeg.output(
+            stream,
+            str(output_path),
+            vcodec="libwebp_anim",
+            pix_fmt="yuv420p",
+            loop=0 if loop else 1,
+            **options,
+            **thread_options(threads),
+        )
+        return output, None
+
+    if output_format == "avif":
+        encoder = get_avif_encoder()
+        if encoder is None:
+            raise ValueError("AVIF output requires FFmpeg built with libaom-av1")
+        output = ffmpeg.output(
+            stream,
+            str(output_path),
+            vcodec=encoder,
+            pix_fmt="yuv420p",
+            f="avif",
+            loop=0 if loop else 1,
+            **{"row-mt": 1, "still-picture": 0},
+            **ANIMATED_IMAGE_PRESETS["avif"][preset],
+            **thread_options(threads),
+        )
+        return output, None
+
+    palette_path = get_palette_cache_path(input_path, start_time, duration, fps, width)
+    gif_options = {"loop": 0 if loop else 1, **thread_options(threads)}
+
+    if palette_path is not None and palette_path.exists():
+        # Keep palettes in use from being cleaned up
+        os.utime(palette_path)
+        palette = ffmpeg.input(str(palette_path))
+        palette_use = ffmpeg.filter([stream, palette], "paletteuse", dither=dither)
+        return ffmpeg.output(palette_use, str(output_path), **gif_options), None
+
+    split_streams = stream.filter_multi_output("split")
+    palette = split_streams[0].filter("palettegen")
+
+    if palette_path is None:
+        palette_use = ffmpeg.filter([split_streams[1], palette], "paletteuse", dither=dither)
+        return ffmpeg.output(palette_use, str(output_path), **gif_options), None
+
+    palettes = palette.filter_multi_output("split")
+    palette_use = ffmpeg.filter([split_streams[1], palettes[0]], "paletteuse", dither=dither)
+    # Unique per run: concurrent renders of the same segment must not share it
+    partial_palette = palette_path.with_name(
+        f"{palette_path.stem}.partial-{uuid.uuid4().hex[:12]}.png"
+    )
+    output = ffmpeg.merge_outputs(
+        ffmpeg.output(palette_use, str(output_path), **gif_options),
+        ffmpeg.output(palettes[1], str(partial_palette), **{"frames:v": 1}),
+    )
+    return output, partial_palette
+
+
+def store_palette(partial_palette: Optional[Path]):
+    """Move a palette written by a successful run into the palette cache"""
+    if partial_palette is not None and partial_palette.exists():
+        os.replace(
+            partial_palette,
+            partial_palette.with_name(f"{partial_palette.name.split('.partial-')[0]}.png"),
+        )
+
+
 def video_to_gif(
     input_path: Path,
     output_path: Path,
@@ -357,80 +860,69 @@ def video_to_gif(
     width: Optional[int] = None,
     fps: int = 12,
     loop: bool = True,
+    output_format: str = "gif",
+    preset: str = "balanced",
+    dither: str = "sierra2_4a",
 ) -> VideoProcessingResponse:
     """
-    Convert a video segment to an animated GIF using FFmpeg with palette optimization.
+    Convert a video segment to an animated image (GIF, WebP or AVIF).
+
+    Animated WebP and AVIF are several times smaller than GIF and faster to
+    encode. GIF palettes are cached per segment, so re-rendering with other
+    loop or dither settings skips the palette analysis.
 
     Args:
         input_path: Path to input video.
-        output_path: Path to save generated GIF.
+        output_path: Path to save generated animation.
         start_time: Start time in seconds.
         duration: Duration in seconds (optional).
         width: Target width in pixels (maintains aspect ratio).
-        fps: Frames per second for the GIF.
-        loop: Whether the GIF should loop indefinitely.
+        fps: Frames per second for the animation.
+        loop: Whether the animation should loop indefinitely.
+        output_format: gif, webp or avif.
+        preset: Speed/size preset for WebP and AVIF (fast, balanced, small).
+        dither: GIF dithering mode.
 
     Returns:
         VideoProcessingResponse with conversion results.
     """
+    partial_palette = None
     try:
         # Basic validation to avoid expensive FFmpeg runs for invalid params
-        if start_time < 0:
-            return VideoProcessingResponse(
-                success=False,
-                message="start_time must be non-negative",
-                filename=output_path.name if output_path else None,
-            )
-
-        if duration is not None and duration <= 0:
-            return VideoProcessingResponse(
-                success=False,
-                message="duration must be greater than 0 when provided",
-                filename=output_path.name if output_path else None,
-            )
-
-        if fps < 1 or fps > 60:
-            return VideoProcessingResponse(
-                success=False,
-                message="fps must be between 1 and 60",
-                filename=output_path.name if output_path else None,
-            )
-
-        if width is not None and width < 32:
+        error = validate_animation_options(
+            start_time, duration, width, fps, output_format, preset, dither
+        )
+        if error:
             return VideoProcessingResponse(
                 success=False,
-                message="width must be at least 32 pixels",
+                message=error,
                 filename=output_path.name if output_path else None,
             )
 
         original_size = get_file_size(input_path)
 
-        input_kwargs = {}
-        if start_time:
-            input_kwargs["ss"] = start_time
-        if duration:
-            input_kwargs["t"] = duration
-
-        # Build the FFmpeg pipeline with palette optimization
-        stream = ffmpeg.input(str(input_path), **input_kwargs)
-        stream = ffmpeg.filter(stream, "fps", fps)
-
-        if width:
-            stream = ffmpeg.filter(stream, "scale", width, -1, flags="lanczos")
-
-        split_streams = stream.filter_multi_output("split")
-        palette = split_streams[0].filter("palettegen")
-        palette_use = ffmpeg.filter([split_streams[1], palette], "paletteuse")
-
-        # loop=0 => infinite loop, loop=1 => play once then stop
-        output = ffmpeg.output(palette_use, str(output_path), loop=0 if loop else 1)
-        ffmpeg.run(output, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        with core_budget.job() as threads:
+            output, partial_palette = build_animation_output(
+                input_path,
+                output_path,
+                start_time,
+                duration,
+                width,
+                fps,
+                loop,
+                output_format,
+                preset,
+                dither,
+                threads,
+            )
+            ffmpeg.run(output, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
+        store_palette(partial_palette)
         processed_size = get_file_size(output_path)
 
         return VideoProcessingResponse(
             success=True,
-            message="GIF created successfully",
+            message=f"{output_format.upper()} created successfully",
             filename=output_path.name,
             download_url=f"/api/v1/download/{output_path.name}",
             original_size=original_size,
@@ -448,10 +940,14 @@ def video_to_gif(
     except Exception as e:
         return VideoProcessingResponse(
             success=False,
-            message=f"Error converting video to GIF: {str(e)}",
+            message=f"Error converting video to {output_format.upper()}: {str(e)}",
             filename=output_path.name if output_path else None,
         )
 
+    finally:
+        if partial_palette is not None and partial_palette.exists():
+            partial_palette.unlink(missing_ok=True)
+
 
 def merge_videos(
     input_paths: list[Path],
@@ -533,8 +1029,12 @@ def merge_videos(
                     quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
                     output_options["b:v"] = quality_map.get(quality, "2.5M")
 
-            stream = ffmpeg.output(stream, str(output_path), **output_options)
-            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+            # Limit FFmpeg to this job's share of the cores
+            with core_budget.job() as threads:
+                if merge_mode != "fast":
+                    output_options.update(thread_options(threads, encoder))
+                stream = ffmpeg.output(stream, str(output_path), **output_options)
+                ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
 
             # Get merged file size
             merged_size = get_file_size(output_path)
@@ -570,3 +1070,672 @@ def merge_videos(
             message=f"Error merging videos: {str(e)}",
             filename=output_path.name if output_path else None,
         )
+
+
+def get_trim_scan_intervals(
+    start_time: float, end_time: Optional[float]
+) -> list[tuple[float, float]]:
+    """Windows of the timeline scanned for keyframes around the trim cut points"""
+    window = VIDEO_TRIM_KEYFRAME_WINDOW
+    if end_time is None:
+        return [(start_time - window, start_time + window)]
+    if end_time - start_time <= 2 * window:
+        return [(start_time - window, end_time + window)]
+    return [(start_time - window, start_time + window), (end_time - window, end_time + window)]
+
+
+def get_trim_keyframes(
+    input_path: Path, start_time: float, end_time: Optional[float]
+) -> list[tuple[float, float]]:
+    """
+    Get the (pts, dts) keyframe times around the trim cut points
+
+    Falls back to scanning from the start of the file when the GOP is longer
+    than the scan window and no keyframe precedes the start cut.
+    """
+    keyframes = get_keyframe_index(input_path, get_trim_scan_intervals(start_time, end_time))
+    if start_time > 0 and not any(pts <= start_time + TRIM_SEEK_EPSILON for pts, _ in keyframes):
+        leading = get_keyframe_index(input_path, [(0.0, start_time + TRIM_SEEK_EPSILON)])
+        keyframes = sorted(set(leading) | set(keyframes))
+    return keyframes
+
+
+def plan_trim(
+    keyframes: list[tuple[float, float]],
+    start_time: float,
+    end_time: Optional[float],
+    smart: bool = False,
+) -> list[tuple[str, float, Optional[float]]]:
+    """
+    Split a trim range into stream-copied and re-encoded parts
+
+    Without smart mode the whole range is stream-copied from the keyframe at
+    or before start_time. In smart mode the complete GOPs inside the range
+    are copied and only the partial GOPs at the edges are re-encoded, which
+    makes the cut frame-accurate at the cost of encoding a few frames.
+
+    Args:
+        keyframes: Sorted (pts, dts) keyframe times in seconds
+        start_time: Start of the range in seconds
+        end_time: End of the range in seconds (None for end of file)
+        smart: Re-encode the partial GOPs at the edges
+
+    Returns:
+        List of (mode, start, stop) parts where mode is "copy" or "encode".
+        Copy parts start on a keyframe and stop before the packet whose decode
+        timestamp is `stop`; a stop of None means end of file.
+    """
+    eps = TRIM_SEEK_EPSILON
+
+    if not smart:
+        preceding = [pts for pts, _ in keyframes if pts <= start_time + eps]
+        return [("copy", preceding[-1] if preceding else 0.0, end_time)]
+
+    inner = [
+        (pts, dts)
+        for pts, dts in keyframes
+        if pts >= start_time - eps and (end_time is None or pts < end_time - eps)
+    ]
+    if not inner:
+        return [("encode", start_time, end_time)]
+
+    parts: list[tuple[str, float, Optional[float]]] = []
+    first_pts = inner[0][0]
+    if first_pts > start_time + eps:
+        parts.append(("encode", start_time, first_pts))
+
+    if end_time is None:
+        parts.append(("copy", first_pts, None))
+        return parts
+
+    end_keyframe = [dts for pts, dts in keyframes if abs(pts - end_time) <= eps]
+    if end_keyframe:
+        parts.append(("copy", first_pts, end_keyframe[0]))
+    elif len(inner) == 1:
+        # No complete GOP inside the range: encoding it in one go is simplest
+        return [("encode", start_time, end_time)]
+    else:
+        last_pts, last_dts = inner[-1]
+        parts.append(("copy", first_pts, last_dts))
+        parts.append(("encode", last_pts, end_time))
+
+    return parts
+
+
+def get_trim_part_window(
+    mode: str, start: float, stop: Optional[float]
+) -> tuple[float, Optional[float]]:
+    """
+    Get the input seek position and output duration of a trim part
+
+    Copy parts seek just past their keyframe so the demuxer lands exactly on
+    it, and stop just before the cutoff decode timestamp.
+    """
+    if mode == "copy":
+        seek = round(start + TRIM_SEEK_EPSILON, 6)
+        if stop is None:
+            return seek, None
+        return seek, round(stop - seek - TRIM_SEEK_EPSILON / 2, 6)
+    return start, round(stop - start, 6) if stop is not None else None
+
+
+def get_trim_edge_options(video_stream: dict) -> Optional[dict]:
+    """
+    Get the FFmpeg options for re-encoding the edges of a smart trim
+
+    The edges are encoded with the source's codec, profile and pixel format
+    so the re-encoded and the copied GOPs can be concatenated. Returns None
+    when no matching encoder is available.
+    """
+    encoder = VIDEO_TRIM_EDGE_ENCODERS.get(video_stream.get("codec_name"))
+    if encoder is None:
+        return None
+
+    try:
+        result = subprocess.run(["ffmpeg", "-encoders"], capture_output=True, text=True)
+        if encoder not in result.stdout:
+            return None
+    except Exception:
+        return None
+
+    preset = VIDEO_COMPRESSION_PRESETS["high"]
+    options = {"c:v": encoder, "crf": preset["crf"], "preset": preset["preset"]}
+    if video_stream.get("pix_fmt"):
+        options["pix_fmt"] = video_stream["pix_fmt"]
+
+    profile = video_stream.get("profile", "").lower().replace("constrained ", "").replace(" ", "")
+    if profile in {"baseline", "main", "high", "high10", "main10"}:
+        options["profile:v"] = profile
+
+    return options
+
+
+def prepare_trim(
+    input_path: Path, start_time: float, end_time: Optional[float], smart: bool = False
+) -> dict:
+    """
+    Probe a video and plan its trim
+
+    Returns:
+        Dict with the planned parts, the effective end time (None for end of
+        file), the source duration, the edge encoder options, whether there is audio and a note
+        explaining any deviation from the requested cut
+
+    Raises:
+        ValueError: If the range is invalid for this video
+    """
+    if start_time < 0:
+        raise ValueError("start_time must be non-negative")
+    if end_time is not None and end_time <= start_time:
+        raise ValueError("end_time must be greater than start_time")
+
+    info = probe_media(input_path)
+    video_stream = next((s for s in info["streams"] if s.get("codec_type") == "video"), None)
+    if video_stream is None:
+        raise ValueError("No video stream found")
+
+    duration = float(info.get("format", {}).get("duration") or 0)
+    if duration and start_time >= duration:
+        raise ValueError(f"start_time is beyond the end of the video ({duration:.2f}s)")
+    if end_time is not None and duration and end_time >= duration:
+        end_time = None
+
+    note = None
+    edge_options = None
+    if smart:
+        edge_options = get_trim_edge_options(video_stream)
+        if edge_options is None:
+            note = f"smart trim is not available for {video_stream.get('codec_name')}, cut at keyframes"
+
+    parts = plan_trim(
+        get_trim_keyframes(input_path, start_time, end_time),
+        start_time,
+        end_time,
+        smart=edge_options is not None,
+    )
+    if edge_options is None and parts[0][1] < start_time - TRIM_SEEK_EPSILON:
+        note = note or f"start snapped to the keyframe at {parts[0][1]:.3f}s"
+
+    return {
+        "parts": parts,
+        "end_time": end_time,
+        "duration": duration,
+        "edge_options": edge_options,
+        "has_audio": any(s.get("codec_type") == "audio" for s in info["streams"]),
+        "note": note,
+    }
+
+
+def trim_video(
+    input_path: Path,
+    output_path: Path,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    smart: bool = False,
+) -> VideoProcessingResponse:
+    """
+    Cut a segment out of a video without re-encoding it
+
+    The input is seeked (not decoded) to the cut point and the streams are
+    copied, so the time taken depends on the clip length rather than the
+    position in the source. With smart mode the partial GOPs at the edges
+    are re-encoded to make the cut frame-accurate.
+
+    Args:
+        input_path: Path to input video
+        output_path: Path to save the trimmed video (same container as the input)
+        start_time: Start of the segment in seconds
+        end_time: End of the segment in seconds (None for end of file)
+        smart: Re-encode the edges for a frame-accurate cut
+
+    Returns:
+        VideoProcessingResponse with trim results
+    """
+    try:
+        original_size = get_file_size(input_path)
+        plan = prepare_trim(input_path, start_time, end_time, smart)
+        parts = plan["parts"]
+        end_time = plan["end_time"]
+
+        if len(parts) == 1 and parts[0][0] == "copy":
+            seek, duration = get_trim_part_window(*parts[0])
+            source = ffmpeg.input(str(input_path), ss=seek)
+            streams = [source["v:0"]] + ([source["a"]] if plan["has_audio"] else [])
+            output_options = {"c": "copy", "avoid_negative_ts": "make_zero"}
+            if duration is not None:
+                output_options["t"] = duration
+            stream = ffmpeg.output(*streams, str(output_path), **output_options)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        else:
+            trim_video_parts(input_path, output_path, plan, start_time)
+
+        message = "Video trimmed successfully"
+        if plan["note"]:
+            message += f" ({plan['note']})"
+
+        return VideoProcessingResponse(
+            success=True,
+            message=message,
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+        )
+
+    except ffmpeg.Error as e:
+        error_message = e.stderr.decode() if e.stderr else str(e)
+        return VideoProcessingResponse(
+            success=False,
+            message=f"FFmpeg error: {error_message}",
+            filename=output_path.name if output_path else None,
+        )
+
+    except Exception as e:
+        return VideoProcessingResponse(
+            success=False,
+            message=f"Error trimming video: {str(e)}",
+            filename=output_path.name if output_path else None,
+        )
+
+
+def trim_video_parts(input_path: Path, output_path: Path, plan: dict, start_time: float):
+    """
+    Run a smart trim: encode/copy each part, then stitch them with the audio
+
+    The video parts are concatenated with the concat demuxer and the audio
+    is stream-copied from the source in one piece, so there are no gaps at
+    the joins.
+
+    Raises:
+        ffmpeg.Error: If FFmpeg fails
+    """
+    work_dir = TEMP_DIR / f"trim_{output_path.stem}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        with core_budget.job() as threads:
+            part_paths = []
+            for index, (mode, start, stop) in enumerate(plan["parts"]):
+                seek, duration = get_trim_part_window(mode, start, stop)
+                part_path = work_dir / f"part_{index:03d}.mkv"
+
+                if mode == "copy":
+                    output_options = {"c": "copy"}
+                else:
+                    output_options = {
+                        **plan["edge_options"],
+                        **thread_options(threads, plan["edge_options"]["c:v"]),
+                    }
+                if duration is not None:
+                    output_options["t"] = duration
+
+                source = ffmpeg.input(str(input_path), ss=seek)
+                stream = ffmpeg.output(source["v:0"], str(part_path), **output_options)
+                ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+                part_paths.append(part_path)
+
+            concat_file = work_dir / "parts.txt"
+            concat_file.write_text("".join(f"file '{path.name}'\n" for path in part_paths))
+
+            streams = [ffmpeg.input(str(concat_file), format="concat", safe=0)["v"]]
+            if plan["has_audio"]:
+                audio_options = {"ss": start_time}
+                if plan["end_time"] is not None:
+                    audio_options["t"] = plan["end_time"] - start_time
+                streams.append(ffmpeg.input(str(input_path), **audio_options)["a"])
+
+            stream = ffmpeg.output(*streams, str(output_path), c="copy")
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def get_thumbnail_times(duration: float, count: int) -> list[float]:
+    """Evenly spaced thumbnail positions, each in the middle of its slice of the video"""
+    return [round(duration * (index + 0.5) / count, 3) for index in range(count)]
+
+
+def format_vtt_timestamp(seconds: float) -> str:
+    """Format seconds as a WebVTT timestamp (HH:MM:SS.mmm)"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+def build_sprite_vtt(
+    sprite_name: str, duration: float, count: int, columns: int, tile_width: int, tile_height: int
+) -> str:
+    """
+    Build the WebVTT index of a sprite sheet
+
+    Each cue covers one slice of the timeline and points at its tile with a
+    media fragment (sprite.jpg#xywh=x,y,w,h), as used by scrubbing previews.
+    """
+    lines = ["WEBVTT", ""]
+    for index in range(count):
+        start = duration * index / count
+        end = duration * (index + 1) / count
+        x = (index % columns) * tile_width
+        y = (index // columns) * tile_height
+        lines.append(f"{format_vtt_timestamp(start)} --> {format_vtt_timestamp(end)}")
+        lines.append(f"{sprite_name}#xywh={x},{y},{tile_width},{tile_height}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def get_thumbnail_archive_name(input_path: Path, **options) -> str:
+    """
+    Name of the thumbnail archive cached in TEMP_DIR for this content and options
+
+    Identical uploads with identical options map to the same archive, so the
+    extraction only runs once while the archive is kept in TEMP_DIR.
+    """
+    key = get_file_fingerprint(input_path) + repr(sorted(options.items()))
+    return f"thumbnails_{hashlib.sha256(key.encode()).hexdigest()[:24]}.zip"
+
+
+def extract_thumbnails(
+    input_path: Path,
+    output_path: Path,
+    mode: str = "grid",
+    count: int = 10,
+    width: int = 320,
+    image_format: str = "jpg",
+    columns: int = 5,
+    scene_threshold: float = 0.4,
+) -> VideoProcessingResponse:
+    """
+    Extract thumbnails from a video into a ZIP archive with a manifest
+
+    Everything comes out of a single FFmpeg run:
+    - grid: `count` evenly spaced thumbnails. Every position is a separate
+      input-side seek, and the thumbnail filter picks the most representative
+      of the first frames there (skipping black or blurred frames).
+    - sprite: the same frames tiled into one sheet, plus a WebVTT index.
+    - scenes: up to `count` scene-change frames. Only keyframes are decoded
+      and compared, which is where encoders place scene cuts.
+
+    Args:
+        input_path: Path to input video
+        output_path: Path of the ZIP archive to create
+        mode: grid, sprite or scenes
+        count: Number of thumbnails (maximum for scenes)
+        width: Thumbnail width in pixels (height keeps the aspect ratio)
+        image_format: jpg, png or webp
+        columns: Sprite sheet columns
+        scene_threshold: Scene change score (0-1) above which a frame is kept
+
+    Returns:
+        VideoProcessingResponse with extraction results
+    """
+    work_dir = TEMP_DIR / f"thumbs_{output_path.stem}"
+    try:
+        if mode not in ("grid", "sprite", "scenes"):
+            return VideoProcessingResponse(
+                success=False,
+                message="mode must be one of: grid, sprite, scenes",
+                filename=output_path.name,
+            )
+
+        if count < 1 or count > VIDEO_THUMBNAIL_MAX_COUNT:
+            return VideoProcessingResponse(
+                success=False,
+                message=f"count must be between 1 and {VIDEO_THUMBNAIL_MAX_COUNT}",
+                filename=output_path.name,
+            )
+
+        original_size = get_file_size(input_path)
+        info = probe_media(input_path)
+        video_stream = next((s for s in info["streams"] if s.get("codec_type") == "video"), None)
+        if video_stream is None:
+            return VideoProcessingResponse(
+                success=False, message="No video stream found", filename=output_path.name
+            )
+
+        duration = float(info.get("format", {}).get("duration") or 0)
+        if duration <= 0 and mode != "scenes":
+            return VideoProcessingResponse(
+                success=False,
+                message="Could not determine video duration",
+                filename=output_path.name,
+            )
+
+        # Even dimensions keep every encoder and the tile layout happy
+        source_width = int(video_stream.get("width") or width)
+        source_height = int(video_stream.get("height") or width)
+        tile_width = max(2, min(width, source_width) // 2 * 2)
+        tile_height = max(2, int(round(tile_width * source_height / source_width / 2)) * 2)
+
+        work_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "mode": mode,
+            "duration": duration,
+            "width": tile_width,
+            "height": tile_height,
+        }
+
+        with core_budget.job() as threads:
+            if mode == "scenes":
+                stream = (
+                    ffmpeg.input(str(input_path), skip_frame="nokey")
+                    .video.filter("select", f"eq(n,0)+gt(scene,{scene_threshold})")
+                    .filter("scale", tile_width, tile_height)
+                    .filter("showinfo")
+                )
+                output = ffmpeg.output(
+                    stream,
+                    str(work_dir / f"scene_%03d.{image_format}"),
+                    fps_mode="vfr",
+                    **{"frames:v": count},
+                    **thread_options(threads),
+                )
+                _, stderr = ffmpeg.run(
+                    output, overwrite_output=True, capture_stdout=True, capture_stderr=True
+                )
+
+                times = [
+                    round(float(t), 3)
+                    for t in re.findall(r"pts_time:\s*([\d.]+)", stderr.decode(errors="replace"))
+                ]
+                files = sorted(work_dir.glob(f"scene_*.{image_format}"))
+                manifest["thumbnails"] = [
+                    {"file": path.name, "time": time} for path, time in zip(files, times)
+                ]
+            else:
+                times = get_thumbnail_times(duration, count)
+                frames = [
+                    ffmpeg.input(str(input_path), ss=time, t=VIDEO_THUMBNAIL_SCAN_SECONDS)
+                    .video.filter("thumbnail", VIDEO_THUMBNAIL_CANDIDATE_FRAMES)
+                    .filter("trim", end_frame=1)
+                    .filter("scale", tile_width, tile_height)
+                    .filter("setsar", 1)
+                    for time in times
+                ]
+
+                if mode == "grid":
+                    files = [f"thumb_{index + 1:03d}.{image_format}" for index in range(count)]
+                    output = ffmpeg.merge_outputs(
+                        *(
+                            ffmpeg.output(frame, str(work_dir / name), **{"frames:v": 1})
+                            for frame, name in zip(frames, files)
+                        )
+                    )
+                    manifest["thumbnails"] = [
+                        {"file": name, "time": time} for name, time in zip(files, times)
+                    ]
+                else:
+                    columns = max(1, min(columns, count))
+                    rows = -(-count // columns)
+                    sprite_name = f"sprite.{image_format}"
+                    sheet = ffmpeg.concat(*frames, v=1, a=0).filter("tile", f"{columns}x{rows}")
+                    output = ffmpeg.output(sheet, str(work_dir / sprite_name), **{"frames:v": 1})
+                    (work_dir / "sprite.vtt").write_text(
+                        build_sprite_vtt(
+                            sprite_name, duration, count, columns, tile_width, tile_height
+                        )
+                    )
+                    manifest.update(
+                        {
+                            "sprite": sprite_name,
+                            "vtt": "sprite.vtt",
+                            "columns": columns,
+                            "rows": rows,
+                        }
+                    )
+                    manifest["thumbnails"] = [{"time": time} for time in times]
+
+                output = output.global_args("-filter_threads", str(threads))
+                ffmpeg.run(output, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+
+        (work_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+        # Write under a temporary name of its own so a concurrent identical
+        # request neither serves nor overwrites a half-written cached archive
+        partial_path = output_path.with_name(f"{output_path.name}.partial-{uuid.uuid4().hex[:12]}")
+        try:
+            with zipfile.ZipFile(partial_path, "w") as archive:
+                for path in sorted(work_dir.iterdir()):
+                    # Images are already compressed, only the text files gain from deflate
+                    compression = (
+                        zipfile.ZIP_DEFLATED
+                        if path.suffix in (".json", ".vtt")
+                        else zipfile.ZIP_STORED
+                    )
+                    archive.write(path, path.name, compress_type=compression)
+            os.replace(partial_path, output_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+        return VideoProcessingResponse(
+            success=True,
+            message=f"Extracted {len(manifest['thumbnails'])} thumbnails ({mode})",
+            filename=output_path.name,
+            download_url=f"/api/v1/download/{output_path.name}",
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+        )
+
+    except ffmpeg.Error as e:
+        error_message = e.stderr.decode() if e.stderr else str(e)
+        return VideoProcessingResponse(
+            success=False,
+            message=f"FFmpeg error: {error_message}",
+            filename=output_path.name if output_path else None,
+        )
+
+    except Exception as e:
+        return VideoProcessingResponse(
+            success=False,
+            message=f"Error extracting thumbnails: {str(e)}",
+            filename=output_path.name if output_path else None,
+        )
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def get_hls_renditions(source_height: int, heights: Optional[list[int]] = None) -> list[dict]:
+    """
+    Pick the HLS ladder rungs to encode for a source
+
+    Rungs taller than the source are dropped so nothing is upscaled; a source
+    smaller than every rung gets a single rendition at its own height.
+
+    Raises:
+        ValueError: If a requested height is not part of the ladder
+    """
+    ladder = VIDEO_HLS_LADDER
+    if heights:
+        known = {rung["height"] for rung in ladder}
+        unknown = sorted(set(heights) - known)
+        if unknown:
+            raise ValueError(
+                f"Unsupported rendition height(s): {', '.join(map(str, unknown))}. "
+                f"Available: {', '.join(str(h) for h in sorted(known, reverse=True))}"
+            )
+        ladder = [rung for rung in ladder if rung["height"] in heights]
+
+    renditions = [rung for rung in ladder if rung["height"] <= source_height]
+    if not renditions:
+        smallest = min(ladder, key=lambda rung: rung["height"])
+        height = max(2, source_height - source_height % 2)
+        renditions = [{**smallest, "name": f"{height}p", "height": height}]
+
+    return renditions
+
+
+def build_hls_output(
+    input_path: Path,
+    output_dir: Path,
+    renditions: list[dict],
+    has_audio: bool,
+    encoder: str,
+    segment_seconds: int = VIDEO_HLS_SEGMENT_SECONDS,
+    threads: int = 1,
+):
+    """
+    Build the FFmpeg graph encoding every rendition of an HLS ladder
+
+    The input is decoded once and `split` feeds one scaler per rendition, so
+    a three-rung ladder costs one decode instead of three. Keyframes are
+    forced on segment boundaries so every rendition can be switched between
+    at each segment. Writes `master.m3u8` and one `<name>/index.m3u8` plus
+    segments per rendition into output_dir.
+    """
+    source = ffmpeg.input(str(input_path))
+    branches = source["v:0"].filter_multi_output("split", len(renditions))
+
+    streams = []
+    output_options = {
+        "c:v": encoder,
+        "pix_fmt": "yuv420p",
+        "force_key_frames": f"expr:gte(t,n_forced*{segment_seconds})",
+        "format": "hls",
+        "hls_time": segment_seconds,
+        "hls_playlist_type": "vod",
+        "hls_segment_filename": str(output_dir / "%v" / "segment_%03d.ts"),
+        "master_pl_name": "master.m3u8",
+        **thread_options(threads, encoder),
+    }
+    if encoder == "libx264":
+        output_options["preset"] = VIDEO_HLS_PRESET
+        output_options["sc_threshold"] = 0
+    if has_audio:
+        output_options["c:a"] = "aac"
+
+    stream_map = []
+    for index, rendition in enumerate(renditions):
+        streams.append(branches[index].filter("scale", -2, rendition["height"]))
+        bitrate = int(rendition["video_bitrate"].rstrip("k"))
+        output_options[f"b:v:{index}"] = f"{bitrate}k"
+        output_options[f"maxrate:v:{index}"] = f"{round(bitrate * 1.07)}k"
+        output_options[f"bufsize:v:{index}"] = f"{bitrate * 2}k"
+
+        if has_audio:
+            streams.append(source["a:0"])
+            output_options[f"b:a:{index}"] = rendition["audio_bitrate"]
+            stream_map.append(f"v:{index},a:{index},name:{rendition['name']}")
+        else:
+            stream_map.append(f"v:{index},name:{rendition['name']}")
+
+    output_options["var_stream_map"] = " ".join(stream_map)
+
+    return ffmpeg.output(*streams, str(output_dir / "%v" / "index.m3u8"), **output_options)
+
+
+def package_hls_archive(output_dir: Path, archive_path: Path) -> int:
+    """
+    Bundle an HLS output directory into a ZIP, keeping its layout
+
+    Segments are already compressed, so entries are stored rather than
+    deflated. Returns the number of segments packaged.
+    """
+    segments = 0
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_STORED) as archive:
+        for path in sorted(output_dir.rglob("*")):
+            if path.is_file():
+                archive.write(path, path.relative_to(output_dir).as_posix())
+                segments += path.suffix == ".ts"
+    return segments
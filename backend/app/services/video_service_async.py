@@ -4,16 +4,44 @@ Uses FFmpeg with progress parsing for real-time updates
 """
 
 import asyncio
+from bisect import bisect_left
 import os
 from pathlib import Path
 import re
+import shutil
 import subprocess
+import time
 from typing import Callable, Optional
 
-from app.config import VIDEO_COMPRESSION_PRESETS
+from app.config import (
+    TEMP_DIR,
+    VIDEO_CHUNK_MAX_SEGMENTS,
+    VIDEO_CHUNK_MIN_SECONDS,
+    VIDEO_COMPRESSION_PRESETS,
+    VIDEO_HLS_SEGMENT_SECONDS,
+)
+from app.services.video_service import (
+    build_animation_output,
+    build_audio_extraction_output,
+    build_hls_output,
+    calculate_target_bitrates,
+    delete_passlog_files,
+    finalize_audio_extraction,
+    get_hls_renditions,
+    get_passlog_prefix,
+    get_target_size_error,
+    get_trim_part_window,
+    package_hls_archive,
+    plan_audio_extraction,
+    prepare_trim,
+    store_palette,
+    validate_animation_options,
+)
 from app.tasks.models import TaskResult, TaskStatus
 from app.tasks.store import task_store
 from app.utils.file_handler import calculate_compression_ratio, get_file_size
+from app.utils.media_probe import probe_media
+from app.utils.resource_governor import core_budget, parse_cpu_time, thread_args
 
 
 def get_available_h264_encoder() -> Optional[str]:
@@ -54,108 +82,540 @@ def get_video_duration(input_path: Path) -> Optional[float]:
         return None
 
 
-async def compress_video_with_progress(
+def get_keyframe_times(input_path: Path) -> list[float]:
+    """
+    Get the presentation times (seconds) of the video keyframes using ffprobe
+
+    Only packet flags are read, so the video is demuxed but never decoded
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "packet=pts_time,flags",
+                "-of",
+                "csv=p=0",
+                str(input_path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" not in flags:
+                continue
+            try:
+                keyframes.append(float(pts_time))
+            except ValueError:
+                continue
+        return sorted(keyframes)
+    except Exception:
+        return []
+
+
+def get_start_time(input_path: Path) -> float:
+    """
+    Get the container start time (seconds) of a media file
+
+    Nonzero in MPEG-TS and many edited MP4s. Packet timestamps include it,
+    while input -ss offsets are counted from it.
+    """
+    try:
+        return float(probe_media(input_path)["format"].get("start_time") or 0.0)
+    except Exception:
+        return 0.0
+
+
+def has_audio_stream(input_path: Path) -> bool:
+    """Check whether the input contains at least one audio stream"""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "a",
+                "-show_entries",
+                "stream=index",
+                "-of",
+                "csv=p=0",
+                str(input_path),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        return bool(result.stdout.strip())
+    except Exception:
+        return False
+
+
+def build_h264_video_args(encoder: str, quality: str) -> list[str]:
+    """Build the FFmpeg video encoding arguments for an H.264 encoder and quality preset"""
+    args = ["-c:v", encoder]
+    if encoder == "libx264":
+        preset = VIDEO_COMPRESSION_PRESETS.get(quality, VIDEO_COMPRESSION_PRESETS["medium"])
+        args.extend(["-crf", str(preset["crf"]), "-preset", preset["preset"]])
+    else:
+        quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
+        args.extend(["-b:v", quality_map.get(quality, "2.5M")])
+    return args
+
+
+def get_segment_count(duration: Optional[float]) -> int:
+    """Number of segments a chunked encode of `duration` seconds is split into"""
+    if not duration or duration <= 0:
+        return 1
+    return max(1, min(VIDEO_CHUNK_MAX_SEGMENTS, int(duration // VIDEO_CHUNK_MIN_SECONDS)))
+
+
+def plan_video_segments(
+    duration: float, keyframes: list[float], segment_count: int
+) -> list[tuple[float, Optional[float]]]:
+    """
+    Split the timeline into roughly equal segments cut at keyframes
+
+    Each boundary is snapped to the nearest keyframe so every segment starts
+    on a frame FFmpeg can seek to without decoding from the previous GOP.
+
+    Returns:
+        List of (start, end) tuples in seconds, the last end being None (EOF)
+    """
+    if segment_count < 2 or duration <= 0:
+        return [(0.0, None)]
+
+    boundaries: list[float] = []
+    for i in range(1, segment_count):
+        target = duration * i / segment_count
+        if keyframes:
+            index = bisect_left(keyframes, target)
+            candidates = keyframes[max(index - 1, 0) : index + 1]
+            target = min(candidates, key=lambda t: abs(t - target))
+        if 0 < target < duration and (not boundaries or target > boundaries[-1]):
+            boundaries.append(target)
+
+    starts = [0.0] + boundaries
+    ends: list[Optional[float]] = [*boundaries, None]
+    return list(zip(starts, ends))
+
+
+async def run_ffmpeg(
+    cmd: list[str], on_progress: Optional[Callable[[float], None]] = None
+) -> Optional[float]:
+    """
+    Run an FFmpeg command, forwarding `-progress pipe:1` output times to on_progress
+
+    Returns:
+        CPU seconds used by FFmpeg when the command includes `-benchmark`
+
+    Raises:
+        RuntimeError: If FFmpeg exits with a non-zero status
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def read_progress():
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+
+            line_str = line.decode().strip()
+
+            if on_progress and line_str.startswith("out_time_ms="):
+                try:
+                    on_progress(int(line_str.split("=")[1]) / 1_000_000)
+                except ValueError:
+                    pass
+
+    try:
+        # Drain stderr while following stdout: a command that logs more than
+        # the pipe buffer would otherwise block until stdout closes, forever
+        _, stderr = await asyncio.gather(read_progress(), process.stderr.read())
+        await process.wait()
+    except asyncio.CancelledError:
+        try:
+            process.kill()
+            # Reading both pipes to EOF lets the transport see the exit
+            await process.communicate()
+        except Exception:
+            pass
+        raise
+
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode() if stderr else "FFmpeg error")
+
+    return parse_cpu_time(stderr)
+
+
+async def encode_video_to_size(
     task_id: str,
     input_path: Path,
     output_path: Path,
+    encoder: str,
+    duration: Optional[float],
+    target_size_mb: float,
     quality: str = "medium",
-) -> TaskResult:
+    threads: int = 1,
+) -> Optional[float]:
     """
-    Compress video with real-time progress updates via FFmpeg
+    Encode a video to fit a target size with progress across both passes
 
-    Progress is tracked by parsing FFmpeg stderr output
+    libx264 runs a two-pass encode (first-pass statistics kept in TEMP_DIR);
+    other encoders fall back to a constrained single-pass bitrate encode.
+    Progress goes from 5% to 99% over all passes.
+
+    Returns:
+        Total FFmpeg CPU seconds
+
+    Raises:
+        ValueError: If the duration is unknown or the target is too small
     """
+    if not duration:
+        raise ValueError("Could not determine video duration")
+
+    video_bitrate, audio_bitrate = calculate_target_bitrates(
+        int(target_size_mb * 1024 * 1024), duration
+    )
+
+    rate_args = [
+        "-c:v",
+        encoder,
+        "-b:v",
+        str(video_bitrate),
+        "-maxrate",
+        str(video_bitrate),
+        "-bufsize",
+        str(video_bitrate * 2),
+    ]
+    if encoder == "libx264":
+        preset = VIDEO_COMPRESSION_PRESETS.get(quality, VIDEO_COMPRESSION_PRESETS["medium"])
+        rate_args.extend(["-preset", preset["preset"]])
+    rate_args.extend(thread_args(threads, encoder))
+
+    audio_args = ["-c:a", "aac", "-b:a", str(audio_bitrate)]
+    progress_args = ["-progress", "pipe:1", "-nostats"]
+    passes = 2 if encoder == "libx264" else 1
+
+    def reporter(pass_index: int) -> Callable[[float], None]:
+        def report(current_time: float):
+            done = (pass_index + min(current_time / duration, 1)) / passes
+            percent = min(5 + done * 94, 99)
+            task_store.update_progress(
+                task_id,
+                percent,
+                f"Pass {pass_index + 1}/{passes}... {percent:.0f}%",
+                "encoding",
+            )
+
+        return report
+
+    input_args = ["ffmpeg", "-y", "-benchmark", "-i", str(input_path)]
+
+    if passes == 1:
+        cmd = [*input_args, *rate_args, *audio_args, *progress_args, str(output_path)]
+        return await run_ffmpeg(cmd, reporter(0))
+
+    passlog_prefix = get_passlog_prefix(output_path)
+    pass_args = ["-passlogfile", str(passlog_prefix)]
     try:
-        # Update task: Starting
-        task_store.update_progress(task_id, 0, "Analyzing video...", "analyzing")
+        first_pass_cpu = await run_ffmpeg(
+            [
+                *input_args,
+                *rate_args,
+                "-pass",
+                "1",
+                *pass_args,
+                "-an",
+                *progress_args,
+                "-f",
+                "null",
+                os.devnull,
+            ],
+            reporter(0),
+        )
+        second_pass_cpu = await run_ffmpeg(
+            [
+                *input_args,
+                *rate_args,
+                "-pass",
+                "2",
+                *pass_args,
+                *audio_args,
+                *progress_args,
+                str(output_path),
+            ],
+            reporter(1),
+        )
+    finally:
+        delete_passlog_files(passlog_prefix)
 
-        # Get original file size
-        original_size = get_file_size(input_path)
+    if first_pass_cpu is None or second_pass_cpu is None:
+        return None
+    return round(first_pass_cpu + second_pass_cpu, 3)
 
-        # Get video duration for progress calculation
-        duration = get_video_duration(input_path)
-        if not duration:
-            duration = 100  # Fallback if we can't determine duration
 
-        # Get compression preset
-        preset = VIDEO_COMPRESSION_PRESETS.get(quality, VIDEO_COMPRESSION_PRESETS["medium"])
+async def encode_video_chunked(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    video_args: list[str],
+    duration: float,
+    message: str = "Encoding",
+    job_threads: Optional[int] = None,
+) -> tuple[int, Optional[float]]:
+    """
+    Encode a video as keyframe-aligned segments in parallel
 
-        # Detect encoder
-        encoder = get_available_h264_encoder()
-        if not encoder:
-            task_store.fail_task(task_id, "No H.264 encoder available")
-            return TaskResult(
-                success=False,
-                error="No H.264 encoder available. Please install FFmpeg with H.264 support.",
-            )
+    Segments are encoded video-only under the global core budget while the
+    audio track is encoded once alongside them, then everything is stitched
+    with the concat demuxer without re-encoding. Progress of all segments is
+    aggregated into the task's progress events (5% -> 90%).
+
+    Within a job, segments share the job's threads (they are already taken
+    from the core budget): each segment gets an even split of them and no
+    more segments run at once than the threads allow. Without a job, each
+    segment reserves its cores from the budget.
+
+    Returns:
+        Tuple of (number of segments, total FFmpeg CPU seconds)
+    """
+    # Keyframe pts include the start time, -ss offsets are relative to it
+    start_time = get_start_time(input_path)
+    keyframes = [pts - start_time for pts in get_keyframe_times(input_path)]
+    segments = plan_video_segments(duration, keyframes, get_segment_count(duration))
+    threads = max(1, (job_threads or core_budget.total_cores) // len(segments))
+    job_slots = asyncio.Semaphore(max(1, job_threads // threads)) if job_threads else None
+
+    def hold_cores(cores: int):
+        """Context holding the cores of one encode for its duration"""
+        return job_slots if job_slots is not None else core_budget.reserve(cores)
+
+    encoder = video_args[1] if len(video_args) > 1 else None
+    encoded_seconds = [0.0] * len(segments)
+
+    work_dir = TEMP_DIR / f"chunks_{output_path.stem}"
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    def report(index: int, seconds: float):
+        encoded_seconds[index] = seconds
+        percent = 5 + min(sum(encoded_seconds) / duration, 1) * 85
+        task_store.update_progress(
+            task_id,
+            percent,
+            f"{message}... {percent:.0f}% ({len(segments)} segments)",
+            "encoding",
+        )
 
-        task_store.update_progress(task_id, 5, "Starting compression...", "encoding")
+    async def encode_segment(
+        index: int, start: float, end: Optional[float]
+    ) -> tuple[Path, Optional[float]]:
+        segment_path = work_dir / f"segment_{index:04d}.mkv"
+        cmd = ["ffmpeg", "-y", "-benchmark"]
+        if start:
+            cmd.extend(["-ss", f"{start:.6f}"])
+        cmd.extend(["-i", str(input_path)])
+        if end is not None:
+            cmd.extend(["-t", f"{end - start:.6f}"])
+        cmd.extend(
+            [
+                "-map",
+                "0:v:0",
+                "-an",
+                *video_args,
+                *thread_args(threads, encoder),
+                "-progress",
+                "pipe:1",
+                "-nostats",
+                str(segment_path),
+            ]
+        )
+        async with hold_cores(threads):
+            cpu_time = await run_ffmpeg(cmd, lambda seconds: report(index, seconds))
+        return segment_path, cpu_time
 
-        # Build FFmpeg command
+    async def encode_audio() -> tuple[Path, Optional[float]]:
+        audio_path = work_dir / "audio.m4a"
         cmd = [
             "ffmpeg",
             "-y",
+            "-benchmark",
+            "-nostats",
             "-i",
             str(input_path),
-            "-c:v",
-            encoder,
+            "-map",
+            "0:a:0",
+            "-vn",
             "-c:a",
             "aac",
             "-b:a",
             "128k",
-            "-progress",
-            "pipe:1",  # Output progress to stdout
-            "-nostats",
+            str(audio_path),
         ]
+        async with hold_cores(1):
+            cpu_time = await run_ffmpeg(cmd)
+        return audio_path, cpu_time
 
-        # Add quality parameters
-        if encoder == "libx264":
-            cmd.extend(["-crf", str(preset["crf"]), "-preset", preset["preset"]])
-        else:
-            quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
-            cmd.extend(["-b:v", quality_map.get(quality, "2.5M")])
+    try:
+        jobs = [
+            asyncio.create_task(encode_segment(index, start, end))
+            for index, (start, end) in enumerate(segments)
+        ]
+        if has_audio_stream(input_path):
+            jobs.append(asyncio.create_task(encode_audio()))
 
-        cmd.append(str(output_path))
+        try:
+            outputs = await asyncio.gather(*jobs)
+        except BaseException:
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            raise
+
+        segment_paths = [path for path, _ in outputs[: len(segments)]]
+        audio_path = outputs[len(segments)][0] if len(outputs) > len(segments) else None
+        cpu_times = [cpu_time for _, cpu_time in outputs]
+
+        task_store.update_progress(task_id, 90, "Stitching segments...", "finalizing")
+
+        concat_file = work_dir / "segments.txt"
+        with open(concat_file, "w") as f:
+            for segment_path in segment_paths:
+                escaped_path = str(segment_path.resolve()).replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+
+        cmd = ["ffmpeg", "-y", "-benchmark", "-nostats", "-f", "concat", "-safe", "0"]
+        cmd.extend(["-i", str(concat_file)])
+        if audio_path:
+            cmd.extend(["-i", str(audio_path), "-map", "0:v", "-map", "1:a"])
+        cmd.extend(["-c", "copy", str(output_path)])
+        cpu_times.append(await run_ffmpeg(cmd))
+
+        known_cpu_times = [cpu_time for cpu_time in cpu_times if cpu_time is not None]
+        cpu_time = round(sum(known_cpu_times), 3) if known_cpu_times else None
+        return len(segments), cpu_time
 
-        # Run FFmpeg with progress tracking
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
 
-        # Parse progress from stdout
-        current_time = 0
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
 
-            line_str = line.decode().strip()
+async def compress_video_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    quality: str = "medium",
+    chunked: bool = False,
+    target_size_mb: Optional[float] = None,
+) -> TaskResult:
+    """
+    Compress video with real-time progress updates via FFmpeg
 
-            # Parse out_time_ms from FFmpeg progress
-            if line_str.startswith("out_time_ms="):
-                try:
-                    time_ms = int(line_str.split("=")[1])
-                    current_time = time_ms / 1_000_000  # Convert to seconds
+    Progress is tracked by parsing FFmpeg stderr output. With `chunked`, long
+    videos are split at keyframes and the segments are encoded in parallel.
+    With `target_size_mb`, a two-pass bitrate encode replaces the CRF preset
+    so the output fits the requested size.
+    """
+    try:
+        # Update task: Starting
+        task_store.update_progress(task_id, 0, "Analyzing video...", "analyzing")
+
+        # Get original file size
+        original_size = get_file_size(input_path)
+
+        # Get video duration for progress calculation
+        probed_duration = get_video_duration(input_path)
+        duration = probed_duration or 100  # Fallback if we can't determine duration
+
+        if target_size_mb:
+            target_error = get_target_size_error(target_size_mb, probed_duration)
+            if target_error:
+                task_store.fail_task(task_id, target_error)
+                return TaskResult(success=False, error=target_error)
+
+        # Detect encoder
+        encoder = get_available_h264_encoder()
+        if not encoder:
+            task_store.fail_task(task_id, "No H.264 encoder available")
+            return TaskResult(
+                success=False,
+                error="No H.264 encoder available. Please install FFmpeg with H.264 support.",
+            )
+
+        video_args = build_h264_video_args(encoder, quality)
+        message = "Video compressed successfully"
+        started = time.monotonic()
+
+        async with core_budget.async_job() as threads:
+            if target_size_mb:
+                task_store.update_progress(
+                    task_id, 5, f"Starting compression to {target_size_mb:g} MB...", "encoding"
+                )
+                cpu_time = await encode_video_to_size(
+                    task_id,
+                    input_path,
+                    output_path,
+                    encoder,
+                    probed_duration,
+                    target_size_mb,
+                    quality,
+                    threads,
+                )
+                message = f"Video compressed successfully to fit {target_size_mb:g} MB"
+            elif chunked and encoder != "h264_vaapi" and get_segment_count(probed_duration) > 1:
+                task_store.update_progress(
+                    task_id, 5, "Starting chunked compression...", "encoding"
+                )
+                segment_count, cpu_time = await encode_video_chunked(
+                    task_id,
+                    input_path,
+                    output_path,
+                    video_args,
+                    probed_duration,
+                    "Encoding",
+                    threads,
+                )
+                message = f"Video compressed successfully ({segment_count} parallel segments)"
+            else:
+                task_store.update_progress(task_id, 5, "Starting compression...", "encoding")
+
+                # Build FFmpeg command
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    "-benchmark",  # Report the child's CPU usage on exit
+                    "-i",
+                    str(input_path),
+                    *video_args,
+                    "-c:a",
+                    "aac",
+                    "-b:a",
+                    "128k",
+                    *thread_args(threads, encoder),
+                    "-progress",
+                    "pipe:1",  # Output progress to stdout
+                    "-nostats",
+                    str(output_path),
+                ]
+
+                def report(current_time: float):
                     percent = min((current_time / duration) * 100, 99)
                     task_store.update_progress(
                         task_id, percent, f"Encoding... {percent:.0f}%", "encoding"
                     )
-                except (ValueError, ZeroDivisionError):
-                    pass
 
-            # Check for end of progress
-            if line_str.startswith("progress=end"):
-                break
+                # Run FFmpeg with progress tracking
+                cpu_time = await run_ffmpeg(cmd, report)
 
-        # Wait for process to complete
-        _, stderr = await process.communicate()
-
-        if process.returncode != 0:
-            error_msg = stderr.decode() if stderr else "FFmpeg error"
-            task_store.fail_task(task_id, error_msg[:500])
-            return TaskResult(success=False, error=error_msg[:500])
+        wall_time = round(time.monotonic() - started, 3)
 
         # Finalize
         task_store.update_progress(task_id, 99, "Finalizing...", "finalizing")
@@ -171,7 +631,9 @@ async def compress_video_with_progress(
             original_size=original_size,
             processed_size=compressed_size,
             compression_ratio=compression_ratio,
-            message="Video compressed successfully",
+            message=message,
+            cpu_time=cpu_time,
+            wall_time=wall_time,
         )
 
         task_store.complete_task(task_id, result)
@@ -192,82 +654,74 @@ async def convert_video_with_progress(
     output_path: Path,
     output_format: str,
     quality: str = "medium",
+    chunked: bool = False,
 ) -> TaskResult:
     """
     Convert video to different format with real-time progress updates
+
+    With `chunked`, long videos are split at keyframes and the segments are
+    encoded in parallel.
     """
     try:
         task_store.update_progress(task_id, 0, "Analyzing video...", "analyzing")
 
         original_size = get_file_size(input_path)
-        duration = get_video_duration(input_path) or 100
+        probed_duration = get_video_duration(input_path)
+        duration = probed_duration or 100
 
-        preset = VIDEO_COMPRESSION_PRESETS.get(quality, VIDEO_COMPRESSION_PRESETS["medium"])
         encoder = get_available_h264_encoder()
 
         if not encoder:
             task_store.fail_task(task_id, "No H.264 encoder available")
             return TaskResult(success=False, error="No H.264 encoder available")
 
-        task_store.update_progress(task_id, 5, "Starting conversion...", "encoding")
-
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            str(input_path),
-            "-c:v",
-            encoder,
-            "-c:a",
-            "aac",
-            "-b:a",
-            "128k",
-            "-progress",
-            "pipe:1",
-            "-nostats",
-        ]
-
-        if encoder == "libx264":
-            cmd.extend(["-crf", str(preset["crf"]), "-preset", preset["preset"]])
-        else:
-            quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
-            cmd.extend(["-b:v", quality_map.get(quality, "2.5M")])
-
-        cmd.append(str(output_path))
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        while True:
-            line = await process.stdout.readline()
-            if not line:
-                break
-
-            line_str = line.decode().strip()
-
-            if line_str.startswith("out_time_ms="):
-                try:
-                    time_ms = int(line_str.split("=")[1])
-                    current_time = time_ms / 1_000_000
+        video_args = build_h264_video_args(encoder, quality)
+        message = f"Video converted to {output_format.upper()} successfully"
+        started = time.monotonic()
+
+        async with core_budget.async_job() as threads:
+            if chunked and encoder != "h264_vaapi" and get_segment_count(probed_duration) > 1:
+                task_store.update_progress(task_id, 5, "Starting chunked conversion...", "encoding")
+                segment_count, cpu_time = await encode_video_chunked(
+                    task_id,
+                    input_path,
+                    output_path,
+                    video_args,
+                    probed_duration,
+                    "Converting",
+                    threads,
+                )
+                message = f"{message} ({segment_count} parallel segments)"
+            else:
+                task_store.update_progress(task_id, 5, "Starting conversion...", "encoding")
+
+                cmd = [
+                    "ffmpeg",
+                    "-y",
+                    "-benchmark",
+                    "-i",
+                    str(input_path),
+                    *video_args,
+                    "-c:a",
+                    "aac",
+                    "-b:a",
+                    "128k",
+                    *thread_args(threads, encoder),
+                    "-progress",
+                    "pipe:1",
+                    "-nostats",
+                    str(output_path),
+                ]
+
+                def report(current_time: float):
                     percent = min((current_time / duration) * 100, 99)
                     task_store.update_progress(
                         task_id, percent, f"Converting... {percent:.0f}%", "encoding"
                     )
-                except (ValueError, ZeroDivisionError):
-                    pass
-
-            if line_str.startswith("progress=end"):
-                break
 
-        _, stderr = await process.communicate()
+                cpu_time = await run_ffmpeg(cmd, report)
 
-        if process.returncode != 0:
-            error_msg = stderr.decode() if stderr else "FFmpeg error"
-            task_store.fail_task(task_id, error_msg[:500])
-            return TaskResult(success=False, error=error_msg[:500])
+        wall_time = round(time.monotonic() - started, 3)
 
         task_store.update_progress(task_id, 99, "Finalizing...", "finalizing")
 
@@ -279,7 +733,9 @@ async def convert_video_with_progress(
             filename=output_path.name,
             original_size=original_size,
             processed_size=converted_size,
-            message=f"Video converted to {output_format.upper()} successfully",
+            message=message,
+            cpu_time=cpu_time,
+            wall_time=wall_time,
         )
 
         task_store.complete_task(task_id, result)
@@ -317,6 +773,7 @@ async def merge_videos_with_progress(
 
         # Update task: Starting
         task_store.update_progress(task_id, 0, "Analyzing videos...", "analyzing")
+        started = time.monotonic()
 
         # Calculate total original size
         total_original_size = sum(get_file_size(path) for path in input_paths)
@@ -349,6 +806,7 @@ async def merge_videos_with_progress(
             cmd = [
                 "ffmpeg",
                 "-y",
+                "-benchmark",  # Report the child's CPU usage on exit
                 "-f",
                 "concat",
                 "-safe",
@@ -404,6 +862,8 @@ async def merge_videos_with_progress(
                 task_store.fail_task(task_id, error_msg[:500])
                 return TaskResult(success=False, error=error_msg[:500])
 
+            cpu_time = parse_cpu_time(stderr)
+
             # Fast mode is quick, so we can mark as complete
             task_store.update_progress(task_id, 99, "Finalizing...", "finalizing")
 
@@ -427,6 +887,7 @@ async def merge_videos_with_progress(
             cmd = [
                 "ffmpeg",
                 "-y",
+                "-benchmark",
                 "-f",
                 "concat",
                 "-safe",
@@ -451,73 +912,77 @@ async def merge_videos_with_progress(
                 quality_map = {"low": "1M", "medium": "2.5M", "high": "5M"}
                 cmd.extend(["-b:v", quality_map.get(quality, "2.5M")])
 
-            cmd.append(str(output_path))
+            # Run FFmpeg with progress tracking, within this job's share of the cores
+            async with core_budget.async_job() as threads:
+                cmd.extend(thread_args(threads, encoder))
+                cmd.append(str(output_path))
 
-            # Run FFmpeg with progress tracking
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
 
-            # Parse progress from stdout
-            current_time = 0
-            while True:
-                # Check if task was cancelled
-                task = task_store.get_task(task_id)
-                if task and task.status == TaskStatus.CANCELLED:
+                # Parse progress from stdout
+                current_time = 0
+                while True:
+                    # Check if task was cancelled
+                    task = task_store.get_task(task_id)
+                    if task and task.status == TaskStatus.CANCELLED:
+                        try:
+                            process.kill()
+                            await process.wait()
+                        except Exception:
+                            pass
+                        task_store.cancel_task(task_id)
+                        return TaskResult(success=False, error="Task cancelled")
+
+                    line = await process.stdout.readline()
+                    if not line:
+                        break
+
+                    line_str = line.decode().strip()
+
+                    # Parse out_time_ms from FFmpeg progress
+                    if line_str.startswith("out_time_ms="):
+                        try:
+                            time_ms = int(line_str.split("=")[1])
+                            current_time = time_ms / 1_000_000  # Convert to seconds
+                            percent = min((current_time / total_duration) * 100, 99)
+                            task_store.update_progress(
+                                task_id, percent, f"Merging... {percent:.0f}%", "encoding"
+                            )
+                        except (ValueError, ZeroDivisionError):
+                            pass
+
+                    # Check for end of progress
+                    if line_str.startswith("progress=end"):
+                        break
+
+                # Wait for process to complete, checking for cancellation
+                try:
+                    _, stderr = await process.communicate()
+                except asyncio.CancelledError:
+                    # Kill the process if task is cancelled
                     try:
                         process.kill()
                         await process.wait()
                     except Exception:
                         pass
+                    raise
+
+                # Check if task was cancelled after process completion
+                task = task_store.get_task(task_id)
+                if task and task.status == TaskStatus.CANCELLED:
                     task_store.cancel_task(task_id)
                     return TaskResult(success=False, error="Task cancelled")
 
-                line = await process.stdout.readline()
-                if not line:
-                    break
-
-                line_str = line.decode().strip()
-
-                # Parse out_time_ms from FFmpeg progress
-                if line_str.startswith("out_time_ms="):
-                    try:
-                        time_ms = int(line_str.split("=")[1])
-                        current_time = time_ms / 1_000_000  # Convert to seconds
-                        percent = min((current_time / total_duration) * 100, 99)
-                        task_store.update_progress(
-                            task_id, percent, f"Merging... {percent:.0f}%", "encoding"
-                        )
-                    except (ValueError, ZeroDivisionError):
-                        pass
-
-                # Check for end of progress
-                if line_str.startswith("progress=end"):
-                    break
-
-            # Wait for process to complete, checking for cancellation
-            try:
-                _, stderr = await process.communicate()
-            except asyncio.CancelledError:
-                # Kill the process if task is cancelled
-                try:
-                    process.kill()
-                    await process.wait()
-                except Exception:
-                    pass
-                raise
-
-            # Check if task was cancelled after process completion
-            task = task_store.get_task(task_id)
-            if task and task.status == TaskStatus.CANCELLED:
-                task_store.cancel_task(task_id)
-                return TaskResult(success=False, error="Task cancelled")
+                if process.returncode != 0:
+                    error_msg = stderr.decode() if stderr else "FFmpeg error"
+                    task_store.fail_task(task_id, error_msg[:500])
+                    return TaskResult(success=False, error=error_msg[:500])
 
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "FFmpeg error"
-                task_store.fail_task(task_id, error_msg[:500])
-                return TaskResult(success=False, error=error_msg[:500])
+            cpu_time = parse_cpu_time(stderr)
 
             # Finalize
             task_store.update_progress(task_id, 99, "Finalizing...", "finalizing")
@@ -532,6 +997,8 @@ async def merge_videos_with_progress(
             original_size=total_original_size,
             processed_size=merged_size,
             message=f"Successfully merged {len(input_paths)} videos",
+            cpu_time=cpu_time,
+            wall_time=round(time.monotonic() - started, 3),
         )
 
         task_store.complete_task(task_id, result)
@@ -551,3 +1018,382 @@ async def merge_videos_with_progress(
                 concat_file.unlink()
             except Exception:
                 pass
+
+
+async def trim_video_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    smart: bool = False,
+) -> TaskResult:
+    """
+    Cut a segment out of a video with real-time progress updates
+
+    Complete GOPs are stream-copied; with `smart` the partial GOPs at the
+    edges are re-encoded and stitched back with the copied ones.
+    """
+    work_dir = TEMP_DIR / f"trim_{output_path.stem}"
+    try:
+        task_store.update_progress(task_id, 0, "Analyzing video...", "analyzing")
+
+        original_size = get_file_size(input_path)
+        plan = prepare_trim(input_path, start_time, end_time, smart)
+        parts = plan["parts"]
+        clip_end = plan["end_time"] if plan["end_time"] is not None else plan["duration"]
+        started = time.monotonic()
+
+        async with core_budget.async_job() as threads:
+            if len(parts) == 1 and parts[0][0] == "copy":
+                steps = [(parts[0], output_path)]
+            else:
+                work_dir.mkdir(parents=True, exist_ok=True)
+                steps = [
+                    (part, work_dir / f"part_{index:03d}.mkv") for index, part in enumerate(parts)
+                ]
+
+            total = max(sum((stop or clip_end) - start for _, start, stop in parts), 0.001)
+            done = 0.0
+            cpu_time = 0.0
+
+            for (mode, start, stop), step_path in steps:
+                seek, duration = get_trim_part_window(mode, start, stop)
+                cmd = ["ffmpeg", "-y", "-benchmark", "-ss", str(seek), "-i", str(input_path)]
+
+                if step_path == output_path:
+                    cmd.extend(["-map", "0:v:0", "-map", "0:a?", "-c", "copy"])
+                    cmd.extend(["-avoid_negative_ts", "make_zero"])
+                elif mode == "copy":
+                    cmd.extend(["-map", "0:v:0", "-c", "copy"])
+                else:
+                    edge_options = plan["edge_options"]
+                    cmd.extend(["-map", "0:v:0"])
+                    for option, value in edge_options.items():
+                        cmd.extend([f"-{option}", str(value)])
+                    cmd.extend(thread_args(threads, edge_options["c:v"]))
+
+                if duration is not None:
+                    cmd.extend(["-t", str(duration)])
+                cmd.extend(["-progress", "pipe:1", "-nostats", str(step_path)])
+
+                verb = "Copying" if mode == "copy" else "Re-encoding edge"
+
+                def report(current_time: float, offset: float = done, verb: str = verb):
+                    percent = 5 + min((offset + current_time) / total, 1) * 85
+                    task_store.update_progress(
+                        task_id, percent, f"{verb}... {percent:.0f}%", "trimming"
+                    )
+
+                cpu_time += await run_ffmpeg(cmd, report) or 0.0
+                done += (stop or clip_end) - start
+
+            if steps[0][1] != output_path:
+                task_store.update_progress(task_id, 90, "Joining segments...", "finalizing")
+
+                concat_file = work_dir / "parts.txt"
+                concat_file.write_text("".join(f"file '{path.name}'\n" for _, path in steps))
+
+                cmd = ["ffmpeg", "-y", "-benchmark", "-nostats", "-f", "concat", "-safe", "0"]
+                cmd.extend(["-i", str(concat_file)])
+                if plan["has_audio"]:
+                    cmd.extend(["-ss", str(start_time)])
+                    if plan["end_time"] is not None:
+                        cmd.extend(["-t", str(plan["end_time"] - start_time)])
+                    cmd.extend(["-i", str(input_path), "-map", "0:v", "-map", "1:a"])
+                cmd.extend(["-c", "copy", str(output_path)])
+
+                cpu_time += await run_ffmpeg(cmd) or 0.0
+
+        wall_time = round(time.monotonic() - started, 3)
+
+        task_store.update_progress(task_id, 99, "Finalizing...", "finalizing")
+
+        message = "Video trimmed successfully"
+        if plan["note"]:
+            message += f" ({plan['note']})"
+
+        result = TaskResult(
+            success=True,
+            download_url=f"/api/v1/download/{output_path.name}",
+            filename=output_path.name,
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+            message=message,
+            cpu_time=round(cpu_time, 3),
+            wall_time=wall_time,
+        )
+
+        task_store.complete_task(task_id, result)
+        return result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+async def video_to_gif_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    start_time: float = 0.0,
+    duration: Optional[float] = None,
+    width: Optional[int] = None,
+    fps: int = 12,
+    loop: bool = True,
+    output_format: str = "gif",
+    preset: str = "balanced",
+    dither: str = "sierra2_4a",
+) -> TaskResult:
+    """
+    Render a video segment as an animated image with real-time progress updates
+
+    Runs the same FFmpeg graph as video_to_gif (including the GIF palette
+    cache) with progress parsed from FFmpeg's output.
+    """
+    partial_palette = None
+    try:
+        task_store.update_progress(task_id, 0, "Analyzing video...", "analyzing")
+
+        error = validate_animation_options(
+            start_time, duration, width, fps, output_format, preset, dither
+        )
+        if error:
+            task_store.fail_task(task_id, error)
+            return TaskResult(success=False, error=error)
+
+        original_size = get_file_size(input_path)
+        clip_duration = duration or max((get_video_duration(input_path) or 0) - start_time, 0)
+        clip_duration = clip_duration or 100
+        started = time.monotonic()
+
+        async with core_budget.async_job() as threads:
+            output, partial_palette = build_animation_output(
+                input_path,
+                output_path,
+                start_time,
+                duration,
+                width,
+                fps,
+                loop,
+                output_format,
+                preset,
+                dither,
+                threads,
+            )
+            cmd = (
+                output.global_args("-benchmark", "-progress", "pipe:1", "-nostats")
+                .overwrite_output()
+                .compile()
+            )
+
+            task_store.update_progress(
+                task_id, 5, f"Rendering {output_format.upper()}...", "encoding"
+            )
+
+            def report(current_time: float):
+                percent = 5 + min(current_time / clip_duration, 1) * 94
+                task_store.update_progress(
+                    task_id, percent, f"Rendering... {percent:.0f}%", "encoding"
+                )
+
+            cpu_time = await run_ffmpeg(cmd, report)
+
+        store_palette(partial_palette)
+        wall_time = round(time.monotonic() - started, 3)
+
+        result = TaskResult(
+            success=True,
+            download_url=f"/api/v1/download/{output_path.name}",
+            filename=output_path.name,
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+            message=f"{output_format.upper()} created successfully",
+            cpu_time=cpu_time,
+            wall_time=wall_time,
+        )
+
+        task_store.complete_task(task_id, result)
+        return result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
+    finally:
+        if partial_palette is not None and partial_palette.exists():
+            partial_palette.unlink(missing_ok=True)
+
+
+async def extract_audio_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    output_format: str = "mp3",
+    bitrate: str = "192k",
+    all_tracks: bool = False,
+    passthrough: bool = True,
+) -> TaskResult:
+    """
+    Extract audio tracks from a video with real-time progress updates
+
+    Compatible tracks are stream-copied, so long extractions are mostly I/O.
+    """
+    try:
+        task_store.update_progress(task_id, 0, "Analyzing audio tracks...", "analyzing")
+
+        original_size = get_file_size(input_path)
+        plan = plan_audio_extraction(
+            input_path, output_path, output_format, bitrate, all_tracks, passthrough
+        )
+        duration = get_video_duration(input_path) or 100
+        started = time.monotonic()
+
+        copied = all(track["copy"] for track in plan)
+        verb = "Copying" if copied else "Extracting"
+
+        async with core_budget.async_job() as threads:
+            cmd = (
+                build_audio_extraction_output(input_path, plan, threads)
+                .global_args("-benchmark", "-progress", "pipe:1", "-nostats")
+                .overwrite_output()
+                .compile()
+            )
+
+            task_store.update_progress(task_id, 5, f"{verb} audio...", "encoding")
+
+            def report(current_time: float):
+                percent = 5 + min(current_time / duration, 1) * 90
+                task_store.update_progress(
+                    task_id, percent, f"{verb}... {percent:.0f}%", "encoding"
+                )
+
+            cpu_time = await run_ffmpeg(cmd, report)
+
+        task_store.update_progress(task_id, 97, "Finalizing...", "finalizing")
+
+        result_path, message = finalize_audio_extraction(plan, output_path)
+        wall_time = round(time.monotonic() - started, 3)
+
+        result = TaskResult(
+            success=True,
+            download_url=f"/api/v1/download/{result_path.name}",
+            filename=result_path.name,
+            original_size=original_size,
+            processed_size=get_file_size(result_path),
+            message=message,
+            cpu_time=cpu_time,
+            wall_time=wall_time,
+        )
+
+        task_store.complete_task(task_id, result)
+        return result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
+
+
+async def package_hls_with_progress(
+    task_id: str,
+    input_path: Path,
+    output_path: Path,
+    heights: Optional[list[int]] = None,
+    segment_seconds: int = VIDEO_HLS_SEGMENT_SECONDS,
+) -> TaskResult:
+    """
+    Encode an adaptive-bitrate HLS ladder with real-time progress updates
+
+    Every rendition comes out of a single FFmpeg process decoding the input
+    once; the playlists and segments are delivered as a ZIP at output_path.
+    """
+    work_dir = TEMP_DIR / f"hls_{output_path.stem}"
+    try:
+        task_store.update_progress(task_id, 0, "Analyzing video...", "analyzing")
+
+        original_size = get_file_size(input_path)
+        streams = probe_media(input_path)["streams"]
+        video_stream = next((s for s in streams if s.get("codec_type") == "video"), None)
+        if video_stream is None:
+            raise ValueError("No video stream found in file")
+        has_audio = any(s.get("codec_type") == "audio" for s in streams)
+
+        renditions = get_hls_renditions(int(video_stream.get("height") or 0), heights)
+        encoder = get_available_h264_encoder()
+        if encoder is None:
+            raise RuntimeError("No H.264 encoder available")
+
+        duration = get_video_duration(input_path) or 100
+        started = time.monotonic()
+        names = ", ".join(rendition["name"] for rendition in renditions)
+
+        async with core_budget.async_job() as threads:
+            work_dir.mkdir(parents=True, exist_ok=True)
+            cmd = (
+                build_hls_output(
+                    input_path,
+                    work_dir,
+                    renditions,
+                    has_audio,
+                    encoder,
+                    segment_seconds,
+                    threads,
+                )
+                .global_args("-benchmark", "-progress", "pipe:1", "-nostats")
+                .overwrite_output()
+                .compile()
+            )
+
+            task_store.update_progress(task_id, 5, f"Encoding {names}...", "encoding")
+
+            def report(current_time: float):
+                percent = 5 + min(current_time / duration, 1) * 90
+                task_store.update_progress(
+                    task_id, percent, f"Encoding {names}... {percent:.0f}%", "encoding"
+                )
+
+            cpu_time = await run_ffmpeg(cmd, report)
+
+        task_store.update_progress(task_id, 96, "Packaging playlists...", "finalizing")
+        segments = package_hls_archive(work_dir, output_path)
+        wall_time = round(time.monotonic() - started, 3)
+
+        result = TaskResult(
+            success=True,
+            download_url=f"/api/v1/download/{output_path.name}",
+            filename=output_path.name,
+            original_size=original_size,
+            processed_size=get_file_size(output_path),
+            message=(
+                f"HLS package created with {len(renditions)} rendition(s) "
+                f"({names}, {segments} segments)"
+            ),
+            cpu_time=cpu_time,
+            wall_time=wall_time,
+        )
+
+        task_store.complete_task(task_id, result)
+        return result
+
+    except asyncio.CancelledError:
+        task_store.cancel_task(task_id)
+        raise
+    except Exception as e:
+        error_msg = str(e)[:500]
+        task_store.fail_task(task_id, error_msg)
+        return TaskResult(success=False, error=error_msg)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
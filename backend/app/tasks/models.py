@@ -48,6 +48,8 @@ class TaskResult:
     message: Optional[str] = None
     error: Optional[str] = None
     total_pages: Optional[int] = None  # For PDF operations
+    cpu_time: Optional[float] = None  # CPU seconds used by FFmpeg (user + system)
+    wall_time: Optional[float] = None  # Elapsed seconds of the processing job
 
     def to_dict(self) -> dict:
         result = {
@@ -63,6 +65,10 @@ class TaskResult:
         # Add optional fields if they exist
         if self.total_pages is not None:
             result["total_pages"] = self.total_pages
+        if self.cpu_time is not None:
+            result["cpu_time"] = self.cpu_time
+        if self.wall_time is not None:
+            result["wall_time"] = self.wall_time
         return result
 
 
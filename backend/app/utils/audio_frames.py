@@ -0,0 +1,67 @@
+"""
+Frame-level parsing of raw MP3 and ADTS (AAC) streams
+
+Used to cut encoded audio exactly on frame boundaries without decoding,
+e.g. to drop the pre-roll frames of a segment encoded in parallel.
+"""
+
+from typing import Iterator
+
+# MPEG audio Layer III bitrates (kbit/s) by bitrate index
+_MP3_BITRATES = {
+    "mpeg1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "mpeg2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _mp3_frame_length(header: bytes) -> int:
+    """Length in bytes of the Layer III frame starting with `header`, 0 if invalid"""
+    if header[0] != 0xFF or header[1] & 0xE6 != 0xE2:  # frame sync + Layer III
+        return 0
+
+    version = (header[1] >> 3) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return 0
+
+    bitrate = _MP3_BITRATES["mpeg1" if version == 3 else "mpeg2"][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    coefficient = 144 if version == 3 else 72
+    return coefficient * bitrate // sample_rate + padding
+
+
+def _adts_frame_length(header: bytes) -> int:
+    """Length in bytes of the ADTS frame starting with `header`, 0 if invalid"""
+    if header[0] != 0xFF or header[1] & 0xF6 != 0xF0:  # sync word + layer 0
+        return 0
+    return ((header[3] & 0x03) << 11) | (header[4] << 3) | (header[5] >> 5)
+
+
+def get_frame_samples(container: str, sample_rate: int) -> int:
+    """Number of samples per frame of a raw "mp3" or "adts" stream"""
+    if container == "mp3":
+        # MPEG-1 Layer III (32 kHz and up) or MPEG-2/2.5 Layer III
+        return 1152 if sample_rate >= 32000 else 576
+    return 1024
+
+
+def iter_audio_frames(data: bytes, container: str) -> Iterator[bytes]:
+    """
+    Yield the frames of a raw "mp3" or "adts" stream
+
+    Bytes that do not start a valid frame (tags, junk) are skipped until the
+    next sync word.
+    """
+    frame_length = _mp3_frame_length if container == "mp3" else _adts_frame_length
+    position = 0
+
+    while position + 7 <= len(data):
+        length = frame_length(data[position : position + 7])
+        if length < 7 or position + length > len(data):
+            position += 1
+            continue
+        yield data[position : position + length]
+        position += length
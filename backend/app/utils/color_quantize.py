@@ -0,0 +1,79 @@
+"""
+Dominant color analysis of images
+
+Pixels never leave Pillow's C buffers: the sample is clustered by median cut
+refined with a few k-means passes (Image.quantize), cluster sizes come from
+getcolors() on the quantized image, and only the resulting handful of
+clusters is handled in Python. Clusters that look alike (close in CIELAB)
+are merged, so photos give distinct colors rather than a run of
+near-identical shades of the same surface.
+"""
+
+import math
+
+from PIL import Image
+
+from app.config import (
+    IMAGE_COLOR_CLUSTERS,
+    IMAGE_COLOR_KMEANS_ITERATIONS,
+    IMAGE_COLOR_MERGE_DELTA_E,
+)
+
+
+def rgb_to_lab(rgb: tuple[int, int, int]) -> tuple[float, float, float]:
+    """Convert an sRGB color to CIELAB (D65 white point)"""
+
+    def linearize(channel: int) -> float:
+        value = channel / 255
+        return value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+
+    r, g, b = (linearize(channel) for channel in rgb)
+    x = (0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047
+    y = 0.2126 * r + 0.7152 * g + 0.0722 * b
+    z = (0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883
+
+    def f(t: float) -> float:
+        return t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116
+
+    fx, fy, fz = f(x), f(y), f(z)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def get_dominant_colors(
+    img: Image.Image, max_colors: int, merge_delta_e: float = IMAGE_COLOR_MERGE_DELTA_E
+) -> list[tuple[tuple[int, int, int], float]]:
+    """
+    Get the dominant colors of an image, most common first
+
+    The image should already be downscaled (a few hundred pixels a side is
+    plenty). Clusters closer than `merge_delta_e` (CIE76 distance) to a more
+    common one are merged into it.
+
+    Returns:
+        (rgb, ratio) of up to `max_colors` colors, ratio being the share of
+        all pixels in the cluster
+    """
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    clusters = min(256, max(IMAGE_COLOR_CLUSTERS, max_colors * 2))
+    quantized = img.quantize(
+        colors=clusters, method=Image.Quantize.MEDIANCUT, kmeans=IMAGE_COLOR_KMEANS_ITERATIONS
+    )
+    palette = quantized.getpalette()
+    counts = quantized.getcolors(256) or []
+    total = sum(count for count, _ in counts)
+
+    merged: list[list] = []  # [rgb, lab, count], most common cluster first
+    for count, index in sorted(counts, reverse=True):
+        rgb = tuple(palette[index * 3 : index * 3 + 3])
+        lab = rgb_to_lab(rgb)
+        for cluster in merged:
+            if math.dist(cluster[1], lab) < merge_delta_e:
+                cluster[2] += count
+                break
+        else:
+            merged.append([rgb, lab, count])
+
+    merged.sort(key=lambda cluster: cluster[2], reverse=True)
+    return [(rgb, count / total) for rgb, _, count in merged[:max_colors]]
@@ -0,0 +1,163 @@
+"""
+Image encoding with named speed/size profiles
+
+Every image the API writes goes through save_image(), so the CPU spent on
+encoding is an explicit choice instead of a blanket optimize=True: "fast"
+skips entropy optimization and uses the quickest compression settings,
+"smallest" spends the most encoder effort for the fewest bytes and
+"balanced" sits in between. Profiles and per-format defaults live in
+app.config; a profile changes how hard the encoder works, never the
+requested quality. For the automatic output format, candidate formats are
+encoded concurrently on encode_pool.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from PIL import Image, features
+
+from app.config import (
+    IMAGE_AUTO_FORMATS,
+    IMAGE_ENCODE_WORKERS,
+    IMAGE_ENCODER_DEFAULT_PROFILE,
+    IMAGE_ENCODER_FORMAT_PROFILES,
+    IMAGE_ENCODER_PROFILE_NAMES,
+    IMAGE_ENCODER_PROFILES,
+    IMAGE_ENCODER_QUALITY,
+    IMAGE_WEBP_LOSSLESS_EFFORT,
+)
+
+# Formats whose size is driven by a quality setting
+LOSSY_FORMATS = ("JPEG", "WEBP", "AVIF")
+
+# File extension written for each format
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp", "AVIF": ".avif", "PNG": ".png", "GIF": ".gif"}
+
+# Pillow features some formats depend on (optional at build time)
+_FORMAT_FEATURES = {"WEBP": "webp", "AVIF": "avif"}
+
+
+def normalize_format(image_format: str) -> str:
+    """Pillow format name of a format or extension (jpg -> JPEG)"""
+    image_format = image_format.upper().lstrip(".")
+    return "JPEG" if image_format == "JPG" else image_format
+
+
+def resolve_profile(image_format: str, profile: Optional[str] = None) -> str:
+    """
+    Encoder profile to use for a format
+
+    Raises:
+        ValueError: If `profile` is not a known profile name
+    """
+    if profile is None:
+        return IMAGE_ENCODER_FORMAT_PROFILES.get(
+            normalize_format(image_format), IMAGE_ENCODER_DEFAULT_PROFILE
+        )
+    if profile not in IMAGE_ENCODER_PROFILE_NAMES:
+        raise ValueError(
+            f"Unknown encoder profile: {profile}. "
+            f"Supported: {', '.join(IMAGE_ENCODER_PROFILE_NAMES)}"
+        )
+    return profile
+
+
+def get_encoder_options(
+    image_format: str,
+    profile: Optional[str] = None,
+    quality: Optional[int] = None,
+    lossless: bool = False,
+) -> dict:
+    """
+    Pillow save() options for a format under an encoder profile
+
+    Args:
+        image_format: Output format (e.g. "JPEG", "png", "webp")
+        profile: Profile name (defaults to the format's configured profile)
+        quality: Lossy quality (defaults to IMAGE_ENCODER_QUALITY)
+        lossless: Encode WebP losslessly (quality is then ignored)
+    """
+    image_format = normalize_format(image_format)
+    profile = resolve_profile(image_format, profile)
+    options = dict(IMAGE_ENCODER_PROFILES.get(image_format, {}).get(profile, {}))
+
+    if image_format == "WEBP" and lossless:
+        options.update(lossless=True, quality=IMAGE_WEBP_LOSSLESS_EFFORT[profile])
+    elif image_format in LOSSY_FORMATS:
+        options["quality"] = quality if quality is not None else IMAGE_ENCODER_QUALITY
+
+    return options
+
+
+def has_transparency(img: Image.Image) -> bool:
+    """Whether an image has at least one pixel that is not fully opaque"""
+    if img.mode in ("RGBA", "LA", "PA"):
+        return img.getchannel("A").getextrema()[0] < 255
+    return img.mode == "P" and "transparency" in img.info
+
+
+def get_auto_formats(img: Image.Image) -> list[str]:
+    """
+    Candidate formats of the automatic output format for an image
+
+    JPEG is left out for images with transparency, and formats this Pillow
+    build cannot write are left out entirely.
+    """
+    transparent = has_transparency(img)
+    return [
+        image_format
+        for image_format in IMAGE_AUTO_FORMATS
+        if not (image_format == "JPEG" and transparent)
+        and (image_format not in _FORMAT_FEATURES or features.check(_FORMAT_FEATURES[image_format]))
+    ]
+
+
+def flatten_for_jpeg(img: Image.Image) -> Image.Image:
+    """Convert an image to a mode JPEG can store, compositing alpha on white"""
+    if img.mode in ("RGB", "L", "CMYK"):
+        return img
+    if img.mode == "P":
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA"):
+        flattened = Image.new("RGB", img.size, (255, 255, 255))
+        flattened.paste(img.convert("RGBA"), mask=img.getchannel("A"))
+        return flattened
+    return img.convert("RGB")
+
+
+def save_image(
+    img: Image.Image,
+    output: Union[Path, BinaryIO],
+    image_format: str,
+    profile: Optional[str] = None,
+    quality: Optional[int] = None,
+    lossless: bool = False,
+):
+    """
+    Encode an image with the options of an encoder profile
+
+    Args:
+        img: Image to save (alpha is flattened on white for JPEG)
+        output: Output path or binary file object
+        image_format: Output format
+        profile: Encoder profile name (defaults to the format's configured profile)
+        quality: Lossy quality (defaults to IMAGE_ENCODER_QUALITY)
+        lossless: Encode WebP losslessly
+    """
+    image_format = normalize_format(image_format)
+    if image_format == "JPEG":
+        img = flatten_for_jpeg(img)
+
+    img.save(
+        output,
+        format=image_format,
+        **get_encoder_options(image_format, profile, quality, lossless),
+    )
+
+
+# Thread pool for encoding one image to several formats at once (Pillow
+# releases the GIL while encoding)
+encode_pool = ThreadPoolExecutor(
+    max_workers=IMAGE_ENCODE_WORKERS, thread_name_prefix="image-encode"
+)
@@ -0,0 +1,151 @@
+"""
+Memory-bounded image loading
+
+Decoding is what makes huge images expensive: a 20000x20000 RGB scan takes
+1.6 GB as a Pillow raster before anything shrinks it to a thumbnail. Images
+loaded through here have their decoded size estimated from the header first.
+When the caller only needs a smaller version, JPEGs are decoded at reduced
+resolution in the DCT domain (Image.draft) and other formats are reduced by
+box averaging right after decoding. Every decode holds its bytes in a
+process-wide memory budget, so concurrent jobs that would not fit wait for
+each other instead of getting the worker OOM-killed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+from typing import Iterator, Optional
+
+from PIL import Image
+
+from app.config import IMAGE_DECODE_WORKERS, IMAGE_MEMORY_BUDGET, IMAGE_REDUCING_GAP
+
+
+class MemoryBudget:
+    """
+    Counting budget of bytes held by decoded images
+
+    Jobs reserve() the bytes they are about to allocate and block until
+    enough of the budget is free. Requests larger than the whole budget are
+    clamped to it so they can still run (alone) instead of waiting forever.
+    """
+
+    def __init__(self, total_bytes: int):
+        self.total_bytes = max(1, total_bytes)
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @property
+    def available(self) -> int:
+        """Number of bytes not reserved by a running job"""
+        return self.total_bytes - self._in_use
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[int]:
+        """Wait until `nbytes` bytes are free and hold them for the block"""
+        nbytes = min(max(0, int(nbytes)), self.total_bytes)
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_use + nbytes <= self.total_bytes)
+            self._in_use += nbytes
+
+        try:
+            yield nbytes
+        finally:
+            with self._condition:
+                self._in_use -= nbytes
+                self._condition.notify_all()
+
+
+def estimate_decoded_bytes(size: tuple[int, int], mode: str) -> int:
+    """
+    Bytes of the Pillow raster of an image of this size and mode
+
+    Pillow stores 8-bit single-band images ("1", "L", "P") with one byte per
+    pixel, 16-bit ones with two and everything else (RGB included) with four.
+    """
+    if mode in ("1", "L", "P"):
+        pixel_bytes = 1
+    elif mode.startswith("I;16"):
+        pixel_bytes = 2
+    else:
+        pixel_bytes = 4
+    return size[0] * size[1] * pixel_bytes
+
+
+# Modes Image.reduce() does not support (palette, bilevel and 16-bit grayscale)
+_UNREDUCIBLE_MODES = ("1", "P", "I;16", "I;16L", "I;16B", "I;16N")
+
+
+def get_reduce_factor(size: tuple[int, int], max_size: tuple[int, int]) -> int:
+    """
+    Integer factor an image can be reduced by before a resize to max_size
+
+    The result stays at least IMAGE_REDUCING_GAP times larger than max_size
+    on both axes, so the final resampling still has enough pixels to
+    antialias from. Both axes use the same factor to keep the aspect ratio.
+    """
+    return max(
+        1,
+        min(int(source / (target * IMAGE_REDUCING_GAP)) for source, target in zip(size, max_size)),
+    )
+
+
+@contextmanager
+def load_image(
+    input_path: Path,
+    max_size: Optional[tuple[int, int]] = None,
+    copies: float = 2.0,
+) -> Iterator[Image.Image]:
+    """
+    Open and decode an image within the memory budget
+
+    Args:
+        input_path: Path to the image
+        max_size: Largest (width, height) the caller will resize the image to.
+            When given, the image may be decoded or reduced to a smaller size
+            (never below IMAGE_REDUCING_GAP times max_size). The caller must
+            then read dimensions from the yielded image, not from the file.
+        copies: Number of rasters of the decoded size held at the same time
+            (the decoded image plus the caller's working copies)
+
+    Yields:
+        The decoded image. It keeps the source `format` even when reduced.
+    """
+    with Image.open(input_path) as img:
+        source_format = img.format
+
+        if max_size is not None and img.format == "JPEG":
+            img.draft(
+                None,
+                (int(max_size[0] * IMAGE_REDUCING_GAP), int(max_size[1] * IMAGE_REDUCING_GAP)),
+            )
+
+        with image_memory_budget.reserve(estimate_decoded_bytes(img.size, img.mode) * copies):
+            img.load()
+
+            if (
+                max_size is None
+                or img.mode in _UNREDUCIBLE_MODES
+                or get_reduce_factor(img.size, max_size) < 2
+            ):
+                yield img
+                return
+
+            reduced = img.reduce(get_reduce_factor(img.size, max_size))
+            reduced.format = source_format
+            # Drop the full-size raster now rather than when the file is closed
+            img.close()
+            yield reduced
+
+
+# Global memory budget instance
+image_memory_budget = MemoryBudget(IMAGE_MEMORY_BUDGET)
+
+# Thread pool for decoding several images at once. Decodes may block on the
+# memory budget, so they never run on encode_pool: jobs holding a reservation
+# wait on encode_pool futures, which would then queue behind blocked decodes.
+decode_pool = ThreadPoolExecutor(
+    max_workers=IMAGE_DECODE_WORKERS, thread_name_prefix="image-decode"
+)
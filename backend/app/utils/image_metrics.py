@@ -0,0 +1,75 @@
+"""
+Perceptual image comparison
+
+SSIM is computed on luminance over non-overlapping 8x8 blocks. Block means
+and second moments come from Image.reduce() on float images and products
+from ImageMath, so the per-pixel work stays in Pillow's C code and only one
+value per block is handled in Python. Large images are compared at a
+reduced size (at most IMAGE_SSIM_MAX_PIXELS), which keeps a comparison in
+the low milliseconds and makes it cheap enough to run per trial encode.
+"""
+
+from array import array
+import math
+
+from PIL import Image, ImageMath
+
+from app.config import IMAGE_SSIM_MAX_PIXELS
+
+SSIM_BLOCK_SIZE = 8
+
+# Stabilizing constants of the SSIM formula for 8-bit data
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def _multiply(first: Image.Image, second: Image.Image) -> Image.Image:
+    """Per-pixel product of two float images"""
+    if hasattr(ImageMath, "lambda_eval"):
+        return ImageMath.lambda_eval(lambda args: args["a"] * args["b"], a=first, b=second)
+    return ImageMath.eval("a * b", a=first, b=second)
+
+
+def _block_means(img: Image.Image) -> array:
+    """Mean of every SSIM block of a float image"""
+    return array("f", img.reduce(SSIM_BLOCK_SIZE).tobytes())
+
+
+class SSIMReference:
+    """Block statistics of a reference image, computed once for many comparisons"""
+
+    def __init__(self, img: Image.Image):
+        self.size = img.size
+        self.factor = max(1, math.ceil(math.sqrt(img.width * img.height / IMAGE_SSIM_MAX_PIXELS)))
+        self.luma = self._get_luma(img)
+        self.mean = _block_means(self.luma)
+        self.mean_sq = _block_means(_multiply(self.luma, self.luma))
+
+    def _get_luma(self, img: Image.Image) -> Image.Image:
+        luma = img.convert("L")
+        if self.factor > 1:
+            luma = luma.reduce(self.factor)
+        return luma.convert("F")
+
+    def compare(self, candidate: Image.Image) -> float:
+        """
+        SSIM of a candidate against the reference (1.0 = identical)
+
+        The candidate must have the size of the reference image.
+        """
+        if candidate.size != self.size:
+            raise ValueError("Candidate and reference sizes differ")
+
+        luma = self._get_luma(candidate)
+        mean = _block_means(luma)
+        mean_sq = _block_means(_multiply(luma, luma))
+        mean_cross = _block_means(_multiply(self.luma, luma))
+
+        total = 0.0
+        for mx, my, mxx, myy, mxy in zip(self.mean, mean, self.mean_sq, mean_sq, mean_cross):
+            covariance = mxy - mx * my
+            variance = (mxx - mx * mx) + (myy - my * my)
+            total += ((2 * mx * my + SSIM_C1) * (2 * covariance + SSIM_C2)) / (
+                (mx * mx + my * my + SSIM_C1) * (variance + SSIM_C2)
+            )
+        return total / len(self.mean)
@@ -0,0 +1,269 @@
+"""
+Lossless JPEG rotations and flips
+
+Rotating a JPEG by decoding and re-encoding it costs a full decode/encode
+and another generation of JPEG loss. Both can be avoided:
+
+- The EXIF Orientation tag tells viewers how to display the stored pixels,
+  so a transform can be applied by rewriting that tag alone. Only a few
+  bytes of the file change and nothing is decoded.
+- jpegtran transforms the DCT blocks themselves, without dequantizing. It
+  is exact when every edge that moves to the left or top of the image is
+  made of whole MCUs (8 or 16 pixels depending on chroma subsampling):
+  partial edge blocks cannot be moved, so those images are left to the
+  decode/encode path.
+
+Transforms are Pillow Image.Transpose methods, None being the identity.
+They are composed with the orientation the file already has, so the result
+is the image as viewers displayed it, transformed.
+"""
+
+from pathlib import Path
+import subprocess
+from typing import Optional
+
+from PIL import Image
+
+from app.config import IMAGE_JPEGTRAN_PATH, IMAGE_JPEGTRAN_TIMEOUT
+from app.utils.image_encoder import get_encoder_options
+
+ORIENTATION_TAG = 0x0112
+
+# Transpose method that displays the stored pixels, for each EXIF orientation
+ORIENTATION_TRANSPOSE = {
+    1: None,
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+TRANSPOSE_ORIENTATION = {
+    method: orientation for orientation, method in ORIENTATION_TRANSPOSE.items()
+}
+
+# jpegtran arguments of each method (Pillow rotates counter-clockwise, jpegtran clockwise)
+JPEGTRAN_ARGUMENTS = {
+    Image.Transpose.FLIP_LEFT_RIGHT: ["-flip", "horizontal"],
+    Image.Transpose.FLIP_TOP_BOTTOM: ["-flip", "vertical"],
+    Image.Transpose.ROTATE_90: ["-rotate", "270"],
+    Image.Transpose.ROTATE_180: ["-rotate", "180"],
+    Image.Transpose.ROTATE_270: ["-rotate", "90"],
+    Image.Transpose.TRANSPOSE: ["-transpose"],
+    Image.Transpose.TRANSVERSE: ["-transverse"],
+}
+
+# Whether the width and the height must be whole MCUs for each method: the
+# right edge moves to the left or top when mirroring or rotating 90 degrees
+# counter-clockwise, the bottom edge to the top or left when flipping or
+# rotating 90 degrees clockwise
+MCU_ALIGNED_AXES = {
+    Image.Transpose.FLIP_LEFT_RIGHT: (True, False),
+    Image.Transpose.FLIP_TOP_BOTTOM: (False, True),
+    Image.Transpose.ROTATE_90: (True, False),
+    Image.Transpose.ROTATE_180: (True, True),
+    Image.Transpose.ROTATE_270: (False, True),
+    Image.Transpose.TRANSPOSE: (False, False),
+    Image.Transpose.TRANSVERSE: (True, True),
+}
+
+SWAPPING_METHODS = {
+    Image.Transpose.ROTATE_90,
+    Image.Transpose.ROTATE_270,
+    Image.Transpose.TRANSPOSE,
+    Image.Transpose.TRANSVERSE,
+}
+
+
+def transpose(img: Image.Image, method: Optional[Image.Transpose]) -> Image.Image:
+    """Apply a transpose method (None returns the image itself)"""
+    return img if method is None else img.transpose(method)
+
+
+def _build_compositions() -> dict:
+    """Method equal to applying two methods in turn, for every pair"""
+    methods = [None, *Image.Transpose]
+    probe = Image.frombytes("L", (3, 2), bytes(range(6)))
+
+    def key(img):
+        return img.size, img.tobytes()
+
+    results = {key(transpose(probe, method)): method for method in methods}
+    return {
+        (first, second): results[key(transpose(transpose(probe, first), second))]
+        for first in methods
+        for second in methods
+    }
+
+
+_COMPOSITIONS = _build_compositions()
+
+
+def compose_transpose(
+    first: Optional[Image.Transpose], second: Optional[Image.Transpose]
+) -> Optional[Image.Transpose]:
+    """Single method equal to applying `first` then `second`"""
+    return _COMPOSITIONS[(first, second)]
+
+
+def get_exif_orientation(img: Image.Image) -> int:
+    """EXIF orientation of an image (1 when missing or invalid)"""
+    orientation = img.getexif().get(ORIENTATION_TAG, 1)
+    return orientation if orientation in ORIENTATION_TRANSPOSE else 1
+
+
+def _find_exif_segment(data: bytes) -> Optional[tuple[int, int]]:
+    """Start and end offsets of the EXIF APP1 segment of a JPEG"""
+    offset = 2
+    while offset + 4 <= len(data) and data[offset] == 0xFF:
+        marker = data[offset + 1]
+        if marker == 0xFF:  # Fill byte
+            offset += 1
+            continue
+        if marker == 0xDA:  # Start of scan: no metadata after it
+            break
+        end = offset + 2 + int.from_bytes(data[offset + 2 : offset + 4], "big")
+        if marker == 0xE1 and data[offset + 4 : offset + 10] == b"Exif\x00\x00":
+            return offset, end
+        offset = end
+    return None
+
+
+def _patch_orientation(data: bytearray, start: int, end: int, orientation: int) -> bool:
+    """Overwrite the orientation entry of IFD0 in place, if there is one"""
+    tiff = start + 10
+    byteorder = "little" if data[tiff : tiff + 2] == b"II" else "big"
+    ifd = tiff + int.from_bytes(data[tiff + 4 : tiff + 8], byteorder)
+    if ifd + 2 > end:
+        return False
+
+    count = int.from_bytes(data[ifd : ifd + 2], byteorder)
+    for entry in range(ifd + 2, min(ifd + 2 + count * 12, end - 11), 12):
+        tag = int.from_bytes(data[entry : entry + 2], byteorder)
+        value_type = int.from_bytes(data[entry + 2 : entry + 4], byteorder)
+        if tag == ORIENTATION_TAG and value_type == 3:  # SHORT
+            data[entry + 8 : entry + 10] = orientation.to_bytes(2, byteorder)
+            return True
+    return False
+
+
+def set_exif_orientation(data: bytes, orientation: int) -> bytes:
+    """
+    Set the EXIF orientation of JPEG data without decoding it
+
+    The tag is overwritten in place when it exists, so the rest of the file
+    is kept byte for byte. Otherwise the EXIF segment is rewritten (or
+    added) with the tag.
+    """
+    data = bytearray(data)
+    segment = _find_exif_segment(data)
+    if segment is not None and _patch_orientation(data, *segment, orientation):
+        return bytes(data)
+    if segment is None and orientation == 1:
+        return bytes(data)
+
+    exif = Image.Exif()
+    if segment is not None:
+        exif.load(bytes(data[segment[0] + 4 : segment[1]]))
+    exif[ORIENTATION_TAG] = orientation
+    payload = exif.tobytes()
+    if len(payload) + 2 > 0xFFFF:
+        raise ValueError("EXIF data too large for a JPEG segment")
+    new_segment = b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload
+
+    if segment is not None:
+        data[segment[0] : segment[1]] = new_segment
+    else:
+        # After the JFIF segment, which must stay first
+        position = 2
+        if data[2:4] == b"\xff\xe0":
+            position = 4 + int.from_bytes(data[4:6], "big")
+        data[position:position] = new_segment
+    return bytes(data)
+
+
+def _run_jpegtran(
+    input_path: Path, output_path: Path, method: Image.Transpose, options: dict
+) -> bool:
+    """Transform a JPEG with jpegtran, False when it is missing or fails"""
+    command = [IMAGE_JPEGTRAN_PATH, "-copy", "all", "-perfect", *JPEGTRAN_ARGUMENTS[method]]
+    if options.get("optimize"):
+        command.append("-optimize")
+    if options.get("progressive"):
+        command.append("-progressive")
+    command += ["-outfile", str(output_path), str(input_path)]
+
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=IMAGE_JPEGTRAN_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        result = None
+
+    if result is None or result.returncode != 0:
+        output_path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def transform_jpeg(
+    input_path: Path,
+    output_path: Path,
+    method: Image.Transpose,
+    profile: Optional[str] = None,
+    metadata_only: bool = False,
+) -> Optional[tuple[int, int]]:
+    """
+    Rotate or flip a JPEG without decoding it
+
+    Args:
+        input_path: Path to input image
+        output_path: Path to save the transformed JPEG
+        method: Transform to apply to the image as displayed
+        profile: Encoder profile (balanced optimizes the Huffman tables,
+            smallest also makes the JPEG progressive)
+        metadata_only: Only rewrite the EXIF orientation (any size, no jpegtran)
+
+    Returns:
+        Displayed (width, height) of the result, or None when the image has
+        to be decoded instead (not a JPEG, partial edge MCUs, jpegtran
+        missing or failing)
+
+    Raises:
+        ValueError: If `metadata_only` is set and the input is not a JPEG
+    """
+    options = get_encoder_options("JPEG", profile)
+
+    with Image.open(input_path) as img:
+        if img.format != "JPEG":
+            if metadata_only:
+                raise ValueError("Metadata-only transforms need a JPEG image")
+            return None
+        width, height = img.size
+        orientation = get_exif_orientation(img)
+        mcu_width = 8 * max(component[1] for component in img.layer)
+        mcu_height = 8 * max(component[2] for component in img.layer)
+
+    method = compose_transpose(ORIENTATION_TRANSPOSE[orientation], method)
+
+    if metadata_only:
+        output_path.write_bytes(
+            set_exif_orientation(input_path.read_bytes(), TRANSPOSE_ORIENTATION[method])
+        )
+        return (height, width) if method in SWAPPING_METHODS else (width, height)
+
+    if method is None:
+        # The transform undoes the orientation: the stored pixels are the result
+        output_path.write_bytes(set_exif_orientation(input_path.read_bytes(), 1))
+        return width, height
+
+    aligned_width, aligned_height = MCU_ALIGNED_AXES[method]
+    if (aligned_width and width % mcu_width) or (aligned_height and height % mcu_height):
+        return None
+    if not _run_jpegtran(input_path, output_path, method, options):
+        return None
+
+    if orientation != 1:
+        # The orientation is now applied to the pixels
+        output_path.write_bytes(set_exif_orientation(output_path.read_bytes(), 1))
+    return (height, width) if method in SWAPPING_METHODS else (width, height)
@@ -0,0 +1,142 @@
+"""
+Cached media probing utilities
+
+ffprobe results are cached by a content fingerprint rather than by path, so
+repeated requests on the same media (e.g. cutting several clips out of one
+recording, each upload landing under a new temp name) skip the probe.
+"""
+
+from collections import OrderedDict
+import hashlib
+from pathlib import Path
+import subprocess
+import threading
+from typing import Any, Optional
+
+import ffmpeg
+
+from app.config import MEDIA_PROBE_CACHE_SIZE
+
+
+class ProbeCache:
+    """Thread-safe LRU cache of probe results"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """Get a cached value, marking it as recently used"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: tuple, value: Any):
+        """Store a value, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def get_file_fingerprint(file_path: Path) -> str:
+    """
+    Get a content fingerprint of a media file
+
+    The whole file is hashed in streamed blocks, so files differing anywhere
+    get distinct keys. The digest is memoized by path, size and modification
+    time, so the several lookups of one request (probe, keyframes, caches)
+    read the file only once.
+    """
+    stat = file_path.stat()
+    memo_key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    cached = fingerprint_cache.get(memo_key)
+    if cached is not None:
+        return cached
+
+    with open(file_path, "rb") as f:
+        fingerprint = hashlib.file_digest(f, "sha256").hexdigest()
+
+    fingerprint_cache.put(memo_key, fingerprint)
+    return fingerprint
+
+
+def probe_media(file_path: Path) -> dict:
+    """
+    Get the ffprobe format and stream information of a media file (cached)
+
+    Raises:
+        ffmpeg.Error: If ffprobe cannot read the file
+    """
+    key = ("probe", get_file_fingerprint(file_path))
+    cached = probe_cache.get(key)
+    if cached is not None:
+        return cached
+
+    info = ffmpeg.probe(str(file_path))
+    probe_cache.put(key, info)
+    return info
+
+
+def get_keyframe_index(
+    file_path: Path, intervals: Optional[list[tuple[float, float]]] = None
+) -> list[tuple[float, float]]:
+    """
+    Get the (pts, dts) times in seconds of the first video stream's keyframes (cached)
+
+    Only packet headers are read, nothing is decoded. When intervals are
+    given, ffprobe seeks to each (start, end) window instead of scanning the
+    whole file, which keeps lookups around a cut point constant-time.
+    """
+    intervals = [(round(max(0.0, start), 3), round(end, 3)) for start, end in intervals or []]
+    key = ("keyframes", get_file_fingerprint(file_path), tuple(intervals))
+    cached = probe_cache.get(key)
+    if cached is not None:
+        return cached
+
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0"]
+    if intervals:
+        cmd.extend(["-read_intervals", ",".join(f"{start}%{end}" for start, end in intervals)])
+    cmd.extend(
+        ["-show_entries", "packet=pts_time,dts_time,flags", "-of", "csv=p=0", str(file_path)]
+    )
+
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "ffprobe error")
+
+    keyframes = set()
+    for line in result.stdout.splitlines():
+        fields = line.split(",")
+        if len(fields) < 3 or "K" not in fields[2]:
+            continue
+        try:
+            pts = float(fields[0])
+        except ValueError:
+            continue
+        try:
+            dts = float(fields[1])
+        except ValueError:
+            dts = pts
+        keyframes.add((pts, dts))
+
+    index = sorted(keyframes)
+    probe_cache.put(key, index)
+    return index
+
+
+# Global cache instances (probe results, file digests)
+probe_cache = ProbeCache(MEDIA_PROBE_CACHE_SIZE)
+fingerprint_cache = ProbeCache(MEDIA_PROBE_CACHE_SIZE)
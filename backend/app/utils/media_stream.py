@@ -0,0 +1,147 @@
+"""
+Live streaming of FFmpeg output
+
+Pipes an encode straight into an HTTP response while teeing the bytes into
+TEMP_DIR, so clients start receiving media as soon as FFmpeg emits it and
+the finished file can still be fetched from /download afterwards.
+"""
+
+import asyncio
+import mimetypes
+import os
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import ffmpeg
+
+from app.config import MEDIA_STREAM_CHUNK_SIZE
+from app.utils.file_handler import delete_file
+from app.utils.resource_governor import core_budget, thread_options
+
+
+def get_stream_media_type(output_format: str) -> str:
+    """Get the Content-Type of a streamed output format"""
+    media_type, _ = mimetypes.guess_type(f"stream.{output_format}")
+    return media_type or "application/octet-stream"
+
+
+def build_stream_command(
+    input_path: Path, muxer: str, output_options: dict, threads: Optional[int] = None
+) -> list[str]:
+    """Build an FFmpeg command writing the encoded output to stdout"""
+    if threads is not None:
+        output_options = {**output_options, **thread_options(threads, output_options.get("c:v"))}
+
+    return (
+        ffmpeg.input(str(input_path))
+        .output("pipe:1", format=muxer, **output_options)
+        .global_args("-nostats", "-loglevel", "error")
+        .compile()
+    )
+
+
+async def stream_ffmpeg_output(
+    input_path: Path,
+    tee_path: Path,
+    muxer: str,
+    output_options: dict,
+    chunk_size: int = MEDIA_STREAM_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Run an encode and yield its output as FFmpeg produces it
+
+    Every chunk is also written to a partial file that replaces tee_path once
+    FFmpeg exits cleanly. If FFmpeg fails or the consumer stops early (client
+    disconnect), FFmpeg is killed and the partial file removed, so tee_path
+    only ever holds complete output.
+
+    Raises:
+        RuntimeError: If FFmpeg exits with a non-zero status
+    """
+    partial_path = tee_path.with_name(f"{tee_path.stem}.partial{tee_path.suffix}")
+    completed = False
+
+    async with core_budget.async_job() as threads:
+        cmd = build_stream_command(input_path, muxer, output_options, threads)
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Drain stderr concurrently so a chatty FFmpeg never blocks on a full pipe
+        stderr_task = asyncio.create_task(process.stderr.read())
+
+        try:
+            with open(partial_path, "wb") as tee:
+                while True:
+                    chunk = await process.stdout.read(chunk_size)
+                    if not chunk:
+                        break
+                    tee.write(chunk)
+                    yield chunk
+
+            await process.wait()
+            stderr = await stderr_task
+            if process.returncode != 0:
+                raise RuntimeError(stderr.decode(errors="replace").strip() or "FFmpeg error")
+
+            os.replace(partial_path, tee_path)
+            completed = True
+
+        finally:
+            # Synchronous cleanup first: when the client disconnects, the
+            # response task is cancelled and every await below may be interrupted
+            if not completed:
+                delete_file(partial_path)
+            if not stderr_task.done():
+                stderr_task.cancel()
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+
+
+async def start_ffmpeg_stream(
+    input_path: Path,
+    tee_path: Path,
+    muxer: str,
+    output_options: dict,
+    cleanup_paths: tuple[Path, ...] = (),
+) -> AsyncIterator[bytes]:
+    """
+    Start a streamed encode and wait for its first chunk
+
+    Waiting for the first chunk lets the caller still answer with a proper
+    error status when FFmpeg rejects the input outright, before any response
+    headers are sent. cleanup_paths (e.g. the uploaded input) are deleted
+    once the stream ends, whether it completed, failed or was abandoned.
+
+    Raises:
+        RuntimeError: If FFmpeg fails before producing any output
+    """
+    chunks = stream_ffmpeg_output(input_path, tee_path, muxer, output_options)
+
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+    except BaseException:
+        for path in cleanup_paths:
+            delete_file(path)
+        raise
+
+    async def relay() -> AsyncIterator[bytes]:
+        try:
+            if first_chunk:
+                yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            for path in cleanup_paths:
+                delete_file(path)
+            await chunks.aclose()
+
+    return relay()
@@ -0,0 +1,192 @@
+"""
+CPU resource governor shared by concurrent FFmpeg encodes
+
+Hands every encode a share of the host's cores, never more than the budget
+in total, and reports the CPU time each FFmpeg child consumed.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+import re
+import threading
+from typing import AsyncGenerator, Iterator, Optional, Union
+
+from app.config import FFMPEG_CORE_BUDGET
+
+# "bench: utime=1.234s stime=0.056s rtime=2.345s", printed by `ffmpeg -benchmark`
+# from the child's own getrusage() when it exits
+_BENCH_PATTERN = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s")
+
+
+class CoreBudget:
+    """
+    Counting budget of CPU cores
+
+    Every encode job takes its threads from the budget with job() (or
+    async_job() on the event loop), and parallel segment encodes reserve()
+    the cores they use before spawning FFmpeg. Both draw from the same pool,
+    so all running encodes together never use more threads than the budget.
+    """
+
+    def __init__(self, total_cores: int):
+        self.total_cores = max(1, total_cores)
+        self._in_use = 0
+        self._waiting = 0
+        self._active_jobs = 0
+        self._condition = threading.Condition()
+        # Futures of coroutines waiting for cores, with their event loop
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def available(self) -> int:
+        """Number of cores not held by a running encode"""
+        return self.total_cores - self._in_use
+
+    @property
+    def active_jobs(self) -> int:
+        """Number of encode jobs currently holding threads"""
+        return self._active_jobs
+
+    def _try_take(self, cores: Optional[int]) -> Optional[int]:
+        """
+        Take cores if they are free (lock held), None otherwise
+
+        `cores=None` takes a job's share: the free cores split evenly between
+        this caller and the others still waiting, at least one.
+        """
+        if cores is None:
+            cores = max(1, self.available // self._waiting)
+        if self._in_use + cores > self.total_cores:
+            return None
+        self._in_use += cores
+        return cores
+
+    def _release(self, cores: int):
+        with self._condition:
+            self._in_use -= cores
+            self._condition.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:  # Loop closed
+                pass
+
+    def _acquire(self, cores: Optional[int]) -> int:
+        """Wait in this thread until cores can be taken"""
+        with self._condition:
+            self._waiting += 1
+            try:
+                while (taken := self._try_take(cores)) is None:
+                    self._condition.wait()
+                return taken
+            finally:
+                self._waiting -= 1
+
+    async def _acquire_async(self, cores: Optional[int]) -> int:
+        """Wait on the event loop until cores can be taken"""
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            self._waiting += 1
+        try:
+            while True:
+                with self._condition:
+                    taken = self._try_take(cores)
+                    if taken is not None:
+                        return taken
+                    future = loop.create_future()
+                    self._async_waiters.append((loop, future))
+                await future
+        finally:
+            with self._condition:
+                self._waiting -= 1
+
+    @contextmanager
+    def _hold_job(self, threads: int) -> Iterator[int]:
+        with self._condition:
+            self._active_jobs += 1
+        try:
+            yield threads
+        finally:
+            with self._condition:
+                self._active_jobs -= 1
+            self._release(threads)
+
+    @contextmanager
+    def job(self) -> Iterator[int]:
+        """
+        Take a running encode job's threads from the budget (blocking)
+
+        The job waits for at least one free core, then takes its share of
+        the free cores: they are split evenly with the jobs still waiting.
+        Four encodes started together on a 16-core host get 4 threads each;
+        a job started while all cores are busy waits for one to be freed.
+        Must not be called on the event loop (use async_job() there).
+        """
+        with self._hold_job(self._acquire(None)) as threads:
+            yield threads
+
+    @asynccontextmanager
+    async def async_job(self) -> AsyncGenerator[int, None]:
+        """Take a running encode job's threads from the budget (see job())"""
+        with self._hold_job(await self._acquire_async(None)) as threads:
+            yield threads
+
+    @asynccontextmanager
+    async def reserve(self, cores: int = 1) -> AsyncGenerator[int, None]:
+        """
+        Wait until `cores` cores are free and hold them for the block
+
+        Requests larger than the whole budget are clamped to it so they can
+        still run (alone) instead of waiting forever.
+        """
+        cores = await self._acquire_async(min(max(1, cores), self.total_cores))
+        try:
+            yield cores
+        finally:
+            self._release(cores)
+
+
+def _wake(future: asyncio.Future):
+    """Wake a coroutine waiting for cores (unless it was cancelled)"""
+    if not future.done():
+        future.set_result(None)
+
+
+def thread_args(threads: int, encoder: Optional[str] = None) -> list[str]:
+    """FFmpeg command-line arguments limiting an encode to `threads` threads"""
+    args = ["-threads", str(threads), "-filter_threads", str(threads)]
+    if encoder == "libx264":
+        args.extend(["-x264-params", f"threads={threads}"])
+    return args
+
+
+def thread_options(threads: int, encoder: Optional[str] = None) -> dict:
+    """ffmpeg-python output options limiting an encode to `threads` threads"""
+    options = {"threads": threads, "filter_threads": threads}
+    if encoder == "libx264":
+        options["x264-params"] = f"threads={threads}"
+    return options
+
+
+def parse_cpu_time(stderr: Union[bytes, str, None]) -> Optional[float]:
+    """
+    Get the CPU time (user + system seconds) of an FFmpeg run from its stderr
+
+    Requires the command to be run with `-benchmark`. Returns None when no
+    report is found.
+    """
+    if not stderr:
+        return None
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode(errors="replace")
+
+    matches = _BENCH_PATTERN.findall(stderr)
+    if not matches:
+        return None
+    utime, stime = matches[-1]
+    return round(float(utime) + float(stime), 3)
+
+
+# Global core budget instance
+core_budget = CoreBudget(FFMPEG_CORE_BUDGET)
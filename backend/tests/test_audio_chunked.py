@@ -0,0 +1,243 @@
+"""
+Tests for segment-parallel (chunked) audio transcoding
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services.audio_service_async import (
+    encode_audio_chunked,
+    get_audio_chunk_plan,
+    plan_audio_segments,
+    transcode_audio_with_progress,
+)
+from app.tasks import task_store
+from app.tasks.models import TaskStatus
+from app.utils.audio_frames import get_frame_samples, iter_audio_frames
+
+client = TestClient(app)
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, no padding: 417-byte frames
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0x64])
+
+
+def mp3_frame(marker: int) -> bytes:
+    return MP3_HEADER + bytes([marker]) * 413
+
+
+def adts_frame(marker: int, length: int = 200) -> bytes:
+    header = bytes(
+        [0xFF, 0xF1, 0x50, 0x80 | (length >> 11), (length >> 3) & 0xFF, (length & 7) << 5, 0xFC]
+    )
+    return header + bytes([marker]) * (length - 7)
+
+
+def make_probe(duration="600.0", sample_rate="44100"):
+    return {
+        "format": {"duration": duration},
+        "streams": [{"codec_type": "audio", "sample_rate": sample_rate, "duration": duration}],
+    }
+
+
+class TestAudioFrames:
+    """Tests for raw frame parsing"""
+
+    def test_mp3_frames(self):
+        data = b"ID3junk" + mp3_frame(1) + mp3_frame(2) + mp3_frame(3)[:100]
+
+        frames = list(iter_audio_frames(data, "mp3"))
+
+        assert frames == [mp3_frame(1), mp3_frame(2)]
+
+    def test_adts_frames(self):
+        data = adts_frame(1) + adts_frame(2, 300)
+
+        assert list(iter_audio_frames(data, "adts")) == [adts_frame(1), adts_frame(2, 300)]
+
+    def test_frame_samples(self):
+        assert get_frame_samples("mp3", 44100) == 1152
+        assert get_frame_samples("mp3", 22050) == 576
+        assert get_frame_samples("adts", 48000) == 1024
+
+
+class TestPlanAudioSegments:
+    """Tests for frame-aligned segment planning"""
+
+    def test_cuts_on_frame_grid(self):
+        segments = plan_audio_segments(1152 * 100 + 10, 1152, 4)
+
+        assert [start % 1152 for start, _ in segments] == [0, 0, 0, 0]
+        assert segments[0][0] == 0
+        assert segments[-1][1] is None
+        assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+
+    def test_single_segment(self):
+        assert plan_audio_segments(1152 * 100, 1152, 1) == [(0, None)]
+
+
+class TestAudioChunkPlan:
+    """Tests for deciding whether an encode can be chunked"""
+
+    @patch("app.services.audio_service_async.probe_media", return_value=make_probe())
+    def test_mp3(self, mock_probe):
+        assert get_audio_chunk_plan(Path("/tmp/a.wav"), {"acodec": "libmp3lame"}) == (
+            44100,
+            600.0,
+        )
+
+    @patch("app.services.audio_service_async.probe_media", return_value=make_probe())
+    def test_vorbis_is_not_chunked(self, mock_probe):
+        assert get_audio_chunk_plan(Path("/tmp/a.wav"), {"acodec": "libvorbis"})[0] is None
+
+    @patch(
+        "app.services.audio_service_async.probe_media",
+        return_value=make_probe(sample_rate="96000"),
+    )
+    def test_resampled_mp3_is_not_chunked(self, mock_probe):
+        assert get_audio_chunk_plan(Path("/tmp/a.wav"), {"acodec": "libmp3lame"})[0] is None
+
+
+class TestEncodeAudioChunked:
+    """Tests for the parallel segment encode"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.audio_service_async.AUDIO_CHUNK_PREROLL_FRAMES", 2)
+    @patch("app.services.audio_service_async.get_audio_segment_count", return_value=3)
+    @patch("app.services.audio_service_async.run_ffmpeg", new_callable=AsyncMock)
+    async def test_preroll_frames_are_dropped(self, mock_run, mock_count, tmp_path):
+        """Test that segments are joined without their pre-roll and post-roll frames"""
+        frame_samples = 1152
+        commands = []
+
+        def fake_encode(cmd, on_progress=None):
+            commands.append(cmd)
+            if "-ss" not in cmd:
+                # Final remux: copy the joined stream
+                Path(cmd[-1]).write_bytes(Path(cmd[cmd.index("-i") + 1]).read_bytes())
+                return 0.1
+
+            # Write frames numbered by their global position on the frame grid
+            first = round(float(cmd[cmd.index("-ss") + 1]) * 44100 / frame_samples)
+            count = 30 - first
+            if "-t" in cmd:
+                count = round(float(cmd[cmd.index("-t") + 1]) * 44100 / frame_samples)
+            frames = b"".join(mp3_frame(first + i) for i in range(count))
+            Path(cmd[-1]).write_bytes(frames)
+            return 1.0
+
+        mock_run.side_effect = fake_encode
+        output_path = tmp_path / "out.mp3"
+
+        with patch("app.services.audio_service_async.TEMP_DIR", tmp_path):
+            segments, cpu_time = await encode_audio_chunked(
+                "task",
+                Path("/tmp/in.wav"),
+                output_path,
+                {"acodec": "libmp3lame", "b:a": "128k"},
+                30 * frame_samples / 44100,
+                44100,
+            )
+
+        assert segments == 3
+        assert cpu_time == 3.1
+        markers = [frame[4] for frame in iter_audio_frames(output_path.read_bytes(), "mp3")]
+        assert markers == list(range(30))
+        segment_cmd = commands[1]
+        assert segment_cmd[segment_cmd.index("-reservoir") + 1] == "0"
+        assert segment_cmd[segment_cmd.index("-f") + 1] == "mp3"
+        assert all("-nostats" in cmd for cmd in commands)
+        assert list(tmp_path.iterdir()) == [output_path]
+
+
+class TestTranscodeWithProgress:
+    """Tests for the async transcode job"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.audio_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.audio_service_async.get_file_size", return_value=1000)
+    @patch("app.services.audio_service_async.probe_media", return_value=make_probe("60.0"))
+    async def test_short_file_single_encode(self, mock_probe, mock_size, mock_run):
+        """Test that files too short to split are encoded in one pass"""
+        mock_run.return_value = 0.5
+        task = task_store.create_task("audio_convert")
+
+        result = await transcode_audio_with_progress(
+            task.id, Path("/tmp/in.wav"), Path("/tmp/out.mp3"), {"acodec": "libmp3lame"}, True
+        )
+
+        assert result.success is True
+        assert "segments" not in result.message
+        mock_run.assert_called_once()
+        assert task_store.get_task(task.id).status == TaskStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    @patch("app.services.audio_service_async.encode_audio_chunked", new_callable=AsyncMock)
+    @patch("app.services.audio_service_async.get_audio_segment_count", return_value=4)
+    @patch("app.services.audio_service_async.get_file_size", return_value=1000)
+    @patch("app.services.audio_service_async.probe_media", return_value=make_probe())
+    async def test_chunked(self, mock_probe, mock_size, mock_count, mock_chunked):
+        mock_chunked.return_value = (4, 12.0)
+        task = task_store.create_task("audio_convert")
+
+        result = await transcode_audio_with_progress(
+            task.id, Path("/tmp/in.wav"), Path("/tmp/out.m4a"), {"acodec": "aac"}, True
+        )
+
+        assert result.success is True
+        assert result.message.endswith("(4 segments in parallel)")
+        assert result.cpu_time == 12.0
+
+
+class TestTranscodeEndpoints:
+    """Tests for /audio/convert/async and /audio/compress/async"""
+
+    @patch("app.api.audio.run_transcode_task", new_callable=AsyncMock)
+    @patch("app.api.audio.asyncio.create_task")
+    @patch("app.api.audio.save_upload_file")
+    def test_convert_async(self, mock_save, mock_create_task, mock_run_task):
+        mock_save.return_value = Path("/tmp/book.wav")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/audio/convert/async",
+            files={"file": ("book.wav", b"fake audio", "audio/wav")},
+            data={"output_format": "mp3", "chunked": "true"},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "audio_convert"
+        assert task.metadata["chunked"] is True
+        assert mock_run_task.call_args.args[3]["acodec"] == "libmp3lame"
+
+    @patch("app.api.audio.run_transcode_task", new_callable=AsyncMock)
+    @patch("app.api.audio.asyncio.create_task")
+    @patch("app.api.audio.save_upload_file")
+    def test_compress_async_lossless_input(self, mock_save, mock_create_task, mock_run_task):
+        """Test that WAV input is compressed to MP3"""
+        mock_save.return_value = Path("/tmp/book.wav")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/audio/compress/async",
+            files={"file": ("book.wav", b"fake audio", "audio/wav")},
+            data={"target_bitrate": "96k"},
+        )
+
+        assert response.status_code == 200
+        output_path = mock_run_task.call_args.args[2]
+        assert output_path.suffix == ".mp3"
+        assert mock_run_task.call_args.args[3]["b:a"] == "96k"
+
+    def test_convert_async_invalid_format(self):
+        response = client.post(
+            "/api/v1/audio/convert/async",
+            files={"file": ("book.wav", b"fake audio", "audio/wav")},
+            data={"output_format": "wma"},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,165 @@
+"""
+Tests for audio merging (stream-copy fast path and async endpoint)
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services.audio_service import get_merge_copy_codec, merge_audio
+from app.tasks import task_store
+from app.tasks.models import TaskStatus
+
+client = TestClient(app)
+
+
+def make_probe(codec="mp3", sample_rate="44100", channels=2, duration="30.0"):
+    return {
+        "format": {"duration": duration},
+        "streams": [
+            {
+                "codec_type": "audio",
+                "codec_name": codec,
+                "sample_rate": sample_rate,
+                "channels": channels,
+            }
+        ],
+    }
+
+
+INPUTS = [Path("/tmp/ch1.mp3"), Path("/tmp/ch2.mp3"), Path("/tmp/ch3.mp3")]
+
+
+class TestMergeCopyCodec:
+    """Tests for detecting stream-copy compatible inputs"""
+
+    @patch("app.services.audio_service.probe_media", return_value=make_probe())
+    def test_matching_inputs(self, mock_probe):
+        assert get_merge_copy_codec(INPUTS, "mp3") == "mp3"
+
+    @patch("app.services.audio_service.probe_media", return_value=make_probe())
+    def test_codec_does_not_fit_output(self, mock_probe):
+        """Test that MP3 inputs merged into FLAC are re-encoded"""
+        assert get_merge_copy_codec(INPUTS, "flac") is None
+
+    @patch("app.services.audio_service.probe_media")
+    def test_sample_rate_mismatch(self, mock_probe):
+        mock_probe.side_effect = [make_probe(), make_probe(sample_rate="22050"), make_probe()]
+
+        assert get_merge_copy_codec(INPUTS, "mp3") is None
+
+    @patch("app.services.audio_service.probe_media", return_value=make_probe(codec="vorbis"))
+    def test_vorbis_is_never_copied(self, mock_probe):
+        assert get_merge_copy_codec(INPUTS, "ogg") is None
+
+    @patch("app.services.audio_service.probe_media", side_effect=Exception("probe failed"))
+    def test_unreadable_input(self, mock_probe):
+        assert get_merge_copy_codec(INPUTS, "mp3") is None
+
+
+class TestMergeAudio:
+    """Tests for merge_audio"""
+
+    @patch("app.services.audio_service.ffmpeg.run")
+    @patch("app.services.audio_service.get_file_size", return_value=1000)
+    @patch("app.services.audio_service.probe_media", return_value=make_probe())
+    def test_stream_copy(self, mock_probe, mock_size, mock_run, tmp_path):
+        """Test that matching inputs use the concat demuxer without re-encoding"""
+        captured = {}
+
+        def run(stream, **kwargs):
+            args = stream.compile()
+            captured["args"] = args
+            captured["list"] = Path(args[args.index("-i") + 1]).read_text()
+
+        mock_run.side_effect = run
+
+        result = merge_audio(INPUTS, tmp_path / "book.mp3", "mp3")
+
+        assert result.success is True
+        assert "stream copy" in result.message
+        args = captured["args"]
+        assert args[args.index("-f") + 1] == "concat"
+        assert args[args.index("-acodec") + 1] == "copy"
+        assert captured["list"].splitlines() == [f"file '{path}'" for path in INPUTS]
+        assert list(tmp_path.iterdir()) == []
+
+    @patch("app.services.audio_service.ffmpeg.run")
+    @patch("app.services.audio_service.get_file_size", return_value=1000)
+    @patch("app.services.audio_service.probe_media", return_value=make_probe())
+    def test_reencode_mode(self, mock_probe, mock_size, mock_run, tmp_path):
+        """Test that reencode mode always uses the concat filter"""
+        result = merge_audio(INPUTS, tmp_path / "book.mp3", "mp3", mode="reencode")
+
+        assert result.success is True
+        assert "stream copy" not in result.message
+        args = mock_run.call_args.args[0].compile()
+        assert "concat=a=1:n=3:v=0" in args[args.index("-filter_complex") + 1]
+        assert args[args.index("-acodec") + 1] == "libmp3lame"
+        mock_probe.assert_not_called()
+
+
+class TestMergeAudioWithProgress:
+    """Tests for the async merge job"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.audio_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.audio_service_async.get_file_size", return_value=1000)
+    @patch("app.services.audio_service.probe_media", return_value=make_probe(codec="aac"))
+    async def test_stream_copy(self, mock_probe, mock_size, mock_run, tmp_path):
+        from app.services.audio_service_async import merge_audio_with_progress
+
+        mock_run.return_value = 0.2
+        task = task_store.create_task("audio_merge")
+
+        result = await merge_audio_with_progress(task.id, INPUTS, tmp_path / "book.m4a", "m4a")
+
+        assert result.success is True
+        assert result.message.endswith("(stream copy, aac)")
+        cmd = mock_run.call_args.args[0]
+        assert cmd[cmd.index("-acodec") + 1] == "copy"
+        assert task_store.get_task(task.id).status == TaskStatus.COMPLETED
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestMergeEndpoints:
+    """Tests for the merge endpoints"""
+
+    @patch("app.api.audio.run_merge_task", new_callable=AsyncMock)
+    @patch("app.api.audio.asyncio.create_task")
+    @patch("app.api.audio.save_upload_file")
+    def test_merge_async(self, mock_save, mock_create_task, mock_run_task):
+        mock_save.side_effect = INPUTS
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/audio/merge/async",
+            files=[("files", (path.name, b"fake audio", "audio/mpeg")) for path in INPUTS],
+            data={"output_format": "MP3"},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "audio_merge"
+        assert task.metadata["mode"] == "auto"
+        assert mock_run_task.call_args.args[1] == INPUTS
+
+    def test_merge_async_single_file(self):
+        response = client.post(
+            "/api/v1/audio/merge/async",
+            files=[("files", ("a.mp3", b"fake audio", "audio/mpeg"))],
+        )
+
+        assert response.status_code == 400
+
+    def test_merge_invalid_mode(self):
+        response = client.post(
+            "/api/v1/audio/merge",
+            files=[("files", (path.name, b"fake audio", "audio/mpeg")) for path in INPUTS],
+            data={"mode": "copy"},
+        )
+
+        assert response.status_code == 400
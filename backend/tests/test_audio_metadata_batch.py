@@ -0,0 +1,206 @@
+"""
+Tests for batch audio metadata extraction
+"""
+
+import io
+import json
+from pathlib import Path
+import threading
+import time
+from unittest.mock import patch
+import zipfile
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.models.audio import AudioMetadataResponse
+from app.services.audio_service import extract_audio_archive
+from app.services.audio_service_async import iter_audio_metadata
+
+client = TestClient(app)
+
+AUDIO_EXTENSIONS = {".mp3", ".flac"}
+
+
+def fake_metadata(input_path: Path) -> AudioMetadataResponse:
+    return AudioMetadataResponse(
+        success=True,
+        message="Metadata extracted successfully",
+        filename=input_path.name,
+        metadata={"codec": input_path.suffix[1:]},
+    )
+
+
+def make_zip(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class TestIterAudioMetadata:
+    """Tests for the bounded concurrent extraction"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+
+        def extract(input_path):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.02)
+            with lock:
+                running["now"] -= 1
+            return fake_metadata(input_path)
+
+        inputs = [(f"song{i}.mp3", Path(f"/tmp/upload{i}.mp3")) for i in range(6)]
+
+        with patch("app.services.audio_service_async.extract_audio_metadata", side_effect=extract):
+            results = [result async for result in iter_audio_metadata(inputs, workers=2)]
+
+        assert running["max"] <= 2
+        assert sorted(result["index"] for result in results) == list(range(6))
+        first = next(result for result in results if result["index"] == 0)
+        assert first["filename"] == "song0.mp3"
+        assert first["metadata"] == {"codec": "mp3"}
+
+
+class TestExtractAudioArchive:
+    """Tests for unpacking uploaded archives"""
+
+    def test_audio_members_only(self, tmp_path):
+        archive_path = tmp_path / "library.zip"
+        archive_path.write_bytes(
+            make_zip(
+                {
+                    "Artist/Album/01.mp3": b"one",
+                    "Artist/Album/cover.jpg": b"jpeg",
+                    "../escape.flac": b"two",
+                    "__MACOSX/Artist/._01.mp3": b"resource fork",
+                }
+            )
+        )
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+
+        with patch("app.services.audio_service.TEMP_DIR", work_dir):
+            extracted = extract_audio_archive(archive_path, AUDIO_EXTENSIONS)
+
+        assert [name for name, _ in extracted] == ["Artist/Album/01.mp3", "../escape.flac"]
+        assert all(path.parent == work_dir for _, path in extracted)
+        assert extracted[1][1].read_bytes() == b"two"
+
+    @patch("app.services.audio_service.AUDIO_METADATA_BATCH_MAX_FILES", 1)
+    def test_too_many_files(self, tmp_path):
+        archive_path = tmp_path / "library.zip"
+        archive_path.write_bytes(make_zip({"a.mp3": b"a", "b.mp3": b"b"}))
+
+        with pytest.raises(ValueError, match="more than 1 files"):
+            extract_audio_archive(archive_path, AUDIO_EXTENSIONS)
+
+    @patch("app.services.audio_service.AUDIO_METADATA_BATCH_MAX_BYTES", 8)
+    def test_limit_counts_bytes_read(self, tmp_path):
+        archive_path = tmp_path / "library.zip"
+        archive_path.write_bytes(make_zip({"a.mp3": b"aaaa", "b.mp3": b"bbbb"}))
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+
+        # Each member streams more than it declares; the total crosses the limit
+        with (
+            patch("app.services.audio_service.TEMP_DIR", work_dir),
+            patch.object(zipfile.ZipFile, "open", side_effect=lambda info: io.BytesIO(b"12345")),
+            pytest.raises(ValueError, match="too large"),
+        ):
+            extract_audio_archive(archive_path, AUDIO_EXTENSIONS)
+
+        assert list(work_dir.iterdir()) == []
+
+    def test_understated_size(self, tmp_path):
+        data = bytearray(make_zip({"a.mp3": b"x" * 1000}))
+        entry = data.rfind(b"PK\x01\x02")
+        data[entry + 24 : entry + 28] = (10).to_bytes(4, "little")
+        archive_path = tmp_path / "library.zip"
+        archive_path.write_bytes(bytes(data))
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+
+        with (
+            patch("app.services.audio_service.TEMP_DIR", work_dir),
+            pytest.raises(ValueError, match="Invalid ZIP"),
+        ):
+            extract_audio_archive(archive_path, AUDIO_EXTENSIONS)
+
+        assert list(work_dir.iterdir()) == []
+
+    def test_invalid_archive(self, tmp_path):
+        archive_path = tmp_path / "library.zip"
+        archive_path.write_bytes(b"not a zip")
+
+        with pytest.raises(ValueError, match="Invalid ZIP"):
+            extract_audio_archive(archive_path, AUDIO_EXTENSIONS)
+
+
+class TestMetadataBatchEndpoint:
+    """Tests for POST /audio/metadata/batch"""
+
+    @patch("app.services.audio_service_async.extract_audio_metadata", side_effect=fake_metadata)
+    def test_multipart_files(self, mock_extract):
+        response = client.post(
+            "/api/v1/audio/metadata/batch",
+            files=[
+                ("files", ("a.mp3", b"fake audio", "audio/mpeg")),
+                ("files", ("b.flac", b"fake audio", "audio/flac")),
+            ],
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        results = sorted(
+            (json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"]
+        )
+        assert [result["filename"] for result in results] == ["a.mp3", "b.flac"]
+        assert results[1]["metadata"] == {"codec": "flac"}
+        # Uploads are deleted once the stream is done
+        assert not any(call.args[0].exists() for call in mock_extract.call_args_list)
+
+    @patch("app.services.audio_service_async.extract_audio_metadata", side_effect=fake_metadata)
+    def test_archive(self, mock_extract):
+        response = client.post(
+            "/api/v1/audio/metadata/batch",
+            files={
+                "archive": (
+                    "library.zip",
+                    make_zip({"x/1.mp3": b"1", "x/2.ogg": b"2", "x/notes.txt": b"n"}),
+                    "application/zip",
+                )
+            },
+        )
+
+        assert response.status_code == 200
+        names = sorted(json.loads(line)["filename"] for line in response.text.splitlines())
+        assert names == ["x/1.mp3", "x/2.ogg"]
+
+    def test_no_input(self):
+        response = client.post("/api/v1/audio/metadata/batch")
+
+        assert response.status_code == 400
+
+    def test_unsupported_file(self):
+        response = client.post(
+            "/api/v1/audio/metadata/batch",
+            files=[("files", ("notes.txt", b"text", "text/plain"))],
+        )
+
+        assert response.status_code == 400
+
+    def test_invalid_archive(self):
+        response = client.post(
+            "/api/v1/audio/metadata/batch",
+            files={"archive": ("library.zip", b"not a zip", "application/zip")},
+        )
+
+        assert response.status_code == 400
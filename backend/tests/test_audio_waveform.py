@@ -0,0 +1,217 @@
+"""
+Tests for waveform peak extraction
+"""
+
+import io
+import json
+from pathlib import Path
+import struct
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.audio_service import (
+    build_waveform_levels,
+    encode_waveform_binary,
+    extract_waveform,
+    read_waveform_buckets,
+)
+
+client = TestClient(app)
+
+ASTATS_OUTPUT = b"""frame:0    pts:0       pts_time:0
+lavfi.astats.1.Min_level=-16384.000000
+lavfi.astats.1.Max_level=32767.000000
+lavfi.astats.1.RMS_level=-6.020600
+frame:1    pts:800     pts_time:0.1
+lavfi.astats.1.Min_level=0.000000
+lavfi.astats.1.Max_level=0.000000
+lavfi.astats.1.RMS_level=-inf
+"""
+
+
+def make_process(stdout=ASTATS_OUTPUT, returncode=0):
+    process = MagicMock()
+    process.stdout = io.BytesIO(stdout)
+    process.stderr = io.BytesIO(b"decode error" if returncode else b"")
+    process.poll.return_value = returncode
+    process.returncode = returncode
+    return process
+
+
+class TestReadWaveformBuckets:
+    """Tests for the streaming astats reduction"""
+
+    @patch("app.services.audio_service.subprocess.Popen")
+    def test_parses_buckets(self, mock_popen):
+        mock_popen.return_value = make_process()
+
+        buckets = read_waveform_buckets(Path("/tmp/in.mp3"), 800)
+
+        assert len(buckets) == 2
+        assert buckets[0][0] == -0.5
+        assert round(buckets[0][1], 3) == 1.0
+        assert round(buckets[0][2], 3) == 0.5
+        assert buckets[1] == (0.0, 0.0, 0.0)
+        cmd = mock_popen.call_args.args[0]
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert "asetnsamples=n=800" in graph
+        assert "channel_layouts=mono" in graph
+
+    @patch("app.services.audio_service.subprocess.Popen")
+    @patch("app.services.audio_service.probe_media", return_value={"format": {"duration": "10.0"}})
+    def test_ffmpeg_failure(self, mock_probe, mock_popen, tmp_path):
+        mock_popen.return_value = make_process(b"", returncode=1)
+
+        result = extract_waveform(Path("/tmp/in.mp3"), tmp_path / "out.json")
+
+        assert result.success is False
+        assert "decode error" in result.message
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestBuildWaveformLevels:
+    """Tests for deriving zoom levels"""
+
+    def test_pairwise_merge(self):
+        buckets = [(-0.5, 0.5, 0.3), (-0.2, 0.8, 0.4), (-0.1, 0.1, 0.1)]
+
+        levels = build_waveform_levels(buckets, 4)
+
+        assert [len(level) for level in levels] == [3, 2, 1]
+        assert levels[1][0][:2] == (-0.5, 0.8)
+        assert round(levels[1][0][2], 4) == round(((0.09 + 0.16) / 2) ** 0.5, 4)
+        assert levels[1][1] == (-0.1, 0.1, 0.1)
+
+
+class TestExtractWaveform:
+    """Tests for extract_waveform"""
+
+    @patch("app.services.audio_service.get_file_size", return_value=1000)
+    @patch("app.services.audio_service.read_waveform_buckets")
+    @patch(
+        "app.services.audio_service.probe_media", return_value={"format": {"duration": "3600.0"}}
+    )
+    def test_levels(self, mock_probe, mock_buckets, mock_size, tmp_path):
+        mock_buckets.return_value = [(-1.0, 1.0, 0.5)] * 1024
+        output_path = tmp_path / "peaks.json"
+
+        result = extract_waveform(Path("/tmp/in.mp3"), output_path, width=1024, levels=3)
+
+        assert result.success is True
+        # One hour at 8 kHz split into 1024 buckets
+        assert mock_buckets.call_args.args[1] == 28125
+        waveform = json.loads(output_path.read_text())
+        assert [level["width"] for level in waveform["levels"]] == [1024, 512, 256]
+        assert waveform["levels"][1]["seconds_per_bucket"] == 7.03125
+        assert waveform["levels"][0]["min"][0] == -127
+        assert waveform["levels"][2]["rms"][0] == 64
+        assert list(tmp_path.iterdir()) == [output_path]
+
+    @patch("app.services.audio_service.os.replace", side_effect=OSError("disk full"))
+    @patch("app.services.audio_service.read_waveform_buckets", return_value=[(0.0, 0.0, 0.0)])
+    @patch("app.services.audio_service.probe_media", return_value={"format": {"duration": "1.0"}})
+    def test_failed_write_leaves_no_partial(self, mock_probe, mock_buckets, mock_replace, tmp_path):
+        result = extract_waveform(Path("/tmp/in.mp3"), tmp_path / "peaks.json", width=16)
+
+        assert result.success is False
+        assert "disk full" in result.message
+        # Each run writes its own partial file
+        assert ".partial-" in mock_replace.call_args.args[0].name
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestEncodeWaveformBinary:
+    """Tests for the binary peak encoding"""
+
+    def test_layout(self):
+        waveform = {
+            "version": 1,
+            "sample_rate": 8000,
+            "duration": 2.0,
+            "levels": [
+                {
+                    "width": 2,
+                    "seconds_per_bucket": 1.0,
+                    "min": [-5, -6],
+                    "max": [5, 6],
+                    "rms": [1, 2],
+                }
+            ],
+        }
+
+        data = encode_waveform_binary(waveform)
+
+        assert struct.unpack_from("<4sBBHIf", data) == (b"WAVP", 1, 1, 0, 8000, 2.0)
+        assert struct.unpack_from("<If", data, 16) == (2, 1.0)
+        assert struct.unpack_from("<6b", data, 24) == (-5, 5, 1, -6, 6, 2)
+        assert len(data) == 30
+
+
+class TestWaveformEndpoint:
+    """Tests for POST /audio/waveform"""
+
+    WAVEFORM = {
+        "version": 1,
+        "bits": 8,
+        "sample_rate": 8000,
+        "duration": 1.0,
+        "levels": [{"width": 1, "seconds_per_bucket": 1.0, "min": [-1], "max": [1], "rms": [1]}],
+    }
+
+    @patch("app.api.audio.extract_waveform")
+    @patch("app.api.audio.save_upload_file")
+    def test_cached_by_content(self, mock_save, mock_extract, tmp_path):
+        """Test that a repeated upload is served from the cached peaks"""
+        input_path = tmp_path / "song.mp3"
+        input_path.write_bytes(b"fake audio")
+
+        def save(file):
+            input_path.write_bytes(b"fake audio")
+            return input_path
+
+        def extract(input_path, output_path, width, levels):
+            output_path.write_text(json.dumps(self.WAVEFORM))
+            return MagicMock(success=True)
+
+        mock_save.side_effect = save
+        mock_extract.side_effect = extract
+
+        with patch("app.api.audio.TEMP_DIR", tmp_path):
+            first = client.post(
+                "/api/v1/audio/waveform",
+                files={"file": ("song.mp3", b"fake audio", "audio/mpeg")},
+            )
+            second = client.post(
+                "/api/v1/audio/waveform",
+                files={"file": ("song.mp3", b"fake audio", "audio/mpeg")},
+                data={"output": "binary"},
+            )
+
+        assert first.status_code == 200
+        assert first.headers["X-Cache"] == "MISS"
+        assert first.json() == self.WAVEFORM
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.headers["content-type"] == "application/octet-stream"
+        assert second.content[:4] == b"WAVP"
+        mock_extract.assert_called_once()
+        assert mock_extract.call_args.args[2:] == (2048, 4)
+
+    def test_invalid_width(self):
+        response = client.post(
+            "/api/v1/audio/waveform",
+            files={"file": ("song.mp3", b"fake audio", "audio/mpeg")},
+            data={"width": "100000"},
+        )
+
+        assert response.status_code == 400
+
+    def test_invalid_output(self):
+        response = client.post(
+            "/api/v1/audio/waveform",
+            files={"file": ("song.mp3", b"fake audio", "audio/mpeg")},
+            data={"output": "png"},
+        )
+
+        assert response.status_code == 400
@@ -174,3 +174,59 @@ def test_create_collage_3x3_grid():
     assert data["success"] is True
     assert data["dimensions"]["width"] == 2400
     assert data["dimensions"]["height"] == 2400
+
+
+def test_create_collage_webp_with_gutter():
+    """Test a WebP collage with custom cells and a gutter"""
+    images = [
+        ("files", (f"image_{i}.png", create_test_image_bytes(), "image/png")) for i in range(2)
+    ]
+
+    response = client.post(
+        "/api/v1/image/collage",
+        files=images,
+        data={
+            "rows": "1",
+            "cols": "2",
+            "image_order": "0,1",
+            "cell_width": "200",
+            "cell_height": "100",
+            "gutter": "8",
+            "output_format": "webp",
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["filename"].endswith(".webp")
+    assert data["dimensions"] == {"width": 408, "height": 100}
+
+
+def test_create_collage_invalid_options():
+    """Test collage creation with invalid cell size, gutter, canvas size or format"""
+    for options in [
+        {"cell_width": "0"},
+        {"cell_height": "5000"},
+        {"gutter": "-1"},
+        {"output_format": "gif"},
+    ]:
+        response = client.post(
+            "/api/v1/image/collage",
+            files=[("files", ("image.png", create_test_image_bytes(), "image/png"))],
+            data={"rows": "1", "cols": "1", "image_order": "0", **options},
+        )
+        assert response.status_code == 400
+
+    response = client.post(
+        "/api/v1/image/collage",
+        files=[("files", ("image.png", create_test_image_bytes(), "image/png"))],
+        data={
+            "rows": "10",
+            "cols": "10",
+            "image_order": ",".join(["0"] * 100),
+            "cell_width": "2000",
+            "cell_height": "2000",
+        },
+    )
+    assert response.status_code == 400
+    assert "too large" in response.json()["detail"]
@@ -0,0 +1,143 @@
+"""
+Tests for fused color adjustments (/image/adjust and /image/filters)
+"""
+
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image, ImageChops, ImageEnhance, ImageOps
+
+from app.main import app
+from app.models.image import ImageProcessingResponse
+from app.services.image_service import apply_filter
+from app.utils.color_adjust import adjust_colors, build_tone_curve
+
+client = TestClient(app)
+
+
+def gradient_image() -> Image.Image:
+    """RGB image covering a spread of hues and levels"""
+    red = Image.linear_gradient("L").resize((64, 64))
+    green = red.rotate(90)
+    blue = Image.radial_gradient("L").resize((64, 64))
+    return Image.merge("RGB", (red, green, blue))
+
+
+def max_difference(first: Image.Image, second: Image.Image) -> int:
+    return max(high for _, high in ImageChops.difference(first, second).getextrema())
+
+
+class TestAdjustColors:
+    """Tests for the LUT/matrix engine against ImageEnhance and ImageOps"""
+
+    def test_identity_returns_same_image(self):
+        img = gradient_image()
+
+        assert adjust_colors(img) is img
+
+    def test_matches_image_enhance(self):
+        img = gradient_image()
+        expected = ImageEnhance.Brightness(img).enhance(1.3)
+        expected = ImageEnhance.Contrast(expected).enhance(0.7)
+        expected = ImageEnhance.Color(expected).enhance(1.6)
+
+        result = adjust_colors(img, brightness=1.3, contrast=0.7, saturation=1.6)
+
+        # Saturation amplifies the rounding of ImageEnhance's intermediate 8-bit images
+        assert max_difference(result, expected) <= 4
+
+    def test_filters_match_image_ops(self):
+        img = gradient_image()
+        grayscale = ImageOps.grayscale(img)
+
+        assert max_difference(adjust_colors(img, effect="grayscale"), grayscale.convert("RGB")) <= 1
+        assert (
+            max_difference(
+                adjust_colors(img, effect="sepia"),
+                ImageOps.colorize(grayscale, "#704214", "#C0A080"),
+            )
+            <= 2
+        )
+        assert max_difference(adjust_colors(img, effect="invert"), ImageOps.invert(img)) == 0
+
+    def test_two_passes_at_most(self):
+        img = gradient_image()
+
+        with patch.object(Image.Image, "point", wraps=img.point) as mock_point:
+            with patch.object(Image.Image, "convert", wraps=img.convert) as mock_convert:
+                adjust_colors(
+                    img, brightness=1.2, contrast=1.4, saturation=0.5, gamma=2.0, effect="sepia"
+                )
+
+        assert mock_point.call_count == 1
+        assert mock_convert.call_count == 1
+
+    def test_invert_alone_is_a_single_lookup(self):
+        img = gradient_image()
+
+        with patch.object(Image.Image, "convert", wraps=img.convert) as mock_convert:
+            adjust_colors(img, brightness=0.8, effect="invert")
+
+        mock_convert.assert_not_called()
+
+    def test_levels_and_gamma(self):
+        curve = build_tone_curve(gamma=2.0, black_point=50, white_point=200)
+
+        assert curve[:51] == [0] * 51
+        assert curve[200:] == [255] * 56
+        assert curve[125] == round(0.5**0.5 * 255)
+
+
+def test_apply_filter_service(tmp_path):
+    """Test that filters produce an RGB image through the fused engine"""
+    input_path = tmp_path / "photo.png"
+    Image.new("RGBA", (8, 8), (0, 0, 0, 255)).save(input_path)
+
+    result = apply_filter(input_path, tmp_path / "sepia.png", "sepia")
+
+    assert result.success is True
+    with Image.open(tmp_path / "sepia.png") as img:
+        assert img.mode == "RGB"
+        assert img.getpixel((0, 0)) == (0x70, 0x42, 0x14)
+
+
+class TestAdjustEndpointLevels:
+    """Tests for the gamma and levels form fields"""
+
+    @patch("app.api.image.adjust_image")
+    @patch("app.api.image.save_upload_file")
+    def test_gamma_and_levels_are_passed(self, mock_save, mock_adjust):
+        mock_save.return_value = Path("/tmp/photo.png")
+        mock_adjust.return_value = ImageProcessingResponse(
+            success=True, message="ok", filename="adjusted_photo.png"
+        )
+
+        response = client.post(
+            "/api/v1/image/adjust",
+            files={"file": ("photo.png", io.BytesIO(b"fake"), "image/png")},
+            data={"gamma": "1.8", "black_point": "10", "white_point": "240"},
+        )
+
+        assert response.status_code == 200
+        kwargs = mock_adjust.call_args.kwargs
+        assert (kwargs["gamma"], kwargs["black_point"], kwargs["white_point"]) == (1.8, 10, 240)
+
+    def test_invalid_gamma(self):
+        response = client.post(
+            "/api/v1/image/adjust",
+            files={"file": ("photo.png", io.BytesIO(b"fake"), "image/png")},
+            data={"gamma": "20"},
+        )
+
+        assert response.status_code == 400
+
+    def test_invalid_levels(self):
+        response = client.post(
+            "/api/v1/image/adjust",
+            files={"file": ("photo.png", io.BytesIO(b"fake"), "image/png")},
+            data={"black_point": "200", "white_point": "100"},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,133 @@
+"""
+Tests for dominant color analysis (extract-colors and palettes from images)
+"""
+
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.models.palette_generator import PaletteGeneratorResponse
+from app.services.palette_generator_service import generate_palette_from_image
+from app.utils.color_quantize import get_dominant_colors, rgb_to_lab
+
+client = TestClient(app)
+
+
+def two_tone_image(right=(100, 100, 240), shade=(103, 100, 236)) -> Image.Image:
+    """Left half red, right half blue with a slightly different shade at the bottom"""
+    img = Image.new("RGB", (40, 40), (200, 30, 30))
+    img.paste(right, (20, 0, 40, 30))
+    img.paste(shade, (20, 30, 40, 40))
+    return img
+
+
+def png_bytes(img: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestGetDominantColors:
+    """Tests for quantization and perceptual merging"""
+
+    def test_rgb_to_lab(self):
+        lightness, a, b = rgb_to_lab((255, 255, 255))
+
+        assert round(lightness) == 100
+        assert abs(a) < 0.5 and abs(b) < 0.5
+
+    def test_close_shades_are_merged(self):
+        colors = get_dominant_colors(two_tone_image(), 6)
+
+        assert [rgb for rgb, _ in colors] == [(200, 30, 30), (100, 100, 240)]
+        assert [ratio for _, ratio in colors] == [0.5, 0.5]
+
+    def test_distinct_colors_are_kept(self):
+        colors = get_dominant_colors(two_tone_image(shade=(30, 200, 30)), 6)
+
+        assert len(colors) == 3
+        assert colors[2] == ((30, 200, 30), 0.125)
+
+    def test_max_colors(self):
+        img = Image.linear_gradient("L").convert("RGB")
+
+        assert len(get_dominant_colors(img, 4)) == 4
+
+
+class TestPaletteFromImage:
+    """Tests for palettes generated from an image"""
+
+    def test_service(self, tmp_path):
+        input_path = tmp_path / "photo.png"
+        two_tone_image().save(input_path)
+
+        result = generate_palette_from_image(input_path, count=5)
+
+        assert result.success is True
+        assert result.scheme == "image"
+        assert result.base_color == "#c81e1e"
+        assert [color.rgb for color in result.colors] == ["rgb(200, 30, 30)", "rgb(100, 100, 240)"]
+
+    @patch("app.api.palette_generator.generate_palette_from_image")
+    @patch("app.api.palette_generator.save_upload_file")
+    def test_endpoint(self, mock_save, mock_generate):
+        mock_save.return_value = Path("/tmp/photo.png")
+        mock_generate.return_value = PaletteGeneratorResponse(
+            success=True, message="ok", scheme="image"
+        )
+
+        response = client.post(
+            "/api/v1/palette-generator/from-image",
+            files={"file": ("photo.png", b"fake image", "image/png")},
+            data={"count": "4"},
+        )
+
+        assert response.status_code == 200
+        assert mock_generate.call_args.args == (Path("/tmp/photo.png"), 4)
+
+    def test_endpoint_invalid_count(self):
+        response = client.post(
+            "/api/v1/palette-generator/from-image",
+            files={"file": ("photo.png", b"fake image", "image/png")},
+            data={"count": "20"},
+        )
+
+        assert response.status_code == 400
+
+
+class TestExtractColorsBatch:
+    """Tests for POST /image/extract-colors/batch"""
+
+    def test_results_in_upload_order(self):
+        response = client.post(
+            "/api/v1/image/extract-colors/batch",
+            files=[
+                ("files", ("a.png", png_bytes(two_tone_image()), "image/png")),
+                ("files", ("broken.png", b"not an image", "image/png")),
+                ("files", ("c.png", png_bytes(Image.new("RGB", (8, 8), "white")), "image/png")),
+            ],
+            data={"max_colors": "3"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["message"] == "Colors extracted from 2/3 image(s)"
+        assert [result["filename"] for result in data["results"]] == [
+            "a.png",
+            "broken.png",
+            "c.png",
+        ]
+        assert data["results"][1]["success"] is False
+        assert data["results"][2]["colors"] == [{"hex": "#ffffff", "ratio": 1.0}]
+
+    def test_unsupported_file(self):
+        response = client.post(
+            "/api/v1/image/extract-colors/batch",
+            files=[("files", ("notes.txt", b"text", "text/plain"))],
+        )
+
+        assert response.status_code == 400
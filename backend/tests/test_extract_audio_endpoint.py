@@ -3,11 +3,12 @@ Tests for /api/v1/video/extract-audio endpoint
 """
 
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.tasks import task_store
 
 client = TestClient(app)
 
@@ -81,3 +82,23 @@ class TestExtractAudioEndpoint:
             )
 
         assert response.status_code == 400
+
+    @patch("app.api.video.run_extract_audio_task", new_callable=AsyncMock)
+    @patch("app.api.video.asyncio.create_task")
+    @patch("app.api.video.save_upload_file")
+    def test_extract_audio_async(self, mock_save, mock_create_task, mock_run_task):
+        """Start an async multi-track extraction"""
+        mock_save.return_value = Path("/tmp/test_video.mp4")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/video/extract-audio/async",
+            files={"file": ("test_video.mkv", b"fake video", "video/x-matroska")},
+            data={"output_format": "AUTO", "all_tracks": "true"},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "video_extract_audio"
+        assert task.metadata["output_format"] == "auto"
+        assert task.metadata["all_tracks"] is True
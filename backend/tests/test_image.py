@@ -128,3 +128,46 @@ def test_create_icon_invalid_file(client, sample_pdf):
         )
 
     assert response.status_code in [400, 422]
+
+
+def test_create_icon_multiple_sizes(client, sample_image):
+    """Test creating a multi-image ICO"""
+    with open(sample_image, "rb") as f:
+        response = client.post(
+            "/api/v1/image/to-icon",
+            files={"file": ("test_image.png", f, "image/png")},
+            data={"sizes": "16, 32,48"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["filename"].endswith(".ico")
+    assert data["dimensions"] == {"width": 48, "height": 48}
+
+
+def test_create_icon_favicon_bundle(client, sample_image):
+    """Test creating a favicon ZIP with PNG variants"""
+    with open(sample_image, "rb") as f:
+        response = client.post(
+            "/api/v1/image/to-icon",
+            files={"file": ("test_image.png", f, "image/png")},
+            data={"include_png": "true"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert "test_image_favicons.zip" in response.headers["content-disposition"]
+    assert response.content.startswith(b"PK")
+
+
+def test_create_icon_invalid_sizes(client, sample_image):
+    """Test creating icons with invalid sizes"""
+    for sizes in ["16,abc", "16,1024"]:
+        with open(sample_image, "rb") as f:
+            response = client.post(
+                "/api/v1/image/to-icon",
+                files={"file": ("test_image.png", f, "image/png")},
+                data={"sizes": sizes},
+            )
+
+        assert response.status_code == 400
@@ -0,0 +1,111 @@
+"""
+Tests for the automatic (smallest) output format
+"""
+
+import io
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.services.image_service import compress_image, convert_image
+from app.utils.image_encoder import get_auto_formats, has_transparency
+
+client = TestClient(app)
+
+
+def photo_image(size=(160, 120)) -> Image.Image:
+    return Image.effect_mandelbrot(size, (-2, -1.5, 1, 1.5), 100).convert("RGB")
+
+
+class TestAutoFormats:
+    """Tests for candidate selection"""
+
+    def test_transparency(self):
+        assert has_transparency(Image.new("RGBA", (4, 4), (0, 0, 0, 0))) is True
+        assert has_transparency(Image.new("RGBA", (4, 4), (0, 0, 0, 255))) is False
+        assert has_transparency(Image.new("RGB", (4, 4))) is False
+
+    def test_no_jpeg_for_transparent_images(self):
+        assert "JPEG" in get_auto_formats(Image.new("RGB", (4, 4)))
+        assert "JPEG" not in get_auto_formats(Image.new("RGBA", (4, 4), (0, 0, 0, 0)))
+
+    def test_missing_codec_is_skipped(self):
+        with patch(
+            "app.utils.image_encoder.features.check", side_effect=lambda name: name != "avif"
+        ):
+            assert get_auto_formats(Image.new("RGB", (4, 4))) == ["JPEG", "WEBP", "PNG"]
+
+
+class TestAutoConvert:
+    """Tests for convert and compress with output_format=auto"""
+
+    def test_convert_keeps_smallest(self, tmp_path):
+        input_path = tmp_path / "photo.png"
+        photo_image().save(input_path)
+
+        result = convert_image(input_path, tmp_path / "photo_converted.auto", "auto")
+
+        assert result.success is True
+        sizes = {candidate.format: candidate.size for candidate in result.candidates}
+        assert set(sizes) == set(get_auto_formats(photo_image()))
+        assert result.processed_size == min(sizes.values())
+        selected = [candidate.format for candidate in result.candidates if candidate.selected]
+        assert selected == [min(sizes, key=sizes.get)]
+        with Image.open(tmp_path / result.filename) as img:
+            assert img.format == selected[0]
+
+    def test_convert_transparent_image(self, tmp_path):
+        input_path = tmp_path / "logo.png"
+        Image.new("RGBA", (32, 32), (255, 0, 0, 128)).save(input_path)
+
+        result = convert_image(input_path, tmp_path / "logo.auto", "auto")
+
+        assert result.success is True
+        assert "JPEG" not in [candidate.format for candidate in result.candidates]
+        with Image.open(tmp_path / result.filename) as img:
+            assert has_transparency(img.convert("RGBA"))
+
+    def test_compress_auto_with_target(self, tmp_path):
+        input_path = tmp_path / "photo.png"
+        photo_image().save(input_path)
+
+        result = compress_image(
+            input_path, tmp_path / "photo.png", max_bytes=4_000, output_format="auto"
+        )
+
+        assert result.success is True
+        assert result.processed_size <= 4_000
+        assert result.filename.endswith((".jpg", ".webp", ".avif"))
+        assert result.trial_encodes >= len(result.candidates)
+        png = next(candidate for candidate in result.candidates if candidate.format == "PNG")
+        assert png.size is None and "downscaling" in png.message
+
+
+class TestAutoEndpoints:
+    """Tests for the auto output format form values"""
+
+    def test_convert_auto(self):
+        buffer = io.BytesIO()
+        photo_image().save(buffer, format="PNG")
+
+        response = client.post(
+            "/api/v1/image/convert",
+            files={"file": ("photo.png", buffer.getvalue(), "image/png")},
+            data={"output_format": "auto"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["candidates"]) >= 2
+        assert data["filename"].endswith(".auto") is False
+
+    def test_compress_rejects_other_formats(self):
+        response = client.post(
+            "/api/v1/image/compress",
+            files={"file": ("photo.png", b"fake image", "image/png")},
+            data={"output_format": "webp"},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,137 @@
+"""
+Tests for target-size and target-SSIM image compression
+"""
+
+import io
+import random
+
+from fastapi.testclient import TestClient
+from PIL import Image, ImageFilter
+import pytest
+
+from app.main import app
+from app.services.image_service import compress_image
+from app.utils.image_metrics import SSIMReference
+
+client = TestClient(app)
+
+
+def noisy_image(size=(400, 300)) -> Image.Image:
+    """Textured RGB image whose encoded size depends strongly on quality"""
+    rng = random.Random(0)
+    noise = Image.frombytes("L", size, rng.randbytes(size[0] * size[1]))
+    noise = noise.filter(ImageFilter.GaussianBlur(1))
+    gradient = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (noise, gradient, noise.rotate(180)))
+
+
+@pytest.fixture
+def jpeg_path(tmp_path):
+    path = tmp_path / "photo.jpg"
+    noisy_image().save(path, quality=95)
+    return path
+
+
+class TestSSIM:
+    """Tests for the block SSIM"""
+
+    def test_identical_image(self):
+        img = noisy_image()
+
+        assert SSIMReference(img).compare(img) == pytest.approx(1.0)
+
+    def test_degradation_lowers_ssim(self):
+        img = noisy_image()
+        reference = SSIMReference(img)
+
+        slightly = reference.compare(img.filter(ImageFilter.GaussianBlur(0.5)))
+        heavily = reference.compare(img.filter(ImageFilter.GaussianBlur(3)))
+
+        assert 1.0 > slightly > heavily
+
+    def test_size_mismatch(self):
+        with pytest.raises(ValueError):
+            SSIMReference(noisy_image()).compare(noisy_image((40, 30)))
+
+
+class TestCompressToTarget:
+    """Tests for the in-memory quality search"""
+
+    def test_max_bytes(self, jpeg_path, tmp_path):
+        output_path = tmp_path / "small.jpg"
+
+        result = compress_image(jpeg_path, output_path, max_bytes=20_000)
+
+        assert result.success is True
+        assert result.processed_size == output_path.stat().st_size <= 20_000
+        assert 10 <= result.quality < 95
+        assert 1 <= result.trial_encodes <= 7
+        assert result.dimensions == {"width": 400, "height": 300}
+
+    def test_min_ssim(self, jpeg_path, tmp_path):
+        output_path = tmp_path / "small.jpg"
+
+        result = compress_image(jpeg_path, output_path, min_ssim=0.9)
+
+        assert result.success is True
+        with Image.open(output_path) as img:
+            assert SSIMReference(noisy_image()).compare(img) >= 0.89
+        assert result.ssim >= 0.9
+
+    def test_unreachable_without_downscale(self, jpeg_path, tmp_path):
+        result = compress_image(jpeg_path, tmp_path / "small.jpg", max_bytes=500)
+
+        assert result.success is False
+        assert "without downscaling" in result.message
+
+    def test_downscale(self, jpeg_path, tmp_path):
+        result = compress_image(
+            jpeg_path, tmp_path / "small.jpg", max_bytes=1_000, allow_downscale=True
+        )
+
+        assert result.success is True
+        assert result.processed_size <= 1_000
+        assert result.dimensions["width"] < 400
+
+    def test_lossless_format_is_downscaled(self, tmp_path):
+        input_path = tmp_path / "photo.png"
+        noisy_image().save(input_path)
+
+        result = compress_image(
+            input_path, tmp_path / "small.png", max_bytes=100_000, allow_downscale=True
+        )
+
+        assert result.success is True
+        assert result.quality is None
+        assert result.processed_size <= 100_000
+        assert result.dimensions["width"] < 400
+        # One encode per size tried: PNG has no quality to search
+        assert result.trial_encodes >= 2
+
+
+class TestCompressEndpointTargets:
+    """Tests for the max_bytes and min_ssim form fields"""
+
+    def test_max_bytes(self):
+        buffer = io.BytesIO()
+        noisy_image().save(buffer, format="JPEG", quality=95)
+
+        response = client.post(
+            "/api/v1/image/compress",
+            files={"file": ("photo.jpg", buffer.getvalue(), "image/jpeg")},
+            data={"max_bytes": "20000"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["processed_size"] <= 20_000
+        assert data["trial_encodes"] >= 1
+
+    def test_invalid_targets(self):
+        for data in [{"max_bytes": "0"}, {"min_ssim": "1.5"}]:
+            response = client.post(
+                "/api/v1/image/compress",
+                files={"file": ("photo.jpg", b"fake image", "image/jpeg")},
+                data=data,
+            )
+            assert response.status_code == 400
@@ -0,0 +1,108 @@
+"""
+Tests for image encoder profiles
+"""
+
+import io
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+import pytest
+
+from app.main import app
+from app.services.image_service import convert_image, flip_image
+from app.utils.image_encoder import get_encoder_options, resolve_profile, save_image
+
+client = TestClient(app)
+
+
+class TestEncoderOptions:
+    """Tests for profile resolution and per-format options"""
+
+    def test_profiles(self):
+        assert get_encoder_options("png", "fast") == {"compress_level": 1}
+        assert get_encoder_options("jpg", "smallest", quality=80) == {
+            "optimize": True,
+            "progressive": True,
+            "subsampling": "4:2:0",
+            "quality": 80,
+        }
+        assert get_encoder_options("WEBP", "balanced") == {"method": 4, "quality": 95}
+        assert get_encoder_options("bmp", "smallest") == {}
+
+    def test_webp_lossless(self):
+        options = get_encoder_options("webp", "fast", quality=50, lossless=True)
+
+        assert options == {"method": 0, "lossless": True, "quality": 0}
+
+    def test_per_format_default(self):
+        with patch.dict("app.utils.image_encoder.IMAGE_ENCODER_FORMAT_PROFILES", {"PNG": "fast"}):
+            assert resolve_profile("png") == "fast"
+            assert resolve_profile("jpeg") == "balanced"
+            assert resolve_profile("png", "smallest") == "smallest"
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            resolve_profile("png", "ultra")
+
+
+class TestSaveImage:
+    """Tests for encoding through a profile"""
+
+    def test_jpeg_flattens_alpha(self):
+        img = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+        buffer = io.BytesIO()
+
+        save_image(img, buffer, "jpeg", "fast")
+
+        with Image.open(buffer) as saved:
+            assert saved.mode == "RGB"
+            assert saved.getpixel((0, 0)) == (255, 255, 255)
+
+    def test_jpeg_from_palette(self):
+        buffer = io.BytesIO()
+
+        save_image(Image.new("P", (4, 4)), buffer, "JPEG")
+
+        with Image.open(buffer) as saved:
+            assert saved.format == "JPEG"
+
+    def test_smallest_jpeg_is_progressive(self, tmp_path):
+        input_path = tmp_path / "photo.jpg"
+        Image.new("RGB", (64, 48), (10, 120, 200)).save(input_path)
+
+        result = flip_image(input_path, tmp_path / "flipped.jpg", profile="smallest")
+
+        assert result.success is True
+        with Image.open(tmp_path / "flipped.jpg") as saved:
+            assert saved.info.get("progressive") == 1
+
+    def test_convert_to_lossless_webp(self, tmp_path):
+        input_path = tmp_path / "logo.png"
+        Image.new("RGB", (32, 32), (1, 2, 3)).save(input_path)
+
+        result = convert_image(input_path, tmp_path / "logo.webp", "webp", lossless=True)
+
+        assert result.success is True
+        with Image.open(tmp_path / "logo.webp") as saved:
+            assert saved.getpixel((0, 0)) == (1, 2, 3)
+
+    def test_service_rejects_unknown_profile(self, tmp_path):
+        input_path = tmp_path / "photo.png"
+        Image.new("RGB", (8, 8)).save(input_path)
+
+        result = flip_image(input_path, tmp_path / "flipped.png", profile="ultra")
+
+        assert result.success is False
+
+
+def test_endpoint_rejects_unknown_profile():
+    """Test that image endpoints validate the encoder profile"""
+    response = client.post(
+        "/api/v1/image/compress",
+        files={"file": ("photo.png", b"fake image", "image/png")},
+        data={"profile": "ultra"},
+    )
+
+    assert response.status_code == 400
+    assert "Unsupported encoder profile" in response.json()["detail"]
@@ -0,0 +1,102 @@
+"""
+Tests for memory-bounded image loading
+"""
+
+from pathlib import Path
+import threading
+import time
+from unittest.mock import patch
+
+from PIL import Image
+
+from app.services.image_service import resize_image
+from app.utils.image_loader import MemoryBudget, estimate_decoded_bytes, load_image
+
+
+def create_image(path: Path, size=(1600, 1200), mode="RGB") -> Path:
+    Image.new(mode, size, color=(200, 100, 50) if mode == "RGB" else 1).save(path)
+    return path
+
+
+class TestMemoryBudget:
+    """Tests for the decoded-bytes budget"""
+
+    def test_waits_for_memory(self):
+        budget = MemoryBudget(100)
+        events = []
+
+        def second_job():
+            with budget.reserve(60):
+                events.append("second")
+
+        with budget.reserve(60):
+            thread = threading.Thread(target=second_job)
+            thread.start()
+            time.sleep(0.05)
+            events.append("first done")
+
+        thread.join(timeout=1)
+        assert events == ["first done", "second"]
+        assert budget.available == 100
+
+    def test_oversized_request_runs_alone(self):
+        budget = MemoryBudget(100)
+
+        with budget.reserve(10_000) as reserved:
+            assert reserved == 100
+            assert budget.available == 0
+
+
+class TestEstimateDecodedBytes:
+    def test_modes(self):
+        assert estimate_decoded_bytes((100, 10), "RGB") == 4000
+        assert estimate_decoded_bytes((100, 10), "L") == 1000
+        assert estimate_decoded_bytes((100, 10), "I;16") == 2000
+
+
+class TestLoadImage:
+    """Tests for reduced-resolution decoding"""
+
+    def test_jpeg_draft(self, tmp_path):
+        path = create_image(tmp_path / "scan.jpg")
+
+        with load_image(path, max_size=(100, 75)) as img:
+            # DCT scaling to 1/4, then reduced to twice the requested size
+            assert img.size == (200, 150)
+            assert img.format == "JPEG"
+
+    def test_png_reduce(self, tmp_path):
+        path = create_image(tmp_path / "scan.png", size=(1000, 800))
+
+        with load_image(path, max_size=(100, 80)) as img:
+            assert img.size == (200, 160)
+            assert img.format == "PNG"
+
+    def test_palette_image_is_not_reduced(self, tmp_path):
+        path = create_image(tmp_path / "scan.png", size=(1000, 800), mode="P")
+
+        with load_image(path, max_size=(100, 80)) as img:
+            assert img.size == (1000, 800)
+
+    def test_full_size_without_max_size(self, tmp_path):
+        path = create_image(tmp_path / "scan.jpg")
+        budget = MemoryBudget(1 << 30)
+
+        with patch("app.utils.image_loader.image_memory_budget", budget):
+            with load_image(path, copies=2) as img:
+                assert img.size == (1600, 1200)
+                assert budget.available == (1 << 30) - 1600 * 1200 * 4 * 2
+
+        assert budget.available == 1 << 30
+
+
+def test_resize_image_decodes_reduced_jpeg(tmp_path):
+    """Test that downscaling a JPEG gives the requested size from a reduced decode"""
+    input_path = create_image(tmp_path / "scan.jpg", size=(4000, 3000))
+
+    result = resize_image(input_path, tmp_path / "small.jpg", width=300)
+
+    assert result.success is True
+    assert result.dimensions == {"width": 300, "height": 225}
+    with Image.open(tmp_path / "small.jpg") as img:
+        assert img.size == (300, 225)
@@ -0,0 +1,192 @@
+"""
+Tests for interactive preview sessions (/image/preview)
+"""
+
+import io
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.models.image import ImageOperations
+from app.services.image_preview_service import (
+    PreviewSession,
+    PreviewSessionStore,
+    commit_preview,
+    create_preview_session,
+    preview_sessions,
+    render_preview,
+)
+
+client = TestClient(app)
+
+
+def make_session(tmp_path, session_id: str, size=(100, 100)) -> PreviewSession:
+    source_path = tmp_path / f"{session_id}.png"
+    source_path.write_bytes(b"source")
+    return PreviewSession(
+        session_id=session_id,
+        source_path=source_path,
+        source_format="PNG",
+        size=size,
+        proxy=Image.new("RGB", size),
+    )
+
+
+def jpeg_bytes(size=(3000, 2000)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (120, 80, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class TestPreviewSessionStore:
+    """Tests for the memory-bounded session LRU"""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        store = PreviewSessionStore(100 * 100 * 4 * 2)
+        first = make_session(tmp_path, "first")
+        store.put(first)
+        store.put(make_session(tmp_path, "second"))
+        store.get("first")
+
+        store.put(make_session(tmp_path, "third"))
+
+        assert store.get("second") is None
+        assert store.get("first") is first
+        assert store.nbytes == 100 * 100 * 4 * 2
+        assert not (tmp_path / "second.png").exists()
+
+    def test_oversized_session_is_kept_alone(self, tmp_path):
+        store = PreviewSessionStore(10)
+        store.put(make_session(tmp_path, "first"))
+        store.put(make_session(tmp_path, "second"))
+
+        assert len(store) == 1
+        assert store.get("second") is not None
+
+    def test_pop_deletes_source(self, tmp_path):
+        store = PreviewSessionStore(1 << 20)
+        store.put(make_session(tmp_path, "first"))
+
+        assert store.pop("first") is not None
+        assert store.pop("first") is None
+        assert store.nbytes == 0
+        assert not (tmp_path / "first.png").exists()
+
+
+class TestPreviewService:
+    """Tests for session creation, preview renders and commits"""
+
+    def test_create_keeps_downscaled_proxy(self, tmp_path):
+        input_path = tmp_path / "photo.jpg"
+        input_path.write_bytes(jpeg_bytes())
+
+        with patch(
+            "app.services.image_preview_service.preview_sessions", PreviewSessionStore(1 << 30)
+        ) as store:
+            result = create_preview_session(input_path)
+            session = store.get(result.session_id)
+
+        assert result.success is True
+        assert result.dimensions == {"width": 3000, "height": 2000}
+        assert result.preview_dimensions == {"width": 1280, "height": 853}
+        assert session.proxy.size == (1280, 853)
+        assert session.source_format == "JPEG"
+
+    def test_create_invalid_image(self, tmp_path):
+        input_path = tmp_path / "broken.png"
+        input_path.write_bytes(b"not an image")
+
+        result = create_preview_session(input_path)
+
+        assert result.success is False
+
+    def test_render_and_commit(self, tmp_path):
+        session = make_session(tmp_path, "photo", size=(40, 30))
+        Image.new("RGB", (400, 300), (100, 100, 100)).save(session.source_path)
+        session.proxy = Image.new("RGB", (40, 30), (100, 100, 100))
+        operations = ImageOperations(brightness=2.0, filter_name="invert")
+
+        preview = render_preview(session, operations, "webp", 70)
+        result = commit_preview(session, tmp_path / "edited.png", operations)
+
+        with Image.open(io.BytesIO(preview)) as img:
+            assert (img.format, img.size) == ("WEBP", (40, 30))
+        assert result.success is True
+        with Image.open(tmp_path / "edited.png") as img:
+            assert img.size == (400, 300)
+            assert img.getpixel((0, 0)) == (55, 55, 55)
+
+    def test_commit_expired_session(self, tmp_path):
+        session = make_session(tmp_path, "photo")
+        session.source_path.unlink()
+
+        result = commit_preview(session, tmp_path / "edited.png", ImageOperations())
+
+        assert result.success is False
+        assert result.message == "Preview session expired"
+
+
+class TestPreviewEndpoints:
+    """Tests for the preview session API"""
+
+    def test_session_lifecycle(self):
+        response = client.post(
+            "/api/v1/image/preview",
+            files={"file": ("photo.jpg", jpeg_bytes((600, 400)), "image/jpeg")},
+        )
+        assert response.status_code == 200
+        session_id = response.json()["session_id"]
+
+        try:
+            response = client.post(
+                f"/api/v1/image/preview/{session_id}/render",
+                data={"contrast": "1.5", "filter_name": "sepia"},
+            )
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "image/jpeg"
+            assert response.headers["cache-control"] == "no-store"
+
+            response = client.post(
+                f"/api/v1/image/preview/{session_id}/commit", data={"gamma": "1.5"}
+            )
+            assert response.status_code == 200
+            assert response.json()["dimensions"] == {"width": 600, "height": 400}
+        finally:
+            response = client.delete(f"/api/v1/image/preview/{session_id}")
+
+        assert response.status_code == 200
+        assert preview_sessions.get(session_id) is None
+
+    def test_unknown_session(self):
+        assert client.post("/api/v1/image/preview/missing/render").status_code == 404
+        assert client.post("/api/v1/image/preview/missing/commit").status_code == 404
+        assert client.delete("/api/v1/image/preview/missing").status_code == 404
+
+    def test_commit_after_source_cleanup(self):
+        response = client.post(
+            "/api/v1/image/preview",
+            files={"file": ("photo.jpg", jpeg_bytes((600, 400)), "image/jpeg")},
+        )
+        session_id = response.json()["session_id"]
+        preview_sessions.get(session_id).source_path.unlink()
+
+        response = client.post(f"/api/v1/image/preview/{session_id}/commit")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Preview session expired"
+        assert preview_sessions.get(session_id) is None
+
+    def test_invalid_render_options(self):
+        for data in [{"output_format": "png"}, {"quality": "0"}, {"filter_name": "emboss"}]:
+            response = client.post("/api/v1/image/preview/missing/render", data=data)
+            assert response.status_code == 400
+
+    def test_unsupported_upload(self):
+        response = client.post(
+            "/api/v1/image/preview",
+            files={"file": ("notes.txt", b"text", "text/plain")},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,132 @@
+"""
+Tests for responsive image sets
+"""
+
+import io
+import json
+import zipfile
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.services.image_service import _resize_ladder, create_responsive_images
+
+client = TestClient(app)
+
+
+def photo_image(size=(1000, 500)) -> Image.Image:
+    return Image.effect_mandelbrot(size, (-2, -1.5, 1, 1.5), 100).convert("RGB")
+
+
+class TestResizeLadder:
+    """Tests for the shared halving ladder"""
+
+    def test_sizes_keep_requested_order(self):
+        levels = _resize_ladder(photo_image(), [(100, 50), (400, 200), (1000, 500)])
+
+        assert [level.size for level in levels] == [(100, 50), (400, 200), (1000, 500)]
+
+    def test_matches_direct_resize(self):
+        img = photo_image()
+
+        laddered = _resize_ladder(img, [(100, 50)])[0]
+        direct = img.resize((100, 50), Image.LANCZOS)
+
+        difference = [abs(a - b) for a, b in zip(laddered.tobytes(), direct.tobytes())]
+        assert sum(difference) / len(difference) < 4
+
+    def test_palette_image(self):
+        img = photo_image().quantize(16)
+
+        assert _resize_ladder(img, [(50, 25)])[0].mode == "RGB"
+
+
+class TestCreateResponsiveImages:
+    """Tests for the archive and srcset manifest"""
+
+    def test_archive(self, tmp_path):
+        input_path = tmp_path / "photo.jpg"
+        photo_image().save(input_path)
+        output_path = tmp_path / "photo.zip"
+
+        result = create_responsive_images(
+            input_path, output_path, [320, 640, 1920], ["webp", "jpg"], name="photo"
+        )
+
+        assert result.success is True
+        assert result.dimensions == {"width": 1000, "height": 500}
+        with zipfile.ZipFile(output_path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            assert manifest["widths"] == [320, 640]
+            assert (
+                manifest["formats"]["webp"]["srcset"]
+                == "photo-320w.webp 320w, photo-640w.webp 640w"
+            )
+            for entry in manifest["formats"]["jpg"]["files"]:
+                with Image.open(io.BytesIO(archive.read(entry["file"]))) as img:
+                    assert img.format == "JPEG"
+                    assert img.size == (entry["width"], entry["height"])
+                    assert entry["size"] == archive.getinfo(entry["file"]).file_size
+
+    def test_source_narrower_than_every_width(self, tmp_path):
+        input_path = tmp_path / "icon.png"
+        Image.new("RGBA", (200, 100), (255, 0, 0, 128)).save(input_path)
+
+        result = create_responsive_images(input_path, tmp_path / "icon.zip", [320], ["png"])
+
+        assert result.success is True
+        with zipfile.ZipFile(tmp_path / "icon.zip") as archive:
+            assert json.loads(archive.read("manifest.json"))["widths"] == [200]
+            with Image.open(io.BytesIO(archive.read("image-200w.png"))) as img:
+                assert img.mode == "RGBA"
+
+    def test_invalid_image(self, tmp_path):
+        input_path = tmp_path / "broken.png"
+        input_path.write_bytes(b"not an image")
+
+        result = create_responsive_images(input_path, tmp_path / "broken.zip")
+
+        assert result.success is False
+
+
+class TestResponsiveEndpoint:
+    """Tests for /image/responsive"""
+
+    def test_returns_archive(self):
+        buffer = io.BytesIO()
+        photo_image().save(buffer, format="PNG")
+
+        response = client.post(
+            "/api/v1/image/responsive",
+            files={"file": ("photo.png", buffer.getvalue(), "image/png")},
+            data={"widths": "320, 640", "formats": "webp,jpeg"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert response.headers["x-download-url"].endswith(".zip")
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == [
+                "manifest.json",
+                "photo-320w.jpg",
+                "photo-320w.webp",
+                "photo-640w.jpg",
+                "photo-640w.webp",
+            ]
+
+    def test_invalid_options(self):
+        for data in [
+            {"widths": "320,abc"},
+            {"widths": "0"},
+            {"widths": "100000"},
+            {"formats": "gif"},
+            {"quality": "best"},
+            {"profile": "ultra"},
+        ]:
+            response = client.post(
+                "/api/v1/image/responsive",
+                files={"file": ("photo.png", b"fake image", "image/png")},
+                data=data,
+            )
+            assert response.status_code == 400
@@ -1,6 +1,9 @@
 import io
+import json
 from pathlib import Path
+import threading
 from unittest.mock import patch
+import zipfile
 
 from PIL import Image
 import pytest
@@ -9,11 +12,14 @@ from app.services.image_service import (
     compress_image,
     convert_image,
     create_collage,
+    create_favicon_bundle,
     create_icon,
     extract_colors,
     resize_image,
     rotate_image,
 )
+from app.utils.image_encoder import encode_pool
+from app.utils.image_loader import load_image
 
 
 def create_temp_image(path: Path, size=(100, 50), color="red", mode="RGB"):
@@ -236,6 +242,117 @@ def test_create_collage_3x3_grid(tmp_path: Path):
     assert output_path.exists()
 
 
+def test_create_collage_cell_size_gutter_and_format(tmp_path: Path):
+    """Test a JPEG collage with custom cells and gutters"""
+    image_paths = []
+    for i, color in enumerate(["red", "blue"]):
+        img_path = tmp_path / f"image_{i}.png"
+        create_temp_image(img_path, size=(300, 100), color=color)
+        image_paths.append(img_path)
+
+    output_path = tmp_path / "collage.jpg"
+    result = create_collage(
+        image_paths,
+        output_path,
+        rows=1,
+        cols=3,
+        image_order=[0, 1, 0],
+        cell_width=60,
+        cell_height=40,
+        gutter=10,
+        output_format="jpg",
+    )
+
+    assert result.success is True
+    assert result.dimensions == {"width": 200, "height": 40}
+    with Image.open(output_path) as img:
+        assert img.format == "JPEG"
+        red, gutter, blue, last = (img.getpixel((x, 20)) for x in (30, 65, 100, 170))
+        assert red[0] > 200 and red[2] < 50
+        assert min(gutter) > 240
+        assert blue[2] > 200 and blue[0] < 50
+        assert last[0] > 200
+
+
+def test_create_collage_decodes_each_image_once(tmp_path: Path):
+    """Test that repeated cells reuse one render of their image"""
+    image_paths = [create_temp_image(tmp_path / "image_0.png", size=(400, 400))]
+
+    with patch(
+        "app.services.image_service._render_collage_cell",
+        return_value=Image.new("RGB", (50, 50), "red"),
+    ) as render:
+        result = create_collage(
+            image_paths,
+            tmp_path / "collage.png",
+            rows=2,
+            cols=2,
+            image_order=[0, 0, 0, 0],
+            cell_width=50,
+            cell_height=50,
+        )
+
+    assert result.success is True
+    render.assert_called_once_with(image_paths[0], (50, 50))
+
+
+def test_create_collage_does_not_need_encode_pool(tmp_path: Path):
+    """Test that cells decode while every encode worker is busy"""
+    image_paths = [create_temp_image(tmp_path / "image_0.png", size=(100, 100))]
+    release = threading.Event()
+    busy = [encode_pool.submit(release.wait) for _ in range(encode_pool._max_workers)]
+
+    try:
+        worker = threading.Thread(
+            target=lambda: create_collage(
+                image_paths, tmp_path / "collage.png", rows=1, cols=2, image_order=[0, 0]
+            )
+        )
+        worker.start()
+        worker.join(timeout=10)
+        encode_free = not worker.is_alive()
+    finally:
+        release.set()
+        for future in busy:
+            future.result()
+        worker.join()
+
+    assert encode_free is True
+    assert (tmp_path / "collage.png").exists()
+
+
+def test_create_collage_large_png_uses_fast_profile(tmp_path: Path):
+    """Test that large PNG canvases skip the slow encoder settings"""
+    image_paths = [create_temp_image(tmp_path / "image_0.png", size=(100, 100))]
+
+    with (
+        patch("app.services.image_service.IMAGE_COLLAGE_PNG_FAST_PIXELS", 100),
+        patch("app.services.image_service.save_image") as save,
+    ):
+        create_collage(
+            image_paths,
+            tmp_path / "collage.png",
+            rows=1,
+            cols=1,
+            image_order=[0],
+            cell_width=20,
+            cell_height=20,
+        )
+
+    assert save.call_args.args[2:] == ("PNG", "fast")
+
+
+def test_create_collage_unreadable_image(tmp_path: Path):
+    """Test collage creation with an image that cannot be decoded"""
+    image_path = tmp_path / "broken.png"
+    image_path.write_bytes(b"not an image")
+
+    result = create_collage([image_path], tmp_path / "collage.png", rows=1, cols=1, image_order=[0])
+
+    assert result.success is False
+    assert "broken.png" in result.message
+
+
 def test_create_icon_success(tmp_path: Path):
     """Test creating an icon from an image"""
     input_path = tmp_path / "input.png"
@@ -270,6 +387,70 @@ def test_create_icon_different_sizes(tmp_path: Path):
         assert output_path.exists()
 
 
+def test_create_icon_multiple_sizes(tmp_path: Path):
+    """Test creating a multi-image ICO from one decode"""
+    input_path = tmp_path / "input.png"
+    output_path = tmp_path / "output.ico"
+    create_temp_image(input_path, size=(1024, 1024), color="blue", mode="RGBA")
+
+    with patch("app.services.image_service.load_image", wraps=load_image) as loader:
+        result = create_icon(input_path, output_path, sizes=[16, 32, 48, 256, 512])
+
+    assert result.success is True
+    assert result.dimensions == {"width": 512, "height": 512}
+    loader.assert_called_once()
+    with Image.open(output_path) as icon:
+        assert icon.info["sizes"] == {(16, 16), (32, 32), (48, 48), (256, 256)}
+        icon.size = (16, 16)
+        icon.load()
+        assert icon.getpixel((8, 8)) == (0, 0, 255, 255)
+
+
+def test_create_favicon_bundle(tmp_path: Path):
+    """Test creating a favicon ZIP with PNG variants and a manifest"""
+    input_path = tmp_path / "input.png"
+    output_path = tmp_path / "favicons.zip"
+    create_temp_image(input_path, size=(600, 600), color=(255, 0, 0, 0), mode="RGBA")
+
+    result = create_favicon_bundle(
+        input_path, output_path, sizes=[16, 32], include_png=True, include_manifest=True
+    )
+
+    assert result.success is True
+    with zipfile.ZipFile(output_path) as archive:
+        assert sorted(archive.namelist()) == [
+            "android-chrome-192x192.png",
+            "android-chrome-512x512.png",
+            "apple-touch-icon.png",
+            "favicon-16x16.png",
+            "favicon-32x32.png",
+            "favicon.ico",
+            "site.webmanifest",
+        ]
+        manifest = json.loads(archive.read("site.webmanifest"))
+        assert [icon["sizes"] for icon in manifest["icons"]] == ["192x192", "512x512"]
+        with Image.open(io.BytesIO(archive.read("apple-touch-icon.png"))) as touch:
+            # Opaque: iOS shows transparent touch icons on black
+            assert touch.size == (180, 180) and touch.mode == "RGB"
+        with Image.open(io.BytesIO(archive.read("favicon-32x32.png"))) as png:
+            assert png.mode == "RGBA" and png.getpixel((0, 0))[3] == 0
+
+
+def test_create_favicon_bundle_ico_only(tmp_path: Path):
+    """Test that the favicon ZIP defaults to the standard ICO sizes"""
+    input_path = tmp_path / "input.png"
+    create_temp_image(input_path, size=(300, 300), color="green")
+
+    result = create_favicon_bundle(input_path, tmp_path / "favicons.zip", include_png=False)
+
+    assert result.success is True
+    with zipfile.ZipFile(tmp_path / "favicons.zip") as archive:
+        assert archive.namelist() == ["favicon.ico"]
+        with Image.open(io.BytesIO(archive.read("favicon.ico"))) as icon:
+            assert max(icon.info["sizes"]) == (256, 256)
+            assert len(icon.info["sizes"]) == 6
+
+
 def test_create_icon_invalid_size_too_small(tmp_path: Path):
     """Test creating icon with size too small"""
     input_path = tmp_path / "input.png"
@@ -0,0 +1,213 @@
+"""
+Tests for deep-zoom tile pyramids
+"""
+
+import io
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+import zipfile
+
+from fastapi.testclient import TestClient
+from PIL import Image
+import pytest
+
+from app.main import app
+from app.services.image_service_async import create_tiles_with_progress
+from app.services.image_tiles_service import (
+    create_tile_pyramid,
+    get_level_count,
+    get_level_size,
+)
+from app.tasks import task_store
+from app.tasks.models import TaskStatus
+
+client = TestClient(app)
+
+
+def map_image(size=(600, 300), mode="RGB") -> Image.Image:
+    """Image with a different color in each quadrant"""
+    img = Image.new(mode, size, "red")
+    img.paste("blue", (size[0] // 2, 0, size[0], size[1] // 2))
+    img.paste("green", (0, size[1] // 2, size[0] // 2, size[1]))
+    return img
+
+
+@pytest.fixture
+def map_path(tmp_path):
+    path = tmp_path / "map.png"
+    map_image().save(path)
+    return path
+
+
+class TestGeometry:
+    """Tests for level counts and sizes"""
+
+    def test_level_count(self):
+        assert get_level_count((600, 300), 256, "dzi") == 11  # 600 -> 1 pixel
+        assert get_level_count((512, 512), 256, "dzi") == 10
+        assert get_level_count((600, 300), 256, "xyz") == 3  # 600, 300, 150
+        assert get_level_count((256, 100), 256, "xyz") == 1
+        assert get_level_count((1, 1), 256, "dzi") == 1
+
+    def test_level_size(self):
+        assert get_level_size((600, 301), 0) == (600, 301)
+        assert get_level_size((600, 301), 1) == (300, 151)
+        assert get_level_size((600, 301), 3) == (75, 38)
+
+
+class TestCreateTilePyramid:
+    """Tests for the band-streamed pyramid"""
+
+    def test_dzi(self, map_path, tmp_path):
+        output_path = tmp_path / "map_dzi.zip"
+        progress = []
+
+        result = create_tile_pyramid(
+            map_path,
+            output_path,
+            "dzi",
+            tile_size=256,
+            name="map",
+            on_progress=lambda written, total: progress.append((written, total)),
+        )
+
+        assert result.success is True
+        assert "11 levels" in result.message
+        with zipfile.ZipFile(output_path) as archive:
+            names = archive.namelist()
+            assert "map.dzi" in names
+            descriptor = archive.read("map.dzi").decode()
+            assert 'TileSize="256"' in descriptor and 'Width="600" Height="300"' in descriptor
+
+            # Full level: 3 x 2 tiles, edge tiles cropped
+            full = sorted(name for name in names if name.startswith("map_files/10/"))
+            assert full == [f"map_files/10/{col}_{row}.jpg" for col in range(3) for row in range(2)]
+            with Image.open(io.BytesIO(archive.read("map_files/10/2_1.jpg"))) as tile:
+                assert tile.size == (600 - 512, 300 - 256)
+
+            # Level 9 (300x150) comes from level 10: quadrants keep their colors
+            with Image.open(io.BytesIO(archive.read("map_files/9/1_0.jpg"))) as tile:
+                assert tile.size == (44, 150)
+                red, green, blue = tile.getpixel((20, 20))
+                assert blue > 200 and red < 50
+
+            with Image.open(io.BytesIO(archive.read("map_files/0/0_0.jpg"))) as tile:
+                assert tile.size == (1, 1)
+
+        assert progress[-1][0] == progress[-1][1] == len(names) - 1
+
+    def test_xyz_pads_tiles(self, tmp_path):
+        input_path = tmp_path / "logo.png"
+        map_image(mode="RGBA").save(input_path)
+        output_path = tmp_path / "logo_xyz.zip"
+
+        result = create_tile_pyramid(input_path, output_path, "xyz", 128, "png")
+
+        assert result.success is True
+        with zipfile.ZipFile(output_path) as archive:
+            metadata = json.loads(archive.read("metadata.json"))
+            assert metadata["max_zoom"] == 3
+            with Image.open(io.BytesIO(archive.read("0/0/0.png"))) as tile:
+                assert tile.size == (128, 128)
+                assert tile.mode == "RGBA"
+                # 600x300 at zoom 0 is 75x38: the rest is transparent padding
+                assert tile.getpixel((10, 10))[3] == 255
+                assert tile.getpixel((100, 100))[3] == 0
+            assert "3/4/2.png" in archive.namelist()
+
+    def test_invalid_image(self, tmp_path):
+        input_path = tmp_path / "broken.png"
+        input_path.write_bytes(b"not an image")
+        output_path = tmp_path / "broken.zip"
+
+        result = create_tile_pyramid(input_path, output_path)
+
+        assert result.success is False
+        assert not output_path.exists()
+
+
+class TestCreateTilesWithProgress:
+    """Tests for the async tiling job"""
+
+    @pytest.mark.asyncio
+    async def test_completes_task(self, map_path, tmp_path):
+        task = task_store.create_task("image_tiles")
+
+        result = await create_tiles_with_progress(
+            task.id, map_path, tmp_path / "map.zip", layout="xyz"
+        )
+
+        assert result.success is True
+        assert result.download_url.endswith("map.zip")
+        assert task_store.get_task(task.id).status == TaskStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_task_stops(self, map_path, tmp_path):
+        task = task_store.create_task("image_tiles")
+        output_path = tmp_path / "map.zip"
+
+        def cancel_while_running(*args, **kwargs):
+            task_store.cancel_task(task.id)
+            return create_tile_pyramid(*args, **kwargs)
+
+        with patch(
+            "app.services.image_service_async.create_tile_pyramid",
+            side_effect=cancel_while_running,
+        ):
+            result = await create_tiles_with_progress(task.id, map_path, output_path)
+
+        assert result.success is False
+        assert not output_path.exists()
+        assert task_store.get_task(task.id).status == TaskStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_failed_task(self, tmp_path):
+        input_path = tmp_path / "broken.png"
+        input_path.write_bytes(b"not an image")
+        task = task_store.create_task("image_tiles")
+
+        result = await create_tiles_with_progress(task.id, input_path, tmp_path / "out.zip")
+
+        assert result.success is False
+        assert task_store.get_task(task.id).status == TaskStatus.FAILED
+
+
+class TestTilesEndpoint:
+    """Tests for POST /image/tiles"""
+
+    @patch("app.api.image.run_tiles_task", new_callable=AsyncMock)
+    @patch("app.api.image.asyncio.create_task")
+    @patch("app.api.image.save_upload_file")
+    def test_start_task(self, mock_save, mock_create_task, mock_run_task):
+        mock_save.return_value = Path("/tmp/map.png")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/image/tiles",
+            files={"file": ("map.png", b"fake image", "image/png")},
+            data={"layout": "XYZ", "tile_size": "512", "output_format": "jpeg"},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "image_tiles"
+        assert task.metadata["layout"] == "xyz"
+        assert task.metadata["output_format"] == "jpg"
+        options = mock_run_task.call_args.args[3]
+        assert options["tile_size"] == 512 and options["name"] == "map"
+
+    def test_invalid_options(self):
+        for data in [
+            {"layout": "tms"},
+            {"tile_size": "32"},
+            {"tile_size": "4096"},
+            {"output_format": "gif"},
+            {"quality": "best"},
+        ]:
+            response = client.post(
+                "/api/v1/image/tiles",
+                files={"file": ("map.png", b"fake image", "image/png")},
+                data=data,
+            )
+            assert response.status_code == 400
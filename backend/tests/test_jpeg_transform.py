@@ -0,0 +1,199 @@
+"""
+Tests for lossless JPEG rotations and flips
+"""
+
+import shutil
+import subprocess
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image, ImageOps
+import pytest
+
+from app.main import app
+from app.services.image_service import flip_image, rotate_image
+from app.utils.jpeg_transform import (
+    ORIENTATION_TAG,
+    compose_transpose,
+    set_exif_orientation,
+    transform_jpeg,
+)
+
+client = TestClient(app)
+
+
+def save_jpeg(path, size=(64, 48), orientation=None):
+    """Photo-like JPEG (4:2:0, MCUs of 16x16) with an optional EXIF orientation"""
+    img = Image.effect_mandelbrot(size, (-2, -1.5, 1, 1.5), 50).convert("RGB")
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[ORIENTATION_TAG] = orientation
+    img.save(path, "JPEG", quality=90, subsampling="4:2:0", exif=exif.tobytes())
+    return path
+
+
+def displayed(path) -> Image.Image:
+    """Image as viewers show it"""
+    with Image.open(path) as img:
+        return ImageOps.exif_transpose(img)
+
+
+def fake_jpegtran(command, **kwargs):
+    """Stand-in for jpegtran: copies the input to -outfile"""
+    shutil.copyfile(command[-1], command[command.index("-outfile") + 1])
+    return subprocess.CompletedProcess(command, 0)
+
+
+class TestOrientation:
+    """Tests for transform composition and EXIF rewriting"""
+
+    def test_compose(self):
+        # Rotating 90 degrees clockwise twice is a half turn
+        assert (
+            compose_transpose(Image.Transpose.ROTATE_270, Image.Transpose.ROTATE_270)
+            == Image.Transpose.ROTATE_180
+        )
+        assert (
+            compose_transpose(Image.Transpose.FLIP_LEFT_RIGHT, Image.Transpose.FLIP_LEFT_RIGHT)
+            is None
+        )
+        assert compose_transpose(None, Image.Transpose.TRANSPOSE) == Image.Transpose.TRANSPOSE
+
+    def test_rewrites_tag_in_place(self, tmp_path):
+        data = save_jpeg(tmp_path / "photo.jpg", orientation=1).read_bytes()
+
+        patched = set_exif_orientation(data, 6)
+
+        assert len(patched) == len(data)
+        assert sum(a != b for a, b in zip(data, patched)) == 1
+        (tmp_path / "patched.jpg").write_bytes(patched)
+        with Image.open(tmp_path / "patched.jpg") as img:
+            assert img.getexif()[ORIENTATION_TAG] == 6
+
+    def test_adds_missing_exif(self, tmp_path):
+        path = tmp_path / "plain.jpg"
+        Image.new("RGB", (16, 16), "red").save(path)
+
+        (tmp_path / "tagged.jpg").write_bytes(set_exif_orientation(path.read_bytes(), 8))
+
+        with Image.open(tmp_path / "tagged.jpg") as img:
+            assert img.getexif()[ORIENTATION_TAG] == 8
+            assert img.applist[0][0] == "APP0"  # JFIF stays first
+            img.load()
+
+
+class TestTransformJpeg:
+    """Tests for the lossless fast paths"""
+
+    def test_metadata_only_any_size(self, tmp_path):
+        input_path = save_jpeg(tmp_path / "photo.jpg", size=(61, 45), orientation=6)
+        output_path = tmp_path / "rotated.jpg"
+
+        size = transform_jpeg(
+            input_path, output_path, Image.Transpose.ROTATE_270, metadata_only=True
+        )
+
+        # Displayed 45x61 before, rotated a quarter turn clockwise again
+        assert size == (61, 45)
+        expected = displayed(input_path).transpose(Image.Transpose.ROTATE_270)
+        assert displayed(output_path).tobytes() == expected.tobytes()
+
+    def test_metadata_only_needs_jpeg(self, tmp_path):
+        input_path = tmp_path / "logo.png"
+        Image.new("RGB", (16, 16)).save(input_path)
+
+        with pytest.raises(ValueError):
+            transform_jpeg(
+                input_path, tmp_path / "out.png", Image.Transpose.ROTATE_180, metadata_only=True
+            )
+
+    @patch("app.utils.jpeg_transform.subprocess.run", side_effect=fake_jpegtran)
+    def test_jpegtran_command(self, mock_run, tmp_path):
+        input_path = save_jpeg(tmp_path / "photo.jpg")
+        output_path = tmp_path / "rotated.jpg"
+
+        size = transform_jpeg(input_path, output_path, Image.Transpose.ROTATE_270, "smallest")
+
+        assert size == (48, 64)
+        command = mock_run.call_args.args[0]
+        assert command[:4] == ["jpegtran", "-copy", "all", "-perfect"]
+        assert command[4:6] == ["-rotate", "90"]
+        assert "-progressive" in command and "-optimize" in command
+
+    @patch("app.utils.jpeg_transform.subprocess.run", side_effect=fake_jpegtran)
+    def test_jpegtran_resets_orientation(self, mock_run, tmp_path):
+        input_path = save_jpeg(tmp_path / "photo.jpg", orientation=3)
+        output_path = tmp_path / "flipped.jpg"
+
+        transform_jpeg(input_path, output_path, Image.Transpose.FLIP_LEFT_RIGHT)
+
+        # Half turn then mirror is a vertical flip of the stored pixels
+        assert mock_run.call_args.args[0][4:6] == ["-flip", "vertical"]
+        with Image.open(output_path) as img:
+            assert img.getexif()[ORIENTATION_TAG] == 1
+
+    @patch("app.utils.jpeg_transform.subprocess.run")
+    def test_partial_mcus_fall_back(self, mock_run, tmp_path):
+        # 60 is not a multiple of 16: the right edge cannot move left
+        input_path = save_jpeg(tmp_path / "photo.jpg", size=(60, 48))
+
+        assert (
+            transform_jpeg(input_path, tmp_path / "out.jpg", Image.Transpose.FLIP_LEFT_RIGHT)
+            is None
+        )
+        # The bottom edge is whole MCUs, so a vertical flip is lossless
+        mock_run.side_effect = fake_jpegtran
+        size = transform_jpeg(input_path, tmp_path / "out.jpg", Image.Transpose.FLIP_TOP_BOTTOM)
+        assert size == (60, 48)
+        assert mock_run.call_count == 1
+
+
+class TestRotateAndFlip:
+    """Tests for the service fallbacks and endpoint options"""
+
+    @patch("app.utils.jpeg_transform.subprocess.run", side_effect=FileNotFoundError)
+    def test_missing_jpegtran_decodes(self, mock_run, tmp_path):
+        input_path = save_jpeg(tmp_path / "photo.jpg", orientation=6)
+        output_path = tmp_path / "rotated.jpg"
+
+        result = rotate_image(input_path, output_path, 90)
+
+        assert result.success is True
+        assert "successfully" in result.message
+        # Displayed 48x64 before, 64x48 after
+        assert result.dimensions == {"width": 64, "height": 48}
+        with Image.open(output_path) as img:
+            assert img.size == (64, 48)
+
+    @patch("app.utils.jpeg_transform.subprocess.run", side_effect=fake_jpegtran)
+    def test_lossless_flip(self, mock_run, tmp_path):
+        input_path = save_jpeg(tmp_path / "photo.jpg")
+
+        result = flip_image(input_path, tmp_path / "flipped.jpg", "vertical")
+
+        assert result.success is True
+        assert "losslessly" in result.message
+        assert result.dimensions == {"width": 64, "height": 48}
+
+    def test_metadata_only_rejects_other_formats(self):
+        for endpoint, data in [("rotate", {"angle": "90"}), ("flip", {"direction": "vertical"})]:
+            response = client.post(
+                f"/api/v1/image/{endpoint}",
+                files={"file": ("logo.png", b"fake image", "image/png")},
+                data={**data, "metadata_only": "true"},
+            )
+            assert response.status_code == 400
+
+    def test_metadata_only_endpoint(self, tmp_path):
+        input_path = save_jpeg(tmp_path / "photo.jpg", size=(61, 45), orientation=1)
+
+        with open(input_path, "rb") as f:
+            response = client.post(
+                "/api/v1/image/rotate",
+                files={"file": ("photo.jpg", f, "image/jpeg")},
+                data={"angle": "90", "metadata_only": "true"},
+            )
+
+        assert response.status_code == 200
+        assert response.json()["dimensions"] == {"width": 45, "height": 61}
+        assert response.json()["processed_size"] == input_path.stat().st_size
@@ -0,0 +1,136 @@
+"""
+Tests for cached media probing utilities
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils.media_probe import (
+    ProbeCache,
+    get_file_fingerprint,
+    get_keyframe_index,
+    probe_cache,
+    probe_media,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_probe_cache():
+    """Start every test with an empty cache"""
+    probe_cache.clear()
+    yield
+    probe_cache.clear()
+
+
+class TestProbeCache:
+    """Tests for the LRU probe cache"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reading an entry protects it from eviction"""
+        cache = ProbeCache(2)
+        cache.put(("a",), 1)
+        cache.put(("b",), 2)
+        assert cache.get(("a",)) == 1
+
+        cache.put(("c",), 3)
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == 1
+        assert len(cache) == 2
+
+
+class TestFileFingerprint:
+    """Tests for content fingerprints"""
+
+    def test_same_content_same_fingerprint(self, tmp_path):
+        """Test that copies of a file under different names share a fingerprint"""
+        first = tmp_path / "upload_1.mp4"
+        second = tmp_path / "upload_2.mp4"
+        first.write_bytes(b"video" * 1000)
+        second.write_bytes(b"video" * 1000)
+
+        assert get_file_fingerprint(first) == get_file_fingerprint(second)
+
+    def test_tail_changes_fingerprint(self, tmp_path):
+        """Test that large files differing only at the end are told apart"""
+        first = tmp_path / "a.mp4"
+        second = tmp_path / "b.mp4"
+        body = b"\0" * (3 * 1024 * 1024)
+        first.write_bytes(body + b"end-a")
+        second.write_bytes(body + b"end-b")
+
+        assert get_file_fingerprint(first) != get_file_fingerprint(second)
+
+    def test_middle_changes_fingerprint(self, tmp_path):
+        """Test that equal-length files differing only in the middle are told apart"""
+        first = tmp_path / "a.wav"
+        second = tmp_path / "b.wav"
+        edge = b"\0" * (2 * 1024 * 1024)
+        first.write_bytes(edge + b"middle-a" + edge)
+        second.write_bytes(edge + b"middle-b" + edge)
+
+        assert get_file_fingerprint(first) != get_file_fingerprint(second)
+
+    def test_rewritten_file_changes_fingerprint(self, tmp_path):
+        """Test that the memoized digest follows a file rewritten in place"""
+        path = tmp_path / "upload.mp4"
+        path.write_bytes(b"first")
+        before = get_file_fingerprint(path)
+
+        path.write_bytes(b"other")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+
+        assert get_file_fingerprint(path) != before
+
+
+class TestProbeMedia:
+    """Tests for cached ffprobe calls"""
+
+    @patch("app.utils.media_probe.ffmpeg.probe")
+    def test_probe_is_cached_by_content(self, mock_probe, tmp_path):
+        """Test that re-uploads of the same file are probed once"""
+        mock_probe.return_value = {"format": {"duration": "10.0"}, "streams": []}
+        first = tmp_path / "first.mp4"
+        second = tmp_path / "second.mp4"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+
+        assert probe_media(first)["format"]["duration"] == "10.0"
+        assert probe_media(second)["format"]["duration"] == "10.0"
+        mock_probe.assert_called_once()
+
+
+class TestKeyframeIndex:
+    """Tests for keyframe lookups"""
+
+    @patch("app.utils.media_probe.subprocess.run")
+    def test_parses_keyframes_in_intervals(self, mock_run, tmp_path):
+        """Test keyframe parsing and the read interval arguments"""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"data")
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="4.000000,3.917000,K__\n4.042000,3.958000,___\n2.000000,N/A,K__\n",
+        )
+
+        keyframes = get_keyframe_index(video, [(-5.0, 10.0), (100.0, 130.0)])
+
+        assert keyframes == [(2.0, 2.0), (4.0, 3.917)]
+        cmd = mock_run.call_args.args[0]
+        assert cmd[cmd.index("-read_intervals") + 1] == "0.0%10.0,100.0%130.0"
+
+        get_keyframe_index(video, [(-5.0, 10.0), (100.0, 130.0)])
+        mock_run.assert_called_once()
+
+    @patch("app.utils.media_probe.subprocess.run")
+    def test_ffprobe_error(self, mock_run, tmp_path):
+        """Test that ffprobe failures are raised, not cached as empty"""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"data")
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="Invalid data")
+
+        with pytest.raises(RuntimeError, match="Invalid data"):
+            get_keyframe_index(video)
+        assert len(probe_cache) == 0
@@ -0,0 +1,212 @@
+"""
+Tests for live streaming of FFmpeg output
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.utils.media_stream import (
+    build_stream_command,
+    get_stream_media_type,
+    start_ffmpeg_stream,
+)
+
+client = TestClient(app)
+
+
+def fake_ffmpeg(script: str):
+    """Patch the FFmpeg command with a shell script standing in for the encode"""
+    return patch("app.utils.media_stream.build_stream_command", return_value=["sh", "-c", script])
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_build_stream_command():
+    """Test that output goes to stdout through the requested muxer"""
+    cmd = build_stream_command(
+        Path("/tmp/in.wav"), "ipod", {"acodec": "aac", "movflags": "empty_moov"}, threads=2
+    )
+
+    assert "pipe:1" in cmd
+    assert cmd[cmd.index("-f") + 1] == "ipod"
+    assert cmd[cmd.index("-movflags") + 1] == "empty_moov"
+    assert cmd[cmd.index("-threads") + 1] == "2"
+
+
+def test_media_types():
+    assert get_stream_media_type("mp3") == "audio/mpeg"
+    assert get_stream_media_type("mp4") == "video/mp4"
+    assert get_stream_media_type("unknown") == "application/octet-stream"
+
+
+@pytest.mark.asyncio
+async def test_stream_is_teed(tmp_path):
+    """Test that streamed bytes end up in the download file"""
+    input_path = tmp_path / "in.wav"
+    input_path.write_bytes(b"input")
+    tee_path = tmp_path / "out.mp3"
+
+    with fake_ffmpeg("printf first; sleep 0.05; printf second"):
+        chunks = await start_ffmpeg_stream(
+            input_path, tee_path, "mp3", {}, cleanup_paths=(input_path,)
+        )
+        body = await collect(chunks)
+
+    assert body == b"firstsecond"
+    assert tee_path.read_bytes() == b"firstsecond"
+    assert not input_path.exists()
+    assert list(tmp_path.iterdir()) == [tee_path]
+
+
+@pytest.mark.asyncio
+async def test_immediate_failure_raises(tmp_path):
+    """Test that FFmpeg failing before any output raises before streaming"""
+    input_path = tmp_path / "in.wav"
+    input_path.write_bytes(b"input")
+
+    with fake_ffmpeg("echo 'Invalid data' >&2; exit 1"):
+        with pytest.raises(RuntimeError, match="Invalid data"):
+            await start_ffmpeg_stream(
+                input_path, tmp_path / "out.mp3", "mp3", {}, cleanup_paths=(input_path,)
+            )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_failure_mid_stream_discards_output(tmp_path):
+    """Test that a failed encode never leaves a truncated download behind"""
+    tee_path = tmp_path / "out.mp3"
+
+    with fake_ffmpeg("printf partial; exit 1"):
+        chunks = await start_ffmpeg_stream(tmp_path / "in.wav", tee_path, "mp3", {})
+        with pytest.raises(RuntimeError):
+            await collect(chunks)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_abandoned_stream_stops_ffmpeg(tmp_path):
+    """Test that a client disconnect kills FFmpeg and removes the partial file"""
+    input_path = tmp_path / "in.wav"
+    input_path.write_bytes(b"input")
+
+    with fake_ffmpeg("printf first; exec sleep 30"):
+        chunks = await start_ffmpeg_stream(
+            input_path, tmp_path / "out.mp3", "mp3", {}, cleanup_paths=(input_path,)
+        )
+        assert await chunks.__anext__() == b"first"
+        await chunks.aclose()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+class TestStreamEndpoints:
+    """Tests for the /convert/stream endpoints"""
+
+    @staticmethod
+    async def fake_stream(input_path, tee_path, muxer, output_options, cleanup_paths=()):
+        async def chunks():
+            yield muxer.encode()
+
+        return chunks()
+
+    @patch("app.api.audio.start_ffmpeg_stream")
+    @patch("app.api.audio.save_upload_file")
+    def test_audio_stream(self, mock_save, mock_stream):
+        """Test streaming an audio conversion"""
+        mock_save.return_value = Path("/tmp/test.wav")
+        mock_stream.side_effect = self.fake_stream
+
+        response = client.post(
+            "/api/v1/audio/convert/stream",
+            files={"file": ("test.wav", b"fake audio", "audio/wav")},
+            data={"output_format": "mp3"},
+        )
+
+        assert response.status_code == 200
+        assert response.content == b"mp3"
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert response.headers["x-download-url"].endswith("_test.mp3")
+        options = mock_stream.call_args.args[3]
+        assert options["acodec"] == "libmp3lame"
+        assert "q:a" not in options
+
+    @patch("app.api.audio.start_ffmpeg_stream")
+    @patch("app.api.audio.save_upload_file")
+    def test_audio_stream_m4a_is_fragmented(self, mock_save, mock_stream):
+        """Test that M4A is streamed as fragmented MP4"""
+        mock_save.return_value = Path("/tmp/test.wav")
+        mock_stream.side_effect = self.fake_stream
+
+        response = client.post(
+            "/api/v1/audio/convert/stream",
+            files={"file": ("test.wav", b"fake audio", "audio/wav")},
+            data={"output_format": "m4a"},
+        )
+
+        assert response.status_code == 200
+        assert "empty_moov" in mock_stream.call_args.args[3]["movflags"]
+
+    def test_audio_stream_unseekable_format(self):
+        """Test that formats needing a seekable output are rejected"""
+        response = client.post(
+            "/api/v1/audio/convert/stream",
+            files={"file": ("test.wav", b"fake audio", "audio/wav")},
+            data={"output_format": "wma"},
+        )
+
+        assert response.status_code == 400
+
+    @patch("app.api.audio.start_ffmpeg_stream", side_effect=RuntimeError("Invalid data"))
+    @patch("app.api.audio.save_upload_file")
+    def test_audio_stream_ffmpeg_error(self, mock_save, mock_stream):
+        """Test that an immediate FFmpeg failure is a proper error response"""
+        mock_save.return_value = Path("/tmp/test.wav")
+
+        response = client.post(
+            "/api/v1/audio/convert/stream",
+            files={"file": ("test.wav", b"fake audio", "audio/wav")},
+            data={"output_format": "ogg"},
+        )
+
+        assert response.status_code == 500
+        assert "Invalid data" in response.json()["detail"]
+
+    @patch("app.api.video.get_available_h264_encoder", return_value="libx264")
+    @patch("app.api.video.start_ffmpeg_stream")
+    @patch("app.api.video.save_upload_file")
+    def test_video_stream(self, mock_save, mock_stream, mock_encoder):
+        """Test streaming a video conversion"""
+        mock_save.return_value = Path("/tmp/test.mp4")
+        mock_stream.side_effect = self.fake_stream
+
+        response = client.post(
+            "/api/v1/video/convert/stream",
+            files={"file": ("test.mp4", b"fake video", "video/mp4")},
+            data={"output_format": "mp4", "quality": "high"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "video/mp4"
+        options = mock_stream.call_args.args[3]
+        assert options["c:v"] == "libx264"
+        assert "frag_keyframe" in options["movflags"]
+        assert mock_stream.call_args.kwargs["cleanup_paths"] == (Path("/tmp/test.mp4"),)
+
+    def test_video_stream_unseekable_format(self):
+        """Test that AVI (needs a seekable output for its index) is rejected"""
+        response = client.post(
+            "/api/v1/video/convert/stream",
+            files={"file": ("test.mp4", b"fake video", "video/mp4")},
+            data={"output_format": "avi"},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,134 @@
+"""
+Tests for the FFmpeg core budget
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.resource_governor import CoreBudget, parse_cpu_time, thread_args, thread_options
+
+
+@pytest.mark.asyncio
+async def test_reserve_and_release():
+    """Test that reserved cores are returned when the block exits"""
+    budget = CoreBudget(4)
+
+    async with budget.reserve(3) as cores:
+        assert cores == 3
+        assert budget.available == 1
+
+    assert budget.available == 4
+
+
+@pytest.mark.asyncio
+async def test_oversized_request_is_clamped():
+    """Test that a request larger than the budget still runs"""
+    budget = CoreBudget(2)
+
+    async with budget.reserve(16) as cores:
+        assert cores == 2
+        assert budget.available == 0
+
+
+@pytest.mark.asyncio
+async def test_waits_for_free_cores():
+    """Test that concurrent reservations never exceed the budget"""
+    budget = CoreBudget(4)
+    peak = 0
+
+    async def job():
+        nonlocal peak
+        async with budget.reserve(2):
+            peak = max(peak, budget.total_cores - budget.available)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(job() for _ in range(5)))
+
+    assert peak == 4
+    assert budget.available == 4
+
+
+def test_jobs_share_the_budget():
+    """Test that waiting jobs split the freed cores without oversubscribing"""
+    budget = CoreBudget(16)
+    threads = []
+    all_running = threading.Barrier(3, timeout=5)
+
+    def job():
+        with budget.job() as job_threads:
+            threads.append(job_threads)
+            all_running.wait()
+
+    with budget.job() as first:
+        assert first == 16
+        assert budget.active_jobs == 1
+        workers = [threading.Thread(target=job) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        while budget._waiting < 3:
+            time.sleep(0.001)
+        assert threads == []
+
+    for worker in workers:
+        worker.join(timeout=5)
+
+    # 16 // 3, then 11 // 2, then the remaining 6
+    assert sorted(threads) == [5, 5, 6]
+    assert budget.active_jobs == 0
+    assert budget.available == 16
+
+
+@pytest.mark.asyncio
+async def test_jobs_and_reservations_share_cores():
+    """Test that segment reservations wait for job threads and vice versa"""
+    budget = CoreBudget(4)
+
+    async with budget.async_job() as threads:
+        assert threads == 4
+        reservation = asyncio.create_task(asyncio.wait_for(hold(budget, 2), 5))
+        await asyncio.sleep(0.01)
+        assert not reservation.done()
+
+    assert await reservation == 2
+
+    async with budget.reserve(4):
+        # A job started from a worker thread waits for the reserved cores
+        job = asyncio.get_running_loop().run_in_executor(None, sync_job, budget)
+        await asyncio.sleep(0.01)
+        assert not job.done()
+
+    assert await asyncio.wait_for(job, 5) == 4
+    assert budget.available == 4
+
+
+async def hold(budget: CoreBudget, cores: int) -> int:
+    async with budget.reserve(cores) as reserved:
+        return reserved
+
+
+def sync_job(budget: CoreBudget) -> int:
+    with budget.job() as threads:
+        return threads
+
+
+def test_thread_args_for_x264():
+    """Test thread arguments include x264 threads only for libx264"""
+    assert thread_args(4) == ["-threads", "4", "-filter_threads", "4"]
+    assert thread_args(2, "libx264")[-2:] == ["-x264-params", "threads=2"]
+    assert thread_options(3, "libx264") == {
+        "threads": 3,
+        "filter_threads": 3,
+        "x264-params": "threads=3",
+    }
+
+
+def test_parse_cpu_time():
+    """Test CPU time is read from the FFmpeg -benchmark report"""
+    stderr = b"frame=  100\nbench: utime=1.250s stime=0.250s rtime=0.900s\nbench: maxrss=1KiB\n"
+
+    assert parse_cpu_time(stderr) == 1.5
+    assert parse_cpu_time("no report") is None
+    assert parse_cpu_time(None) is None
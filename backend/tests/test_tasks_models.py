@@ -101,6 +101,14 @@ class TestTaskResult:
         assert d["download_url"] == "/download/file.mp4"
         assert d["filename"] == "file.mp4"
         assert d["compression_ratio"] == 50.0
+        assert "cpu_time" not in d
+
+    def test_to_dict_with_resource_usage(self):
+        """Test that FFmpeg resource usage is included when recorded"""
+        result = TaskResult(success=True, cpu_time=42.5, wall_time=12.25)
+        d = result.to_dict()
+        assert d["cpu_time"] == 42.5
+        assert d["wall_time"] == 12.25
 
 
 class TestTask:
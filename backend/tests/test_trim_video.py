@@ -0,0 +1,240 @@
+"""
+Tests for video trimming (planning, service and endpoints)
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services.video_service import plan_trim, trim_video
+from app.tasks import task_store
+
+client = TestClient(app)
+
+# Keyframes every 2 seconds, decode timestamps two B-frames earlier
+KEYFRAMES = [(t, t - 0.083 if t else t) for t in (0.0, 2.0, 4.0, 6.0, 8.0, 10.0)]
+
+PROBE = {
+    "format": {"duration": "12.0"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "pix_fmt": "yuv420p", "profile": "High"},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+}
+
+
+class TestPlanTrim:
+    """Tests for splitting a trim into copied and re-encoded parts"""
+
+    def test_copy_snaps_to_previous_keyframe(self):
+        """Test that stream copy starts at the keyframe before the cut"""
+        assert plan_trim(KEYFRAMES, 3.5, 7.0) == [("copy", 2.0, 7.0)]
+
+    def test_smart_encodes_only_partial_gops(self):
+        """Test that only the edges around the copied GOPs are re-encoded"""
+        parts = plan_trim(KEYFRAMES, 3.5, 9.0, smart=True)
+
+        assert parts == [("encode", 3.5, 4.0), ("copy", 4.0, 7.917), ("encode", 8.0, 9.0)]
+
+    def test_smart_cut_on_keyframes_is_pure_copy(self):
+        """Test that cuts on keyframes need no re-encoding"""
+        assert plan_trim(KEYFRAMES, 4.0, 8.0, smart=True) == [("copy", 4.0, 7.917)]
+
+    def test_smart_to_end_of_file(self):
+        """Test that the copied part runs to EOF without an end cut"""
+        assert plan_trim(KEYFRAMES, 5.0, None, smart=True) == [
+            ("encode", 5.0, 6.0),
+            ("copy", 6.0, None),
+        ]
+
+    def test_smart_within_one_gop(self):
+        """Test that a range without a complete GOP is encoded in one piece"""
+        assert plan_trim(KEYFRAMES, 4.5, 5.5, smart=True) == [("encode", 4.5, 5.5)]
+        assert plan_trim(KEYFRAMES, 3.5, 5.5, smart=True) == [("encode", 3.5, 5.5)]
+
+
+class TestTrimVideoService:
+    """Tests for the trim_video service"""
+
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.get_keyframe_index", return_value=KEYFRAMES)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_copy_trim_seeks_input(self, mock_size, mock_probe, mock_keyframes, mock_run):
+        """Test a single stream-copy command with input-side seeking"""
+        result = trim_video(Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), 3.5, 7.0)
+
+        assert result.success is True
+        assert "keyframe at 2.000s" in result.message
+        mock_run.assert_called_once()
+
+        args = mock_run.call_args.args[0].compile()
+        assert args.index("-ss") < args.index("-i")
+        assert args[args.index("-ss") + 1] == "2.001"
+        assert args[args.index("-c") + 1] == "copy"
+
+    @patch("app.services.video_service.get_trim_edge_options")
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.get_keyframe_index", return_value=KEYFRAMES)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_smart_trim_runs_parts_and_stitch(
+        self, mock_size, mock_probe, mock_keyframes, mock_run, mock_edge, tmp_path
+    ):
+        """Test that edges are encoded, GOPs copied and everything concatenated"""
+        mock_edge.return_value = {"c:v": "libx264", "crf": 18, "preset": "slow"}
+
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            result = trim_video(Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), 3.5, 9.0, smart=True)
+
+        assert result.success is True
+        assert result.message == "Video trimmed successfully"
+        assert mock_run.call_count == 4
+
+        commands = [call.args[0].compile() for call in mock_run.call_args_list]
+        assert "libx264" in commands[0]
+        assert commands[1][commands[1].index("-c") + 1] == "copy"
+        assert "libx264" in commands[2]
+        assert "concat" in commands[3]
+        assert not (tmp_path / "trim_out").exists()
+
+    @patch("app.services.video_service.get_trim_edge_options", return_value=None)
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.get_keyframe_index", return_value=KEYFRAMES)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_smart_falls_back_to_keyframe_cut(
+        self, mock_size, mock_probe, mock_keyframes, mock_run, mock_edge
+    ):
+        """Test the fallback when the codec cannot be re-encoded"""
+        result = trim_video(Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), 3.5, 9.0, smart=True)
+
+        assert result.success is True
+        assert "smart trim is not available" in result.message
+        mock_run.assert_called_once()
+
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_start_beyond_end(self, mock_size, mock_probe):
+        """Test that a start past the video duration fails"""
+        result = trim_video(Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), 30.0)
+
+        assert result.success is False
+        assert "beyond the end" in result.message
+
+
+class TestTrimVideoEndpoints:
+    """Tests for /api/v1/video/trim and /api/v1/video/trim/async"""
+
+    @patch("app.api.video.delete_file")
+    @patch("app.api.video.trim_video")
+    @patch("app.api.video.save_upload_file")
+    def test_trim_success(self, mock_save, mock_trim, mock_delete):
+        """Test a successful synchronous trim"""
+        mock_save.return_value = Path("/tmp/test_video.mp4")
+        mock_trim.return_value = MagicMock(
+            success=True,
+            message="Video trimmed successfully",
+            filename="trimmed_test_video.mp4",
+            download_url="/api/v1/download/trimmed_test_video.mp4",
+            original_size=1000,
+            processed_size=100,
+            compression_ratio=None,
+        )
+
+        response = client.post(
+            "/api/v1/video/trim",
+            files={"file": ("test_video.mp4", b"fake video", "video/mp4")},
+            data={"start_time": 10, "end_time": 20, "smart": "true"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["success"] is True
+        assert mock_trim.call_args.args[2:] == (10.0, 20.0, True)
+        mock_delete.assert_called_once()
+
+    def test_trim_invalid_range(self):
+        """Test that end_time must come after start_time"""
+        response = client.post(
+            "/api/v1/video/trim",
+            files={"file": ("test_video.mp4", b"fake video", "video/mp4")},
+            data={"start_time": 20, "end_time": 10},
+        )
+
+        assert response.status_code == 400
+        assert "end_time" in response.json()["detail"]
+
+    @patch("app.api.video.run_trim_task", new_callable=AsyncMock)
+    @patch("app.api.video.asyncio.create_task")
+    @patch("app.api.video.save_upload_file")
+    def test_trim_async_creates_task(self, mock_save, mock_create_task, mock_run_task):
+        """Test that the async endpoint returns a task id"""
+        mock_save.return_value = Path("/tmp/test_video.mp4")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/video/trim/async",
+            files={"file": ("test_video.mp4", b"fake video", "video/mp4")},
+            data={"start_time": 5},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "video_trim"
+        assert task.metadata["end_time"] is None
+
+
+class TestTrimVideoWithProgress:
+    """Tests for the async trim service"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.video_service.get_keyframe_index", return_value=KEYFRAMES)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_copy_trim_completes_task(self, mock_size, mock_probe, mock_keyframes, mock_run):
+        """Test a stream-copy trim through the task store"""
+        from app.services.video_service_async import trim_video_with_progress
+
+        mock_run.return_value = 0.05
+        task = task_store.create_task("video_trim")
+
+        result = await trim_video_with_progress(
+            task.id, Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), 4.0, 8.0
+        )
+
+        assert result.success is True
+        assert result.cpu_time == 0.05
+        cmd = mock_run.call_args.args[0]
+        assert cmd[cmd.index("-ss") + 1] == "4.001"
+        assert cmd[cmd.index("-t") + 1] == "3.9985"
+        assert cmd[-1] == "/tmp/out.mp4"
+        assert task_store.get_task(task.id).result.success is True
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service.get_trim_edge_options", return_value={"c:v": "libx264"})
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.video_service.get_keyframe_index", return_value=KEYFRAMES)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_smart_trim_keeps_stats_off_stderr(
+        self, mock_size, mock_probe, mock_keyframes, mock_run, mock_edge, tmp_path
+    ):
+        """Test that every step, the join included, writes no stats to stderr"""
+        from app.services.video_service_async import trim_video_with_progress
+
+        mock_run.return_value = 0.05
+        task = task_store.create_task("video_trim")
+
+        with patch("app.services.video_service_async.TEMP_DIR", tmp_path):
+            result = await trim_video_with_progress(
+                task.id, Path("/tmp/in.mp4"), tmp_path / "out.mp4", 3.5, 9.0, smart=True
+            )
+
+        assert result.success is True
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        assert "concat" in commands[-1]
+        assert all("-nostats" in cmd for cmd in commands)
@@ -3,6 +3,7 @@ Tests for video processing endpoints
 """
 
 from pathlib import Path
+from unittest.mock import patch
 
 
 def test_compress_video_invalid_format(client):
@@ -25,6 +26,24 @@ def test_compress_video_invalid_format(client):
     assert response.status_code in [400, 422]
 
 
+@patch("app.api.video.compress_video")
+@patch("app.api.video.get_video_duration", return_value=7200.0)
+@patch("app.api.video.save_upload_file")
+def test_compress_video_unreachable_target_size(mock_save, mock_duration, mock_compress, client):
+    """Test that a target too small for the video is a client error"""
+    mock_save.return_value = Path("/tmp/long.mp4")
+
+    response = client.post(
+        "/api/v1/video/compress",
+        files={"file": ("long.mp4", b"fake video", "video/mp4")},
+        data={"quality": "medium", "target_size_mb": "1"},
+    )
+
+    assert response.status_code == 400
+    assert "required" in response.json()["detail"]
+    mock_compress.assert_not_called()
+
+
 def test_convert_video_invalid_format(client):
     """Test sending a non-video file to video convert endpoint"""
     pdf_path = Path(__file__).parent / "temp" / "test_file.pdf"
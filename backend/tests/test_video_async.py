@@ -107,6 +107,38 @@ class TestCompressVideoAsyncEndpoint:
             task = task_store.get_task(response.json()["task_id"])
             assert task.metadata["quality"] == quality
 
+    @patch("app.api.video.run_compress_task", new_callable=AsyncMock)
+    @patch("app.api.video.asyncio.create_task")
+    @patch("app.api.video.save_upload_file")
+    def test_compress_async_chunked(self, mock_save, mock_create_task, mock_run_task, client):
+        """Test that chunked mode is forwarded to the background task"""
+        from pathlib import Path
+
+        mock_save.return_value = Path("/tmp/test.mp4")
+        mock_create_task.side_effect = lambda coro: MagicMock()
+
+        response = client.post(
+            "/api/v1/video/compress/async",
+            files=create_mock_video_file(),
+            data={"quality": "medium", "chunked": "true"},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.metadata["chunked"] is True
+        assert mock_run_task.call_args.args[4] is True
+
+    def test_compress_async_invalid_target_size(self, client):
+        """Test that a non-positive target size is rejected"""
+        response = client.post(
+            "/api/v1/video/compress/async",
+            files=create_mock_video_file(),
+            data={"quality": "medium", "target_size_mb": "0"},
+        )
+
+        assert response.status_code == 400
+        assert "target_size_mb" in response.json()["detail"]
+
 
 class TestConvertVideoAsyncEndpoint:
     """Tests for POST /api/v1/video/convert/async"""
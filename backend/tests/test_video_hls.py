@@ -0,0 +1,182 @@
+"""
+Tests for HLS adaptive-bitrate packaging
+"""
+
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+import zipfile
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.main import app
+from app.services.video_service import build_hls_output, get_hls_renditions
+from app.tasks import task_store
+from app.tasks.models import TaskStatus
+
+client = TestClient(app)
+
+PROBE = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "height": 720},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ]
+}
+
+
+class TestHlsRenditions:
+    """Tests for ladder selection"""
+
+    def test_no_upscaling(self):
+        """Test that rungs above the source height are skipped"""
+        assert [r["name"] for r in get_hls_renditions(720)] == ["720p", "480p", "360p"]
+
+    def test_full_ladder(self):
+        assert [r["height"] for r in get_hls_renditions(2160)] == [1080, 720, 480, 360]
+
+    def test_requested_heights(self):
+        assert [r["height"] for r in get_hls_renditions(1080, [1080, 480])] == [1080, 480]
+
+    def test_tiny_source(self):
+        """Test that a source below every rung keeps its own height"""
+        (rendition,) = get_hls_renditions(241)
+
+        assert rendition["height"] == 240
+        assert rendition["name"] == "240p"
+
+    def test_unknown_height(self):
+        with pytest.raises(ValueError, match="Unsupported rendition"):
+            get_hls_renditions(1080, [1080, 900])
+
+
+class TestBuildHlsOutput:
+    """Tests for the single-decode ladder graph"""
+
+    def test_one_decode_split_into_renditions(self):
+        renditions = get_hls_renditions(720)
+        args = build_hls_output(
+            Path("/tmp/in.mp4"), Path("/tmp/hls"), renditions, True, "libx264"
+        ).compile()
+
+        assert args.count("-i") == 1
+        graph = args[args.index("-filter_complex") + 1]
+        assert "split=3" in graph
+        assert graph.count("scale=") == 3
+        assert args[args.index("-var_stream_map") + 1] == (
+            "v:0,a:0,name:720p v:1,a:1,name:480p v:2,a:2,name:360p"
+        )
+        assert args[args.index("-b:v:1") + 1] == "1400k"
+        assert args[args.index("-master_pl_name") + 1] == "master.m3u8"
+        assert args[-1] == "/tmp/hls/%v/index.m3u8"
+
+    def test_video_only(self):
+        args = build_hls_output(
+            Path("/tmp/in.mp4"), Path("/tmp/hls"), get_hls_renditions(480), False, "libx264"
+        ).compile()
+
+        assert args[args.index("-var_stream_map") + 1] == "v:0,name:480p v:1,name:360p"
+        assert "-c:a" not in args
+
+
+class TestPackageHlsWithProgress:
+    """Tests for the async HLS job"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.video_service_async.get_available_h264_encoder", return_value="libx264")
+    @patch("app.services.video_service_async.get_video_duration", return_value=12.0)
+    @patch("app.services.video_service_async.probe_media", return_value=PROBE)
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_archive_layout(
+        self, mock_size, mock_probe, mock_duration, mock_encoder, mock_run, tmp_path
+    ):
+        """Test that playlists and segments are zipped with their folder layout"""
+        from app.services.video_service_async import package_hls_with_progress
+
+        def write_package(cmd, on_progress=None):
+            playlist = next(arg for arg in cmd if arg.endswith("index.m3u8"))
+            output_dir = Path(playlist).parent.parent
+            (output_dir / "master.m3u8").write_text("#EXTM3U\n")
+            for name in ("720p", "480p", "360p"):
+                (output_dir / name).mkdir()
+                (output_dir / name / "index.m3u8").write_text("#EXTM3U\n")
+                (output_dir / name / "segment_000.ts").write_bytes(b"ts")
+            on_progress(6.0)
+            return 1.5
+
+        mock_run.side_effect = write_package
+        task = task_store.create_task("video_hls")
+        output_path = tmp_path / "clip_hls.zip"
+
+        with patch("app.services.video_service_async.TEMP_DIR", tmp_path):
+            result = await package_hls_with_progress(task.id, Path("/tmp/in.mp4"), output_path)
+
+        assert result.success is True
+        assert "3 rendition(s)" in result.message
+        assert result.cpu_time == 1.5
+        mock_run.assert_called_once()
+        with zipfile.ZipFile(output_path) as archive:
+            assert "master.m3u8" in archive.namelist()
+            assert "480p/segment_000.ts" in archive.namelist()
+        assert list(tmp_path.iterdir()) == [output_path]
+        assert task_store.get_task(task.id).status == TaskStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    @patch(
+        "app.services.video_service_async.probe_media",
+        return_value={"streams": [{"codec_type": "audio"}]},
+    )
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_no_video_stream(self, mock_size, mock_probe, tmp_path):
+        from app.services.video_service_async import package_hls_with_progress
+
+        task = task_store.create_task("video_hls")
+
+        result = await package_hls_with_progress(
+            task.id, Path("/tmp/in.mp3"), tmp_path / "out_hls.zip"
+        )
+
+        assert result.success is False
+        assert task_store.get_task(task.id).status == TaskStatus.FAILED
+
+
+class TestHlsEndpoint:
+    """Tests for POST /video/hls"""
+
+    @patch("app.api.video.run_hls_task", new_callable=AsyncMock)
+    @patch("app.api.video.asyncio.create_task")
+    @patch("app.api.video.save_upload_file")
+    def test_start_task(self, mock_save, mock_create_task, mock_run_task):
+        mock_save.return_value = Path("/tmp/test.mp4")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/video/hls",
+            files={"file": ("test.mp4", b"fake video", "video/mp4")},
+            data={"renditions": "720p, 480", "segment_seconds": "4"},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "video_hls"
+        assert task.metadata["renditions"] == [720, 480]
+        mock_run_task.assert_called_once()
+        assert mock_run_task.call_args.args[3:] == ([720, 480], 4)
+
+    def test_invalid_rendition(self):
+        response = client.post(
+            "/api/v1/video/hls",
+            files={"file": ("test.mp4", b"fake video", "video/mp4")},
+            data={"renditions": "1080,900"},
+        )
+
+        assert response.status_code == 400
+
+    def test_invalid_segment_seconds(self):
+        response = client.post(
+            "/api/v1/video/hls",
+            files={"file": ("test.mp4", b"fake video", "video/mp4")},
+            data={"segment_seconds": "60"},
+        )
+
+        assert response.status_code == 400
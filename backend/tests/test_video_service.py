@@ -9,10 +9,14 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from app.services.video_service import (
+    build_animation_output,
+    calculate_target_bitrates,
     compress_video,
     convert_video,
     extract_audio,
     get_available_h264_encoder,
+    plan_audio_extraction,
+    store_palette,
     video_to_gif,
 )
 
@@ -163,6 +167,76 @@ class TestCompressVideo:
         assert "error" in result.message.lower()
 
 
+class TestTargetSizeCompression:
+    """Tests for target-size (two-pass) compression"""
+
+    def test_bitrates_fit_target(self):
+        """Test that video + audio + container overhead stay under the target"""
+        target = 25 * 1024 * 1024
+        video_bitrate, audio_bitrate = calculate_target_bitrates(target, 120.0)
+
+        assert audio_bitrate == 128_000
+        assert (video_bitrate + audio_bitrate) * 120.0 / 8 < target
+        assert video_bitrate > 1_500_000
+
+    def test_audio_budget_shrinks_for_small_targets(self):
+        """Test that tiny targets keep most bits for video"""
+        _, audio_bitrate = calculate_target_bitrates(4 * 1024 * 1024, 60.0)
+        assert audio_bitrate == 64_000
+
+    def test_unreachable_target(self):
+        """Test that a target too small for the duration is rejected"""
+        with pytest.raises(ValueError, match="too small"):
+            calculate_target_bitrates(100 * 1024, 3600.0)
+
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.ffmpeg.output")
+    @patch("app.services.video_service.ffmpeg.input")
+    @patch("app.services.video_service.ffmpeg.probe")
+    @patch("app.services.video_service.get_available_h264_encoder", return_value="libx264")
+    @patch("app.services.video_service.get_file_size")
+    def test_two_pass_encode(
+        self, mock_size, mock_encoder, mock_probe, mock_input, mock_output, mock_run
+    ):
+        """Test that libx264 runs an analysis pass then the final pass"""
+        mock_size.side_effect = [50_000_000, 24_000_000]
+        mock_probe.return_value = {"format": {"duration": "300.0"}}
+
+        result = compress_video(
+            Path("/tmp/input.mp4"), Path("/tmp/output.mp4"), "medium", target_size_mb=25
+        )
+
+        assert result.success is True
+        assert "25 MB" in result.message
+        assert mock_run.call_count == 2
+
+        first_pass, second_pass = (call.kwargs for call in mock_output.call_args_list)
+        assert first_pass["pass"] == 1 and first_pass["f"] == "null"
+        assert second_pass["pass"] == 2
+        assert first_pass["passlogfile"] == second_pass["passlogfile"]
+        assert second_pass["b:v"] == second_pass["maxrate"]
+
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.ffmpeg.output")
+    @patch("app.services.video_service.ffmpeg.input")
+    @patch("app.services.video_service.ffmpeg.probe")
+    @patch("app.services.video_service.get_available_h264_encoder", return_value="libx264")
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_target_too_small(
+        self, mock_size, mock_encoder, mock_probe, mock_input, mock_output, mock_run
+    ):
+        """Test that an unreachable target fails without encoding"""
+        mock_probe.return_value = {"format": {"duration": "7200.0"}}
+
+        result = compress_video(
+            Path("/tmp/input.mp4"), Path("/tmp/output.mp4"), "medium", target_size_mb=1
+        )
+
+        assert result.success is False
+        assert "too small" in result.message
+        mock_run.assert_not_called()
+
+
 class TestConvertVideo:
     """Tests for convert_video function"""
 
@@ -337,6 +411,201 @@ class TestVideoToGif:
         assert "error converting video to gif" in result.message.lower()
 
 
+class TestAnimatedImages:
+    """Tests for WebP/AVIF output and the GIF palette cache"""
+
+    @staticmethod
+    def write_outputs(stream, **kwargs):
+        """Create the files FFmpeg would have written"""
+        args = stream.compile()
+        for arg in args:
+            if arg.endswith((".gif", ".png", ".webp")) and args[args.index(arg) - 1] != "-i":
+                Path(arg).write_bytes(b"data")
+        return b"", b""
+
+    def test_concurrent_renders_write_distinct_partial_palettes(self, tmp_path):
+        """Test that two renders of one segment never write the same partial palette"""
+        video = tmp_path / "input.mp4"
+        video.write_bytes(b"video")
+
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            partials = [
+                build_animation_output(
+                    video, tmp_path / f"{name}.gif", start_time=1.0, duration=2.0, width=320
+                )[1]
+                for name in ("a", "b")
+            ]
+
+        assert partials[0] != partials[1]
+        partials[1].write_bytes(b"palette")
+        store_palette(partials[1])
+        # Moved to the cache path shared by both renders
+        assert [path.name for path in tmp_path.glob("palette_*")] == [
+            partials[0].name.split(".partial-")[0] + ".png"
+        ]
+
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    @patch("app.services.video_service.ffmpeg.run")
+    def test_palette_cached_between_renders(self, mock_run, mock_size, tmp_path):
+        """Test that a second render of the segment reuses the palette"""
+        mock_run.side_effect = self.write_outputs
+        video = tmp_path / "input.mp4"
+        video.write_bytes(b"video")
+
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            first = video_to_gif(video, tmp_path / "a.gif", 1.0, 2.0, 320, 10, dither="bayer")
+            second = video_to_gif(video, tmp_path / "b.gif", 1.0, 2.0, 320, 10, loop=False)
+
+        assert first.success is True and second.success is True
+        palettes = list(tmp_path.glob("palette_*"))
+        assert len(palettes) == 1 and ".partial" not in palettes[0].name
+
+        first_args, second_args = (call.args[0].compile() for call in mock_run.call_args_list)
+        assert "palettegen" in " ".join(first_args)
+        assert "palettegen" not in " ".join(second_args)
+        assert str(palettes[0]) in second_args
+
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    @patch("app.services.video_service.ffmpeg.run")
+    def test_failed_render_does_not_cache_palette(self, mock_run, mock_size, tmp_path):
+        """Test that a palette from a failed run is discarded"""
+        import ffmpeg
+
+        def fail(stream, **kwargs):
+            self.write_outputs(stream)
+            raise ffmpeg.Error("ffmpeg", b"", b"boom")
+
+        mock_run.side_effect = fail
+        video = tmp_path / "input.mp4"
+        video.write_bytes(b"video")
+
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            result = video_to_gif(video, tmp_path / "a.gif")
+
+        assert result.success is False
+        assert list(tmp_path.glob("palette_*")) == []
+
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    @patch("app.services.video_service.ffmpeg.run")
+    def test_webp_preset(self, mock_run, mock_size):
+        """Test animated WebP encoding options"""
+        result = video_to_gif(
+            Path("/tmp/input.mp4"), Path("/tmp/out.webp"), output_format="webp", preset="small"
+        )
+
+        assert result.success is True
+        assert result.message == "WEBP created successfully"
+        args = mock_run.call_args.args[0].compile()
+        assert args[args.index("-vcodec") + 1] == "libwebp_anim"
+        assert args[args.index("-compression_level") + 1] == "6"
+        assert "palettegen" not in " ".join(args)
+
+    @patch("app.services.video_service.get_avif_encoder", return_value=None)
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_avif_unavailable(self, mock_size, mock_encoder):
+        """Test the error when FFmpeg cannot encode AV1"""
+        result = video_to_gif(Path("/tmp/input.mp4"), Path("/tmp/out.avif"), output_format="avif")
+
+        assert result.success is False
+        assert "libaom-av1" in result.message
+
+    def test_invalid_preset(self):
+        """Test that unknown presets are rejected before running FFmpeg"""
+        result = video_to_gif(
+            Path("/tmp/input.mp4"), Path("/tmp/out.webp"), output_format="webp", preset="ultra"
+        )
+
+        assert result.success is False
+        assert "preset" in result.message
+
+
+MULTI_TRACK_PROBE = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264"},
+        {"codec_type": "audio", "codec_name": "aac", "tags": {"language": "eng"}},
+        {"codec_type": "audio", "codec_name": "ac3", "tags": {"language": "und"}},
+    ]
+}
+
+
+class TestAudioPassthrough:
+    """Tests for codec-aware audio extraction"""
+
+    @patch("app.services.video_service.probe_media", return_value=MULTI_TRACK_PROBE)
+    def test_compatible_codec_is_copied(self, mock_probe):
+        """Test that AAC into m4a is stream-copied"""
+        (track,) = plan_audio_extraction(Path("/tmp/in.mp4"), Path("/tmp/out.m4a"), "m4a")
+
+        assert track["copy"] is True
+        assert track["options"]["acodec"] == "copy"
+        assert "b:a" not in track["options"]
+
+    @patch("app.services.video_service.probe_media", return_value=MULTI_TRACK_PROBE)
+    def test_incompatible_codec_is_encoded(self, mock_probe):
+        """Test that AAC into mp3 is re-encoded at the requested bitrate"""
+        (track,) = plan_audio_extraction(Path("/tmp/in.mp4"), Path("/tmp/out.mp3"), "mp3", "128k")
+
+        assert track["copy"] is False
+        assert track["options"]["acodec"] == "libmp3lame"
+        assert track["options"]["b:a"] == "128k"
+
+    @patch("app.services.video_service.probe_media", return_value=MULTI_TRACK_PROBE)
+    def test_passthrough_can_be_disabled(self, mock_probe):
+        """Test forcing a re-encode of a compatible track"""
+        (track,) = plan_audio_extraction(
+            Path("/tmp/in.mp4"), Path("/tmp/out.m4a"), "m4a", passthrough=False
+        )
+
+        assert track["options"]["acodec"] == "aac"
+
+    @patch("app.services.video_service.probe_media", return_value=MULTI_TRACK_PROBE)
+    def test_auto_all_tracks(self, mock_probe):
+        """Test per-track containers and file names in auto mode"""
+        plan = plan_audio_extraction(
+            Path("/tmp/out_audio.auto"), Path("/tmp/out_audio.auto"), "auto", all_tracks=True
+        )
+
+        assert [track["path"].name for track in plan] == [
+            "out_audio_track1_eng.m4a",
+            "out_audio_track2.m4a",
+        ]
+        assert [track["copy"] for track in plan] == [True, False]
+
+    @patch("app.services.video_service.probe_media", return_value={"streams": []})
+    def test_no_audio(self, mock_probe):
+        """Test that videos without audio are rejected"""
+        with pytest.raises(ValueError, match="No audio"):
+            plan_audio_extraction(Path("/tmp/in.mp4"), Path("/tmp/out.mp3"))
+
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.probe_media", return_value=MULTI_TRACK_PROBE)
+    @patch("app.services.video_service.get_file_size", return_value=1000)
+    def test_all_tracks_single_run_zipped(self, mock_size, mock_probe, mock_run, tmp_path):
+        """Test that every track comes out of one FFmpeg run and is zipped"""
+        import zipfile
+
+        def write_tracks(stream, **kwargs):
+            args = stream.compile()
+            assert args.count("-map") == 2
+            for arg in args:
+                if arg.endswith(".m4a"):
+                    Path(arg).write_bytes(b"audio")
+
+        mock_run.side_effect = write_tracks
+
+        result = extract_audio(
+            Path("/tmp/in.mkv"), tmp_path / "clip_audio.m4a", "m4a", all_tracks=True
+        )
+
+        assert result.success is True
+        assert result.filename == "clip_audio.zip"
+        assert "1 stream-copied" in result.message
+        mock_run.assert_called_once()
+        with zipfile.ZipFile(tmp_path / "clip_audio.zip") as archive:
+            assert len(archive.namelist()) == 2
+        assert list(tmp_path.glob("*.m4a")) == []
+
+
 class TestExtractAudio:
     """Tests for extract_audio function"""
 
@@ -3,7 +3,9 @@ Tests for video_service_async
 Uses mocking for FFmpeg subprocess calls
 """
 
+import asyncio
 from pathlib import Path
+import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -93,6 +95,141 @@ class TestGetVideoDuration:
         assert result is None
 
 
+class TestGetKeyframeTimes:
+    """Tests for keyframe detection"""
+
+    @patch("app.services.video_service_async.subprocess.run")
+    def test_keeps_only_keyframe_packets(self, mock_run):
+        """Test that only packets flagged K are returned, sorted"""
+        from app.services.video_service_async import get_keyframe_times
+
+        mock_run.return_value = MagicMock(
+            stdout="4.000000,K__\n0.040000,___\n0.000000,K__\nN/A,K__\n2.000000,K_\n"
+        )
+        assert get_keyframe_times(Path("/tmp/video.mp4")) == [0.0, 2.0, 4.0]
+
+    @patch("app.services.video_service_async.subprocess.run")
+    def test_ffprobe_error(self, mock_run):
+        """Test that probe failures yield no keyframes"""
+        from app.services.video_service_async import get_keyframe_times
+
+        mock_run.side_effect = Exception("ffprobe failed")
+        assert get_keyframe_times(Path("/tmp/video.mp4")) == []
+
+
+class TestGetStartTime:
+    """Tests for container start time detection"""
+
+    @patch("app.services.video_service_async.probe_media")
+    def test_reads_format_start_time(self, mock_probe):
+        """Test that the start time comes from the container format"""
+        from app.services.video_service_async import get_start_time
+
+        mock_probe.return_value = {"format": {"start_time": "1.400000"}}
+        assert get_start_time(Path("/tmp/video.ts")) == 1.4
+
+        mock_probe.return_value = {"format": {}}
+        assert get_start_time(Path("/tmp/video.mp4")) == 0.0
+
+        mock_probe.side_effect = Exception("ffprobe failed")
+        assert get_start_time(Path("/tmp/video.mp4")) == 0.0
+
+
+class TestPlanVideoSegments:
+    """Tests for keyframe-aligned segment planning"""
+
+    def test_single_segment(self):
+        """Test that one segment covers the whole video"""
+        from app.services.video_service_async import plan_video_segments
+
+        assert plan_video_segments(60.0, [0.0, 30.0], 1) == [(0.0, None)]
+
+    def test_boundaries_snap_to_nearest_keyframe(self):
+        """Test that boundaries land on the closest keyframe"""
+        from app.services.video_service_async import plan_video_segments
+
+        keyframes = [0.0, 9.0, 19.5, 31.0, 42.0, 50.0]
+        segments = plan_video_segments(60.0, keyframes, 3)
+        assert segments == [(0.0, 19.5), (19.5, 42.0), (42.0, None)]
+
+    def test_sparse_keyframes_merge_segments(self):
+        """Test that boundaries snapping to the same keyframe are deduplicated"""
+        from app.services.video_service_async import plan_video_segments
+
+        segments = plan_video_segments(60.0, [0.0, 30.0], 4)
+        assert segments == [(0.0, 30.0), (30.0, None)]
+
+    def test_no_keyframes_splits_evenly(self):
+        """Test even split when keyframes are unknown"""
+        from app.services.video_service_async import plan_video_segments
+
+        segments = plan_video_segments(40.0, [], 4)
+        assert segments == [(0.0, 10.0), (10.0, 20.0), (20.0, 30.0), (30.0, None)]
+
+    @patch("app.services.video_service_async.VIDEO_CHUNK_MAX_SEGMENTS", 8)
+    @patch("app.services.video_service_async.VIDEO_CHUNK_MIN_SECONDS", 10)
+    def test_segment_count(self):
+        """Test segment count is bounded by duration and max segments"""
+        from app.services.video_service_async import get_segment_count
+
+        assert get_segment_count(None) == 1
+        assert get_segment_count(15) == 1
+        assert get_segment_count(35) == 3
+        assert get_segment_count(7200) == 8
+
+
+class TestRunFfmpeg:
+    """Tests for the FFmpeg subprocess runner"""
+
+    # Logs far more than a pipe buffer to stderr, then reports progress
+    NOISY_COMMAND = [
+        sys.executable,
+        "-c",
+        "import sys; sys.stderr.write('w' * 400_000); sys.stderr.flush(); "
+        "print('out_time_ms=2000000'); print('progress=end')",
+    ]
+
+    @pytest.mark.asyncio
+    async def test_drains_stderr_while_reading_progress(self):
+        """Test that a command logging more than the pipe buffer completes"""
+        from app.services.video_service_async import run_ffmpeg
+
+        progress = []
+        task = asyncio.create_task(run_ffmpeg(self.NOISY_COMMAND, progress.append))
+        done, _ = await asyncio.wait({task}, timeout=10)
+
+        assert task in done
+        task.result()
+        assert progress == [2.0]
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_the_process(self):
+        """Test that cancelling returns promptly even with a full stderr pipe"""
+        from app.services.video_service_async import run_ffmpeg
+
+        cmd = [
+            sys.executable,
+            "-c",
+            "import time, sys; sys.stderr.write('w' * 400_000); time.sleep(60)",
+        ]
+        task = asyncio.create_task(run_ffmpeg(cmd))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        done, _ = await asyncio.wait({task}, timeout=10)
+
+        assert task in done
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_error_carries_stderr(self):
+        """Test that a failing command raises with its stderr"""
+        from app.services.video_service_async import run_ffmpeg
+
+        cmd = [sys.executable, "-c", "import sys; sys.exit('Conversion failed')"]
+        with pytest.raises(RuntimeError, match="Conversion failed"):
+            await run_ffmpeg(cmd)
+
+
 class TestCompressVideoWithProgress:
     """Tests for compress_video_with_progress"""
 
@@ -141,7 +278,7 @@ class TestCompressVideoWithProgress:
                 b"",
             ]
         )
-        mock_process.communicate = AsyncMock(return_value=(b"", b""))
+        mock_process.stderr.read = AsyncMock(return_value=b"")
         mock_subprocess.return_value = mock_process
 
         task = task_store.create_task("test")
@@ -172,7 +309,7 @@ class TestCompressVideoWithProgress:
         mock_process = AsyncMock()
         mock_process.returncode = 1
         mock_process.stdout.readline = AsyncMock(return_value=b"")
-        mock_process.communicate = AsyncMock(return_value=(b"", b"FFmpeg error message"))
+        mock_process.stderr.read = AsyncMock(return_value=b"FFmpeg error message")
         mock_subprocess.return_value = mock_process
 
         task = task_store.create_task("test")
@@ -228,7 +365,7 @@ class TestConvertVideoWithProgress:
                 b"",
             ]
         )
-        mock_process.communicate = AsyncMock(return_value=(b"", b""))
+        mock_process.stderr.read = AsyncMock(return_value=b"")
         mock_subprocess.return_value = mock_process
 
         task = task_store.create_task("test")
@@ -259,7 +396,7 @@ class TestConvertVideoWithProgress:
         mock_process = AsyncMock()
         mock_process.returncode = 1
         mock_process.stdout.readline = AsyncMock(return_value=b"")
-        mock_process.communicate = AsyncMock(return_value=(b"", b"Conversion failed"))
+        mock_process.stderr.read = AsyncMock(return_value=b"Conversion failed")
         mock_subprocess.return_value = mock_process
 
         task = task_store.create_task("test")
@@ -305,3 +442,287 @@ class TestConvertVideoWithProgress:
 
         assert result.success is False
         assert task_store.get_task(task.id).status == TaskStatus.FAILED
+
+
+class TestChunkedEncoding:
+    """Tests for segment-parallel encoding"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.encode_video_chunked", new_callable=AsyncMock)
+    @patch("app.services.video_service_async.get_segment_count", return_value=4)
+    @patch("app.services.video_service_async.get_video_duration", return_value=120.0)
+    @patch("app.services.video_service_async.get_available_h264_encoder", return_value="libx264")
+    @patch("app.services.video_service_async.get_file_size")
+    async def test_compress_uses_chunked_encoder(
+        self, mock_size, mock_encoder, mock_duration, mock_count, mock_chunked
+    ):
+        """Test that chunked compression delegates to the segment encoder"""
+        from app.services.video_service_async import compress_video_with_progress
+
+        mock_size.side_effect = [1000000, 400000]
+        mock_chunked.return_value = (4, 12.5)
+
+        task = task_store.create_task("test")
+        result = await compress_video_with_progress(
+            task.id, Path("/tmp/input.mp4"), Path("/tmp/output.mp4"), "medium", chunked=True
+        )
+
+        assert result.success is True
+        assert "4 parallel segments" in result.message
+        assert result.cpu_time == 12.5
+        assert result.wall_time is not None
+        args = mock_chunked.call_args.args
+        assert args[3][:2] == ["-c:v", "libx264"]
+        assert args[4] == 120.0
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.encode_video_chunked", new_callable=AsyncMock)
+    @patch("app.services.video_service_async.asyncio.create_subprocess_exec")
+    @patch("app.services.video_service_async.get_video_duration", return_value=5.0)
+    @patch("app.services.video_service_async.get_available_h264_encoder", return_value="libx264")
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_short_video_falls_back_to_single_pass(
+        self, mock_size, mock_encoder, mock_duration, mock_subprocess, mock_chunked
+    ):
+        """Test that videos too short to split use the regular encode"""
+        from app.services.video_service_async import convert_video_with_progress
+
+        mock_process = AsyncMock()
+        mock_process.returncode = 0
+        mock_process.stdout.readline = AsyncMock(side_effect=[b"progress=end\n", b""])
+        mock_process.stderr.read = AsyncMock(return_value=b"")
+        mock_subprocess.return_value = mock_process
+
+        task = task_store.create_task("test")
+        result = await convert_video_with_progress(
+            task.id, Path("/tmp/input.mp4"), Path("/tmp/output.mkv"), "mkv", chunked=True
+        )
+
+        assert result.success is True
+        mock_chunked.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.TEMP_DIR")
+    @patch("app.services.video_service_async.has_audio_stream", return_value=True)
+    @patch("app.services.video_service_async.get_keyframe_times")
+    @patch("app.services.video_service_async.get_segment_count", return_value=3)
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    async def test_segments_are_encoded_and_stitched(
+        self, mock_run, mock_count, mock_keyframes, mock_audio, mock_temp_dir, tmp_path
+    ):
+        """Test segment commands, progress aggregation and concat stitching"""
+        from app.services.video_service_async import encode_video_chunked
+
+        mock_temp_dir.__truediv__ = lambda _, name: tmp_path / name
+        mock_keyframes.return_value = [0.0, 10.0, 20.0, 30.0]
+
+        async def fake_run(cmd, on_progress=None):
+            if on_progress:
+                on_progress(10.0)
+            return 1.5
+
+        mock_run.side_effect = fake_run
+
+        task = task_store.create_task("test")
+        count, cpu_time = await encode_video_chunked(
+            task.id,
+            Path("/tmp/in.mp4"),
+            Path("/tmp/out.mp4"),
+            ["-c:v", "libx264"],
+            30.0,
+            job_threads=6,
+        )
+
+        assert count == 3
+        # 3 segments + audio + concat, 1.5s each
+        assert cpu_time == 7.5
+        commands = [call.args[0] for call in mock_run.call_args_list]
+        segment_cmds = [cmd for cmd in commands if "-an" in cmd]
+        assert len(segment_cmds) == 3
+        assert "-ss" not in segment_cmds[0]
+        assert segment_cmds[1][segment_cmds[1].index("-ss") + 1] == "10.000000"
+        assert segment_cmds[0][segment_cmds[0].index("-threads") + 1] == "2"
+        assert "-t" not in segment_cmds[2]
+
+        concat_cmd = commands[-1]
+        assert concat_cmd[concat_cmd.index("-f") + 1] == "concat"
+        assert "copy" in concat_cmd
+        assert "1:a" in concat_cmd
+
+        # All segments reported 10s each, so encoding reached its 90% slot
+        assert task_store.get_task(task.id).progress.percent == 90
+        assert not (tmp_path / "chunks_out").exists()
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.TEMP_DIR")
+    @patch("app.services.video_service_async.has_audio_stream", return_value=False)
+    @patch("app.services.video_service_async.get_start_time", return_value=1.4)
+    @patch("app.services.video_service_async.get_keyframe_times")
+    @patch("app.services.video_service_async.get_segment_count", return_value=3)
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    async def test_segments_offset_by_start_time(
+        self, mock_run, mock_count, mock_keyframes, mock_start, mock_audio, mock_temp_dir, tmp_path
+    ):
+        """Test that cuts land on keyframes of streams not starting at zero (MPEG-TS)"""
+        from app.services.video_service_async import encode_video_chunked
+
+        mock_temp_dir.__truediv__ = lambda _, name: tmp_path / name
+        # Keyframe pts count from the 1.4s start time, -ss from the first frame
+        mock_keyframes.return_value = [1.4, 11.4, 21.4, 31.4]
+        mock_run.return_value = 1.0
+
+        task = task_store.create_task("test")
+        await encode_video_chunked(
+            task.id, Path("/tmp/in.ts"), Path("/tmp/out.mp4"), ["-c:v", "libx264"], 30.0
+        )
+
+        segment_cmds = [call.args[0] for call in mock_run.call_args_list if "-an" in call.args[0]]
+        assert "-ss" not in segment_cmds[0]
+        assert segment_cmds[0][segment_cmds[0].index("-t") + 1] == "10.000000"
+        assert segment_cmds[1][segment_cmds[1].index("-ss") + 1] == "10.000000"
+        assert segment_cmds[2][segment_cmds[2].index("-ss") + 1] == "20.000000"
+
+
+class TestTargetSizeEncoding:
+    """Tests for target-size two-pass encoding with progress"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    async def test_two_passes_share_progress(self, mock_run):
+        """Test pass commands and progress spanning both passes"""
+        from app.services.video_service_async import encode_video_to_size
+
+        async def fake_run(cmd, on_progress=None):
+            on_progress(30.0)
+            return 2.0
+
+        mock_run.side_effect = fake_run
+
+        task = task_store.create_task("test")
+        cpu_time = await encode_video_to_size(
+            task.id, Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), "libx264", 60.0, 10
+        )
+
+        assert cpu_time == 4.0
+        first_cmd, second_cmd = (call.args[0] for call in mock_run.call_args_list)
+        assert first_cmd[first_cmd.index("-pass") + 1] == "1"
+        assert "-an" in first_cmd
+        assert second_cmd[second_cmd.index("-pass") + 1] == "2"
+        assert second_cmd[-1] == "/tmp/out.mp4"
+
+        # Halfway through the second pass = 75% of the work
+        progress = task_store.get_task(task.id).progress
+        assert progress.percent == pytest.approx(5 + 0.75 * 94)
+        assert "Pass 2/2" in progress.message
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.get_video_duration", return_value=None)
+    @patch("app.services.video_service_async.get_available_h264_encoder", return_value="libx264")
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_unknown_duration_fails(self, mock_size, mock_encoder, mock_duration):
+        """Test that the bitrate cannot be computed without a duration"""
+        from app.services.video_service_async import compress_video_with_progress
+
+        task = task_store.create_task("test")
+        result = await compress_video_with_progress(
+            task.id, Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), target_size_mb=25
+        )
+
+        assert result.success is False
+        assert "duration" in result.error
+        assert task_store.get_task(task.id).status == TaskStatus.FAILED
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.video_service_async.get_video_duration", return_value=7200.0)
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_unreachable_target_fails_task(self, mock_size, mock_duration, mock_run):
+        """Test that a target too small for the video fails the task before encoding"""
+        from app.services.video_service_async import compress_video_with_progress
+
+        task = task_store.create_task("test")
+        result = await compress_video_with_progress(
+            task.id, Path("/tmp/in.mp4"), Path("/tmp/out.mp4"), target_size_mb=1
+        )
+
+        assert result.success is False
+        assert "MB required" in result.error
+        stored = task_store.get_task(task.id)
+        assert stored.status == TaskStatus.FAILED
+        assert stored.result.error == result.error
+        mock_run.assert_not_called()
+
+
+class TestVideoToGifWithProgress:
+    """Tests for async animated image rendering"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    async def test_progress_over_clip_duration(self, mock_size, mock_run):
+        """Test that progress is measured against the clip, not the whole video"""
+        from app.services.video_service_async import video_to_gif_with_progress
+
+        async def fake_run(cmd, on_progress=None):
+            on_progress(2.0)
+            return 0.4
+
+        mock_run.side_effect = fake_run
+        task = task_store.create_task("video_to_gif")
+
+        result = await video_to_gif_with_progress(
+            task.id,
+            Path("/tmp/in.mp4"),
+            Path("/tmp/out.webp"),
+            start_time=10.0,
+            duration=4.0,
+            output_format="webp",
+        )
+
+        assert result.success is True
+        assert result.cpu_time == 0.4
+        cmd = mock_run.call_args.args[0]
+        assert "-progress" in cmd and "libwebp_anim" in cmd
+        assert task_store.get_task(task.id).result.message == "WEBP created successfully"
+
+    @pytest.mark.asyncio
+    async def test_invalid_options_fail_task(self):
+        """Test that validation errors fail the task without running FFmpeg"""
+        from app.services.video_service_async import video_to_gif_with_progress
+
+        task = task_store.create_task("video_to_gif")
+        result = await video_to_gif_with_progress(
+            task.id, Path("/tmp/in.mp4"), Path("/tmp/out.gif"), fps=90
+        )
+
+        assert result.success is False
+        assert task_store.get_task(task.id).status == TaskStatus.FAILED
+
+
+class TestExtractAudioWithProgress:
+    """Tests for async audio extraction"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_service_async.run_ffmpeg", new_callable=AsyncMock)
+    @patch("app.services.video_service_async.get_video_duration", return_value=60.0)
+    @patch("app.services.video_service_async.get_file_size", return_value=1000)
+    @patch(
+        "app.services.video_service.probe_media",
+        return_value={"streams": [{"codec_type": "audio", "codec_name": "mp3"}]},
+    )
+    async def test_passthrough_copy(self, mock_probe, mock_size, mock_duration, mock_run):
+        """Test that a compatible track is copied and the task completes"""
+        from app.services.video_service_async import extract_audio_with_progress
+
+        mock_run.return_value = 0.01
+        task = task_store.create_task("video_extract_audio")
+
+        result = await extract_audio_with_progress(
+            task.id, Path("/tmp/in.mp4"), Path("/tmp/out.mp3"), "mp3"
+        )
+
+        assert result.success is True
+        assert "stream copy" in result.message
+        cmd = mock_run.call_args.args[0]
+        assert cmd[cmd.index("-acodec") + 1] == "copy"
+        assert task_store.get_task(task.id).status == TaskStatus.COMPLETED
@@ -0,0 +1,174 @@
+"""
+Tests for video thumbnail, sprite sheet and scene extraction
+"""
+
+import io
+import json
+from pathlib import Path
+from unittest.mock import patch
+import zipfile
+
+from fastapi.testclient import TestClient
+import ffmpeg
+import pytest
+
+from app.main import app
+from app.services.video_service import (
+    build_sprite_vtt,
+    extract_thumbnails,
+    format_vtt_timestamp,
+    get_thumbnail_archive_name,
+    get_thumbnail_times,
+)
+
+client = TestClient(app)
+
+PROBE = {
+    "format": {"duration": "100.0"},
+    "streams": [{"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080}],
+}
+
+
+def fake_ffmpeg_run(stream, **kwargs):
+    """Create the output images FFmpeg would have written"""
+    args = stream.compile()
+    for arg in args:
+        if arg.endswith((".jpg", ".png", ".webp")):
+            Path(arg.replace("%03d", "001")).write_bytes(b"image")
+    return b"", b"[Parsed_showinfo_3 @ 0x1] n:   0 pts:      0 pts_time:0     \n"
+
+
+class TestThumbnailHelpers:
+    """Tests for thumbnail timing and the WebVTT index"""
+
+    def test_times_are_centered_in_slices(self):
+        """Test evenly spaced positions that avoid the first and last frame"""
+        assert get_thumbnail_times(100.0, 4) == [12.5, 37.5, 62.5, 87.5]
+
+    def test_vtt_timestamp(self):
+        """Test WebVTT timestamp formatting"""
+        assert format_vtt_timestamp(3725.5) == "01:02:05.500"
+
+    def test_sprite_vtt_points_at_tiles(self):
+        """Test that each cue references its tile in the sheet"""
+        vtt = build_sprite_vtt("sprite.jpg", 40.0, 4, 2, 160, 90)
+
+        assert vtt.startswith("WEBVTT")
+        assert "00:00:00.000 --> 00:00:10.000\nsprite.jpg#xywh=0,0,160,90" in vtt
+        assert "00:00:30.000 --> 00:00:40.000\nsprite.jpg#xywh=160,90,160,90" in vtt
+
+    def test_archive_name_depends_on_content_and_options(self, tmp_path):
+        """Test the content-addressed cache name"""
+        first = tmp_path / "a.mp4"
+        second = tmp_path / "b.mp4"
+        first.write_bytes(b"same video")
+        second.write_bytes(b"same video")
+
+        name = get_thumbnail_archive_name(first, mode="grid", count=10)
+        assert name == get_thumbnail_archive_name(second, mode="grid", count=10)
+        assert name != get_thumbnail_archive_name(first, mode="grid", count=12)
+
+
+class TestExtractThumbnails:
+    """Tests for the extract_thumbnails service"""
+
+    @pytest.mark.parametrize("mode", ["grid", "sprite", "scenes"])
+    @patch("app.services.video_service.ffmpeg.run", side_effect=fake_ffmpeg_run)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    def test_single_ffmpeg_run_per_mode(self, mock_probe, mock_run, mode, tmp_path):
+        """Test that every mode runs FFmpeg once and archives a manifest"""
+        output_path = tmp_path / "thumbs.zip"
+
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            result = extract_thumbnails(
+                Path("/tmp/in.mp4"), output_path, mode=mode, count=4, width=320, columns=2
+            )
+
+        assert result.success is True
+        mock_run.assert_called_once()
+
+        with zipfile.ZipFile(output_path) as archive:
+            names = archive.namelist()
+            manifest = json.loads(archive.read("manifest.json"))
+
+        assert manifest["width"] == 320
+        assert manifest["height"] == 180
+        if mode == "sprite":
+            assert {"sprite.jpg", "sprite.vtt"} <= set(names)
+            assert (manifest["columns"], manifest["rows"]) == (2, 2)
+        elif mode == "grid":
+            assert [t["time"] for t in manifest["thumbnails"]] == [12.5, 37.5, 62.5, 87.5]
+        else:
+            assert manifest["thumbnails"] == [{"file": "scene_001.jpg", "time": 0.0}]
+        assert not (tmp_path / "thumbs_thumbs").exists()
+        assert not list(tmp_path.glob("thumbs.zip.partial-*"))
+
+    @patch("app.services.video_service.ffmpeg.run", side_effect=fake_ffmpeg_run)
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    def test_grid_seeks_every_input(self, mock_probe, mock_run, tmp_path):
+        """Test that each thumbnail position is an input-side seek"""
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            extract_thumbnails(Path("/tmp/in.mp4"), tmp_path / "t.zip", count=3)
+
+        args = mock_run.call_args.args[0].compile()
+        inputs = [index for index, arg in enumerate(args) if arg == "-i"]
+        assert len(inputs) == 3
+        assert [args[index - 4] for index in inputs] == ["-ss"] * 3
+
+    @patch("app.services.video_service.ffmpeg.run")
+    @patch("app.services.video_service.probe_media", return_value=PROBE)
+    def test_ffmpeg_error(self, mock_probe, mock_run, tmp_path):
+        """Test FFmpeg failures"""
+        mock_run.side_effect = ffmpeg.Error("ffmpeg", b"", b"decode failed")
+
+        with patch("app.services.video_service.TEMP_DIR", tmp_path):
+            result = extract_thumbnails(Path("/tmp/in.mp4"), tmp_path / "t.zip")
+
+        assert result.success is False
+        assert "decode failed" in result.message
+        assert not (tmp_path / "t.zip").exists()
+
+
+class TestThumbnailsEndpoint:
+    """Tests for /api/v1/video/thumbnails"""
+
+    @patch("app.api.video.extract_thumbnails")
+    @patch("app.api.video.save_upload_file")
+    def test_archive_is_cached(self, mock_save, mock_extract, tmp_path):
+        """Test that a second identical request is served from the cache"""
+        upload = tmp_path / "upload.mp4"
+        mock_save.side_effect = lambda file: upload.write_bytes(b"video") and upload
+
+        def create_archive(input_path, output_path, **options):
+            with zipfile.ZipFile(output_path, "w") as archive:
+                archive.writestr("manifest.json", "{}")
+            return type("Result", (), {"success": True})()
+
+        mock_extract.side_effect = create_archive
+
+        with patch("app.api.video.TEMP_DIR", tmp_path):
+            responses = [
+                client.post(
+                    "/api/v1/video/thumbnails",
+                    files={"file": ("clip.mp4", b"video", "video/mp4")},
+                    data={"mode": "sprite", "count": 20},
+                )
+                for _ in range(2)
+            ]
+
+        assert [r.status_code for r in responses] == [200, 200]
+        assert [r.headers["x-cache"] for r in responses] == ["MISS", "HIT"]
+        assert responses[0].headers["content-type"] == "application/zip"
+        assert zipfile.ZipFile(io.BytesIO(responses[1].content)).namelist() == ["manifest.json"]
+        mock_extract.assert_called_once()
+
+    def test_invalid_mode(self):
+        """Test that unknown modes are rejected"""
+        response = client.post(
+            "/api/v1/video/thumbnails",
+            files={"file": ("clip.mp4", b"video", "video/mp4")},
+            data={"mode": "mosaic"},
+        )
+
+        assert response.status_code == 400
+        assert "mode" in response.json()["detail"]
@@ -3,11 +3,12 @@ Tests for /api/v1/video/to-gif endpoint
 """
 
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.tasks import task_store
 
 client = TestClient(app)
 
@@ -83,3 +84,61 @@ class TestVideoToGifEndpoint:
 
         assert response.status_code == 400
         assert "fps" in response.json()["detail"].lower()
+
+    @patch("app.api.video.video_to_gif")
+    @patch("app.api.video.save_upload_file")
+    def test_video_to_webp(self, mock_save, mock_convert):
+        """Render an animated WebP with a preset"""
+        mock_save.return_value = Path("/tmp/test_video.mp4")
+        mock_convert.return_value = MagicMock(
+            success=True,
+            message="WEBP created successfully",
+            filename="webp_test_video.webp",
+            download_url="/api/v1/download/webp_test_video.webp",
+            original_size=1000,
+            processed_size=50,
+            compression_ratio=None,
+        )
+
+        response = client.post(
+            "/api/v1/video/to-gif",
+            files={"file": ("test_video.mp4", b"fake video", "video/mp4")},
+            data={"output_format": "WebP", "preset": "small"},
+        )
+
+        assert response.status_code == 200
+        kwargs = mock_convert.call_args.kwargs
+        assert kwargs["output_format"] == "webp"
+        assert kwargs["preset"] == "small"
+        assert kwargs["output_path"].suffix == ".webp"
+
+    def test_unsupported_output_format(self):
+        """Reject unknown animated image formats"""
+        response = client.post(
+            "/api/v1/video/to-gif",
+            files={"file": ("test_video.mp4", b"fake video", "video/mp4")},
+            data={"output_format": "apng"},
+        )
+
+        assert response.status_code == 400
+        assert "output_format" in response.json()["detail"]
+
+    @patch("app.api.video.run_gif_task", new_callable=AsyncMock)
+    @patch("app.api.video.asyncio.create_task")
+    @patch("app.api.video.save_upload_file")
+    def test_video_to_gif_async(self, mock_save, mock_create_task, mock_run_task):
+        """Start an async render and return the task id"""
+        mock_save.return_value = Path("/tmp/test_video.mp4")
+        mock_create_task.side_effect = lambda coro: coro.close()
+
+        response = client.post(
+            "/api/v1/video/to-gif/async",
+            files={"file": ("test_video.mp4", b"fake video", "video/mp4")},
+            data={"output_format": "avif", "preset": "fast", "fps": 15},
+        )
+
+        assert response.status_code == 200
+        task = task_store.get_task(response.json()["task_id"])
+        assert task.task_type == "video_to_gif"
+        assert task.metadata["output_format"] == "avif"
+        assert task.metadata["fps"] == 15